@@ -0,0 +1,82 @@
+"""create_account_balances_tables
+
+Revision ID: create_account_balances_20261016
+Revises: create_vault_vesting_lots_20250127
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'create_account_balances_20261016'
+down_revision = 'create_vault_vesting_lots_20250127'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create account_balances table (materialized running balance per account)
+    op.create_table(
+        'account_balances',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('account_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('balance', sa.Numeric(24, 8), nullable=False, server_default='0'),
+        sa.Column('entry_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_entry_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], name='fk_account_balances_account_id'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_account_balances_id'), 'account_balances', ['id'], unique=False)
+    op.create_index(op.f('ix_account_balances_account_id'), 'account_balances', ['account_id'], unique=True)
+
+    # Create account_balance_checkpoints table (balance as of a closed period boundary)
+    op.create_table(
+        'account_balance_checkpoints',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('account_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('checkpoint_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('balance', sa.Numeric(24, 8), nullable=False),
+        sa.Column('entry_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], name='fk_account_balance_checkpoints_account_id'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('account_id', 'checkpoint_at', name='uq_account_balance_checkpoints_account_at'),
+    )
+    op.create_index(op.f('ix_account_balance_checkpoints_id'), 'account_balance_checkpoints', ['id'], unique=False)
+    op.create_index(op.f('ix_account_balance_checkpoints_account_id'), 'account_balance_checkpoints', ['account_id'], unique=False)
+    op.create_index('ix_account_balance_checkpoints_account_at', 'account_balance_checkpoints', ['account_id', 'checkpoint_at'], unique=False)
+
+    # Checkpoint + delta reads scan entries of one account after a timestamp
+    op.create_index('ix_ledger_entries_account_created', 'ledger_entries', ['account_id', 'created_at'], unique=False)
+
+    # Backfill snapshots from the existing ledger.
+    # Run inside the migration transaction with ledger_entries locked against
+    # writes, so no entry can be committed between the backfill and the
+    # application starting to maintain the snapshot.
+    op.execute("LOCK TABLE ledger_entries IN SHARE MODE")
+    op.execute("""
+        INSERT INTO account_balances (id, account_id, currency, balance, entry_count, last_entry_at, created_at)
+        SELECT gen_random_uuid(), a.id, a.currency, SUM(le.amount), COUNT(le.id), MAX(le.created_at), now()
+        FROM accounts a
+        JOIN ledger_entries le ON le.account_id = a.id
+        GROUP BY a.id, a.currency
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ledger_entries_account_created', table_name='ledger_entries')
+
+    op.drop_index('ix_account_balance_checkpoints_account_at', table_name='account_balance_checkpoints')
+    op.drop_index(op.f('ix_account_balance_checkpoints_account_id'), table_name='account_balance_checkpoints')
+    op.drop_index(op.f('ix_account_balance_checkpoints_id'), table_name='account_balance_checkpoints')
+    op.drop_table('account_balance_checkpoints')
+
+    op.drop_index(op.f('ix_account_balances_account_id'), table_name='account_balances')
+    op.drop_index(op.f('ix_account_balances_id'), table_name='account_balances')
+    op.drop_table('account_balances')
@@ -0,0 +1,49 @@
+"""create_webhook_inbox_events_table
+
+Revision ID: create_webhook_inbox_20261016
+Revises: create_account_balances_20261016
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'create_webhook_inbox_20261016'
+down_revision = 'create_account_balances_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create webhook_inbox_events table (durable intake for provider webhooks)
+    op.create_table(
+        'webhook_inbox_events',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('provider', sa.String(length=20), nullable=False),
+        sa.Column('event_type', sa.String(length=32), nullable=False),
+        sa.Column('provider_event_id', sa.String(length=255), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='RECEIVED'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('transaction_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('operation_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('provider', 'provider_event_id', name='uq_webhook_inbox_events_provider_event'),
+    )
+    op.create_index(op.f('ix_webhook_inbox_events_id'), 'webhook_inbox_events', ['id'], unique=False)
+    op.create_index(op.f('ix_webhook_inbox_events_status'), 'webhook_inbox_events', ['status'], unique=False)
+    op.create_index('ix_webhook_inbox_events_status_next_attempt', 'webhook_inbox_events', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_webhook_inbox_events_status_next_attempt', table_name='webhook_inbox_events')
+    op.drop_index(op.f('ix_webhook_inbox_events_status'), table_name='webhook_inbox_events')
+    op.drop_index(op.f('ix_webhook_inbox_events_id'), table_name='webhook_inbox_events')
+    op.drop_table('webhook_inbox_events')
@@ -0,0 +1,47 @@
+"""add_accounts_user_wallet_unique_index
+
+Revision ID: accounts_user_wallet_uq_20261016
+Revises: create_webhook_inbox_20261016
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'accounts_user_wallet_uq_20261016'
+down_revision = 'create_webhook_inbox_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # uq_accounts_unique does not prevent duplicate wallet accounts (NULL vault_id/offer_id
+    # are distinct in PostgreSQL). The partial unique index below is the ON CONFLICT target
+    # of ensure_wallet_accounts(); it cannot be built over existing duplicates.
+    conn = op.get_bind()
+    duplicates = conn.execute(sa.text("""
+        SELECT user_id, currency, account_type, COUNT(*) AS n
+        FROM accounts
+        WHERE user_id IS NOT NULL AND vault_id IS NULL AND offer_id IS NULL
+        GROUP BY user_id, currency, account_type
+        HAVING COUNT(*) > 1
+        LIMIT 10
+    """)).fetchall()
+    if duplicates:
+        sample = ", ".join(f"{row.user_id}/{row.currency}/{row.account_type} (x{row.n})" for row in duplicates)
+        raise RuntimeError(
+            f"Duplicate wallet accounts must be merged before adding uq_accounts_user_wallet: {sample}"
+        )
+
+    op.create_index(
+        'uq_accounts_user_wallet',
+        'accounts',
+        ['user_id', 'currency', 'account_type'],
+        unique=True,
+        postgresql_where=sa.text('user_id IS NOT NULL AND vault_id IS NULL AND offer_id IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_accounts_user_wallet', table_name='accounts')
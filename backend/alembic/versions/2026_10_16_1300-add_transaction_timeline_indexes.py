@@ -0,0 +1,37 @@
+"""add_transaction_timeline_indexes
+
+Revision ID: txn_timeline_idx_20261016
+Revises: accounts_user_wallet_uq_20261016
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'txn_timeline_idx_20261016'
+down_revision = 'accounts_user_wallet_uq_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pagination of GET /api/v1/transactions on (created_at, id)
+    op.create_index(
+        'ix_transactions_user_created_id',
+        'transactions',
+        ['user_id', 'created_at', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_operations_standalone_created_id',
+        'operations',
+        ['created_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text('transaction_id IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_operations_standalone_created_id', table_name='operations')
+    op.drop_index('ix_transactions_user_created_id', table_name='transactions')
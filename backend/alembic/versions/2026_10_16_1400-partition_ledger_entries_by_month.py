@@ -0,0 +1,121 @@
+"""partition_ledger_entries_by_month
+
+Revision ID: partition_ledger_20261016
+Revises: txn_timeline_idx_20261016
+Create Date: 2026-10-16 14:00:00.000000
+
+Rebuilds ledger_entries as a table range-partitioned by created_at month
+(ledger_entries_yYYYYmMM + ledger_entries_default) and creates the
+ledger_partition_archives table. Existing rows are copied under an ACCESS
+EXCLUSIVE lock: run during a maintenance window.
+
+The primary key becomes (id, created_at) - PostgreSQL requires the partition
+key in every unique constraint of a partitioned table. operations is not
+partitioned (global idempotency_key uniqueness, inbound foreign keys).
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'partition_ledger_20261016'
+down_revision = 'txn_timeline_idx_20261016'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+ARCHIVE_SCHEMA = 'ledger_archive'
+
+
+def _month_index(value: datetime) -> int:
+    return value.year * 12 + (value.month - 1)
+
+
+def _month_from_index(index: int) -> datetime:
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _create_ledger_indexes() -> None:
+    op.create_foreign_key('fk_ledger_entries_account_id', 'ledger_entries', 'accounts', ['account_id'], ['id'])
+    op.create_foreign_key('fk_ledger_entries_operation_id', 'ledger_entries', 'operations', ['operation_id'], ['id'])
+    op.create_index(op.f('ix_ledger_entries_account_id'), 'ledger_entries', ['account_id'], unique=False)
+    op.create_index(op.f('ix_ledger_entries_entry_type'), 'ledger_entries', ['entry_type'], unique=False)
+    op.create_index(op.f('ix_ledger_entries_id'), 'ledger_entries', ['id'], unique=False)
+    op.create_index(op.f('ix_ledger_entries_operation_id'), 'ledger_entries', ['operation_id'], unique=False)
+    op.create_index('ix_ledger_entries_account_created', 'ledger_entries', ['account_id', 'created_at'], unique=False)
+
+
+def upgrade() -> None:
+    # Registry of ledger_entries partitions moved to the archive schema
+    op.create_table(
+        'ledger_partition_archives',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('partition_name', sa.String(length=63), nullable=False),
+        sa.Column('archive_schema', sa.String(length=63), nullable=False),
+        sa.Column('range_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('range_end', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('entry_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('amount_sum', sa.Numeric(24, 8), nullable=False, server_default='0'),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('partition_name'),
+    )
+    op.create_index(op.f('ix_ledger_partition_archives_id'), 'ledger_partition_archives', ['id'], unique=False)
+    op.create_index(op.f('ix_ledger_partition_archives_range_end'), 'ledger_partition_archives', ['range_end'], unique=False)
+
+    op.execute(f'CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}')
+
+    # Rebuild ledger_entries as a partitioned table (no writes while copying)
+    conn = op.get_bind()
+    op.execute("LOCK TABLE ledger_entries IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE ledger_entries RENAME TO ledger_entries_unpartitioned")
+    op.execute("""
+        CREATE TABLE ledger_entries (LIKE ledger_entries_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY RANGE (created_at)
+    """)
+
+    now = datetime.now(timezone.utc)
+    oldest = conn.execute(sa.text("SELECT MIN(created_at) FROM ledger_entries_unpartitioned")).scalar() or now
+    for index in range(_month_index(oldest.astimezone(timezone.utc)), _month_index(now) + MONTHS_AHEAD + 1):
+        start, end = _month_from_index(index), _month_from_index(index + 1)
+        op.execute(
+            f"CREATE TABLE ledger_entries_y{start.year:04d}m{start.month:02d} PARTITION OF ledger_entries "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    # Safety net only: maintenance keeps monthly partitions ahead of time
+    op.execute("CREATE TABLE ledger_entries_default PARTITION OF ledger_entries DEFAULT")
+
+    op.execute("INSERT INTO ledger_entries SELECT * FROM ledger_entries_unpartitioned")
+    op.execute("DROP TABLE ledger_entries_unpartitioned")
+
+    op.create_primary_key('ledger_entries_pkey', 'ledger_entries', ['id', 'created_at'])
+    _create_ledger_indexes()
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    archived = conn.execute(sa.text("SELECT COUNT(*) FROM ledger_partition_archives")).scalar()
+    if archived:
+        raise RuntimeError(
+            f"{archived} ledger partition(s) are archived in schema {ARCHIVE_SCHEMA}: "
+            "re-attach them before downgrading"
+        )
+
+    op.execute("LOCK TABLE ledger_entries IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE ledger_entries RENAME TO ledger_entries_partitioned")
+    op.execute("CREATE TABLE ledger_entries (LIKE ledger_entries_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO ledger_entries SELECT * FROM ledger_entries_partitioned")
+    op.execute("DROP TABLE ledger_entries_partitioned")  # Drops its partitions
+
+    op.create_primary_key('ledger_entries_pkey', 'ledger_entries', ['id'])
+    _create_ledger_indexes()
+
+    op.execute(f'DROP SCHEMA IF EXISTS {ARCHIVE_SCHEMA}')
+
+    op.drop_index(op.f('ix_ledger_partition_archives_range_end'), table_name='ledger_partition_archives')
+    op.drop_index(op.f('ix_ledger_partition_archives_id'), table_name='ledger_partition_archives')
+    op.drop_table('ledger_partition_archives')
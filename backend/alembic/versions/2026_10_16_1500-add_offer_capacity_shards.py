@@ -0,0 +1,58 @@
+"""add_offer_capacity_shards
+
+Revision ID: offer_capacity_shards_20261016
+Revises: partition_ledger_20261016
+Create Date: 2026-10-16 15:00:00.000000
+
+Capacity shards of hot offers (see app/services/offers/capacity_shards.py).
+No offer is sharded by this migration.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'offer_capacity_shards_20261016'
+down_revision = 'partition_ledger_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'offer_capacity_shards',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('offer_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('shard_no', sa.Integer(), nullable=False),
+        sa.Column('capacity', sa.Numeric(24, 8), nullable=False),
+        sa.Column('reserved_amount', sa.Numeric(24, 8), nullable=False, server_default='0'),
+        sa.CheckConstraint('capacity >= 0', name='check_capacity_shard_capacity_non_negative'),
+        sa.CheckConstraint('reserved_amount >= 0', name='check_capacity_shard_reserved_non_negative'),
+        sa.CheckConstraint('reserved_amount <= capacity', name='check_capacity_shard_not_overfilled'),
+        sa.ForeignKeyConstraint(['offer_id'], ['offers.id'], name='fk_offer_capacity_shards_offer_id', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_offer_capacity_shards_id'), 'offer_capacity_shards', ['id'], unique=False)
+    op.create_index(op.f('ix_offer_capacity_shards_offer_id'), 'offer_capacity_shards', ['offer_id'], unique=False)
+    op.create_index('uq_offer_capacity_shards_offer_shard', 'offer_capacity_shards', ['offer_id', 'shard_no'], unique=True)
+
+
+def downgrade() -> None:
+    # Fold outstanding reservations back into the offers before dropping the shards
+    op.execute("""
+        UPDATE offers o
+        SET invested_amount = o.invested_amount + s.reserved,
+            committed_amount = o.invested_amount + s.reserved
+        FROM (
+            SELECT offer_id, SUM(reserved_amount) AS reserved
+            FROM offer_capacity_shards
+            GROUP BY offer_id
+        ) s
+        WHERE s.offer_id = o.id
+    """)
+    op.drop_index('uq_offer_capacity_shards_offer_shard', table_name='offer_capacity_shards')
+    op.drop_index(op.f('ix_offer_capacity_shards_offer_id'), table_name='offer_capacity_shards')
+    op.drop_index(op.f('ix_offer_capacity_shards_id'), table_name='offer_capacity_shards')
+    op.drop_table('offer_capacity_shards')
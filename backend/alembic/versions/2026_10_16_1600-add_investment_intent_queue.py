@@ -0,0 +1,58 @@
+"""add_investment_intent_queue
+
+Revision ID: investment_intent_queue_20261016
+Revises: offer_capacity_shards_20261016
+Create Date: 2026-10-16 16:00:00.000000
+
+Queued allocation of investment intents (see
+app/services/offers/allocation_queue.py): per-offer opt-in flag, FIFO
+sequence and allocation bookkeeping on investment_intents. No offer is
+switched to queued allocation by this migration.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'investment_intent_queue_20261016'
+down_revision = 'offer_capacity_shards_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('offers', sa.Column('queued_allocation', sa.Boolean(), nullable=False, server_default=sa.text('false')))
+
+    op.execute('CREATE SEQUENCE investment_intent_queue_seq')
+    op.add_column('investment_intents', sa.Column('queue_position', sa.BigInteger(), nullable=True))
+    op.add_column('investment_intents', sa.Column('allocation_batch_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('investment_intents', sa.Column('rejection_reason', sa.String(length=64), nullable=True))
+    op.add_column('investment_intents', sa.Column('callback_url', sa.String(length=2048), nullable=True))
+    op.create_index(op.f('ix_investment_intents_allocation_batch_id'), 'investment_intents', ['allocation_batch_id'], unique=False)
+    # The allocation worker's FIFO scan: only queued intents still waiting
+    op.create_index(
+        'ix_investment_intents_offer_queue',
+        'investment_intents',
+        ['offer_id', 'queue_position'],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING' AND queue_position IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    pending = conn.execute(sa.text(
+        "SELECT COUNT(*) FROM investment_intents WHERE status = 'PENDING' AND queue_position IS NOT NULL"
+    )).scalar()
+    if pending:
+        raise RuntimeError(f"{pending} queued investment intent(s) are still PENDING: drain the allocation queue first")
+
+    op.drop_index('ix_investment_intents_offer_queue', table_name='investment_intents')
+    op.drop_index(op.f('ix_investment_intents_allocation_batch_id'), table_name='investment_intents')
+    op.drop_column('investment_intents', 'callback_url')
+    op.drop_column('investment_intents', 'rejection_reason')
+    op.drop_column('investment_intents', 'allocation_batch_id')
+    op.drop_column('investment_intents', 'queue_position')
+    op.execute('DROP SEQUENCE investment_intent_queue_seq')
+
+    op.drop_column('offers', 'queued_allocation')
@@ -0,0 +1,62 @@
+"""add_vesting_release_checkpoints
+
+Revision ID: vesting_release_ckpt_20261016
+Revises: investment_intent_queue_20261016
+Create Date: 2026-10-16 17:00:00.000000
+
+Per-shard checkpoints of the parallel AVENIR vesting release runner (see
+app/services/vesting_release_runner.py), plus a partial index on VESTED lots
+for the runner's keyset walk in id order.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'vesting_release_ckpt_20261016'
+down_revision = 'investment_intent_queue_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'vesting_release_checkpoints',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('trace_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('shard_no', sa.Integer(), nullable=False),
+        sa.Column('shard_count', sa.Integer(), nullable=False),
+        sa.Column('vault_code', sa.String(length=50), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('as_of_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('last_lot_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('lots_released', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('amount_released', sa.Numeric(precision=20, scale=2), nullable=False, server_default='0'),
+        sa.Column('lots_skipped', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('locks_missing_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('trace_id', 'shard_no', name='uq_vesting_release_checkpoints_trace_shard'),
+        sa.CheckConstraint('shard_no >= 0 AND shard_no < shard_count', name='ck_vesting_release_checkpoints_shard_no'),
+    )
+    op.create_index(op.f('ix_vesting_release_checkpoints_trace_id'), 'vesting_release_checkpoints', ['trace_id'], unique=False)
+
+    op.create_index(
+        'ix_vault_vesting_lots_vested_id',
+        'vault_vesting_lots',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'VESTED'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vault_vesting_lots_vested_id', table_name='vault_vesting_lots')
+    op.drop_index(op.f('ix_vesting_release_checkpoints_trace_id'), table_name='vesting_release_checkpoints')
+    op.drop_table('vesting_release_checkpoints')
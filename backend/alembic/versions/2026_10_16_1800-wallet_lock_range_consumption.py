@@ -0,0 +1,84 @@
+"""wallet_lock_range_consumption
+
+Revision ID: wallet_lock_consumed_20261016
+Revises: vesting_release_ckpt_20261016
+Create Date: 2026-10-16 18:00:00.000000
+
+Partial releases of a WalletLock now grow wallet_locks.consumed_amount
+instead of releasing the row and inserting a remainder row (see
+app/services/wallet_lock_helpers.py). Adds the column, its range check and
+a partial index for the FIFO scan of ACTIVE locks.
+
+Existing chains are compacted: split remainders (ACTIVE, no operation_id,
+no intent_id) carry no link to the lock they were split from, so they
+cannot be folded back into it; the remainders of each user and instrument
+are merged into the oldest one (same total, oldest FIFO position). RELEASED
+rows are history and are kept.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'wallet_lock_consumed_20261016'
+down_revision = 'vesting_release_ckpt_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'wallet_locks',
+        sa.Column('consumed_amount', sa.Numeric(precision=20, scale=2), nullable=False, server_default='0'),
+    )
+    op.create_check_constraint(
+        'check_wallet_locks_consumed_amount_range',
+        'wallet_locks',
+        'consumed_amount >= 0 AND consumed_amount <= amount',
+    )
+    op.create_index(
+        'ix_wallet_locks_active_fifo',
+        'wallet_locks',
+        ['user_id', 'reference_type', 'reference_id', 'reason', 'created_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'ACTIVE'"),
+    )
+
+    op.execute("""
+        WITH remainders AS (
+            SELECT
+                id,
+                first_value(id) OVER chain AS keep_id,
+                SUM(amount) OVER (PARTITION BY user_id, currency, reason, reference_type, reference_id) AS total
+            FROM wallet_locks
+            WHERE status = 'ACTIVE' AND operation_id IS NULL AND intent_id IS NULL
+            WINDOW chain AS (PARTITION BY user_id, currency, reason, reference_type, reference_id ORDER BY created_at, id)
+        ),
+        merged AS (
+            UPDATE wallet_locks w
+            SET amount = r.total, updated_at = now()
+            FROM remainders r
+            WHERE w.id = r.id AND r.id = r.keep_id AND w.amount <> r.total
+        )
+        DELETE FROM wallet_locks w
+        USING remainders r
+        WHERE w.id = r.id AND r.id <> r.keep_id
+    """)
+
+
+def downgrade() -> None:
+    # Back to split rows: a partly consumed lock is released and its remainder re-locked
+    op.execute("""
+        WITH consumed AS (
+            UPDATE wallet_locks
+            SET status = 'RELEASED', released_at = now(), updated_at = now()
+            WHERE status = 'ACTIVE' AND consumed_amount > 0
+            RETURNING user_id, currency, amount - consumed_amount AS remaining, reason, reference_type, reference_id
+        )
+        INSERT INTO wallet_locks (id, user_id, currency, amount, reason, reference_type, reference_id, status, created_at)
+        SELECT gen_random_uuid(), user_id, currency, remaining, reason, reference_type, reference_id, 'ACTIVE', now()
+        FROM consumed
+    """)
+
+    op.drop_index('ix_wallet_locks_active_fifo', table_name='wallet_locks')
+    op.drop_constraint('check_wallet_locks_consumed_amount_range', 'wallet_locks', type_='check')
+    op.drop_column('wallet_locks', 'consumed_amount')
@@ -0,0 +1,58 @@
+"""create_exposure_aggregates
+
+Revision ID: exposure_aggregates_20261016
+Revises: wallet_lock_consumed_20261016
+Create Date: 2026-10-16 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'exposure_aggregates_20261016'
+down_revision = 'wallet_lock_consumed_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create exposure_aggregates table (running totals per instrument, see app/core/accounts/exposures.py)
+    op.create_table(
+        'exposure_aggregates',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('reference_type', sa.String(length=20), nullable=False),
+        sa.Column('reference_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('reason', sa.String(length=50), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('total_amount', sa.Numeric(20, 2), nullable=False, server_default='0'),
+        sa.Column('item_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('reference_type', 'reference_id', 'reason', 'currency', name='uq_exposure_aggregates_key'),
+    )
+    op.create_index(op.f('ix_exposure_aggregates_id'), 'exposure_aggregates', ['id'], unique=False)
+
+    # Backfill from the source rows, locked against writes so nothing is
+    # committed between the backfill and the application maintaining the
+    # aggregates (same approach as account_balances).
+    op.execute("LOCK TABLE wallet_locks, vault_accounts IN SHARE MODE")
+    op.execute("""
+        INSERT INTO exposure_aggregates (id, reference_type, reference_id, reason, currency, total_amount, item_count, created_at)
+        SELECT gen_random_uuid(), reference_type, reference_id, reason, currency, SUM(amount - consumed_amount), COUNT(*), now()
+        FROM wallet_locks
+        WHERE status = 'ACTIVE'
+        GROUP BY reference_type, reference_id, reason, currency
+    """)
+    op.execute("""
+        INSERT INTO exposure_aggregates (id, reference_type, reference_id, reason, currency, total_amount, item_count, created_at)
+        SELECT gen_random_uuid(), 'VAULT', vault_id, 'VAULT_PRINCIPAL', 'AED', SUM(principal), COUNT(*), now()
+        FROM vault_accounts
+        GROUP BY vault_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_exposure_aggregates_id'), table_name='exposure_aggregates')
+    op.drop_table('exposure_aggregates')
@@ -14,18 +14,21 @@ from app.core.offers.models import Offer, OfferStatus, InvestmentIntent, Investm
 from app.core.users.models import User
 from app.schemas.offers import (
     CreateOfferRequest, UpdateOfferRequest, OfferResponse, OfferInvestmentListItem, OfferInvestmentsPaginatedResponse,
-    OfferMarketingUpdateIn, MarketingWhyItem, MarketingBreakdown, MarketingMetrics
+    OfferMarketingUpdateIn, MarketingWhyItem, MarketingBreakdown, MarketingMetrics,
+    OfferCapacityShardsRequest, OfferCapacityShardsResponse
 )
 from app.core.offers.models import OfferMedia
-from app.api.v1.offers import build_offer_response
+from app.api.v1.offers import build_offer_response, build_offer_responses
 from app.auth.dependencies import require_admin_role
 from app.auth.oidc import Principal
+from app.services.offers.allocation_queue import count_queued_intents
+from app.services.exposure_aggregates import get_exposure
+from app.services.offers.capacity_shards import fold_capacity_shards, has_capacity_shards
 from app.services.system_wallet_helpers import get_offer_system_wallet_balances
 from app.utils.trace_id import get_trace_id
 from fastapi import Request
 from pydantic import BaseModel, Field
-from app.core.accounts.wallet_locks import WalletLock, LockReason, LockStatus
-from sqlalchemy import func
+from app.core.accounts.wallet_locks import LockReason, ReferenceType
 import logging
 
 router = APIRouter()
@@ -118,16 +121,10 @@ async def list_offers(
     if currency:
         query = query.filter(Offer.currency == currency)
     
-    # Eager load relationships to avoid N+1 queries
-    # Note: cover_media and promo_video_media are now properties, not ORM relationships
-    query = query.options(
-        selectinload(Offer.offer_media),
-    )
-    
     offers = query.order_by(Offer.created_at.desc()).limit(limit).offset(offset).all()
     
-    # Use build_offer_response for consistency (includes media/documents/marketing)
-    return [build_offer_response(offer, db) for offer in offers]
+    # Same builder as the client API (includes media/documents/marketing); media loaded in bulk for the page
+    return build_offer_responses(offers, db)
 
 
 @router.get(
@@ -142,11 +139,8 @@ async def get_offer(
     principal: Principal = Depends(require_admin_role()),
 ) -> OfferResponse:
     """Get offer by ID"""
-    # Eager load relationships to avoid N+1 queries
-    # Note: cover_media and promo_video_media are now properties, not ORM relationships
-    offer = db.query(Offer).options(
-        selectinload(Offer.offer_media),
-    ).filter(Offer.id == offer_id).first()
+    # Media/documents are loaded by build_offer_response (one query each)
+    offer = db.query(Offer).filter(Offer.id == offer_id).first()
     
     if not offer:
         raise HTTPException(
@@ -188,14 +182,31 @@ async def update_offer(
     if request.metadata is not None:
         offer.offer_metadata = request.metadata
     
+    # Validate allocation mode change (queued allocation and capacity shards are exclusive)
+    if request.queued_allocation is not None and request.queued_allocation != offer.queued_allocation:
+        if request.queued_allocation and has_capacity_shards(db, offer_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="OFFER_CAPACITY_SHARDED"
+            )
+        if not request.queued_allocation and count_queued_intents(db, offer_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="OFFER_ALLOCATION_QUEUE_NOT_EMPTY"
+            )
+        offer.queued_allocation = request.queued_allocation
+    
     # Validate max_amount change
     if request.max_amount is not None:
+        # Sharded capacity: fold reservations first so committed_amount is current
+        fold_capacity_shards(db, offer_id)
         if request.max_amount < offer.committed_amount:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="INVALID_MAX_AMOUNT"
             )
         offer.max_amount = request.max_amount
+        fold_capacity_shards(db, offer_id)  # Re-split the new remaining capacity
     
     db.commit()
     db.refresh(offer)
@@ -288,6 +299,7 @@ async def pause_offer(
             detail="OFFER_NOT_LIVE"
         )
     
+    fold_capacity_shards(db, offer_id)  # Waits for in-flight sharded investments
     offer.status = OfferStatus.PAUSED
     db.commit()
     db.refresh(offer)
@@ -334,6 +346,7 @@ async def close_offer(
             detail="OFFER_CANNOT_BE_CLOSED"
         )
     
+    fold_capacity_shards(db, offer_id, shard_count=0)  # Final committed_amount, shards removed
     offer.status = OfferStatus.CLOSED
     db.commit()
     db.refresh(offer)
@@ -355,6 +368,55 @@ async def close_offer(
     )
 
 
+@router.put(
+    "/offers/{offer_id}/capacity-shards",
+    response_model=OfferCapacityShardsResponse,
+    summary="Set offer capacity shards",
+    description=(
+        "Split the remaining capacity over shard_count rows so concurrent investments do not serialize "
+        "on the offer row (hot launches); 0 removes the shards. Folds pending reservations into "
+        "committed_amount first. Requires ADMIN role."
+    ),
+)
+async def set_offer_capacity_shards(
+    offer_id: UUID,
+    request: OfferCapacityShardsRequest,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(require_admin_role()),
+) -> OfferCapacityShardsResponse:
+    """Set offer capacity shards"""
+    offer = db.query(Offer).filter(Offer.id == offer_id).first()
+    if not offer:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="OFFER_NOT_FOUND"
+        )
+    
+    if offer.status == OfferStatus.CLOSED and request.shard_count > 0:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="OFFER_CLOSED"
+        )
+    
+    if offer.queued_allocation and request.shard_count > 0:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="OFFER_ALLOCATION_QUEUED"
+        )
+    
+    summary = fold_capacity_shards(db, offer_id, shard_count=request.shard_count)
+    db.commit()
+    db.refresh(offer)
+    
+    return OfferCapacityShardsResponse(
+        offer_id=str(offer.id),
+        shard_count=request.shard_count,
+        folded_amount=summary["folded_amount"],
+        committed_amount=str(offer.committed_amount),
+        remaining_amount=str(offer.max_amount - offer.committed_amount),
+    )
+
+
 @router.get(
     "/offers/{offer_id}/investments",
     response_model=OfferInvestmentsPaginatedResponse,
@@ -741,22 +803,10 @@ async def get_offer_portfolio(
     # Get system wallet balances
     system_balances = get_offer_system_wallet_balances(db, offer_id, offer.currency)
     
-    # Calculate total client liabilities (sum of active wallet_locks)
-    clients_locked_total = db.query(
-        func.coalesce(func.sum(WalletLock.amount), Decimal("0.00"))
-    ).filter(
-        WalletLock.reference_type == "OFFER",
-        WalletLock.reference_id == offer_id,
-        WalletLock.reason == LockReason.OFFER_INVEST.value,
-        WalletLock.status == LockStatus.ACTIVE.value,
-        WalletLock.currency == offer.currency,
-    ).scalar()
-    
-    # Ensure it's a Decimal
-    if clients_locked_total is None:
-        clients_locked_total = Decimal("0.00")
-    else:
-        clients_locked_total = Decimal(str(clients_locked_total))
+    # Total client liabilities (sum of active wallet_locks, maintained in exposure_aggregates)
+    clients_locked_total, _ = get_exposure(
+        db, (ReferenceType.OFFER.value, offer_id, LockReason.OFFER_INVEST.value, offer.currency),
+    )
     
     return OfferPortfolioResponse(
         offer_id=str(offer_id),
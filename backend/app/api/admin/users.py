@@ -11,6 +11,7 @@ from app.infrastructure.database import get_db
 from app.core.users.models import User
 from app.schemas.compliance import UserListItem, UserDetailResponse, ResolveUserRequest, ResolveUserResponse
 from app.auth.dependencies import require_admin_role
+from app.auth.principal_cache import invalidate_cached_user
 
 router = APIRouter()
 
@@ -104,3 +105,17 @@ async def get_user(
         external_subject=user.external_subject,
         created_at=user.created_at.isoformat() + "Z",
     )
+
+
+@router.delete(
+    "/users/{user_id}/auth-cache",
+    status_code=204,
+    summary="Invalidate cached auth data",
+    description="Drop the user's cached authentication record (e.g. after a change made outside the API). Requires ADMIN role.",
+)
+async def invalidate_user_auth_cache(
+    user_id: UUID,
+    principal = Depends(require_admin_role()),
+) -> None:
+    """Invalidate a user's cached auth record (this replica; others expire within AUTH_USER_CACHE_TTL_SECONDS)"""
+    invalidate_cached_user(user_id)
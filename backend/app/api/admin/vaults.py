@@ -16,6 +16,7 @@ from app.schemas.vaults import (
     AdminVaultRow,
     AdminPortfolioResponse,
     ProcessWithdrawalsResponse,
+    WithdrawalDecisionItem,
     WithdrawalListResponse,
     WithdrawalListItem,
     VaultSnapshot,
@@ -26,11 +27,14 @@ from app.auth.oidc import Principal
 from app.services.vault_service import (
     get_vault_by_code,
     process_pending_withdrawals,
+    project_pending_withdrawals,
     VaultNotFoundError,
 )
+from app.core.accounts.exposures import vault_principal_key
+from app.services.exposure_aggregates import get_exposure, get_vault_principals
 from app.services.vault_helpers import get_vault_cash_balance
 from app.services.system_wallet_helpers import get_vault_system_wallet_balances
-from app.core.vaults.models import Vault, WithdrawalRequest, WithdrawalRequestStatus, VaultAccount
+from app.core.vaults.models import Vault, WithdrawalRequest, WithdrawalRequestStatus
 from app.utils.trace_id import get_trace_id
 from app.services.vesting_service import release_avenir_vesting_lots, VestingReleaseError
 from pydantic import BaseModel, Field
@@ -67,6 +71,7 @@ async def list_vaults(
     
     try:
         vaults = db.query(Vault).order_by(Vault.code).all()
+        vault_principals = get_vault_principals(db, [vault.id for vault in vaults])
         
         vault_rows = []
         for vault in vaults:
@@ -86,11 +91,8 @@ async def list_vaults(
             # Get cash balance from ledger (source of truth)
             vault_cash_balance = get_vault_cash_balance(db, vault.id, "AED")  # TODO: support multi-currency
             
-            # Get total_aum from sum of vault_accounts.principal
-            total_aum_result = db.query(func.sum(VaultAccount.principal)).filter(
-                VaultAccount.vault_id == vault.id,
-            ).scalar()
-            total_aum = Decimal(str(total_aum_result)) if total_aum_result else Decimal("0.00")
+            # total_aum: sum of vault_accounts.principal (maintained in exposure_aggregates)
+            total_aum, _ = vault_principals[vault.id]
             
             vault_rows.append(
                 AdminVaultRow(
@@ -142,10 +144,8 @@ async def get_vault_portfolio(
     try:
         vault = get_vault_by_code(db, vault_code)
         
-        # Count accounts
-        accounts_count = db.query(func.count(VaultAccount.id)).filter(
-            VaultAccount.vault_id == vault.id,
-        ).scalar() or 0
+        # total_aum and accounts count: sum / count of vault_accounts (maintained in exposure_aggregates)
+        total_aum, accounts_count = get_exposure(db, vault_principal_key(vault.id))
         
         # Get system wallet balances (from ledger, source of truth)
         system_balances = get_vault_system_wallet_balances(db, vault.id, "AED")
@@ -153,12 +153,6 @@ async def get_vault_portfolio(
         # Get cash balance from ledger (same as system_balances["available"])
         vault_cash_balance = get_vault_cash_balance(db, vault.id, "AED")
         
-        # Get total_aum from sum of vault_accounts.principal
-        total_aum_result = db.query(func.sum(VaultAccount.principal)).filter(
-            VaultAccount.vault_id == vault.id,
-        ).scalar()
-        total_aum = Decimal(str(total_aum_result)) if total_aum_result else Decimal("0.00")
-        
         # Count pending withdrawals
         pending_count = db.query(func.count(WithdrawalRequest.id)).filter(
             WithdrawalRequest.vault_id == vault.id,
@@ -301,11 +295,16 @@ async def list_vault_withdrawals(
     "/vaults/{vault_code}/withdrawals/process",
     response_model=ProcessWithdrawalsResponse,
     summary="Process pending withdrawals (FIFO)",
-    description="Process pending withdrawal requests in FIFO order. Requires ADMIN role.",
+    description=(
+        "Process pending withdrawal requests in FIFO order, in batches. "
+        "dry_run=true returns what would execute now without writing. Requires ADMIN role."
+    ),
 )
 async def process_withdrawals_endpoint(
     vault_code: str,
     http_request: Request,
+    dry_run: bool = Query(False, description="Project the decisions without writing (default: false)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Dry run: max pending requests projected"),
     db: Session = Depends(get_db),
     principal: Principal = Depends(require_admin_role()),
 ) -> ProcessWithdrawalsResponse:
@@ -313,11 +312,38 @@ async def process_withdrawals_endpoint(
     trace_id = get_trace_id(http_request) or "unknown"
     
     logger.info(
-        f"Processing pending withdrawals: vault_code={vault_code}",
-        extra={"trace_id": trace_id, "vault_code": vault_code}
+        f"Processing pending withdrawals: vault_code={vault_code}, dry_run={dry_run}",
+        extra={"trace_id": trace_id, "vault_code": vault_code, "dry_run": dry_run}
     )
     
     try:
+        if dry_run:
+            projection = project_pending_withdrawals(db=db, vault_code=vault_code, max_requests=limit)
+            
+            # Nothing to keep (the vault pool account may have been created by the read)
+            db.rollback()
+            
+            return ProcessWithdrawalsResponse(
+                processed_count=projection["executable_count"],
+                remaining_count=projection["remaining_count"],
+                cancelled_count=projection["cancellable_count"],
+                executed_amount=str(projection["executable_amount"]),
+                waiting_request_id=str(projection["waiting_request_id"]) if projection["waiting_request_id"] else None,
+                dry_run=True,
+                vault_cash_balance=str(projection["vault_cash_balance"]),
+                projected_cash_balance=str(projection["projected_cash_balance"]),
+                decisions=[
+                    WithdrawalDecisionItem(
+                        request_id=str(decision.request_id),
+                        user_id=str(decision.user_id),
+                        amount=str(decision.amount),
+                        decision=decision.decision,
+                        reason=decision.reason,
+                    )
+                    for decision in projection["decisions"]
+                ],
+            )
+        
         result = process_pending_withdrawals(db=db, vault_code=vault_code)
         
         # Commit transaction
@@ -326,6 +352,9 @@ async def process_withdrawals_endpoint(
         return ProcessWithdrawalsResponse(
             processed_count=result["processed_count"],
             remaining_count=result["remaining_count"],
+            cancelled_count=result["cancelled_count"],
+            executed_amount=str(result["executed_amount"]),
+            waiting_request_id=str(result["waiting_request_id"]) if result["waiting_request_id"] else None,
         )
     except ValueError as e:
         db.rollback()
@@ -2,14 +2,15 @@
 Public API - Articles (Blog/News)
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import Optional, List
 from datetime import datetime, timezone
 import logging
 
-from app.infrastructure.database import get_db
+from app.infrastructure.database import get_async_db
 from app.core.articles.models import Article, ArticleMedia, ArticleStatus, ArticleMediaType
 from app.core.offers.models import Offer
 from app.schemas.articles import (
@@ -21,8 +22,10 @@ from app.schemas.articles import (
 )
 from app.auth.dependencies import require_user_role
 from app.auth.oidc import Principal
+from app.services.catalog_cache import ARTICLES, OFFERS, catalog_cached
 from app.services.storage.s3_service import get_s3_service
 from app.services.storage.exceptions import StorageNotConfiguredError
+from app.utils.conditional_requests import check_not_modified
 
 logger = logging.getLogger(__name__)
 
@@ -193,15 +196,38 @@ def build_article_media_block(article: Article, db: Session) -> ArticleMediaBloc
     description="List published articles with optional filters. Requires USER role.",
 )
 async def list_articles(
+    request: Request,
+    response: Response,
     limit: int = Query(default=20, ge=1, le=100, description="Maximum number of results"),
     offset: int = Query(default=0, ge=0, description="Number of results to skip"),
     tag: Optional[str] = Query(None, description="Filter by tag"),
     featured: Optional[bool] = Query(None, description="Filter by featured flag"),
     offer_id: Optional[UUID] = Query(None, description="Filter articles linked to this offer"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     principal: Principal = Depends(require_user_role()),
 ) -> List[ArticlePublicListItem]:
     """List published articles"""
+    validators = await _list_published_articles.validators(limit=limit, offset=offset, tag=tag, featured=featured, offer_id=offer_id)
+    not_modified = check_not_modified(request, response, validators)
+    if not_modified is not None:
+        return not_modified
+    return await _list_published_articles.fetch(
+        db,
+        limit=limit, offset=offset, tag=tag, featured=featured, offer_id=offer_id,
+    )
+
+
+@catalog_cached(ARTICLES, response_type=List[ArticlePublicListItem])
+def _list_published_articles(
+    db: Session,
+    *,
+    limit: int,
+    offset: int,
+    tag: Optional[str],
+    featured: Optional[bool],
+    offer_id: Optional[UUID],
+) -> List[ArticlePublicListItem]:
+    """Published articles page (sync: runs through run_db)"""
     query = db.query(Article).filter(Article.status == ArticleStatus.PUBLISHED.value)
     
     # Filter by tag (if provided)
@@ -252,10 +278,21 @@ async def list_articles(
 )
 async def get_article_by_slug(
     slug: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     principal: Principal = Depends(require_user_role()),
 ) -> ArticlePublicDetail:
     """Get published article by slug"""
+    not_modified = check_not_modified(request, response, await _published_article_detail.validators(slug))
+    if not_modified is not None:
+        return not_modified
+    return await _published_article_detail.fetch(db, slug)
+
+
+@catalog_cached(ARTICLES, OFFERS, response_type=ArticlePublicDetail)
+def _published_article_detail(db: Session, slug: str) -> ArticlePublicDetail:
+    """Published article detail (sync: runs through run_db)"""
     article = db.query(Article).filter(
         Article.slug == slug,
         Article.status == ArticleStatus.PUBLISHED.value
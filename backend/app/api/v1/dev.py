@@ -16,10 +16,7 @@ from app.infrastructure.settings import get_settings
 from app.auth.dependencies import require_user_role, get_user_id_from_principal
 from app.auth.oidc import Principal
 from app.services.wallet_helpers import get_wallet_balances
-from app.services.system_wallet_helpers import (
-    get_offer_system_wallet_balances,
-    get_vault_system_wallet_balances,
-)
+from app.services.system_wallet_helpers import get_system_wallet_balances_bulk
 from app.core.vaults.models import Vault, VaultAccount
 from app.core.offers.models import Offer, OfferStatus
 from app.core.accounts.wallet_locks import WalletLock, LockReason, LockStatus
@@ -197,7 +194,7 @@ async def get_wallet_matrix(
             elif vault.code.upper() == "AVENIR":
                 # Source of truth: wallet_locks (reason=VAULT_AVENIR_VESTING, status=ACTIVE)
                 vault_locked_total = db.query(
-                    func.coalesce(func.sum(WalletLock.amount), Decimal("0.00"))
+                    func.coalesce(func.sum(WalletLock.remaining_amount), Decimal("0.00"))
                 ).filter(
                     WalletLock.user_id == user_id,
                     WalletLock.reference_type == "VAULT",
@@ -261,8 +258,10 @@ async def get_wallet_matrix(
             vaults = db.query(Vault).filter(
                 Vault.status.in_([VaultStatus.ACTIVE, VaultStatus.PAUSED])
             ).order_by(Vault.code).all()
+            vault_system_balances = get_system_wallet_balances_bulk(db, vault_ids=[v.id for v in vaults])
+            empty_buckets = {"available": Decimal("0"), "locked": Decimal("0"), "blocked": Decimal("0")}
             for vault in vaults:
-                vault_balances = get_vault_system_wallet_balances(db, vault.id, currency)
+                vault_balances = vault_system_balances.get((vault.id, currency), empty_buckets)
                 rows.append(WalletMatrixRow(
                     label=f"COFFRE — {vault.code} (SYSTEM)",
                     row_kind="VAULT_SYSTEM",
@@ -284,7 +283,7 @@ async def get_wallet_matrix(
         # Query wallet_locks for active OFFER_INVEST locks
         user_offer_locks_query = db.query(
             WalletLock.reference_id.label("offer_id"),
-            func.sum(WalletLock.amount).label("total_invested")
+            func.sum(WalletLock.remaining_amount).label("total_invested")
         ).filter(
             WalletLock.user_id == user_id,
             WalletLock.reason == LockReason.OFFER_INVEST.value,
@@ -349,8 +348,10 @@ async def get_wallet_matrix(
             offers = db.query(Offer).filter(
                 Offer.status.in_([OfferStatus.LIVE, OfferStatus.PAUSED])
             ).order_by(Offer.code).all()
+            offer_system_balances = get_system_wallet_balances_bulk(db, offer_ids=[o.id for o in offers])
+            empty_buckets = {"available": Decimal("0"), "locked": Decimal("0"), "blocked": Decimal("0")}
             for offer in offers:
-                offer_balances = get_offer_system_wallet_balances(db, offer.id, offer.currency)
+                offer_balances = offer_system_balances.get((offer.id, offer.currency), empty_buckets)
                 offer_label = offer.name if offer.name else offer.code
                 rows.append(WalletMatrixRow(
                     label=f"OFFRE — {offer_label} (SYSTEM)",
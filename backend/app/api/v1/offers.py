@@ -2,15 +2,19 @@
 Client API - Offers (read-only listing + invest)
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status as http_status, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, status as http_status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload, joinedload
 from uuid import UUID
-from typing import Optional, List
+from typing import Dict, Optional, List, Union
+from collections import defaultdict
 from decimal import Decimal
 import logging
 
-from app.infrastructure.database import get_db
-from app.core.offers.models import Offer, OfferStatus, OfferMedia, OfferDocument, MediaVisibility, DocumentVisibility
+from app.infrastructure.database import get_async_db, get_db, run_db
+from app.core.offers.models import (
+    Offer, OfferStatus, OfferMedia, OfferDocument, MediaVisibility, DocumentVisibility, InvestmentIntent, InvestmentIntentStatus
+)
 from datetime import datetime, timezone
 from app.schemas.offers import (
     OfferResponse, InvestInOfferRequest, OfferInvestmentResponse, MediaItemResponse, DocumentItemResponse,
@@ -22,8 +26,10 @@ from app.core.articles.models import Article, ArticleMedia, ArticleStatus
 from app.schemas.articles import ArticlePublicListItem
 from app.core.offers.models import OfferTimelineEvent
 from app.schemas.offers_timeline import TimelineEventResponse, TimelineEventArticleInfo
+from app.utils.conditional_requests import check_not_modified
 from app.utils.trace_id import get_trace_id
 from app.infrastructure.settings import get_settings
+from app.services.catalog_cache import ARTICLES, OFFERS, catalog_cached
 from app.services.storage.s3_service import get_s3_service
 from app.services.storage.exceptions import StorageNotConfiguredError
 
@@ -39,6 +45,11 @@ from app.services.offers.service_v1_1 import (
     OfferClosedError,
     InsufficientAvailableFundsError,
 )
+from app.services.offers.allocation_queue import (
+    drain_offer_allocation_queue,
+    enqueue_investment_intent,
+    schedule_offer_allocation,
+)
 from app.services.fund_services import InsufficientBalanceError, ValidationError
 
 router = APIRouter()
@@ -106,166 +117,155 @@ def resolve_document_url(doc: OfferDocument) -> Optional[str]:
     return None
 
 
-def build_media_block(offer: Offer, db: Session) -> OfferMediaBlockResponse:
+def _offer_asset_urls(assets: List[Union[OfferMedia, OfferDocument]]) -> Dict[UUID, Optional[str]]:
+    """
+    URLs of media/documents by id: public URL if set, else presigned.
+    
+    All keys are presigned in one batch (one cache lookup); if the batch
+    fails, falls back to per-item generation (which logs and returns None).
+    """
+    urls = {asset.id: asset.url for asset in assets if asset.url}
+    to_sign = [asset for asset in assets if not asset.url]
+    if not to_sign:
+        return urls
+    
+    try:
+        signed = get_s3_service().generate_presigned_get_urls([asset.key for asset in to_sign])
+        urls.update({asset.id: signed[asset.key] for asset in to_sign})
+    except Exception:
+        for asset in to_sign:
+            if isinstance(asset, OfferMedia):
+                urls[asset.id] = generate_presigned_url_for_media(asset)
+            else:
+                urls[asset.id] = generate_presigned_url_for_document(asset)
+    return urls
+
+
+def _media_item_response(media: OfferMedia, kind: Optional[str], url: str) -> MediaItemResponse:
+    return MediaItemResponse(
+        id=str(media.id),
+        type=media.type.value,
+        kind=kind,
+        url=url,
+        mime_type=media.mime_type,
+        size_bytes=media.size_bytes,
+        width=media.width,
+        height=media.height,
+        duration_seconds=media.duration_seconds,
+        sort_order=media.sort_order if media.sort_order is not None else 0,  # Backward compatibility: default to 0
+        is_cover=media.is_cover if hasattr(media, 'is_cover') else False,  # Backward compatibility: default to False
+        created_at=media.created_at.isoformat() if media.created_at else None,  # Backward compatibility: handle None case
+    )
+
+
+def build_media_blocks(offers: List[Offer], db: Session) -> Dict[UUID, OfferMediaBlockResponse]:
     """
-    Build structured media block with presigned URLs.
+    Build structured media blocks with presigned URLs for several offers.
     
-    Structure:
+    Structure (per offer):
     - cover: The media identified by offer.cover_media_id (if exists and PUBLIC)
     - promo_video: The media identified by offer.promo_video_media_id (if exists and PUBLIC)
     - gallery: All other PUBLIC media items (excluding cover and promo_video)
     - documents: All PUBLIC documents
     
-    Uses bulk queries to avoid SQLAlchemy relationship ambiguity.
-    Always returns a valid OfferMediaBlockResponse (even if empty) to avoid 412 errors.
+    One OfferMedia query and one OfferDocument query for all offers (grouped
+    in memory), one presign batch for all URLs.
+    Always returns a valid OfferMediaBlockResponse (even if empty) for every offer to avoid 412 errors.
     """
-    # Collect cover and promo_video IDs for bulk query
-    media_ids_to_fetch = []
-    cover_id = offer.cover_media_id
-    promo_id = offer.promo_video_media_id
-    
-    if cover_id:
-        media_ids_to_fetch.append(cover_id)
-    if promo_id:
-        media_ids_to_fetch.append(promo_id)
-    
-    # Bulk fetch cover and promo_video (if IDs exist)
-    cover_promo_media_dict = {}
-    if media_ids_to_fetch:
-        cover_promo_media = db.query(OfferMedia).filter(
-            OfferMedia.id.in_(media_ids_to_fetch),
-            OfferMedia.offer_id == offer.id,  # Security: ensure media belongs to this offer
-            OfferMedia.visibility == MediaVisibility.PUBLIC
-        ).all()
-        cover_promo_media_dict = {media.id: media for media in cover_promo_media}
-    
-    cover_media = cover_promo_media_dict.get(cover_id) if cover_id else None
-    promo_video_media = cover_promo_media_dict.get(promo_id) if promo_id else None
-    
-    # Get all other PUBLIC media (excluding cover and promo_video)
-    gallery_media_query = db.query(OfferMedia).filter(
-        OfferMedia.offer_id == offer.id,
-        OfferMedia.visibility == MediaVisibility.PUBLIC
-    )
+    offer_ids = [offer.id for offer in offers]
+    if not offer_ids:
+        return {}
     
-    # Exclude cover and promo_video from gallery
-    if cover_id and promo_id:
-        gallery_media_query = gallery_media_query.filter(
-            ~OfferMedia.id.in_([cover_id, promo_id])
-        )
-    elif cover_id:
-        gallery_media_query = gallery_media_query.filter(OfferMedia.id != cover_id)
-    elif promo_id:
-        gallery_media_query = gallery_media_query.filter(OfferMedia.id != promo_id)
-    
-    gallery_media = gallery_media_query.order_by(OfferMedia.sort_order, OfferMedia.created_at).all()
-    
-    # Build cover response
-    cover_response = None
-    if cover_media:
-        cover_url = generate_presigned_url_for_media(cover_media)
-        if cover_url:  # Only include if URL was successfully generated
-            cover_response = MediaItemResponse(
-                id=str(cover_media.id),
-                type=cover_media.type.value,
-                kind="COVER",
-                url=cover_url,
-                mime_type=cover_media.mime_type,
-                size_bytes=cover_media.size_bytes,
-                width=cover_media.width,
-                height=cover_media.height,
-                duration_seconds=cover_media.duration_seconds,
-                sort_order=cover_media.sort_order if cover_media.sort_order is not None else 0,  # Backward compatibility: default to 0
-                is_cover=cover_media.is_cover if hasattr(cover_media, 'is_cover') else False,  # Backward compatibility: default to False
-                created_at=cover_media.created_at.isoformat() if cover_media.created_at else None,  # Backward compatibility: handle None case
-            )
-    
-    # Build promo_video response
-    promo_video_response = None
-    if promo_video_media:
-        promo_url = generate_presigned_url_for_media(promo_video_media)
-        if promo_url:  # Only include if URL was successfully generated
-            promo_video_response = MediaItemResponse(
-                id=str(promo_video_media.id),
-                type=promo_video_media.type.value,
-                kind="PROMO_VIDEO",
-                url=promo_url,
-                mime_type=promo_video_media.mime_type,
-                size_bytes=promo_video_media.size_bytes,
-                width=promo_video_media.width,
-                height=promo_video_media.height,
-                duration_seconds=promo_video_media.duration_seconds,
-                sort_order=promo_video_media.sort_order if promo_video_media.sort_order is not None else 0,  # Backward compatibility: default to 0
-                is_cover=promo_video_media.is_cover if hasattr(promo_video_media, 'is_cover') else False,  # Backward compatibility: default to False
-                created_at=promo_video_media.created_at.isoformat() if promo_video_media.created_at else None,  # Backward compatibility: handle None case
-            )
+    media_by_offer: Dict[UUID, List[OfferMedia]] = defaultdict(list)
+    for media in db.query(OfferMedia).filter(
+        OfferMedia.offer_id.in_(offer_ids),
+        OfferMedia.visibility == MediaVisibility.PUBLIC
+    ).order_by(OfferMedia.sort_order, OfferMedia.created_at).all():
+        media_by_offer[media.offer_id].append(media)
     
-    # Build gallery responses (excluding cover and promo_video)
-    # Sort gallery media by (sort_order ASC, created_at ASC, id ASC) for stable ordering
-    gallery_responses = []
-    for media in gallery_media:
-        gallery_url = generate_presigned_url_for_media(media)
-        if gallery_url:  # Only include if URL was successfully generated
-            gallery_responses.append(MediaItemResponse(
-                id=str(media.id),
-                type=media.type.value,
-                kind=None,  # Gallery items don't have a kind
-                url=gallery_url,
-                mime_type=media.mime_type,
-                size_bytes=media.size_bytes,
-                width=media.width,
-                height=media.height,
-                duration_seconds=media.duration_seconds,
-                sort_order=media.sort_order if media.sort_order is not None else 0,  # Backward compatibility: default to 0
-                is_cover=media.is_cover if hasattr(media, 'is_cover') else False,  # Backward compatibility: default to False
-                created_at=media.created_at.isoformat() if media.created_at else None,  # Backward compatibility: handle None case
-            ))
-    
-    # Stable sort: sort_order ASC, created_at ASC (None last), id ASC
-    gallery_responses.sort(key=lambda m: (
-        m.sort_order,
-        m.created_at if m.created_at else "9999-12-31T23:59:59",  # Put None values last
-        m.id
-    ))
-    
-    # Get PUBLIC documents
-    docs = db.query(OfferDocument).filter(
-        OfferDocument.offer_id == offer.id,
+    docs_by_offer: Dict[UUID, List[OfferDocument]] = defaultdict(list)
+    for doc in db.query(OfferDocument).filter(
+        OfferDocument.offer_id.in_(offer_ids),
         OfferDocument.visibility == DocumentVisibility.PUBLIC
-    ).order_by(OfferDocument.created_at.desc()).all()
-    
-    # Build document responses
-    document_responses = []
-    for doc in docs:
-        doc_url = generate_presigned_url_for_document(doc)
-        if doc_url:  # Only include if URL was successfully generated
-            document_responses.append(DocumentItemResponse(
-                id=str(doc.id),
-                name=doc.name,
-                kind=doc.kind.value,
-                url=doc_url,
-                mime_type=doc.mime_type,
-                size_bytes=doc.size_bytes,
-                created_at=doc.created_at.isoformat() if doc.created_at else None,  # Backward compatibility: handle None case
-            ))
-    
-    return OfferMediaBlockResponse(
-        cover=cover_response,
-        promo_video=promo_video_response,
-        gallery=gallery_responses,
-        documents=document_responses,
+    ).order_by(OfferDocument.created_at.desc()).all():
+        docs_by_offer[doc.offer_id].append(doc)
+    
+    urls = _offer_asset_urls(
+        [media for items in media_by_offer.values() for media in items]
+        + [doc for items in docs_by_offer.values() for doc in items]
     )
+    
+    blocks = {}
+    for offer in offers:
+        cover_id = offer.cover_media_id
+        promo_id = offer.promo_video_media_id
+        
+        # Media belongs to this offer by construction (grouped by offer_id)
+        cover_response = None
+        promo_video_response = None
+        gallery_responses = []
+        for media in media_by_offer.get(offer.id, []):
+            url = urls.get(media.id)
+            if not url:  # Only include if URL was successfully generated
+                continue
+            if cover_id and media.id == cover_id:
+                cover_response = _media_item_response(media, "COVER", url)
+            elif promo_id and media.id == promo_id:
+                promo_video_response = _media_item_response(media, "PROMO_VIDEO", url)
+            else:
+                gallery_responses.append(_media_item_response(media, None, url))  # Gallery items don't have a kind
+        
+        # Stable sort: sort_order ASC, created_at ASC (None last), id ASC
+        gallery_responses.sort(key=lambda m: (
+            m.sort_order,
+            m.created_at if m.created_at else "9999-12-31T23:59:59",  # Put None values last
+            m.id
+        ))
+        
+        document_responses = []
+        for doc in docs_by_offer.get(offer.id, []):
+            doc_url = urls.get(doc.id)
+            if doc_url:  # Only include if URL was successfully generated
+                document_responses.append(DocumentItemResponse(
+                    id=str(doc.id),
+                    name=doc.name,
+                    kind=doc.kind.value,
+                    url=doc_url,
+                    mime_type=doc.mime_type,
+                    size_bytes=doc.size_bytes,
+                    created_at=doc.created_at.isoformat() if doc.created_at else None,  # Backward compatibility: handle None case
+                ))
+        
+        blocks[offer.id] = OfferMediaBlockResponse(
+            cover=cover_response,
+            promo_video=promo_video_response,
+            gallery=gallery_responses,
+            documents=document_responses,
+        )
+    return blocks
+
+
+def build_media_block(offer: Offer, db: Session) -> OfferMediaBlockResponse:
+    """Build the structured media block of one offer (see build_media_blocks)."""
+    return build_media_blocks([offer], db)[offer.id]
+
+
+def build_offer_responses(offers: List[Offer], db: Session) -> List[OfferResponse]:
+    """Build OfferResponses for a page of offers (media/documents loaded in bulk), in input order."""
+    media_blocks = build_media_blocks(offers, db)
+    return [_offer_response(offer, media_blocks[offer.id]) for offer in offers]
 
 
 def build_offer_response(offer: Offer, db: Session) -> OfferResponse:
     """Build OfferResponse with structured media block containing presigned URLs.
     
-    Uses explicit queries to avoid SQLAlchemy relationship ambiguity.
     All media URLs are presigned URLs generated at runtime (never public endpoints).
     """
-    # Build structured media block with presigned URLs
-    media_block = build_media_block(offer, db)
-    
+    return build_offer_responses([offer], db)[0]
+
+
+def _offer_response(offer: Offer, media_block: OfferMediaBlockResponse) -> OfferResponse:
+    """OfferResponse from an offer and its already-built media block (no queries)"""
     # Compute fill percentage
     max_amount = float(offer.max_amount)
     committed_amount = float(offer.committed_amount or offer.invested_amount)
@@ -342,12 +342,13 @@ def build_offer_response(offer: Offer, db: Session) -> OfferResponse:
     description="List offers with status LIVE. Only LIVE offers are visible to regular users. Requires USER role.",
 )
 async def list_offers(
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by status (default: LIVE). For backward compatibility, accepts 'LIVE' only."),
     currency: Optional[str] = Query(None, description="Filter by currency (default: AED)"),
     limit: int = Query(default=50, ge=1, le=100, description="Maximum number of results"),
     offset: int = Query(default=0, ge=0, description="Number of results to skip"),
     http_request: Request = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     principal: Principal = Depends(require_user_role()),
 ) -> List[OfferResponse]:
     """
@@ -375,23 +376,13 @@ async def list_offers(
                     }
                 )
         
-        # Always filter for LIVE offers (canonical rule: only LIVE offers visible to users)
-        query = db.query(Offer).filter(Offer.status == OfferStatus.LIVE)
-        
-        # Filter by currency
-        if currency:
-            query = query.filter(Offer.currency == currency.upper())
-        else:
-            # Default to AED if no currency specified
-            query = query.filter(Offer.currency == "AED")
+        # Revalidation: 304 before touching the database
+        validators = await _list_live_offers.validators(currency=currency, limit=limit, offset=offset)
+        not_modified = check_not_modified(http_request, response, validators)
+        if not_modified is not None:
+            return not_modified
         
-        # No need to eager load offer_media - we use explicit queries in build_offer_response
-        # This avoids SQLAlchemy relationship ambiguity issues
-        
-        offers = query.order_by(Offer.created_at.desc()).limit(limit).offset(offset).all()
-        
-        # Build responses (this may raise exceptions if media/storage issues occur)
-        return [build_offer_response(offer, db) for offer in offers]
+        return await _list_live_offers.fetch(db, currency=currency, limit=limit, offset=offset)
         
     except HTTPException:
         # Re-raise HTTPException as-is (already has proper JSON format)
@@ -419,6 +410,34 @@ async def list_offers(
         )
 
 
+@catalog_cached(OFFERS, response_type=List[OfferResponse])
+def _list_live_offers(
+    db: Session,
+    *,
+    currency: Optional[str],
+    limit: int,
+    offset: int,
+) -> List[OfferResponse]:
+    """LIVE offers page (sync: runs through run_db)"""
+    # Always filter for LIVE offers (canonical rule: only LIVE offers visible to users)
+    query = db.query(Offer).filter(Offer.status == OfferStatus.LIVE)
+    
+    # Filter by currency
+    if currency:
+        query = query.filter(Offer.currency == currency.upper())
+    else:
+        # Default to AED if no currency specified
+        query = query.filter(Offer.currency == "AED")
+    
+    # No need to eager load offer_media - we use explicit queries in build_offer_response
+    # This avoids SQLAlchemy relationship ambiguity issues
+    
+    offers = query.order_by(Offer.created_at.desc()).limit(limit).offset(offset).all()
+    
+    # Build responses (this may raise exceptions if media/storage issues occur)
+    return build_offer_responses(offers, db)
+
+
 @router.get(
     "/offers/{offer_id}",
     response_model=OfferResponse,
@@ -427,10 +446,21 @@ async def list_offers(
 )
 async def get_offer(
     offer_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     principal: Principal = Depends(require_user_role()),
 ) -> OfferResponse:
     """Get LIVE offer by ID"""
+    not_modified = check_not_modified(request, response, await _live_offer_detail.validators(offer_id))
+    if not_modified is not None:
+        return not_modified
+    return await _live_offer_detail.fetch(db, offer_id)
+
+
+@catalog_cached(OFFERS, response_type=OfferResponse)
+def _live_offer_detail(db: Session, offer_id: UUID) -> OfferResponse:
+    """LIVE offer detail (sync: runs through run_db)"""
     # No need to eager load offer_media - we use explicit queries in build_offer_response
     # This avoids SQLAlchemy relationship ambiguity issues
     offer = db.query(Offer).filter(Offer.id == offer_id).first()
@@ -456,12 +486,17 @@ async def get_offer(
     response_model=OfferInvestmentResponse,
     status_code=http_status.HTTP_201_CREATED,
     summary="Invest in an offer",
-    description="Invest in a LIVE offer. Funds are moved from AVAILABLE to LOCKED. Partial fills are supported. Requires USER role.",
+    description=(
+        "Invest in a LIVE offer. Funds are moved from AVAILABLE to LOCKED. Partial fills are supported. "
+        "Offers with queued allocation answer 202 with a PENDING investment, decided in FIFO order: "
+        "poll GET /offers/{offer_id}/investments/{investment_id} or pass a callback_url. Requires USER role."
+    ),
 )
 async def invest_in_offer_endpoint(
     offer_id: UUID,
     request: InvestInOfferRequest,
     http_request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     principal: Principal = Depends(require_user_role()),
 ) -> OfferInvestmentResponse:
@@ -475,6 +510,9 @@ async def invest_in_offer_endpoint(
     )
     
     try:
+        if db.query(Offer.queued_allocation).filter(Offer.id == offer_id).scalar():
+            return _queue_investment(db, offer_id, user_id, request, response)
+        
         intent, remaining_after = invest_in_offer_v1_1(
             db=db,
             user_id=user_id,
@@ -565,6 +603,92 @@ async def invest_in_offer_endpoint(
         )
 
 
+def _queue_investment(
+    db: Session,
+    offer_id: UUID,
+    user_id: UUID,
+    request: InvestInOfferRequest,
+    response: Response,
+) -> OfferInvestmentResponse:
+    """Queued allocation: store a PENDING intent, schedule the offer's allocator (202)."""
+    intent, created = enqueue_investment_intent(
+        db,
+        user_id=user_id,
+        offer_id=offer_id,
+        amount=request.amount,
+        currency=request.currency,
+        idempotency_key=request.idempotency_key,
+        callback_url=request.callback_url,
+    )
+    db.commit()
+    
+    if created:
+        if get_settings().OFFER_ALLOCATION_ASYNC:
+            try:
+                schedule_offer_allocation(offer_id)
+            except Exception as e:
+                # Intent is durable: the sweeper will enqueue the offer
+                logger.warning(
+                    f"Failed to schedule allocation of offer {offer_id}: {type(e).__name__}: {str(e)}"
+                )
+        else:
+            drain_offer_allocation_queue(db, offer_id)
+            db.refresh(intent)
+    
+    if intent.status == InvestmentIntentStatus.PENDING:
+        response.status_code = http_status.HTTP_202_ACCEPTED
+    offer = db.query(Offer).filter(Offer.id == offer_id).first()
+    return _intent_response(intent, offer)
+
+
+def _intent_response(intent: InvestmentIntent, offer: Offer) -> OfferInvestmentResponse:
+    return OfferInvestmentResponse(
+        investment_id=str(intent.id),
+        offer_id=str(intent.offer_id),
+        requested_amount=str(intent.requested_amount),
+        accepted_amount=str(intent.allocated_amount),
+        currency=intent.currency,
+        status=intent.status.value,
+        offer_committed_amount=str(offer.invested_amount or offer.committed_amount),
+        offer_remaining_amount=str(max(offer.max_amount - offer.invested_amount, Decimal("0"))),
+        created_at=intent.created_at.isoformat(),
+        queue_position=str(intent.queue_position) if intent.queue_position is not None else None,
+        rejection_reason=intent.rejection_reason,
+    )
+
+
+@router.get(
+    "/offers/{offer_id}/investments/{investment_id}",
+    response_model=OfferInvestmentResponse,
+    summary="Get an investment in an offer",
+    description="Current status of one of the caller's investments (polling for queued allocation). Requires USER role.",
+)
+async def get_offer_investment(
+    offer_id: UUID,
+    investment_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(require_user_role()),
+) -> OfferInvestmentResponse:
+    """Get an investment in an offer"""
+    return await run_db(db, _offer_investment, offer_id, investment_id, UUID(principal.sub))
+
+
+def _offer_investment(db: Session, offer_id: UUID, investment_id: UUID, user_id: UUID) -> OfferInvestmentResponse:
+    """One investment intent of the user (sync: runs through run_db)"""
+    intent = db.query(InvestmentIntent).filter(
+        InvestmentIntent.id == investment_id,
+        InvestmentIntent.offer_id == offer_id,
+        InvestmentIntent.user_id == user_id,
+    ).first()
+    if not intent:
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            detail="INVESTMENT_NOT_FOUND"
+        )
+    offer = db.query(Offer).filter(Offer.id == offer_id).first()
+    return _intent_response(intent, offer)
+
+
 def generate_presigned_url_for_article_media(media: ArticleMedia) -> Optional[str]:
     """
     Generate presigned URL for article media.
@@ -595,9 +719,11 @@ def generate_presigned_url_for_article_media(media: ArticleMedia) -> Optional[st
 )
 async def get_offer_articles(
     offer_id: UUID,
+    request: Request,
+    response: Response,
     limit: int = Query(default=10, ge=1, le=50, description="Maximum number of results"),
     offset: int = Query(default=0, ge=0, description="Number of results to skip"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> List[ArticlePublicListItem]:
     """
     Get published articles linked to an offer.
@@ -605,6 +731,16 @@ async def get_offer_articles(
     This is a PUBLIC endpoint (no authentication required).
     Returns only articles with status='published'.
     """
+    validators = await _published_offer_articles.validators(offer_id, limit=limit, offset=offset)
+    not_modified = check_not_modified(request, response, validators)
+    if not_modified is not None:
+        return not_modified
+    return await _published_offer_articles.fetch(db, offer_id, limit=limit, offset=offset)
+
+
+@catalog_cached(OFFERS, ARTICLES, response_type=List[ArticlePublicListItem])
+def _published_offer_articles(db: Session, offer_id: UUID, *, limit: int, offset: int) -> List[ArticlePublicListItem]:
+    """Published articles of an offer (sync: runs through run_db)"""
     # Verify offer exists
     offer = db.query(Offer).filter(Offer.id == offer_id).first()
     if not offer:
@@ -686,7 +822,9 @@ def build_timeline_event_response_public(event: OfferTimelineEvent, db: Session)
 )
 async def get_offer_timeline(
     offer_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
 ) -> List[TimelineEventResponse]:
     """
     Get timeline events for an offer.
@@ -695,6 +833,15 @@ async def get_offer_timeline(
     Returns timeline events sorted by sort_order ASC, then occurred_at ASC.
     Linked articles are only included if they are published.
     """
+    not_modified = check_not_modified(request, response, await _offer_timeline.validators(offer_id))
+    if not_modified is not None:
+        return not_modified
+    return await _offer_timeline.fetch(db, offer_id)
+
+
+@catalog_cached(OFFERS, ARTICLES, response_type=List[TimelineEventResponse])
+def _offer_timeline(db: Session, offer_id: UUID) -> List[TimelineEventResponse]:
+    """Timeline events of an offer (sync: runs through run_db)"""
     # Verify offer exists
     offer = db.query(Offer).filter(Offer.id == offer_id).first()
     if not offer:
@@ -2,13 +2,15 @@
 Public API - Partners (Trusted Partners)
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 from uuid import UUID
 from typing import Optional, List
 import logging
 
-from app.infrastructure.database import get_db
+from app.infrastructure.database import get_async_db
 from app.core.partners.models import (
     Partner, PartnerStatus, PartnerTeamMember, PartnerMedia, PartnerMediaType,
     PartnerDocument, PartnerPortfolioProject, PartnerPortfolioProjectStatus,
@@ -25,8 +27,10 @@ from app.schemas.partners import (
     PortfolioProjectMediaOut,
     OfferMinimalOut,
 )
+from app.services.catalog_cache import OFFERS, PARTNERS, catalog_cached
 from app.services.storage.s3_service import get_s3_service
 from app.services.storage.exceptions import StorageNotConfiguredError
+from app.utils.conditional_requests import check_not_modified
 
 logger = logging.getLogger(__name__)
 
@@ -63,40 +67,55 @@ def generate_presigned_url_for_portfolio_media(media: PartnerPortfolioMedia) ->
         return None
 
 
-@router.get(
-    "/partners",
-    response_model=List[PublicPartnerListItem],
-    summary="List published partners",
-    description="List all published partners (for directory).",
-)
-async def list_partners(
-    limit: int = Query(default=50, ge=1, le=100, description="Maximum number of results"),
-    offset: int = Query(default=0, ge=0, description="Number of results to skip"),
-    db: Session = Depends(get_db),
-) -> List[PublicPartnerListItem]:
-    """List published partners"""
-    partners = db.query(Partner).filter(
-        Partner.status == PartnerStatus.PUBLISHED.value
-    ).order_by(Partner.created_at.desc()).limit(limit).offset(offset).all()
+def build_partner_list_items(db: Session, partners: List[Partner]) -> List[PublicPartnerListItem]:
+    """
+    List items for a page of partners, in input order.
+    
+    CEO photos and first gallery images of all partners are loaded with one
+    query each and presigned in one batch (no per-partner queries).
+    """
+    if not partners:
+        return []
+    
+    ceo_photo_ids = [partner.ceo_photo_media_id for partner in partners if partner.ceo_photo_media_id]
+    ceo_photos = {
+        media.id: media
+        for media in db.query(PartnerMedia).filter(PartnerMedia.id.in_(ceo_photo_ids)).all()
+    } if ceo_photo_ids else {}
+    
+    # First IMAGE of each partner (fallback cover)
+    ranked = db.query(
+        PartnerMedia.id.label("id"),
+        func.row_number().over(
+            partition_by=PartnerMedia.partner_id,
+            order_by=(PartnerMedia.created_at, PartnerMedia.id),
+        ).label("rank"),
+    ).filter(
+        PartnerMedia.partner_id.in_([partner.id for partner in partners]),
+        PartnerMedia.type == PartnerMediaType.IMAGE
+    ).subquery()
+    first_images = {
+        media.partner_id: media
+        for media in db.query(PartnerMedia).join(ranked, ranked.c.id == PartnerMedia.id).filter(ranked.c.rank == 1).all()
+    }
+    
+    medias = list(ceo_photos.values()) + list(first_images.values())
+    try:
+        signed = get_s3_service().generate_presigned_get_urls([media.key for media in medias])
+        urls = {media.id: signed[media.key] for media in medias}
+    except Exception:
+        urls = {media.id: generate_presigned_url_for_partner_media(media) for media in medias}
     
     results = []
     for partner in partners:
-        # Get CEO photo URL
-        ceo_photo_url = None
-        if partner.ceo_photo_media_id:
-            ceo_photo_media = db.query(PartnerMedia).filter(PartnerMedia.id == partner.ceo_photo_media_id).first()
-            if ceo_photo_media:
-                ceo_photo_url = generate_presigned_url_for_partner_media(ceo_photo_media)
+        # CEO photo URL
+        ceo_photo = ceo_photos.get(partner.ceo_photo_media_id) if partner.ceo_photo_media_id else None
+        ceo_photo_url = urls.get(ceo_photo.id) if ceo_photo else None
         
-        # Get first gallery image as cover (or CEO photo)
+        # First gallery image as cover (or CEO photo)
         cover_image_url = ceo_photo_url
-        if not cover_image_url:
-            first_image = db.query(PartnerMedia).filter(
-                PartnerMedia.partner_id == partner.id,
-                PartnerMedia.type == PartnerMediaType.IMAGE
-            ).first()
-            if first_image:
-                cover_image_url = generate_presigned_url_for_partner_media(first_image)
+        if not cover_image_url and partner.id in first_images:
+            cover_image_url = urls.get(first_images[partner.id].id)
         
         results.append(PublicPartnerListItem(
             id=str(partner.id),
@@ -115,6 +134,37 @@ async def list_partners(
     return results
 
 
+@router.get(
+    "/partners",
+    response_model=List[PublicPartnerListItem],
+    summary="List published partners",
+    description="List all published partners (for directory).",
+)
+async def list_partners(
+    request: Request,
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=100, description="Maximum number of results"),
+    offset: int = Query(default=0, ge=0, description="Number of results to skip"),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[PublicPartnerListItem]:
+    """List published partners"""
+    validators = await _list_published_partners.validators(limit=limit, offset=offset)
+    not_modified = check_not_modified(request, response, validators)
+    if not_modified is not None:
+        return not_modified
+    return await _list_published_partners.fetch(db, limit=limit, offset=offset)
+
+
+@catalog_cached(PARTNERS, response_type=List[PublicPartnerListItem])
+def _list_published_partners(db: Session, *, limit: int, offset: int) -> List[PublicPartnerListItem]:
+    """Published partners page (sync: runs through run_db)"""
+    partners = db.query(Partner).filter(
+        Partner.status == PartnerStatus.PUBLISHED.value
+    ).order_by(Partner.created_at.desc()).limit(limit).offset(offset).all()
+    
+    return build_partner_list_items(db, partners)
+
+
 @router.get(
     "/partners/{code_or_id}",
     response_model=PublicPartnerDetail,
@@ -123,9 +173,21 @@ async def list_partners(
 )
 async def get_partner(
     code_or_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
 ) -> PublicPartnerDetail:
     """Get partner by code or ID (PUBLISHED only)"""
+    validators = await _published_partner_detail.validators(code_or_id)
+    not_modified = check_not_modified(request, response, validators)
+    if not_modified is not None:
+        return not_modified
+    return await _published_partner_detail.fetch(db, code_or_id)
+
+
+@catalog_cached(PARTNERS, OFFERS, response_type=PublicPartnerDetail)
+def _published_partner_detail(db: Session, code_or_id: str) -> PublicPartnerDetail:
+    """Published partner detail (sync: runs through run_db)"""
     # Try to parse as UUID first
     partner = None
     try:
@@ -344,11 +406,23 @@ async def get_partner(
 )
 async def get_offer_partners(
     offer_id: UUID,
+    request: Request,
+    response: Response,
     limit: int = Query(default=10, ge=1, le=50, description="Maximum number of results"),
     offset: int = Query(default=0, ge=0, description="Number of results to skip"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> List[PublicPartnerListItem]:
     """Get published partners linked to an offer"""
+    validators = await _published_offer_partners.validators(offer_id, limit=limit, offset=offset)
+    not_modified = check_not_modified(request, response, validators)
+    if not_modified is not None:
+        return not_modified
+    return await _published_offer_partners.fetch(db, offer_id, limit=limit, offset=offset)
+
+
+@catalog_cached(PARTNERS, OFFERS, response_type=List[PublicPartnerListItem])
+def _published_offer_partners(db: Session, offer_id: UUID, *, limit: int, offset: int) -> List[PublicPartnerListItem]:
+    """Published partners of an offer, primary first (sync: runs through run_db)"""
     # Verify offer exists
     offer = db.query(Offer).filter(Offer.id == offer_id).first()
     if not offer:
@@ -366,40 +440,7 @@ async def get_offer_partners(
         Partner.created_at.desc()
     ).limit(limit).offset(offset).all()
     
-    results = []
-    for partner in partners:
-        # Get CEO photo URL
-        ceo_photo_url = None
-        if partner.ceo_photo_media_id:
-            ceo_photo_media = db.query(PartnerMedia).filter(PartnerMedia.id == partner.ceo_photo_media_id).first()
-            if ceo_photo_media:
-                ceo_photo_url = generate_presigned_url_for_partner_media(ceo_photo_media)
-        
-        # Get first gallery image as cover (or CEO photo)
-        cover_image_url = ceo_photo_url
-        if not cover_image_url:
-            first_image = db.query(PartnerMedia).filter(
-                PartnerMedia.partner_id == partner.id,
-                PartnerMedia.type == PartnerMediaType.IMAGE
-            ).first()
-            if first_image:
-                cover_image_url = generate_presigned_url_for_partner_media(first_image)
-        
-        results.append(PublicPartnerListItem(
-            id=str(partner.id),
-            code=partner.code,
-            trade_name=partner.trade_name,
-            legal_name=partner.legal_name,
-            description_markdown=partner.description_markdown,
-            website_url=partner.website_url,
-            city=partner.city,
-            country=partner.country,
-            ceo_name=partner.ceo_name,
-            ceo_photo_url=ceo_photo_url,
-            cover_image_url=cover_image_url,
-        ))
-    
-    return results
+    return build_partner_list_items(db, partners)
 
 
 
@@ -2,16 +2,19 @@
 Transactions API endpoints - READ-ONLY
 """
 
+import base64
+import json
 from decimal import Decimal
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List, Tuple
 from uuid import UUID
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, func, literal, or_, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from app.infrastructure.database import get_db
+from app.infrastructure.database import get_async_db, get_db, run_db
 from app.core.transactions.models import Transaction, TransactionType, TransactionStatus
 from app.core.ledger.models import LedgerEntryType
 from app.core.ledger.models import LedgerEntry, Operation, OperationType, OperationStatus
@@ -20,6 +23,7 @@ from app.core.offers.models import OfferInvestment, Offer
 from app.core.users.models import User
 from app.core.vaults.models import Vault
 from app.schemas.wallet import TransactionListItem, TransactionDetailResponse, WalletMovement
+from app.services.wallet_helpers import WALLET_ACCOUNT_TYPES
 
 from app.auth.dependencies import require_user_role, get_user_id_from_principal
 from app.auth.oidc import Principal
@@ -139,18 +143,226 @@ def _compute_transaction_amount(
     return Decimal(str(result)) if result is not None else Decimal('0')
 
 
+# User-facing standalone operations (offers + vaults), listed alongside Transactions
+TIMELINE_OPERATION_TYPES = (
+    OperationType.INVEST_EXCLUSIVE,
+    OperationType.VAULT_DEPOSIT,
+    OperationType.VAULT_WITHDRAW_EXECUTED,
+    OperationType.VAULT_VESTING_RELEASE,
+)
+
+_VAULT_OPERATION_DIRECTIONS = {
+    OperationType.VAULT_DEPOSIT: "IN",
+    OperationType.VAULT_WITHDRAW_EXECUTED: "OUT",
+    OperationType.VAULT_VESTING_RELEASE: "IN",  # Release adds to available
+}
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_timeline_cursor(created_at: datetime, item_id: UUID) -> str:
+    """Opaque keyset cursor for (created_at, id)."""
+    raw = json.dumps({"created_at": created_at.isoformat(), "id": str(item_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_timeline_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor from encode_timeline_cursor(); 400 if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["created_at"]), UUID(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _timeline_page(
+    db: Session,
+    *,
+    user_id: UUID,
+    wallet_account_ids: List[UUID],
+    transaction_type: Optional[TransactionType],
+    transaction_status: Optional[TransactionStatus],
+    currency: Optional[str],
+    after: Optional[Tuple[datetime, UUID]],
+    size: int,
+):
+    """
+    One page of the user's timeline: Transactions UNION ALL standalone Operations,
+    ordered by (created_at, id) DESC, strictly after the cursor.
+    
+    Only rows with a wallet impact are selected (ledger entries on the user's
+    wallet accounts, or an INVESTMENT with accepted_amount in metadata).
+    
+    Returns rows of (kind, id, created_at), kind in {"TRANSACTION", "OPERATION"}.
+    """
+    wallet_entries = select(LedgerEntry.operation_id).where(
+        LedgerEntry.account_id.in_(wallet_account_ids)
+    )
+    
+    txn_has_wallet_entries = select(Operation.id).where(
+        Operation.transaction_id == Transaction.id,
+        Operation.id.in_(wallet_entries),
+    ).exists()
+    txn_query = select(
+        literal("TRANSACTION").label("kind"),
+        Transaction.id.label("id"),
+        Transaction.created_at.label("created_at"),
+    ).where(
+        Transaction.user_id == user_id,
+        or_(
+            txn_has_wallet_entries,
+            and_(
+                Transaction.type == TransactionType.INVESTMENT,
+                Transaction.transaction_metadata["accepted_amount"].isnot(None),
+            ),
+        ),
+    )
+    if transaction_type is not None:
+        txn_query = txn_query.where(Transaction.type == transaction_type)
+    if transaction_status is not None:
+        txn_query = txn_query.where(Transaction.status == transaction_status)
+    if currency:
+        # Same rule as the list item: metadata currency, else currency of the first ledger entry
+        first_entry_currency = select(LedgerEntry.currency).join(
+            Operation, LedgerEntry.operation_id == Operation.id
+        ).where(
+            Operation.transaction_id == Transaction.id
+        ).limit(1).scalar_subquery()
+        txn_query = txn_query.where(
+            func.coalesce(
+                Transaction.transaction_metadata["currency"].as_string(),
+                first_entry_currency,
+                "AED",
+            ) == currency
+        )
+    
+    if currency:
+        wallet_entries = wallet_entries.where(LedgerEntry.currency == currency)
+    op_query = select(
+        literal("OPERATION").label("kind"),
+        Operation.id.label("id"),
+        Operation.created_at.label("created_at"),
+    ).where(
+        Operation.transaction_id.is_(None),
+        Operation.type.in_(TIMELINE_OPERATION_TYPES),
+        Operation.id.in_(wallet_entries),
+    )
+    
+    if after is not None:
+        txn_query = txn_query.where(tuple_(Transaction.created_at, Transaction.id) < tuple_(*after))
+        op_query = op_query.where(tuple_(Operation.created_at, Operation.id) < tuple_(*after))
+    
+    # Each branch is limited on its own index order before the merge
+    txn_query = txn_query.order_by(Transaction.created_at.desc(), Transaction.id.desc()).limit(size)
+    op_query = op_query.order_by(Operation.created_at.desc(), Operation.id.desc()).limit(size)
+    
+    timeline = union_all(
+        select(txn_query.subquery()),
+        select(op_query.subquery()),
+    ).subquery()
+    return db.execute(
+        select(timeline.c.kind, timeline.c.id, timeline.c.created_at).order_by(
+            timeline.c.created_at.desc(), timeline.c.id.desc()
+        ).limit(size)
+    ).all()
+
+
+def _wallet_entry_sums(
+    db: Session,
+    operation_ids: List[UUID],
+    wallet_account_ids: List[UUID],
+) -> Dict[UUID, Dict[str, Tuple[Decimal, Decimal]]]:
+    """
+    Sum wallet ledger entries per operation and currency (one grouped query).
+    
+    Returns {operation_id: {currency: (net_amount, debit_abs_amount)}}.
+    """
+    if not operation_ids or not wallet_account_ids:
+        return {}
+    
+    rows = db.query(
+        LedgerEntry.operation_id,
+        LedgerEntry.currency,
+        func.sum(LedgerEntry.amount),
+        func.coalesce(
+            func.sum(func.abs(LedgerEntry.amount)).filter(LedgerEntry.entry_type == LedgerEntryType.DEBIT),
+            Decimal('0'),
+        ),
+    ).filter(
+        LedgerEntry.operation_id.in_(operation_ids),
+        LedgerEntry.account_id.in_(wallet_account_ids),
+    ).group_by(LedgerEntry.operation_id, LedgerEntry.currency).all()
+    
+    sums: Dict[UUID, Dict[str, Tuple[Decimal, Decimal]]] = {}
+    for operation_id, entry_currency, net, debit in rows:
+        sums.setdefault(operation_id, {})[entry_currency] = (Decimal(str(net)), Decimal(str(debit)))
+    return sums
+
+
+def _offer_product(metadata: Optional[dict]) -> Optional[str]:
+    """Display name for offer-related items: "name (code)", with "-" as fallback."""
+    if not metadata:
+        return None
+    offer_name = metadata.get("offer_name")
+    offer_code = metadata.get("offer_code")
+    if offer_code:
+        return f"{offer_name or '-'} ({offer_code})"
+    return offer_name or "-"
+
+
+def _vault_display_fields(
+    operation_type: Optional[OperationType],
+    amount: Decimal,
+    metadata: Optional[dict],
+    vault_codes: Dict[UUID, str],
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(amount_display, direction, product_label) for vault operations, else (None, None, None)."""
+    if operation_type not in _VAULT_OPERATION_DIRECTIONS:
+        return None, None, None
+    
+    vault_code = metadata.get("vault_code") if metadata else None
+    if not vault_code and metadata and metadata.get("vault_id"):
+        try:
+            vault_code = vault_codes.get(UUID(str(metadata["vault_id"])))
+        except (ValueError, TypeError):
+            vault_code = None
+    if operation_type == OperationType.VAULT_VESTING_RELEASE:
+        vault_code = vault_code or 'AVENIR'
+    
+    return (
+        str(abs(amount).quantize(Decimal('0.01'))),
+        _VAULT_OPERATION_DIRECTIONS[operation_type],
+        f"COFFRE {vault_code}" if vault_code else "COFFRE",
+    )
+
+
+def _metadata_vault_ids(metadata_list: Iterable[Optional[dict]]) -> set:
+    """Vault ids referenced by metadata without a vault_code (resolved in one query)."""
+    vault_ids = set()
+    for metadata in metadata_list:
+        if metadata and not metadata.get("vault_code") and metadata.get("vault_id"):
+            try:
+                vault_ids.add(UUID(str(metadata["vault_id"])))
+            except (ValueError, TypeError):
+                pass
+    return vault_ids
+
+
 @router.get(
     "/transactions",
     response_model=List[TransactionListItem],
     summary="Get transaction history",
-    description="Get transaction history for authenticated user. Includes Transactions and standalone Operations (e.g., INVEST_EXCLUSIVE). READ-ONLY endpoint. Requires USER role.",
+    description="Get transaction history for authenticated user. Includes Transactions and standalone Operations (e.g., INVEST_EXCLUSIVE). Keyset-paginated: pass the X-Next-Cursor response header back as `cursor` to get the next page. READ-ONLY endpoint. Requires USER role.",
 )
 async def get_transactions(
+    response: Response,
     currency: Optional[str] = Query(default=None, description="Filter by currency (e.g., AED)"),
     type: Optional[str] = Query(default=None, description="Filter by transaction type (DEPOSIT, WITHDRAWAL, INVESTMENT)"),
     status: Optional[str] = Query(default=None, description="Filter by transaction status"),
     limit: int = Query(default=20, ge=1, le=100, description="Maximum number of transactions to return"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    db: AsyncSession = Depends(get_async_db),
     principal: Principal = Depends(require_user_role()),
 ) -> List[TransactionListItem]:
     """
@@ -160,7 +372,12 @@ async def get_transactions(
     1. Transaction records (DEPOSIT, WITHDRAWAL, INVESTMENT)
     2. Standalone Operations that affect user wallet (e.g., INVEST_EXCLUSIVE from offers)
     
-    Ordered by created_at DESC.
+    Ordered by (created_at, id) DESC. When more items exist, the response
+    carries an X-Next-Cursor header; the next page starts strictly after it.
+    
+    Set-based: a page costs a fixed number of queries regardless of history
+    length (wallet accounts, UNION timeline page, transactions + operations,
+    wallet ledger sums, offers, vaults).
     
     Rules:
     - amount = sum of ledger entries affecting user wallet
@@ -173,495 +390,246 @@ async def get_transactions(
     """
     user_id = get_user_id_from_principal(principal)
     
-    # Get user's wallet account IDs for filtering operations
-    wallet_accounts = db.query(Account).filter(
-        Account.user_id == user_id,
-        Account.account_type.in_([
-            AccountType.WALLET_AVAILABLE,
-            AccountType.WALLET_BLOCKED,
-            AccountType.WALLET_LOCKED,
-        ])
-    ).all()
-    wallet_account_ids = [acc.id for acc in wallet_accounts]
+    transaction_type = None
+    if type:
+        try:
+            transaction_type = TransactionType[type.upper()]
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Invalid transaction type: {type}")
     
-    # Build unified result list
-    # DEFENSIVE: Wrap entire processing in try/except to ensure we always return valid JSON
-    result = []
+    transaction_status = None
+    if status:
+        try:
+            transaction_status = TransactionStatus[status.upper()]
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Invalid transaction status: {status}")
     
-    try:
-        # 1. Get Transactions
-        txn_query = db.query(Transaction).filter(Transaction.user_id == user_id)
-        
-        if type:
-            try:
-                transaction_type = TransactionType[type.upper()]
-                txn_query = txn_query.filter(Transaction.type == transaction_type)
-            except KeyError:
-                raise HTTPException(status_code=400, detail=f"Invalid transaction type: {type}")
-        
-        if status:
-            try:
-                transaction_status = TransactionStatus[status.upper()]
-                txn_query = txn_query.filter(Transaction.status == transaction_status)
-            except KeyError:
-                raise HTTPException(status_code=400, detail=f"Invalid transaction status: {status}")
-        
-        transactions = txn_query.order_by(Transaction.created_at.desc()).limit(limit * 2).all()  # Get more to account for filtering
-        
-        for txn in transactions:
-            try:
-                # Determine currency: first try transaction metadata, then ledger entries, then default
-                currency_val = "AED"  # Default
-                try:
-                    if txn.transaction_metadata and "currency" in txn.transaction_metadata:
-                        currency_val = txn.transaction_metadata["currency"]
-                    else:
-                        # Fallback: get from first operation's ledger entry
-                        operations = db.query(Operation).filter(Operation.transaction_id == txn.id).limit(1).all()
-                        if operations:
-                            ledger_entry = db.query(LedgerEntry).filter(
-                                LedgerEntry.operation_id == operations[0].id
-                            ).first()
-                            if ledger_entry:
-                                currency_val = ledger_entry.currency
-                except (AttributeError, TypeError, KeyError):
-                    # Keep default "AED"
-                    pass
-                
-                # Filter by currency if specified
-                if currency and currency_val != currency:
-                    continue
-                
-                # Compute amount with error handling
-                try:
-                    amount = _compute_transaction_amount(
-                        db, 
-                        txn.id, 
-                        user_id, 
-                        currency_val,
-                        transaction_type=txn.type,
-                        transaction_metadata=txn.transaction_metadata,
-                    )
-                except Exception as e:
-                    logger.warning(
-                        f"Error computing amount for transaction {txn.id}: {e}",
-                        extra={"transaction_id": str(txn.id)}
-                    )
-                    amount = Decimal('0')
-                
-                # Skip if amount is zero (no wallet impact)
-                # Note: For INVESTMENT, amount should never be zero if transaction was successful
-                if amount == 0:
-                    continue
-                
-                # Get primary operation for metadata (defensive)
-                try:
-                    primary_op = db.query(Operation).filter(Operation.transaction_id == txn.id).first()
-                    operation_type = primary_op.type.value if primary_op and primary_op.type else None
-                except (AttributeError, TypeError):
-                    primary_op = None
-                    operation_type = None
-                
-                # Merge transaction metadata with operation metadata (transaction metadata takes precedence for offer info)
-                try:
-                    metadata = txn.transaction_metadata or {}
-                    if primary_op and primary_op.operation_metadata:
-                        # Merge operation metadata into transaction metadata
-                        metadata = {**(primary_op.operation_metadata or {}), **metadata}
-                except (AttributeError, TypeError):
-                    metadata = {}
-                
-                # Extract offer_product for display (offer_name + offer_code) - defensive
-                offer_product = None
-                try:
-                    if metadata:
-                        offer_name = metadata.get("offer_name")
-                        offer_code = metadata.get("offer_code")
-                        if offer_name and offer_code:
-                            offer_product = f"{offer_name} ({offer_code})"
-                        elif offer_name:
-                            offer_product = offer_name
-                        elif offer_code:
-                            offer_product = offer_code
-                except (AttributeError, TypeError, KeyError):
-                    offer_product = None
-                
-                # Normalize datetime (defensive)
-                try:
-                    if txn.created_at and txn.created_at.tzinfo is not None:
-                        created_at_utc = txn.created_at.astimezone(timezone.utc)
-                        iso_str = created_at_utc.isoformat()
-                        if iso_str.endswith('+00:00') or iso_str.endswith('-00:00'):
-                            created_at_str = iso_str[:-6] + 'Z'
-                        elif '+' in iso_str or (iso_str.count('-') >= 3 and len(iso_str) > 19):
-                            if len(iso_str) >= 6 and iso_str[-6] in '+-' and iso_str[-3] == ':':
-                                created_at_str = iso_str[:-6] + 'Z'
-                            else:
-                                created_at_str = iso_str + 'Z'
-                        else:
-                            created_at_str = iso_str + 'Z'
-                    elif txn.created_at:
-                        created_at_str = txn.created_at.isoformat() + "Z"
-                    else:
-                        # Fallback: use current time
-                        created_at_str = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
-                except (AttributeError, TypeError, ValueError):
-                    # Fallback: use current time
-                    created_at_str = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
-                
-                # Calculate vault-specific fields (if primary_op is a vault operation)
-                # DEFENSIVE: Always provide safe defaults to avoid serialization errors
-                amount_display = None
-                direction = None
-                product_label = None
-                
-                try:
-                    if primary_op and primary_op.type in [OperationType.VAULT_DEPOSIT, OperationType.VAULT_WITHDRAW_EXECUTED, OperationType.VAULT_VESTING_RELEASE]:
-                        # Calculate amount_display (always positive) - defensive
-                        try:
-                            amount_display = str(abs(amount).quantize(Decimal('0.01')))
-                        except (TypeError, ValueError, AttributeError):
-                            # Fallback: use amount as string if quantize fails
-                            try:
-                                amount_display = str(abs(float(amount)))
-                            except (TypeError, ValueError):
-                                amount_display = "0.00"
-                        
-                        # Set direction based on operation type (defensive mapping)
-                        if primary_op.type == OperationType.VAULT_DEPOSIT:
-                            direction = "IN"
-                        elif primary_op.type == OperationType.VAULT_WITHDRAW_EXECUTED:
-                            direction = "OUT"
-                        elif primary_op.type == OperationType.VAULT_VESTING_RELEASE:
-                            direction = "IN"  # Release adds to available
-                        else:
-                            # Fallback: determine from amount sign
-                            direction = "IN" if amount >= 0 else "OUT"
-                        
-                        # Get vault code from metadata or query Vault (defensive)
-                        vault_code = None
-                        try:
-                            vault_code = metadata.get("vault_code") if metadata else None
-                            if not vault_code and metadata and metadata.get("vault_id"):
-                                try:
-                                    vault_id = UUID(metadata["vault_id"])
-                                    vault = db.query(Vault).filter(Vault.id == vault_id).first()
-                                    if vault:
-                                        vault_code = vault.code
-                                except (ValueError, TypeError, AttributeError):
-                                    pass
-                        except (AttributeError, TypeError):
-                            pass
-                        
-                        # For VAULT_VESTING_RELEASE, vault_code should always be 'AVENIR'
-                        if primary_op.type == OperationType.VAULT_VESTING_RELEASE:
-                            vault_code = vault_code or 'AVENIR'  # Fallback to AVENIR if missing
-                        
-                        # Set product_label with fallback
-                        if vault_code:
-                            product_label = f"COFFRE {vault_code}"
-                        else:
-                            product_label = "COFFRE"
-                except Exception as e:
-                    # Log but don't fail - use safe defaults
-                    logger.warning(
-                        f"Error computing vault fields for transaction {txn.id}: {e}",
-                        extra={"transaction_id": str(txn.id), "operation_id": str(primary_op.id) if primary_op else None}
-                    )
-                    # Keep defaults (None) - schema allows None for these fields
-                
-                # Ensure offer_product has a fallback if missing
-                if not offer_product and metadata:
-                    try:
-                        offer_name = metadata.get("offer_name") or "-"
-                        offer_code = metadata.get("offer_code") or ""
-                        if offer_code:
-                            offer_product = f"{offer_name} ({offer_code})"
-                        else:
-                            offer_product = offer_name
-                    except (AttributeError, TypeError):
-                        offer_product = "-"
-                
-                try:
-                    result.append(TransactionListItem(
-                        transaction_id=str(txn.id),
-                        operation_id=str(primary_op.id) if primary_op else None,
-                        type=txn.type.value,
-                        operation_type=operation_type,
-                        status=txn.status.value,
-                        amount=str(amount),
-                        currency=currency_val,
-                        created_at=created_at_str,
-                        metadata=metadata,
-                        offer_product=offer_product,
-                        amount_display=amount_display,
-                        direction=direction,
-                        product_label=product_label,
-                    ))
-                except Exception as e:
-                    # Log error but continue processing other transactions
-                    logger.error(
-                        f"Error serializing transaction {txn.id}: {e}",
-                        extra={"transaction_id": str(txn.id), "error": str(e)},
-                        exc_info=True
-                    )
-                    # Skip this transaction rather than failing the entire request
-                    continue
-            except Exception as e:
-                # Log error but continue processing other transactions
-                logger.error(
-                    f"Error processing transaction {txn.id}: {e}",
-                    extra={"transaction_id": str(txn.id), "error": str(e)},
-                    exc_info=True
+    after = decode_timeline_cursor(cursor) if cursor else None
+    
+    items, next_cursor = await run_db(
+        db,
+        _transaction_history_page,
+        user_id=user_id,
+        transaction_type=transaction_type,
+        transaction_status=transaction_status,
+        currency=currency,
+        after=after,
+        limit=limit,
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
+
+
+def _transaction_history_page(
+    db: Session,
+    *,
+    user_id: UUID,
+    transaction_type: Optional[TransactionType],
+    transaction_status: Optional[TransactionStatus],
+    currency: Optional[str],
+    after: Optional[Tuple[datetime, UUID]],
+    limit: int,
+) -> Tuple[List[TransactionListItem], Optional[str]]:
+    """
+    One timeline page and the cursor of the next one (None on the last page).
+    
+    Sync on purpose: runs on the request's AsyncSession through run_db.
+    """
+    wallet_account_ids = [
+        row.id for row in db.query(Account.id).filter(
+            Account.user_id == user_id,
+            Account.account_type.in_(WALLET_ACCOUNT_TYPES),
+        ).all()
+    ]
+    
+    page = _timeline_page(
+        db,
+        user_id=user_id,
+        wallet_account_ids=wallet_account_ids,
+        transaction_type=transaction_type,
+        transaction_status=transaction_status,
+        currency=currency,
+        after=after,
+        size=limit + 1,
+    )
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_timeline_cursor(page[-1].created_at, page[-1].id)
+    if not page:
+        return [], None
+    
+    transaction_ids = [row.id for row in page if row.kind == "TRANSACTION"]
+    operation_ids = [row.id for row in page if row.kind == "OPERATION"]
+    
+    transactions = {
+        txn.id: txn
+        for txn in db.query(Transaction).options(
+            selectinload(Transaction.operations)
+        ).filter(Transaction.id.in_(transaction_ids)).all()
+    } if transaction_ids else {}
+    standalone_ops = {
+        op.id: op for op in db.query(Operation).filter(Operation.id.in_(operation_ids)).all()
+    } if operation_ids else {}
+    
+    # Primary operation of a transaction: the first one created
+    primary_ops = {
+        txn_id: min(txn.operations, key=lambda op: (op.created_at, str(op.id)))
+        for txn_id, txn in transactions.items()
+        if txn.operations
+    }
+    
+    entry_sums = _wallet_entry_sums(
+        db,
+        operation_ids + [op.id for txn in transactions.values() for op in txn.operations],
+        wallet_account_ids,
+    )
+    
+    offer_rows = db.query(OfferInvestment, Offer).join(
+        Offer, Offer.id == OfferInvestment.offer_id
+    ).filter(OfferInvestment.operation_id.in_(operation_ids)).all() if operation_ids else []
+    offers_by_operation = {investment.operation_id: (investment, offer) for investment, offer in offer_rows}
+    
+    vault_ids = _metadata_vault_ids(
+        [txn.transaction_metadata for txn in transactions.values()]
+        + [op.operation_metadata for op in primary_ops.values()]
+        + [op.operation_metadata for op in standalone_ops.values()]
+    )
+    vault_codes = {
+        vault.id: vault.code for vault in db.query(Vault.id, Vault.code).filter(Vault.id.in_(vault_ids)).all()
+    } if vault_ids else {}
+    
+    result = []
+    for row in page:
+        try:
+            if row.kind == "TRANSACTION":
+                item = _transaction_list_item(
+                    transactions[row.id], primary_ops.get(row.id), entry_sums, vault_codes,
                 )
-                # Skip this transaction rather than failing the entire request
-                continue
-        
-        # 2. Get standalone Operations (those without transaction_id) that affect user wallet
-        if wallet_account_ids:
-            op_query = db.query(Operation).filter(
-            Operation.transaction_id.is_(None),
-            Operation.type.in_([
-                OperationType.INVEST_EXCLUSIVE,
-                OperationType.VAULT_DEPOSIT,
-                OperationType.VAULT_WITHDRAW_EXECUTED,
-                OperationType.VAULT_VESTING_RELEASE,
-            ]),  # User-facing standalone operations (offers + vaults)
-        )
-        
-        # Filter by currency if specified
-        if currency:
-            # Get operations that have ledger entries in the specified currency
-            op_ids_with_currency = db.query(LedgerEntry.operation_id).filter(
-                LedgerEntry.account_id.in_(wallet_account_ids),
-                LedgerEntry.currency == currency,
-            ).distinct().all()
-            op_ids_list = [op_id[0] for op_id in op_ids_with_currency]
-            if op_ids_list:
-                op_query = op_query.filter(Operation.id.in_(op_ids_list))
             else:
-                standalone_ops = []
-                op_query = None
-        
-        standalone_ops = op_query.order_by(Operation.created_at.desc()).limit(limit * 2).all() if op_query else []
-        
-        for op in standalone_ops:
-            try:
-                # Check if this operation affects user wallet
-                ledger_entries = db.query(LedgerEntry).filter(
-                    LedgerEntry.operation_id == op.id,
-                    LedgerEntry.account_id.in_(wallet_account_ids),
-                ).all()
-                
-                if not ledger_entries:
-                    continue
-                
-                # Determine currency from ledger entry (defensive)
-                try:
-                    currency_val = ledger_entries[0].currency if ledger_entries else (currency or "AED")
-                except (AttributeError, IndexError, TypeError):
-                    currency_val = currency or "AED"
-                
-                # Filter by currency if specified
-                if currency and currency_val != currency:
-                    continue
-                
-                # Compute amount with error handling
-                try:
-                    amount = _compute_operation_amount(db, op.id, user_id, currency_val)
-                except Exception as e:
-                    logger.warning(
-                        f"Error computing amount for operation {op.id}: {e}",
-                        extra={"operation_id": str(op.id)}
-                    )
-                    amount = Decimal('0')
-                
-                # Skip if amount is zero
-                if amount == 0:
-                    continue
-            
-                # Get offer investment metadata if available (defensive)
-                try:
-                    metadata = op.operation_metadata or {}
-                    offer_product = None
-                    offer_investment = db.query(OfferInvestment).filter(OfferInvestment.operation_id == op.id).first()
-                    if offer_investment:
-                        offer = db.query(Offer).filter(Offer.id == offer_investment.offer_id).first()
-                        if offer:
-                            metadata = {
-                                **(metadata or {}),
-                                "offer_id": str(offer.id),
-                                "offer_code": offer.code,
-                                "offer_name": offer.name,
-                                "investment_id": str(offer_investment.id),
-                            }
-                            offer_product = f"{offer.name} ({offer.code})"
-                except (AttributeError, TypeError):
-                    metadata = {}
-                    offer_product = None
-                
-                # Normalize datetime (defensive)
-                try:
-                    if op.created_at and op.created_at.tzinfo is not None:
-                        created_at_utc = op.created_at.astimezone(timezone.utc)
-                        iso_str = created_at_utc.isoformat()
-                        if iso_str.endswith('+00:00') or iso_str.endswith('-00:00'):
-                            created_at_str = iso_str[:-6] + 'Z'
-                        elif '+' in iso_str or (iso_str.count('-') >= 3 and len(iso_str) > 19):
-                            if len(iso_str) >= 6 and iso_str[-6] in '+-' and iso_str[-3] == ':':
-                                created_at_str = iso_str[:-6] + 'Z'
-                            else:
-                                created_at_str = iso_str + 'Z'
-                        else:
-                            created_at_str = iso_str + 'Z'
-                    elif op.created_at:
-                        created_at_str = op.created_at.isoformat() + "Z"
-                    else:
-                        # Fallback: use current time
-                        created_at_str = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
-                except (AttributeError, TypeError, ValueError):
-                    # Fallback: use current time
-                    created_at_str = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
-                
-                # Map operation type to transaction type for display (defensive)
-                try:
-                    display_type = "INVESTMENT" if op.type == OperationType.INVEST_EXCLUSIVE else (op.type.value if op.type else "UNKNOWN")
-                except (AttributeError, TypeError):
-                    display_type = "UNKNOWN"
-                
-                # Calculate vault-specific fields
-                # DEFENSIVE: Always provide safe defaults to avoid serialization errors
-                # This mapping is intentionally defensive to prevent UI errors when new OperationType are added
-                amount_display = None
-                direction = None
-                product_label = None
-                
-                try:
-                    if op.type in [OperationType.VAULT_DEPOSIT, OperationType.VAULT_WITHDRAW_EXECUTED, OperationType.VAULT_VESTING_RELEASE]:
-                        # Calculate amount_display (always positive) - defensive
-                        try:
-                            amount_display = str(abs(amount).quantize(Decimal('0.01')))
-                        except (TypeError, ValueError, AttributeError):
-                            # Fallback: use amount as string if quantize fails
-                            try:
-                                amount_display = str(abs(float(amount)))
-                            except (TypeError, ValueError):
-                                amount_display = "0.00"
-                        
-                        # Set direction based on operation type (defensive mapping)
-                        if op.type == OperationType.VAULT_DEPOSIT:
-                            direction = "IN"
-                        elif op.type == OperationType.VAULT_WITHDRAW_EXECUTED:
-                            direction = "OUT"
-                        elif op.type == OperationType.VAULT_VESTING_RELEASE:
-                            direction = "IN"  # Release adds to available
-                        else:
-                            # Fallback: determine from amount sign
-                            direction = "IN" if amount >= 0 else "OUT"
-                        
-                        # Get vault code from metadata or query Vault (defensive)
-                        vault_code = None
-                        try:
-                            vault_code = metadata.get("vault_code") if metadata else None
-                            if not vault_code and metadata and metadata.get("vault_id"):
-                                try:
-                                    vault_id = UUID(metadata["vault_id"])
-                                    vault = db.query(Vault).filter(Vault.id == vault_id).first()
-                                    if vault:
-                                        vault_code = vault.code
-                                except (ValueError, TypeError, AttributeError):
-                                    pass
-                        except (AttributeError, TypeError):
-                            pass
-                        
-                        # For VAULT_VESTING_RELEASE, vault_code should always be 'AVENIR'
-                        if op.type == OperationType.VAULT_VESTING_RELEASE:
-                            vault_code = vault_code or 'AVENIR'  # Fallback to AVENIR if missing
-                        
-                        # Set product_label with fallback
-                        if vault_code:
-                            product_label = f"COFFRE {vault_code}"
-                        else:
-                            product_label = "COFFRE"
-                except Exception as e:
-                    # Log but don't fail - use safe defaults
-                    logger.warning(
-                        f"Error computing vault fields for operation {op.id}: {e}",
-                        extra={"operation_id": str(op.id), "operation_type": op.type.value if op.type else None}
-                    )
-                    # Keep defaults (None) - schema allows None for these fields
-                
-                # Ensure offer_product has a fallback if missing (for INVEST_EXCLUSIVE)
-                if not offer_product:
-                    try:
-                        if metadata:
-                            offer_name = metadata.get("offer_name") or "-"
-                            offer_code = metadata.get("offer_code") or ""
-                            if offer_code:
-                                offer_product = f"{offer_name} ({offer_code})"
-                            else:
-                                offer_product = offer_name
-                        else:
-                            offer_product = "-"
-                    except (AttributeError, TypeError):
-                        offer_product = "-"
-                
-                try:
-                    result.append(TransactionListItem(
-                        transaction_id=None,
-                        operation_id=str(op.id),
-                        type=display_type,
-                        operation_type=op.type.value,
-                        status=op.status.value,
-                        amount=str(amount),
-                        currency=currency_val,
-                        created_at=created_at_str,
-                        metadata=metadata,
-                        offer_product=offer_product,
-                        amount_display=amount_display,
-                        direction=direction,
-                        product_label=product_label,
-                    ))
-                except Exception as e:
-                    # Log error but continue processing other operations
-                    logger.error(
-                        f"Error serializing operation {op.id}: {e}",
-                        extra={"operation_id": str(op.id), "operation_type": op.type.value if op.type else None, "error": str(e)},
-                        exc_info=True
-                    )
-                    # Skip this operation rather than failing the entire request
-                    continue
-            except Exception as e:
-                # Log error but continue processing other operations
-                logger.error(
-                    f"Error processing operation {op.id}: {e}",
-                    extra={"operation_id": str(op.id), "error": str(e)},
-                    exc_info=True
+                item = _operation_list_item(
+                    standalone_ops[row.id], entry_sums, offers_by_operation, vault_codes, currency,
                 )
-                # Skip this operation rather than failing the entire request
-                continue
-    
-    except Exception as e:
-        # Log critical error but return partial results rather than 500
-        logger.error(
-            f"Critical error in get_transactions for user {user_id}: {e}",
-            extra={"user_id": str(user_id), "currency": currency, "error": str(e)},
-            exc_info=True
-        )
-        # Return whatever we have so far (could be empty list, but valid JSON)
-        # This prevents 500 errors from breaking the frontend
+        except Exception as e:
+            # Log error but continue processing other items rather than failing the page
+            logger.error(
+                f"Error building transaction list item {row.kind} {row.id}: {e}",
+                extra={"item_id": str(row.id), "kind": row.kind, "error": str(e)},
+                exc_info=True
+            )
+            continue
+        if item is not None:
+            result.append(item)
+    
+    return result, next_cursor
+
+
+def _transaction_list_item(
+    txn: Transaction,
+    primary_op: Optional[Operation],
+    entry_sums: Dict[UUID, Dict[str, Tuple[Decimal, Decimal]]],
+    vault_codes: Dict[UUID, str],
+) -> Optional[TransactionListItem]:
+    """Build the list item of a Transaction from preloaded data (None if no wallet impact)."""
+    txn_metadata = txn.transaction_metadata or {}
+    
+    # Currency: transaction metadata, else the primary operation's ledger entries, else AED
+    currency_val = txn_metadata.get("currency")
+    if not currency_val and primary_op is not None and entry_sums.get(primary_op.id):
+        currency_val = next(iter(entry_sums[primary_op.id]))
+    currency_val = currency_val or "AED"
+    
+    amount = None
+    if txn.type == TransactionType.INVESTMENT and "accepted_amount" in txn_metadata:
+        try:
+            amount = Decimal(str(txn_metadata["accepted_amount"]))
+        except (ValueError, TypeError, ArithmeticError):
+            amount = None
+    if amount is None:
+        sums = [entry_sums.get(op.id, {}).get(currency_val) for op in txn.operations]
+        sums = [s for s in sums if s is not None]
+        net = sum((s[0] for s in sums), Decimal('0'))
+        debit = sum((s[1] for s in sums), Decimal('0'))
+        # INVESTMENT: absolute value of the DEBIT moved out of AVAILABLE
+        amount = debit if txn.type == TransactionType.INVESTMENT and debit > 0 else net
+    
+    # Skip if amount is zero (no wallet impact)
+    if amount == 0:
+        return None
     
-    # Sort by created_at DESC and limit
-    try:
-        result.sort(key=lambda x: x.created_at, reverse=True)
-        return result[:limit]
-    except Exception as e:
-        # If sorting fails, return unsorted (better than 500)
-        logger.warning(
-            f"Error sorting transactions: {e}",
-            extra={"error": str(e)}
-        )
-        return result[:limit]
+    # Transaction metadata takes precedence over operation metadata (offer info)
+    metadata = txn_metadata
+    if primary_op is not None and primary_op.operation_metadata:
+        metadata = {**primary_op.operation_metadata, **txn_metadata}
+    
+    operation_type = primary_op.type if primary_op is not None else None
+    amount_display, direction, product_label = _vault_display_fields(operation_type, amount, metadata, vault_codes)
+    
+    return TransactionListItem(
+        transaction_id=str(txn.id),
+        operation_id=str(primary_op.id) if primary_op else None,
+        type=txn.type.value,
+        operation_type=operation_type.value if operation_type else None,
+        status=txn.status.value,
+        amount=str(amount),
+        currency=currency_val,
+        created_at=_normalize_datetime(txn.created_at),
+        metadata=metadata,
+        offer_product=_offer_product(metadata),
+        amount_display=amount_display,
+        direction=direction,
+        product_label=product_label,
+    )
+
+
+def _operation_list_item(
+    op: Operation,
+    entry_sums: Dict[UUID, Dict[str, Tuple[Decimal, Decimal]]],
+    offers_by_operation: Dict[UUID, Tuple[OfferInvestment, Offer]],
+    vault_codes: Dict[UUID, str],
+    currency: Optional[str],
+) -> Optional[TransactionListItem]:
+    """Build the list item of a standalone Operation from preloaded data (None if no wallet impact)."""
+    sums = entry_sums.get(op.id)
+    if not sums:
+        return None
+    
+    currency_val = currency if currency in sums else next(iter(sums))
+    amount = sums[currency_val][0]
+    if amount == 0:
+        return None
+    
+    metadata = op.operation_metadata or {}
+    offer_product = None
+    if op.id in offers_by_operation:
+        offer_investment, offer = offers_by_operation[op.id]
+        metadata = {
+            **metadata,
+            "offer_id": str(offer.id),
+            "offer_code": offer.code,
+            "offer_name": offer.name,
+            "investment_id": str(offer_investment.id),
+        }
+        offer_product = f"{offer.name} ({offer.code})"
+    
+    amount_display, direction, product_label = _vault_display_fields(op.type, amount, metadata, vault_codes)
+    
+    return TransactionListItem(
+        transaction_id=None,
+        operation_id=str(op.id),
+        type="INVESTMENT" if op.type == OperationType.INVEST_EXCLUSIVE else op.type.value,
+        operation_type=op.type.value,
+        status=op.status.value,
+        amount=str(amount),
+        currency=currency_val,
+        created_at=_normalize_datetime(op.created_at),
+        metadata=metadata,
+        offer_product=offer_product or _offer_product(metadata) or "-",
+        amount_display=amount_display,
+        direction=direction,
+        product_label=product_label,
+    )
 
 
 def _infer_movement(transaction_type: TransactionType, status: TransactionStatus) -> WalletMovement | None:
@@ -3,10 +3,10 @@ Wallet API endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
 
-from app.infrastructure.database import get_db
+from app.infrastructure.database import get_async_db, run_db
 from app.core.accounts.models import Account, AccountType
 from app.schemas.wallet import WalletBalanceResponse
 from app.services.wallet_helpers import get_wallet_balances
@@ -24,7 +24,7 @@ router = APIRouter()
 )
 async def get_wallet(
     currency: str = "AED",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     principal: Principal = Depends(require_user_role()),
 ) -> WalletBalanceResponse:
     """
@@ -41,7 +41,7 @@ async def get_wallet(
     user_id = get_user_id_from_principal(principal)
     
     # Get wallet balances
-    balances = get_wallet_balances(db, user_id, currency)
+    balances = await run_db(db, get_wallet_balances, user_id, currency)
     
     return WalletBalanceResponse(
         currency=currency,
@@ -2,26 +2,57 @@
 ZAND webhook endpoints
 """
 
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
-from uuid import uuid4
 
 from app.infrastructure.database import get_db
-from app.core.transactions.models import Transaction, TransactionType, TransactionStatus
-from app.schemas.webhooks import ZandDepositWebhookPayload, ZandDepositWebhookResponse
-from app.services.fund_services import record_deposit_blocked
-# TODO: Implement webhook signature verification
-# from app.utils.webhook_security import verify_zand_webhook_signature
+from app.infrastructure.settings import get_settings
+from app.schemas.webhooks import (
+    ZandDepositWebhookPayload,
+    ZandDepositWebhookResponse,
+    ZandBulkDepositWebhookPayload,
+    ZandBulkDepositWebhookResponse,
+    ZandBulkDepositResult,
+)
+from app.services.fund_services import (
+    DepositEvent,
+    DEPOSIT_ACCEPTED,
+    DEPOSIT_DUPLICATE,
+    DEPOSIT_FAILED,
+    record_deposits_blocked_bulk,
+)
+from app.services.webhook_inbox import enqueue_inbox_event, process_inbox_event, store_zand_deposit_event
+from app.utils.metrics import record_webhook_rejected
+from app.utils.webhook_security import verify_zand_webhook_security
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+async def _verify_signature(request: Request) -> None:
+    """Reject (401) a request whose signature or timestamp does not verify (see webhook_security)."""
+    valid, error = verify_zand_webhook_security(
+        await request.body(),
+        request.headers.get("X-Zand-Signature"),
+        request.headers.get("X-Zand-Timestamp"),
+    )
+    if not valid:
+        record_webhook_rejected("signature_invalid")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Webhook signature verification failed: {error}"
+        )
+
+
 @router.post(
     "/zand/deposit",
     response_model=ZandDepositWebhookResponse,
     status_code=status.HTTP_202_ACCEPTED,
     summary="ZAND deposit webhook",
-    description="Receive deposit notification from ZAND Bank. Funds are recorded in WALLET_BLOCKED compartment pending compliance review.",
+    description="Receive deposit notification from ZAND Bank. The event is persisted and acknowledged immediately; funds are recorded asynchronously in WALLET_BLOCKED compartment pending compliance review.",
 )
 async def zand_deposit_webhook(
     payload: ZandDepositWebhookPayload,
@@ -29,62 +60,136 @@ async def zand_deposit_webhook(
     db: Session = Depends(get_db),
 ) -> ZandDepositWebhookResponse:
     """
-    Process ZAND Bank deposit webhook.
+    Accept ZAND Bank deposit webhook.
     
     This endpoint:
-    1. Verifies webhook signature (if configured)
-    2. Creates Transaction (type=DEPOSIT, status=INITIATED)
-    3. Records deposit in WALLET_BLOCKED compartment
-    4. Returns transaction_id for tracking
+    1. Verifies the webhook signature
+    2. Persists the validated payload in the webhook inbox (keyed by provider_event_id)
+    3. Enqueues ledger processing (RQ worker: Transaction + WALLET_BLOCKED deposit)
+    4. Returns 202 with the deposit's transaction_id: the Transaction it is
+       recorded under when known (already recorded, or processed inline),
+       otherwise the id assigned at intake, which processing creates it under
+    
+    No ledger work happens in the request, so latency does not depend on
+    ledger write time. With WEBHOOK_INBOX_ASYNC=false the event is processed
+    inline (tests / environments without a worker).
     
     Idempotency: Uses provider_event_id to prevent duplicate processing.
     
-    Security: Webhook signature verification should be enabled in production.
+    Security: X-Zand-Signature (HMAC-SHA256 of the X-Zand-Timestamp and
+    the raw body with ZAND_WEBHOOK_SECRET) is required and the timestamp
+    must be within ZAND_WEBHOOK_TOLERANCE_SECONDS; without a secret the
+    route only answers in DEV_MODE.
     """
-    # Verify webhook signature (if secret is configured)
-    if hasattr(request, 'headers'):
-        # TODO: Implement signature verification
-        # verify_zand_webhook_signature(request, payload)
-        pass
-    
-    # Create Transaction
-    transaction = Transaction(
-        user_id=payload.user_id,
-        type=TransactionType.DEPOSIT,
-        status=TransactionStatus.INITIATED,
-        transaction_metadata={
-            "provider_event_id": payload.provider_event_id,
-            "iban": payload.iban,
-            "amount": str(payload.amount),
-            "currency": payload.currency,
-            "occurred_at": payload.occurred_at.isoformat(),
-        },
-    )
-    db.add(transaction)
-    db.flush()  # Get transaction.id
+    await _verify_signature(request)
     
     try:
-        # Record deposit in WALLET_BLOCKED compartment
-        operation = record_deposit_blocked(
-            db=db,
-            user_id=payload.user_id,
-            currency=payload.currency,
-            amount=payload.amount,
-            transaction_id=transaction.id,
-            idempotency_key=f"zand-{payload.provider_event_id}",
-            provider_reference=payload.provider_event_id,
+        inbox_event_id, transaction_id, created = store_zand_deposit_event(
+            db,
+            provider_event_id=payload.provider_event_id,
+            payload=payload.model_dump(mode="json"),
         )
-        
         db.commit()
-        
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing deposit: {str(e)}"
+        )
+    
+    if not created:
+        record_webhook_rejected("duplicate")
         return ZandDepositWebhookResponse(
-            status="accepted",
-            transaction_id=str(transaction.id),
+            status="duplicate",
+            transaction_id=str(transaction_id),
         )
-        
+    
+    if get_settings().WEBHOOK_INBOX_ASYNC:
+        try:
+            enqueue_inbox_event(inbox_event_id)
+        except Exception as e:
+            # Event is durable in the inbox: the sweeper will enqueue it
+            logger.warning(
+                f"Failed to enqueue webhook inbox event {inbox_event_id}: {type(e).__name__}: {str(e)}"
+            )
+    else:
+        _, _, processed_transaction_id = process_inbox_event(db, inbox_event_id)
+        transaction_id = processed_transaction_id or transaction_id
+    
+    return ZandDepositWebhookResponse(
+        status="accepted",
+        transaction_id=str(transaction_id),
+    )
+
+
+@router.post(
+    "/zand/deposits/bulk",
+    response_model=ZandBulkDepositWebhookResponse,
+    status_code=status.HTTP_200_OK,
+    summary="ZAND bulk deposit webhook",
+    description="Receive a batch of deposit notifications from ZAND Bank (backlog replay). Each event is recorded in WALLET_BLOCKED compartment; the response carries one result per event.",
+)
+async def zand_bulk_deposit_webhook(
+    payload: ZandBulkDepositWebhookPayload,
+    request: Request,
+    db: Session = Depends(get_db),
+) -> ZandBulkDepositWebhookResponse:
+    """
+    Process a batch of ZAND Bank deposit events.
+    
+    Events are deduplicated against already-recorded deposits with a single
+    lookup and posted in chunked DB transactions (ZAND_BULK_CHUNK_SIZE).
+    A failing event is reported as failed without rejecting the others.
+    
+    Idempotency: Uses provider_event_id, same key as the single-event webhook.
+    
+    Security: X-Zand-Signature (HMAC-SHA256 of the X-Zand-Timestamp and
+    the raw body with ZAND_WEBHOOK_SECRET) is required and the timestamp
+    must be within ZAND_WEBHOOK_TOLERANCE_SECONDS; without a secret the
+    route only answers in DEV_MODE.
+    """
+    await _verify_signature(request)
+    
+    max_events = get_settings().ZAND_BULK_MAX_EVENTS
+    if len(payload.events) > max_events:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many events: {len(payload.events)} > {max_events}"
+        )
+    
+    events = [
+        DepositEvent(
+            provider_event_id=event.provider_event_id,
+            user_id=event.user_id,
+            amount=event.amount,
+            currency=event.currency,
+            iban=event.iban,
+            occurred_at=event.occurred_at,
+        )
+        for event in payload.events
+    ]
+    
+    try:
+        results = record_deposits_blocked_bulk(db=db, events=events)
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing deposit: {str(e)}"
+            detail=f"Error processing deposits: {str(e)}"
         )
+    
+    return ZandBulkDepositWebhookResponse(
+        accepted_count=sum(1 for r in results if r.status == DEPOSIT_ACCEPTED),
+        duplicate_count=sum(1 for r in results if r.status == DEPOSIT_DUPLICATE),
+        failed_count=sum(1 for r in results if r.status == DEPOSIT_FAILED),
+        results=[
+            ZandBulkDepositResult(
+                provider_event_id=r.provider_event_id,
+                status=r.status,
+                transaction_id=str(r.transaction_id) if r.transaction_id else None,
+                operation_id=str(r.operation_id) if r.operation_id else None,
+                error=r.error,
+            )
+            for r in results
+        ],
+    )
@@ -12,7 +12,7 @@ from app.auth.oidc import Principal
 from app.security.rbac import require_role, Role
 from app.infrastructure.settings import get_settings
 from app.infrastructure.database import get_db
-from app.core.users.models import User
+from app.auth.principal_cache import cache_claims, get_cached_claims, get_user_email
 
 settings = get_settings()
 
@@ -25,6 +25,9 @@ async def get_current_principal(
     Extract Principal from JWT token in Authorization header.
     
     For DEV mode: Supports Bearer token with JWT.
+    
+    Verified claims and user emails are cached (app/auth/principal_cache.py):
+    a repeated token needs neither decoding nor a database round-trip.
     """
     if not authorization:
         raise HTTPException(
@@ -56,8 +59,11 @@ async def get_current_principal(
         )
     
     try:
-        # Decode JWT token
-        payload = pyjwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        # Decode JWT token (once per token while it is valid)
+        payload = get_cached_claims(token)
+        if payload is None:
+            payload = pyjwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+            cache_claims(token, payload)
         
         # Extract user info
         user_id_str = payload.get("sub")
@@ -65,15 +71,16 @@ async def get_current_principal(
         # Extract roles from JWT claims (if present)
         roles = payload.get("roles", ["USER"])
         
-        # Get user from database to extract roles
-        if user_id_str:
+        # Email missing from the token: take it from the user record
+        # (with an email claim both branches build the same Principal)
+        if user_id_str and not email:
             try:
                 user_id = UUID(user_id_str)
-                user = db.query(User).filter(User.id == user_id).first()
-                if user:
+                found, user_email = get_user_email(db, user_id)
+                if found:
                     return Principal(
                         sub=user_id_str,
-                        email=email or user.email,
+                        email=email or user_email,
                         roles=roles,  # Use roles from JWT
                         claims=payload,
                     )
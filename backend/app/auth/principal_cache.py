@@ -0,0 +1,108 @@
+"""
+Authentication caches - verified token claims and user records
+
+get_current_principal used to decode the JWT and query users on every
+request. Two per-process caches remove both from the hot path:
+
+- token cache: SHA-256(raw token) -> verified claims. Keyed by the hash of
+  the whole token, never by an unverified jti, so a forged token can not hit
+  another token's entry. An entry never outlives the token's exp claim:
+  expired tokens always go through decoding (and fail).
+- user cache: user_id -> the user fields auth needs (email), including
+  "no such user". Invalidated after commit whenever a User row is inserted,
+  updated or deleted through the ORM (this process), and explicitly by
+  DELETE /admin/v1/users/{user_id}/auth-cache. Other replicas converge
+  within AUTH_USER_CACHE_TTL_SECONDS.
+"""
+
+import hashlib
+import time
+from typing import Any, Dict, Hashable, Optional
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.users.models import User
+from app.infrastructure.settings import get_settings
+from app.utils.local_cache import TTLLRUCache
+from app.utils.session_pending import add_pending, register_pending_namespace
+
+_PENDING_USER_INVALIDATIONS = "auth_user_cache_invalidations"
+
+# Cached user record: (found, email)
+_MISSING_USER = (False, None)
+
+settings = get_settings()
+
+_token_cache: TTLLRUCache[Dict[str, Any]] = TTLLRUCache(
+    maxsize=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_TOKEN_CACHE_TTL_SECONDS,
+)
+_user_cache: TTLLRUCache[tuple] = TTLLRUCache(
+    maxsize=settings.AUTH_USER_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def get_cached_claims(token: str) -> Optional[Dict[str, Any]]:
+    """Verified claims of a token decoded earlier (None on miss)."""
+    return _token_cache.get(_token_key(token))
+
+
+def cache_claims(token: str, claims: Dict[str, Any]) -> None:
+    """Remember the verified claims of a token until it expires (capped by the cache TTL)."""
+    ttl = float(settings.AUTH_TOKEN_CACHE_TTL_SECONDS)
+    exp = claims.get("exp")
+    if exp is not None:
+        try:
+            ttl = min(ttl, float(exp) - time.time())
+        except (TypeError, ValueError):
+            return
+    if ttl > 0:
+        _token_cache.set(_token_key(token), claims, ttl_seconds=ttl)
+
+
+def get_user_email(db: Session, user_id: UUID) -> tuple:
+    """
+    (found, email) of a user, from the cache or the database.
+    """
+    record = _user_cache.get(user_id)
+    if record is None:
+        row = db.query(User.email).filter(User.id == user_id).first()
+        record = (True, row.email) if row else _MISSING_USER
+        _user_cache.set(user_id, record)
+    return record
+
+
+def invalidate_cached_user(user_id: UUID) -> None:
+    """Drop a user's cached record (this process)."""
+    _user_cache.delete(user_id)
+
+
+def clear_auth_caches() -> None:
+    """Drop every cached token and user record (tests, key rotation)."""
+    _token_cache.clear()
+    _user_cache.clear()
+
+
+def _invalidate_committed(pending: Dict[Hashable, Any]) -> None:
+    for user_id in pending:
+        invalidate_cached_user(user_id)
+
+
+register_pending_namespace(_PENDING_USER_INVALIDATIONS, _invalidate_committed)
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    """A changed user row is dropped from the cache once its transaction commits."""
+    session = Session.object_session(target)
+    if session is not None and target.id is not None:
+        add_pending(session, _PENDING_USER_INVALIDATIONS, target.id, None)
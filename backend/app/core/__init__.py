@@ -6,7 +6,11 @@ from app.core.users.models import User
 from app.core.accounts.models import Account
 from app.core.transactions.models import Transaction
 from app.core.ledger.models import Operation, LedgerEntry
+from app.core.ledger.balances import AccountBalance, AccountBalanceCheckpoint
+from app.core.ledger.partitions import LedgerPartitionArchive
+from app.core.accounts.exposures import ExposureAggregate
 from app.core.compliance.models import AuditLog
+from app.core.webhooks.models import WebhookInboxEvent
 
-__all__ = ["User", "Account", "Transaction", "Operation", "LedgerEntry", "AuditLog"]
+__all__ = ["User", "Account", "Transaction", "Operation", "LedgerEntry", "AccountBalance", "AccountBalanceCheckpoint", "LedgerPartitionArchive", "ExposureAggregate", "AuditLog", "WebhookInboxEvent"]
 
@@ -0,0 +1,212 @@
+"""
+Exposure aggregates - Materialized per-instrument totals of wallet_locks and vault_accounts
+
+The wallet_locks and vault_accounts rows remain the source of truth:
+    locked(instrument)    = SUM(amount - consumed_amount) of ACTIVE wallet_locks
+    principal(vault)      = SUM(vault_accounts.principal)
+
+ExposureAggregate stores those sums (and row counts) per
+(reference_type, reference_id, reason, currency) so the admin portfolio
+views are a single unique-key lookup instead of a scan over every lock or
+vault account of the instrument. Like account_balances, the aggregates are
+maintained in the SAME database transaction as every write to the source
+rows (see _maintain_exposure_aggregates below); drift is detected and
+repaired by app/services/exposure_aggregates.py.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import Column, String, Numeric, Integer, UniqueConstraint, event, func, inspect
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.accounts.wallet_locks import LockStatus, ReferenceType, WalletLock
+from app.core.common.base_model import BaseModel
+from app.core.vaults.models import VaultAccount
+
+# reason of the vault principal rows (not a lock reason: SUM(vault_accounts.principal) per vault)
+VAULT_PRINCIPAL_REASON = "VAULT_PRINCIPAL"
+# Currency of the vault principal rows: vaults and vault_accounts carry no
+# currency column and every vault is AED-denominated (vault_service posts
+# and withdraws in AED), so principal is AED by construction
+VAULT_PRINCIPAL_CURRENCY = "AED"
+
+ExposureKey = Tuple[str, UUID, str, str]  # (reference_type, reference_id, reason, currency)
+
+
+class ExposureAggregate(BaseModel):
+    """
+    ExposureAggregate model - Running totals of one instrument (one row per key)
+
+    Invariants (checked by the rebuild job):
+        lock reasons:    total_amount == SUM(remaining_amount), item_count == COUNT(*)
+                         of the ACTIVE wallet_locks with this key
+        VAULT_PRINCIPAL: total_amount == SUM(principal), item_count == COUNT(*)
+                         of the vault_accounts of the vault
+
+    Rows are only ever written through apply_exposure_deltas() (atomic
+    INSERT ... ON CONFLICT DO UPDATE SET total_amount = total_amount + delta).
+    Never assign totals directly except when repairing drift.
+    """
+
+    __tablename__ = "exposure_aggregates"
+
+    reference_type = Column(String(20), nullable=False)  # OFFER, VAULT
+    reference_id = Column(PG_UUID(as_uuid=True), nullable=False)  # offer_id or vault_id
+    reason = Column(String(50), nullable=False)  # Lock reason, or VAULT_PRINCIPAL
+    currency = Column(String(3), nullable=False)  # ISO 4217
+    total_amount = Column(Numeric(20, 2), nullable=False, default=Decimal("0.00"))
+    item_count = Column(Integer, nullable=False, default=0)  # ACTIVE locks, or vault accounts
+
+    __table_args__ = (
+        UniqueConstraint('reference_type', 'reference_id', 'reason', 'currency', name='uq_exposure_aggregates_key'),
+    )
+
+
+def vault_principal_key(vault_id: UUID) -> ExposureKey:
+    """Key of the SUM(vault_accounts.principal) row of a vault (AED: vaults are AED-only)"""
+    return (ReferenceType.VAULT.value, vault_id, VAULT_PRINCIPAL_REASON, VAULT_PRINCIPAL_CURRENCY)
+
+
+def apply_exposure_deltas(
+    connection: Connection,
+    deltas: Dict[ExposureKey, Tuple[Decimal, int]],
+) -> None:
+    """
+    Fold source deltas into exposure_aggregates with one atomic upsert.
+
+    Args:
+        connection: Connection bound to the transaction that wrote the source rows
+        deltas: key -> (amount delta, count delta)
+
+    Rows are written in key order so concurrent transactions always acquire
+    row locks in the same order.
+    """
+    rows = [
+        {
+            "id": uuid4(),
+            "reference_type": reference_type,
+            "reference_id": reference_id,
+            "reason": reason,
+            "currency": currency,
+            "total_amount": amount,
+            "item_count": count,
+        }
+        for (reference_type, reference_id, reason, currency), (amount, count)
+        in sorted(deltas.items(), key=lambda item: tuple(str(part) for part in item[0]))
+        if amount or count
+    ]
+    if not rows:
+        return
+
+    table = ExposureAggregate.__table__
+    stmt = pg_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.reference_type, table.c.reference_id, table.c.reason, table.c.currency],
+        set_={
+            "total_amount": table.c.total_amount + stmt.excluded.total_amount,
+            "item_count": table.c.item_count + stmt.excluded.item_count,
+            "updated_at": func.now(),
+        },
+    )
+    connection.execute(stmt)
+
+
+def collect_lock_consumption_deltas(rows: Iterable) -> Dict[ExposureKey, Tuple[Decimal, int]]:
+    """
+    Aggregate the RETURNING rows of a lock consumption UPDATE into deltas.
+
+    Each row has reference_type, reference_id, reason, currency, consumed
+    (the amount consumed by the UPDATE) and status (after the UPDATE).
+    """
+    deltas: Dict[ExposureKey, Tuple[Decimal, int]] = defaultdict(lambda: (Decimal("0"), 0))
+    for row in rows:
+        key = (row.reference_type, row.reference_id, row.reason, row.currency)
+        amount, count = deltas[key]
+        released = 1 if row.status == LockStatus.RELEASED.value else 0
+        deltas[key] = (amount - Decimal(str(row.consumed)), count - released)
+    return deltas
+
+
+def _attribute_before(obj, name: str):
+    """Value of an attribute before the pending flush (current value when unchanged)"""
+    history = inspect(obj).attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return None
+
+
+def _lock_exposure(obj: WalletLock, before: bool) -> Optional[Tuple[ExposureKey, Decimal]]:
+    """(key, remaining amount) a lock contributes, None when not ACTIVE"""
+    value = (lambda name: _attribute_before(obj, name)) if before else (lambda name: getattr(obj, name))
+    if value("status") != LockStatus.ACTIVE.value:
+        return None
+    key = (value("reference_type"), value("reference_id"), value("reason"), value("currency"))
+    return key, Decimal(str(value("amount"))) - Decimal(str(value("consumed_amount") or 0))
+
+
+def collect_exposure_deltas(
+    new: Iterable[object],
+    dirty: Iterable[object],
+    deleted: Iterable[object],
+) -> Dict[ExposureKey, Tuple[Decimal, int]]:
+    """Aggregate flushed WalletLock / VaultAccount objects into per-key deltas."""
+    deltas: Dict[ExposureKey, Tuple[Decimal, int]] = defaultdict(lambda: (Decimal("0"), 0))
+
+    def add(key: ExposureKey, amount: Decimal, count: int) -> None:
+        total, items = deltas[key]
+        deltas[key] = (total + amount, items + count)
+
+    for objects, before, after in ((new, False, True), (dirty, True, True), (deleted, True, False)):
+        for obj in objects:
+            if isinstance(obj, WalletLock):
+                if before and (exposure := _lock_exposure(obj, before=True)):
+                    add(exposure[0], -exposure[1], -1)
+                if after and (exposure := _lock_exposure(obj, before=False)):
+                    add(exposure[0], exposure[1], 1)
+            elif isinstance(obj, VaultAccount):
+                if before:
+                    add(vault_principal_key(_attribute_before(obj, "vault_id")), -Decimal(str(_attribute_before(obj, "principal") or 0)), -1)
+                if after:
+                    add(vault_principal_key(obj.vault_id), Decimal(str(obj.principal or 0)), 1)
+
+    return deltas
+
+
+def _load_replaced_value(target, value, oldvalue, initiator):
+    return value
+
+
+# An attribute set on an expired object keeps no "before" value unless the
+# old value is loaded on set: the deltas need it for the tracked columns.
+for _attribute in (
+    WalletLock.status, WalletLock.amount, WalletLock.consumed_amount, WalletLock.currency,
+    WalletLock.reason, WalletLock.reference_type, WalletLock.reference_id,
+    VaultAccount.principal, VaultAccount.vault_id,
+):
+    event.listen(_attribute, "set", _load_replaced_value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_exposure_aggregates(session: Session, flush_context) -> None:
+    """
+    Keep exposure_aggregates in sync with every ORM write to wallet_locks and vault_accounts.
+
+    Runs inside the flush, on the same connection/transaction as the writes
+    (see _maintain_account_balances). Core UPDATEs of these tables bypass
+    this hook and must call apply_exposure_deltas() themselves.
+    """
+    tracked = (WalletLock, VaultAccount)
+    new = [obj for obj in session.new if isinstance(obj, tracked)]
+    dirty = [obj for obj in session.dirty if isinstance(obj, tracked) and session.is_modified(obj)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, tracked)]
+    if not (new or dirty or deleted):
+        return
+
+    apply_exposure_deltas(session.connection(), collect_exposure_deltas(new, dirty, deleted))
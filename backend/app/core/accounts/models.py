@@ -2,7 +2,7 @@
 Account model - Wallet compartments and system accounts
 """
 
-from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, Index, UniqueConstraint
+from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import enum
@@ -63,4 +63,11 @@ class Account(BaseModel):
         # Note: In PostgreSQL, NULL != NULL, so this constraint allows multiple rows with NULL values.
         # We rely on application-level "get or create" logic to prevent duplicates.
         UniqueConstraint('account_type', 'user_id', 'vault_id', 'offer_id', 'currency', name='uq_accounts_unique'),
+        # One wallet account per (user, currency, type): conflict target of ensure_wallet_accounts()
+        Index(
+            'uq_accounts_user_wallet',
+            'user_id', 'currency', 'account_type',
+            unique=True,
+            postgresql_where=text('user_id IS NOT NULL AND vault_id IS NULL AND offer_id IS NULL'),
+        ),
     )
@@ -7,10 +7,16 @@ This model provides a metadata layer on top of ledger entries to track:
 - Idempotency via intent_id or operation_id
 
 This is the source of truth for Wallet Matrix OFFER_USER and VAULT_USER rows.
+
+Partial releases consume a lock as a range: consumed_amount grows (oldest
+locks first) and the row is RELEASED once fully consumed, so the amount
+still locked is remaining_amount = amount - consumed_amount. No row is
+split.
 """
 from decimal import Decimal
-from sqlalchemy import Column, String, ForeignKey, Numeric, Text, DateTime, Index, UniqueConstraint, CheckConstraint
+from sqlalchemy import Column, String, ForeignKey, Numeric, Text, DateTime, Index, UniqueConstraint, CheckConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 import enum
 from app.core.common.base_model import BaseModel
@@ -54,7 +60,8 @@ class WalletLock(BaseModel):
     
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", name="fk_wallet_locks_user_id"), nullable=False, index=True)
     currency = Column(String(3), nullable=False, default="AED", index=True)  # ISO 4217
-    amount = Column(Numeric(20, 2), nullable=False)  # Locked amount
+    amount = Column(Numeric(20, 2), nullable=False)  # Locked amount (as created, never changed)
+    consumed_amount = Column(Numeric(20, 2), nullable=False, default=Decimal("0.00"), server_default="0")  # Released so far by partial releases
     
     reason = Column(String(50), nullable=False, index=True)  # Lock reason (OFFER_INVEST, VAULT_AVENIR_VESTING, etc.)
     reference_type = Column(String(20), nullable=False, index=True)  # Reference type (OFFER, VAULT)
@@ -76,10 +83,21 @@ class WalletLock(BaseModel):
     # Table constraints
     __table_args__ = (
         CheckConstraint('amount > 0', name='check_wallet_locks_amount_positive'),
+        CheckConstraint('consumed_amount >= 0 AND consumed_amount <= amount', name='check_wallet_locks_consumed_amount_range'),
         Index('ix_wallet_locks_reference', 'reference_type', 'reference_id', 'reason', 'status'),
         Index('ix_wallet_locks_user_status', 'user_id', 'status'),
+        # FIFO consumption: ACTIVE locks of a user and instrument, oldest first
+        Index(
+            'ix_wallet_locks_active_fifo',
+            'user_id', 'reference_type', 'reference_id', 'reason', 'created_at', 'id',
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
         # Unique constraint for idempotency: one active lock per intent_id
         # Note: intent_id is already unique (unique=True on column), but we add this for clarity
         # If intent_id is NULL, we can't use it for idempotency, so we rely on application logic
     )
-
+    
+    @hybrid_property
+    def remaining_amount(self) -> Decimal:
+        """Amount still locked (amount - consumed_amount)"""
+        return self.amount - self.consumed_amount
@@ -0,0 +1,157 @@
+"""
+Account balance snapshots - Materialized running balances derived from LedgerEntries
+
+The ledger remains the source of truth:
+    balance(account) = SUM(ledger_entries.amount) WHERE account_id = account.id
+
+AccountBalance stores that sum per account so balance reads are a single
+primary-key lookup instead of a scan over the account's whole history.
+The snapshot is maintained in the SAME database transaction as every
+LedgerEntry insert (see _maintain_account_balances below), so it can never
+observe a committed entry that the snapshot does not include.
+
+AccountBalanceCheckpoint stores the balance of an account as of a point in
+time (all entries with created_at < checkpoint_at). It backs the optional
+"checkpoint + delta" read path and lets closed periods of the ledger be
+archived without ever being rescanned.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import Column, String, ForeignKey, Numeric, Integer, DateTime, Index, UniqueConstraint, event, func
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, relationship
+
+from app.core.common.base_model import BaseModel
+from app.core.ledger.models import LedgerEntry
+
+
+class AccountBalance(BaseModel):
+    """
+    AccountBalance model - Materialized running balance (one row per account)
+
+    Invariant (checked by the reconciliation job):
+        account_balances.balance == SUM(ledger_entries.amount) for the account
+
+    Rows are only ever written through apply_balance_deltas() (atomic
+    INSERT ... ON CONFLICT DO UPDATE SET balance = balance + delta).
+    Never assign balance directly except when repairing drift.
+    """
+
+    __tablename__ = "account_balances"
+
+    account_id = Column(PG_UUID(as_uuid=True), ForeignKey("accounts.id", name="fk_account_balances_account_id"), nullable=False, unique=True, index=True)
+    currency = Column(String(3), nullable=False)  # ISO 4217 (denormalized from accounts.currency)
+    balance = Column(Numeric(24, 8), nullable=False, default=Decimal("0"))  # Same precision as ledger_entries.amount
+    entry_count = Column(Integer, nullable=False, default=0)  # Number of ledger entries folded into balance
+    last_entry_at = Column(DateTime(timezone=True), nullable=True)  # Commit-time of the last folded batch
+
+    # Relationships
+    account = relationship("Account", foreign_keys=[account_id], lazy="select")
+
+
+class AccountBalanceCheckpoint(BaseModel):
+    """
+    AccountBalanceCheckpoint model - Balance of an account as of checkpoint_at
+
+    balance == SUM(ledger_entries.amount) WHERE account_id = ... AND created_at < checkpoint_at
+
+    Checkpoints are immutable once written and must only be taken for
+    closed periods (checkpoint_at safely in the past), because
+    ledger_entries.created_at is the transaction start time and an
+    in-flight transaction may still commit entries dated before now().
+    """
+
+    __tablename__ = "account_balance_checkpoints"
+
+    account_id = Column(PG_UUID(as_uuid=True), ForeignKey("accounts.id", name="fk_account_balance_checkpoints_account_id"), nullable=False, index=True)
+    checkpoint_at = Column(DateTime(timezone=True), nullable=False)
+    balance = Column(Numeric(24, 8), nullable=False)
+    entry_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('account_id', 'checkpoint_at', name='uq_account_balance_checkpoints_account_at'),
+        Index('ix_account_balance_checkpoints_account_at', 'account_id', 'checkpoint_at'),
+    )
+
+
+def apply_balance_deltas(
+    connection: Connection,
+    deltas: Dict[UUID, Tuple[str, Decimal, int]],
+) -> None:
+    """
+    Fold ledger deltas into account_balances with one atomic upsert.
+
+    Args:
+        connection: Connection bound to the transaction that inserted the entries
+        deltas: account_id -> (currency, amount delta, entry count delta)
+
+    Rows are written in account_id order so concurrent transactions always
+    acquire row locks in the same order (no deadlocks between postings that
+    touch the same accounts, e.g. INTERNAL_OMNIBUS).
+    """
+    if not deltas:
+        return
+
+    rows = [
+        {
+            "id": uuid4(),
+            "account_id": account_id,
+            "currency": currency,
+            "balance": amount,
+            "entry_count": count,
+            "last_entry_at": func.now(),
+        }
+        for account_id, (currency, amount, count) in sorted(deltas.items(), key=lambda item: str(item[0]))
+    ]
+
+    table = AccountBalance.__table__
+    stmt = pg_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.account_id],
+        set_={
+            "balance": table.c.balance + stmt.excluded.balance,
+            "entry_count": table.c.entry_count + stmt.excluded.entry_count,
+            "last_entry_at": func.now(),
+            "updated_at": func.now(),
+        },
+    )
+    connection.execute(stmt)
+
+
+def collect_balance_deltas(entries: Iterable[LedgerEntry]) -> Dict[UUID, Tuple[str, Decimal, int]]:
+    """Aggregate new LedgerEntry objects into per-account deltas."""
+    totals: Dict[UUID, Decimal] = defaultdict(lambda: Decimal("0"))
+    counts: Dict[UUID, int] = defaultdict(int)
+    currencies: Dict[UUID, str] = {}
+
+    for entry in entries:
+        totals[entry.account_id] += Decimal(str(entry.amount))
+        counts[entry.account_id] += 1
+        currencies[entry.account_id] = entry.currency
+
+    return {
+        account_id: (currencies[account_id], totals[account_id], counts[account_id])
+        for account_id in totals
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_account_balances(session: Session, flush_context) -> None:
+    """
+    Keep account_balances in sync with every ORM LedgerEntry insert.
+
+    Runs inside the flush, on the same connection/transaction as the INSERT
+    into ledger_entries: a rollback discards both, a commit persists both.
+    Bulk Core inserts into ledger_entries bypass this hook and must call
+    apply_balance_deltas() themselves.
+    """
+    new_entries = [obj for obj in session.new if isinstance(obj, LedgerEntry)]
+    if not new_entries:
+        return
+
+    apply_balance_deltas(session.connection(), collect_balance_deltas(new_entries))
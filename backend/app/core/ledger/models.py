@@ -2,7 +2,7 @@
 Ledger models - Operation and LedgerEntry (IMMUTABLE)
 """
 
-from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, Numeric, JSON, Text
+from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, Numeric, JSON, Text, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import enum
@@ -57,6 +57,14 @@ class Operation(BaseModel):
     transaction = relationship("Transaction", back_populates="operations")
     ledger_entries = relationship("LedgerEntry", back_populates="operation", lazy="select")
 
+    __table_args__ = (
+        # Keyset pagination of standalone operations (GET /api/v1/transactions)
+        Index(
+            'ix_operations_standalone_created_id', 'created_at', 'id',
+            postgresql_where=text('transaction_id IS NULL'),
+        ),
+    )
+
 
 class LedgerEntry(BaseModel):
     """
@@ -70,6 +78,10 @@ class LedgerEntry(BaseModel):
     - ✅ Corrections must be done via a new Operation (ADJUSTMENT or REVERSAL)
     
     The balance of an Account = SUM(ledger_entries.amount) WHERE account_id = account.id
+    (materialized in account_balances, see app/core/ledger/balances.py)
+    
+    In PostgreSQL the table is range-partitioned by created_at month with
+    primary key (id, created_at) - see app/services/ledger_partitions.py.
     
     This model enforces immutability at the application level by:
     - Not having an updated_at field
@@ -94,3 +106,8 @@ class LedgerEntry(BaseModel):
     operation = relationship("Operation", back_populates="ledger_entries")
     account = relationship("Account", back_populates="ledger_entries")
 
+    __table_args__ = (
+        # Checkpoint + delta balance reads: entries of one account after a checkpoint
+        Index('ix_ledger_entries_account_created', 'account_id', 'created_at'),
+    )
+
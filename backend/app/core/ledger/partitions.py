@@ -0,0 +1,55 @@
+"""
+Ledger partition archives - Months of ledger_entries moved out of the live table
+
+In production ledger_entries is range-partitioned by created_at month
+(one partition per month, see app/services/ledger_partitions.py). Closed
+months can be detached into the archive schema; before that, a balance
+checkpoint is written at the partition's upper bound for every account.
+
+For every archived month, LedgerPartitionArchive records the range and what
+was moved. The archive horizon (latest range_end) splits the ledger in two:
+    balance(account) = checkpoint(account, horizon) + SUM(live ledger_entries)
+"""
+
+from sqlalchemy import Column, String, Numeric, Integer, DateTime, func, select
+
+from app.core.common.base_model import BaseModel
+from app.core.ledger.balances import AccountBalanceCheckpoint
+
+
+class LedgerPartitionArchive(BaseModel):
+    """
+    LedgerPartitionArchive model - One archived (detached) ledger_entries partition
+
+    Archives are contiguous from the oldest month: a month is only archived
+    once every older month has been archived.
+    """
+
+    __tablename__ = "ledger_partition_archives"
+
+    partition_name = Column(String(63), nullable=False, unique=True)  # e.g. ledger_entries_y2025m01
+    archive_schema = Column(String(63), nullable=False)  # Schema the partition was moved to
+    range_start = Column(DateTime(timezone=True), nullable=False)  # Inclusive
+    range_end = Column(DateTime(timezone=True), nullable=False, index=True)  # Exclusive - checkpoint_at of the boundary checkpoints
+    entry_count = Column(Integer, nullable=False, default=0)
+    amount_sum = Column(Numeric(24, 8), nullable=False, default=0)  # Always 0 for a balanced ledger
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+def archive_horizon_subquery():
+    """Scalar subquery: latest archived range_end (NULL if nothing is archived)."""
+    return select(func.max(LedgerPartitionArchive.range_end)).scalar_subquery()
+
+
+def archived_balances_select():
+    """
+    Select (account_id, balance, entry_count) of archived entries per account:
+    the checkpoints taken at the archive horizon. Empty when nothing is archived.
+    """
+    return select(
+        AccountBalanceCheckpoint.account_id.label("account_id"),
+        AccountBalanceCheckpoint.balance.label("balance"),
+        AccountBalanceCheckpoint.entry_count.label("entry_count"),
+    ).where(
+        AccountBalanceCheckpoint.checkpoint_at == archive_horizon_subquery()
+    )
@@ -9,6 +9,7 @@ from app.core.offers.models import (
     OfferInvestmentStatus,
     InvestmentIntent,
     InvestmentIntentStatus,
+    OfferCapacityShard,
     OfferMedia,
     MediaType,
     MediaVisibility,
@@ -25,6 +26,7 @@ __all__ = [
     "OfferInvestmentStatus",
     "InvestmentIntent",
     "InvestmentIntentStatus",
+    "OfferCapacityShard",
     "OfferMedia",
     "MediaType",
     "MediaVisibility",
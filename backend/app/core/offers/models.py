@@ -3,7 +3,7 @@ Offer models - Exclusive investment offers
 """
 
 from decimal import Decimal
-from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, Numeric, Text, DateTime, Index, CheckConstraint, Integer, BigInteger, Boolean
+from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, Numeric, Text, DateTime, Index, CheckConstraint, Integer, BigInteger, Boolean, Sequence, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import remote
@@ -44,6 +44,8 @@ class Offer(BaseModel):
     - committed_amount: Legacy field (alias for invested_amount, kept for backward compatibility)
     - status: DRAFT, LIVE, PAUSED, CLOSED
     - Enforces max_amount limit via row-level locking (SELECT ... FOR UPDATE)
+    - queued_allocation: investments are queued as PENDING intents and allocated
+      in FIFO batches by the allocation worker (app/services/offers/allocation_queue.py)
     """
     
     __tablename__ = "offers"
@@ -58,6 +60,7 @@ class Offer(BaseModel):
     maturity_date = Column(DateTime(timezone=True), nullable=True)  # Maturity date (timestamptz)
     status = Column(SQLEnum(OfferStatus, name="offer_status", create_constraint=True), nullable=False, default=OfferStatus.DRAFT, index=True)
     offer_metadata = Column('metadata', JSONB, nullable=True)  # Flexible JSONB metadata (DB column: metadata)
+    queued_allocation = Column(Boolean, nullable=False, default=False, server_default=text("false"))  # Allocate intents in FIFO batches (hot launches)
     
     # Marketing V1.1 fields
     cover_media_id = Column(UUID(as_uuid=True), ForeignKey("offer_media.id", name="fk_offers_cover_media_id"), nullable=True, index=True)  # Cover image media ID
@@ -235,6 +238,9 @@ class InvestmentIntent(BaseModel):
     - status: PENDING, CONFIRMED, REJECTED
     - idempotency_key: Prevents double-click duplication
     - operation_id: Links to ledger operation that moved funds (only if CONFIRMED)
+    - queue_position: FIFO order of queued intents (offers with queued_allocation);
+      allocation_batch_id records the batch that decided the intent
+    - rejection_reason: Why a queued intent was REJECTED (OFFER_FULL, ...)
     """
     
     __tablename__ = "investment_intents"
@@ -247,6 +253,10 @@ class InvestmentIntent(BaseModel):
     status = Column(SQLEnum(InvestmentIntentStatus, name="investment_intent_status", create_constraint=True), nullable=False, default=InvestmentIntentStatus.PENDING, index=True)
     idempotency_key = Column(String(255), nullable=True, unique=True, index=True)  # Prevents double-click duplication
     operation_id = Column(UUID(as_uuid=True), ForeignKey("operations.id", name="fk_investment_intents_operation_id"), nullable=True, index=True)  # Link to ledger operation (only if CONFIRMED)
+    queue_position = Column(BigInteger, nullable=True)  # INTENT_QUEUE_SEQUENCE value (queued allocation only)
+    allocation_batch_id = Column(UUID(as_uuid=True), nullable=True, index=True)  # Allocation batch that decided this intent
+    rejection_reason = Column(String(64), nullable=True)  # OFFER_FULL, INSUFFICIENT_AVAILABLE_FUNDS, OFFER_NOT_LIVE, ...
+    callback_url = Column(String(2048), nullable=True)  # Notified once a queued intent is decided
     
     # Relationships
     offer = relationship("Offer", back_populates="investment_intents")
@@ -261,6 +271,43 @@ class InvestmentIntent(BaseModel):
         Index('idx_investment_intents_offer_user', 'offer_id', 'user_id'),
         Index('idx_investment_intents_offer_status', 'offer_id', 'status'),
         Index('idx_investment_intents_user_status', 'user_id', 'status'),
+        Index(
+            'ix_investment_intents_offer_queue',
+            'offer_id', 'queue_position',
+            postgresql_where=text("status = 'PENDING' AND queue_position IS NOT NULL"),
+        ),
+    )
+
+
+# Arrival order of queued intents (one sequence for every offer: gaps are fine, order is what counts)
+INTENT_QUEUE_SEQUENCE = Sequence("investment_intent_queue_seq", metadata=BaseModel.metadata)
+
+
+class OfferCapacityShard(BaseModel):
+    """
+    OfferCapacityShard model - One slice of an offer's remaining capacity (hot launches)
+    
+    When an offer is sharded (app/services/offers/capacity_shards.py), its
+    remaining capacity at sharding time is split over N shard rows and
+    investors reserve from shards instead of locking the offer row:
+        offer.max_amount == offer.invested_amount + SUM(shard.capacity)
+        investments not yet folded == SUM(shard.reserved_amount)
+    Folding moves reserved_amount into offers.invested_amount and re-splits
+    what is left. reserved_amount <= capacity is the no-overfill guarantee.
+    """
+    
+    __tablename__ = "offer_capacity_shards"
+    
+    offer_id = Column(UUID(as_uuid=True), ForeignKey("offers.id", name="fk_offer_capacity_shards_offer_id", ondelete="CASCADE"), nullable=False, index=True)
+    shard_no = Column(Integer, nullable=False)  # 0..N-1
+    capacity = Column(Numeric(24, 8), nullable=False)  # Capacity assigned to this shard at the last fold
+    reserved_amount = Column(Numeric(24, 8), nullable=False, default=0)  # Allocated since the last fold
+    
+    __table_args__ = (
+        CheckConstraint('capacity >= 0', name='check_capacity_shard_capacity_non_negative'),
+        CheckConstraint('reserved_amount >= 0', name='check_capacity_shard_reserved_non_negative'),
+        CheckConstraint('reserved_amount <= capacity', name='check_capacity_shard_not_overfilled'),
+        Index('uq_offer_capacity_shards_offer_shard', 'offer_id', 'shard_no', unique=True),
     )
 
 
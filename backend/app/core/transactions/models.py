@@ -2,7 +2,7 @@
 Transaction model - High-level business transactions
 """
 
-from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import enum
@@ -49,3 +49,8 @@ class Transaction(BaseModel):
     # Relationships
     user = relationship("User", back_populates="transactions")
     operations = relationship("Operation", back_populates="transaction", lazy="select")
+
+    __table_args__ = (
+        # Keyset pagination of a user's history (GET /api/v1/transactions)
+        Index('ix_transactions_user_created_id', 'user_id', 'created_at', 'id'),
+    )
@@ -4,7 +4,7 @@ Vault models - Cash-only vaults (coffres)
 
 from decimal import Decimal
 from datetime import date, timedelta
-from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, Numeric, Text, DateTime, Date, Index, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, Numeric, Text, DateTime, Date, Integer, Index, CheckConstraint, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
@@ -185,6 +185,8 @@ class VestingLot(BaseModel):
         Index('ix_vault_vesting_lots_user_status', 'user_id', 'status'),
         Index('ix_vault_vesting_lots_source_operation', 'source_operation_id'),
         Index('ix_vault_vesting_lots_vault_code_release_day', 'vault_code', 'release_day', 'status'),
+        # Keyset walk of the parallel release runner (id order, VESTED lots only)
+        Index('ix_vault_vesting_lots_vested_id', 'id', postgresql_where=text("status = 'VESTED'")),
         UniqueConstraint('source_operation_id', name='uq_vault_vesting_lots_source_operation'),
     )
     
@@ -195,3 +197,54 @@ class VestingLot(BaseModel):
     
     def __repr__(self) -> str:
         return f"<VestingLot(id={self.id}, vault_code={self.vault_code}, user_id={self.user_id}, amount={self.amount}, released_amount={self.released_amount}, status={self.status})>"
+
+
+class VestingReleaseCheckpointStatus(str, enum.Enum):
+    """Status of one shard of a parallel vesting release run"""
+    PENDING = "PENDING"  # Not started yet
+    RUNNING = "RUNNING"  # A worker is (or was, if it crashed) releasing chunks
+    COMPLETED = "COMPLETED"  # No mature lot left after the cursor
+    FAILED = "FAILED"  # Worker stopped on an error; resumable
+
+
+class VestingReleaseCheckpoint(BaseModel):
+    """
+    VestingReleaseCheckpoint model - Progress of one user-hash shard of a
+    parallel vesting release run (see app/services/vesting_release_runner.py)
+    
+    One row per (trace_id, shard_no). The row is updated in the same
+    transaction as each released chunk, so last_lot_id is exactly the point
+    where a resumed run continues.
+    """
+    
+    __tablename__ = "vesting_release_checkpoints"
+    
+    trace_id = Column(UUID(as_uuid=True), nullable=False, index=True)  # Run id (= VestingLot.release_job_trace_id)
+    shard_no = Column(Integer, nullable=False)
+    shard_count = Column(Integer, nullable=False)
+    vault_code = Column(String(50), nullable=False, default="AVENIR")
+    currency = Column(String(3), nullable=False)
+    as_of_date = Column(Date, nullable=False)
+    status = Column(String(20), nullable=False, default=VestingReleaseCheckpointStatus.PENDING.value)
+    
+    # Keyset cursor: lots of the shard are walked in id order
+    last_lot_id = Column(UUID(as_uuid=True), nullable=True)
+    
+    # Counters (cumulative across resumes)
+    lots_released = Column(Integer, nullable=False, default=0)
+    amount_released = Column(Numeric(20, 2), nullable=False, default=Decimal("0.00"))
+    lots_skipped = Column(Integer, nullable=False, default=0)
+    errors_count = Column(Integer, nullable=False, default=0)
+    locks_missing_count = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        UniqueConstraint('trace_id', 'shard_no', name='uq_vesting_release_checkpoints_trace_shard'),
+        CheckConstraint('shard_no >= 0 AND shard_no < shard_count', name='ck_vesting_release_checkpoints_shard_no'),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<VestingReleaseCheckpoint(trace_id={self.trace_id}, shard={self.shard_no}/{self.shard_count}, status={self.status}, lots_released={self.lots_released})>"
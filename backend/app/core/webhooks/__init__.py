@@ -0,0 +1,3 @@
+"""
+Webhooks domain - Durable inbox for provider events
+"""
@@ -0,0 +1,62 @@
+"""
+WebhookInboxEvent model - Durable inbox for inbound provider webhooks
+
+Webhooks are persisted here and acknowledged immediately; the ledger work is
+done by an RQ job (app/workers/jobs.py). The row is the source of truth for
+processing state, retries and dead-lettering - the RQ queue only carries the
+event id and can be rebuilt from this table.
+"""
+from sqlalchemy import Column, String, Integer, JSON, Text, DateTime, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+import enum
+from app.core.common.base_model import BaseModel
+
+
+class WebhookProvider(str, enum.Enum):
+    """Webhook provider enum"""
+    ZAND = "ZAND"
+
+
+class WebhookEventType(str, enum.Enum):
+    """Webhook event type enum"""
+    DEPOSIT = "DEPOSIT"
+
+
+class WebhookInboxStatus(str, enum.Enum):
+    """Inbox event processing status"""
+    RECEIVED = "RECEIVED"  # Persisted, waiting for the worker
+    PROCESSED = "PROCESSED"  # Ledger work committed
+    FAILED = "FAILED"  # Last attempt failed, retry scheduled (next_attempt_at)
+    DEAD_LETTER = "DEAD_LETTER"  # Gave up (max attempts or non-retriable error) - needs manual action
+
+
+class WebhookInboxEvent(BaseModel):
+    """
+    WebhookInboxEvent model - One inbound webhook delivery, keyed by provider_event_id
+
+    Duplicate deliveries of the same (provider, provider_event_id) collapse onto
+    the same row at intake. transaction_id is assigned at intake so the webhook
+    can answer with it before the Transaction row exists.
+    """
+
+    __tablename__ = "webhook_inbox_events"
+
+    provider = Column(String(20), nullable=False)  # ZAND
+    event_type = Column(String(32), nullable=False)  # DEPOSIT
+    provider_event_id = Column(String(255), nullable=False)
+    payload = Column(JSON, nullable=False)  # Validated payload (JSON-safe)
+
+    status = Column(String(20), nullable=False, default=WebhookInboxStatus.RECEIVED.value, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Results (set at intake / when processed)
+    transaction_id = Column(UUID(as_uuid=True), nullable=False)
+    operation_id = Column(UUID(as_uuid=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('provider', 'provider_event_id', name='uq_webhook_inbox_events_provider_event'),
+        Index('ix_webhook_inbox_events_status_next_attempt', 'status', 'next_attempt_at'),
+    )
@@ -1,9 +1,24 @@
 """
-Database configuration - SQLAlchemy 2.x (sync)
+Database configuration - SQLAlchemy 2.x (sync + asyncio)
+
+Two stacks share the same models and database:
+- sync: engine / SessionLocal / get_db (services, scripts, RQ workers)
+- async: AsyncSession over asyncpg / get_async_db (read-heavy API endpoints),
+  so DB round-trips no longer block the event loop
+
+Migration path: services keep taking a sync Session and are called from async
+endpoints through run_db(), which runs them on the AsyncSession's connection
+(AsyncSession.run_sync). A service can later be rewritten natively async
+without touching its callers' session type.
 """
 
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, TypeVar, Union
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 from app.infrastructure.settings import get_settings
 
 settings = get_settings()
@@ -17,6 +32,14 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+T = TypeVar("T")
+
+# Async drivers for the sync URLs' dialects
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
 
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models - SQLAlchemy 2.x style"""
@@ -34,4 +57,55 @@ def get_db():
         db.close()
 
 
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with its driver swapped for the asyncio one (psycopg2 -> asyncpg)."""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+@lru_cache()
+def get_async_engine() -> AsyncEngine:
+    """
+    Async engine (created on first use: scripts and workers never need it).
+    """
+    return create_async_engine(
+        settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL),
+        pool_pre_ping=True,
+        pool_size=settings.ASYNC_DB_POOL_SIZE,
+        max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+    )
+
+
+@lru_cache()
+def get_async_sessionmaker() -> async_sessionmaker:
+    """AsyncSession factory bound to the async engine."""
+    # expire_on_commit=False: attributes must not lazy-load (implicit IO) after commit
+    return async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
 
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency to get an async database session
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def run_db(db: Union[AsyncSession, Session], fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Compatibility shim: call a sync service fn(session, *args, **kwargs) from async code.
+
+    With an AsyncSession, fn runs on the session's asyncpg connection
+    (AsyncSession.run_sync): its queries await instead of blocking the event
+    loop. With a plain Session (tests overriding get_async_db, callers not
+    migrated yet), fn is simply called.
+
+    fn must return plain data / response models: ORM objects it loaded must not
+    lazy-load attributes once back in async code.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return fn(db, *args, **kwargs)
@@ -2,7 +2,13 @@
 Redis client configuration
 """
 
+import asyncio
+import weakref
+
 import redis
+import redis.asyncio as aioredis
+from sqlalchemy.util import await_
+from sqlalchemy.util.concurrency import in_greenlet
 from app.infrastructure.settings import get_settings
 
 settings = get_settings()
@@ -11,18 +17,97 @@ settings = get_settings()
 redis_pool = redis.ConnectionPool.from_url(settings.REDIS_URL, decode_responses=True)
 redis_client = redis.Redis(connection_pool=redis_pool)
 
+# RQ stores pickled job data: it needs a client without decode_responses
+rq_redis_pool = redis.ConnectionPool.from_url(settings.REDIS_URL)
+rq_redis_client = redis.Redis(connection_pool=rq_redis_pool)
+
+# redis.asyncio connections belong to the event loop that opened them: one pool per loop
+_async_redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
 
 def get_redis() -> redis.Redis:
     """Get Redis client instance"""
     return redis_client
 
 
+def get_rq_redis() -> redis.Redis:
+    """Get Redis client instance for RQ queues and workers (binary responses)"""
+    return rq_redis_client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """
+    Get the redis.asyncio client of the running event loop (for async code such
+    as middleware: commands await instead of blocking the loop).
+
+    Short socket timeouts: callers on the request path must degrade rather
+    than wait on an unreachable Redis.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_redis_clients.get(loop)
+    if client is None:
+        client = aioredis.Redis(connection_pool=aioredis.ConnectionPool.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=settings.REDIS_ASYNC_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_ASYNC_SOCKET_TIMEOUT_SECONDS,
+            max_connections=settings.REDIS_ASYNC_MAX_CONNECTIONS,
+        ))
+        _async_redis_clients[loop] = client
+    return client
+
+
+class _GreenletRedis:
+    """
+    Sync facade of a redis.asyncio client for sync code running under run_db
+    (AsyncSession.run_sync): every command awaits on the event loop through
+    SQLAlchemy's greenlet, the way the session's queries do.
+    """
+
+    def __init__(self, client: aioredis.Redis) -> None:
+        self.client = client
+
+    def __getattr__(self, command: str):
+        method = getattr(self.client, command)
+        return lambda *args, **kwargs: await_(method(*args, **kwargs))
+
+    def pipeline(self, transaction: bool = True) -> "_GreenletPipeline":
+        return _GreenletPipeline(self.client.pipeline(transaction=transaction))
+
+
+class _GreenletPipeline:
+    """Pipeline of a _GreenletRedis: commands are buffered, execute() awaits."""
+
+    def __init__(self, pipe) -> None:
+        self.pipe = pipe
+
+    def __getattr__(self, command: str):
+        method = getattr(self.pipe, command)
+
+        def buffer(*args, **kwargs):
+            method(*args, **kwargs)
+            return self
+        return buffer
+
+    def execute(self):
+        return await_(self.pipe.execute())
+
+
+def get_redis_for_sync_code():
+    """
+    Redis client for sync helpers that may run either in a worker thread or
+    under run_db: the blocking client, or - on the event loop, inside
+    AsyncSession.run_sync - a facade over get_async_redis() whose commands
+    await instead of blocking the loop.
+    """
+    if in_greenlet():
+        return _GreenletRedis(get_async_redis())
+    return redis_client
+
+
 def ping_redis() -> bool:
     """Ping Redis to check connectivity"""
     try:
         return redis_client.ping()
     except Exception:
         return False
-
-
-
@@ -2,6 +2,8 @@
 FastAPI application entry point
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
@@ -20,11 +22,8 @@ from app.api.public.metrics import router as metrics_router
 from app.api.v1 import router as api_v1_router
 from app.api.admin import router as admin_router
 from app.api.webhooks import router as webhooks_router
-from app.utils.trace_id import TraceIDMiddleware
-from app.utils.request_logging import RequestLoggingMiddleware
-from app.utils.security_headers import SecurityHeadersMiddleware
-from app.utils.rate_limiter import RateLimitMiddleware
-from app.infrastructure.redis_client import get_redis
+from app.utils.rate_limiter import EndpointRateLimits
+from app.utils.request_pipeline import RequestPipelineMiddleware
 
 # Setup logging
 setup_logging()
@@ -52,6 +51,24 @@ logger.info(
     f"{'reason=' + reason if reason else ''}"
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks"""
+    # Warm the system account registry (INTERNAL_OMNIBUS, offer/vault pools).
+    # Best effort: on failure the registry fills itself on first use.
+    from app.infrastructure.database import SessionLocal
+    from app.services.system_accounts import warm_system_account_registry
+    db = SessionLocal()
+    try:
+        count = warm_system_account_registry(db)
+        logger.info(f"SYSTEM ACCOUNTS: registry warmed with {count} account(s)")
+    except Exception as e:
+        logger.warning(f"SYSTEM ACCOUNTS: registry warm-up skipped: {type(e).__name__}: {str(e)}")
+    finally:
+        db.close()
+    yield
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Vancelian Core API",
@@ -60,6 +77,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware IMMEDIATELY after app creation (before other middlewares and routers)
@@ -87,15 +105,19 @@ if settings.CORS_ENABLED:
         allow_methods=cors_methods,  # Use parsed methods from settings (or ["*"])
         allow_headers=cors_headers,  # Use parsed headers from settings (or ["*"])
         allow_credentials=settings.CORS_ALLOW_CREDENTIALS,  # From settings
+        expose_headers=["X-Next-Cursor"],  # Keyset pagination cursor (GET /api/v1/transactions)
     )
 
-# Add custom middlewares (order matters - first added is outermost)
-app.add_middleware(TraceIDMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
-app.add_middleware(RequestLoggingMiddleware)
-# Initialize Redis client for rate limiting
-redis_client = get_redis()
-app.add_middleware(RateLimitMiddleware, redis_client=redis_client)
+# Request pipeline: trace id, security headers, request logging, rate limiting
+# in one pure ASGI layer (added last = outermost, CORS runs inside it)
+app.add_middleware(
+    RequestPipelineMiddleware,
+    trace_id=True,
+    security_headers=True,
+    request_logging=True,
+    # Rate limiting on the redis.asyncio client (local token-bucket fallback)
+    rate_limits=EndpointRateLimits(),
+)
 
 # Register exception handlers
 from app.services.storage.exceptions import StorageNotConfiguredError
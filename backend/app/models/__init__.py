@@ -27,10 +27,15 @@ from app.core.transactions.models import Transaction, TransactionType, Transacti
 
 # 5. Operation model (depends on Transaction)
 from app.core.ledger.models import Operation, OperationType, OperationStatus, LedgerEntry, LedgerEntryType
+from app.core.ledger.balances import AccountBalance, AccountBalanceCheckpoint
+from app.core.ledger.partitions import LedgerPartitionArchive
 
 # 6. AuditLog model (depends on User and Role)
 from app.core.compliance.models import AuditLog
 
+# 6b. Webhook inbox (no foreign keys)
+from app.core.webhooks.models import WebhookInboxEvent, WebhookProvider, WebhookEventType, WebhookInboxStatus
+
 # 7. Offer models (depends on User and Operation)
 from app.core.offers.models import (
     Offer, OfferInvestment, OfferStatus, OfferInvestmentStatus,
@@ -55,6 +60,9 @@ from app.core.partners.models import (
 # 10. Vault models (depends on User)
 from app.core.vaults.models import Vault, VaultAccount, WithdrawalRequest, VestingLot, VaultStatus, WithdrawalRequestStatus, VestingLotStatus
 
+# 11. Exposure aggregates (keyed by wallet_locks / vault_accounts instruments)
+from app.core.accounts.exposures import ExposureAggregate
+
 # Export all for convenience
 __all__ = [
     "Base",
@@ -70,7 +78,14 @@ __all__ = [
     "OperationStatus",
     "LedgerEntry",
     "LedgerEntryType",
+    "AccountBalance",
+    "AccountBalanceCheckpoint",
+    "LedgerPartitionArchive",
     "AuditLog",
+    "WebhookInboxEvent",
+    "WebhookProvider",
+    "WebhookEventType",
+    "WebhookInboxStatus",
     "Role",
     "Offer",
     "OfferInvestment",
@@ -107,5 +122,6 @@ __all__ = [
     "LockReason",
     "ReferenceType",
     "LockStatus",
+    "ExposureAggregate",
 ]
 
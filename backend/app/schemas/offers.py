@@ -26,12 +26,14 @@ class UpdateOfferRequest(BaseModel):
     max_amount: Optional[Decimal] = Field(None, gt=0, description="Maximum amount that can be committed")
     maturity_date: Optional[datetime] = Field(None, description="Maturity date (ISO format)")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Arbitrary metadata (JSONB)")
+    queued_allocation: Optional[bool] = Field(None, description="Queue investments and allocate them in FIFO batches (hot launches)")
 
 
 class InvestInOfferRequest(BaseModel):
     amount: Decimal = Field(..., gt=0, description="Amount to invest")
     currency: str = Field(default="AED", min_length=3, max_length=3, description="Currency code")
     idempotency_key: Optional[str] = Field(None, max_length=255, description="Idempotency key to prevent duplicate investments")
+    callback_url: Optional[str] = Field(None, max_length=2048, description="Offers with queued allocation: https URL notified once the investment is decided")
 
 
 # Media/Documents schemas (defined before OfferResponse to avoid forward reference)
@@ -137,11 +139,25 @@ class OfferInvestmentResponse(BaseModel):
     offer_committed_amount: str = Field(..., description="Total committed amount in offer after this investment")
     offer_remaining_amount: str = Field(..., description="Remaining capacity in offer after this investment")
     created_at: str = Field(..., description="Creation timestamp (ISO format)")
+    queue_position: Optional[str] = Field(None, description="FIFO position (offers with queued allocation)")
+    rejection_reason: Optional[str] = Field(None, description="Why a queued investment was REJECTED (OFFER_FULL, INSUFFICIENT_AVAILABLE_FUNDS, ...)")
 
     class Config:
         from_attributes = True
 
 
+class OfferCapacityShardsRequest(BaseModel):
+    shard_count: int = Field(..., ge=0, le=256, description="Number of capacity shards (0 = no sharding, row-locked investments)")
+
+
+class OfferCapacityShardsResponse(BaseModel):
+    offer_id: str = Field(..., description="Offer UUID")
+    shard_count: int = Field(..., description="Number of capacity shards")
+    folded_amount: str = Field(..., description="Reserved amount folded into committed_amount")
+    committed_amount: str = Field(..., description="Committed amount after folding")
+    remaining_amount: str = Field(..., description="Remaining capacity (split over the shards)")
+
+
 class OfferInvestmentListItem(BaseModel):
     """Admin view of an investment intent for an offer"""
     id: str = Field(..., description="Investment Intent UUID")
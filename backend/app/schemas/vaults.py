@@ -250,16 +250,39 @@ class AdminPortfolioResponse(BaseModel):
     pending_withdrawals_count: int = Field(..., description="Count of pending withdrawals")
 
 
+class WithdrawalDecisionItem(BaseModel):
+    """Planned outcome of one pending withdrawal (dry run)"""
+    request_id: str = Field(..., description="Withdrawal request ID")
+    user_id: str = Field(..., description="User ID")
+    amount: str = Field(..., description="Requested amount")
+    decision: str = Field(..., description="EXECUTE, CANCEL or WAIT (vault cash insufficient, stays PENDING)")
+    reason: Optional[str] = Field(None, description="Cancellation reason")
+
+
 class ProcessWithdrawalsResponse(BaseModel):
     """Response schema for process withdrawals"""
-    processed_count: int = Field(..., description="Number of withdrawals processed")
+    processed_count: int = Field(..., description="Number of withdrawals processed (dry run: that would be processed)")
     remaining_count: int = Field(..., description="Number of remaining pending withdrawals")
+    cancelled_count: int = Field(0, description="Number of withdrawals cancelled (dry run: that would be cancelled)")
+    executed_amount: str = Field("0.00", description="Total amount executed (dry run: that would be executed)")
+    waiting_request_id: Optional[str] = Field(None, description="First request waiting for vault cash")
+    dry_run: bool = Field(False, description="True when nothing was written")
+    vault_cash_balance: Optional[str] = Field(None, description="Dry run: current vault cash balance")
+    projected_cash_balance: Optional[str] = Field(None, description="Dry run: vault cash balance after processing")
+    decisions: List[WithdrawalDecisionItem] = Field(default_factory=list, description="Dry run: decisions in FIFO order")
 
     class Config:
         json_schema_extra = {
             "example": {
                 "processed_count": 3,
                 "remaining_count": 2,
+                "cancelled_count": 0,
+                "executed_amount": "1500.00",
+                "waiting_request_id": "123e4567-e89b-12d3-a456-426614174000",
+                "dry_run": False,
+                "vault_cash_balance": None,
+                "projected_cash_balance": None,
+                "decisions": [],
             }
         }
 
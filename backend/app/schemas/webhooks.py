@@ -5,7 +5,7 @@ Webhook payload schemas
 from decimal import Decimal
 from datetime import datetime
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -65,4 +65,27 @@ class ZandDepositWebhookResponse(BaseModel):
         }
 
 
+class ZandBulkDepositWebhookPayload(BaseModel):
+    """
+    ZAND Bank bulk deposit webhook payload schema
+    
+    Used by ZAND to replay a backlog of deposit events (e.g. after an outage).
+    """
+    events: List[ZandDepositWebhookPayload] = Field(..., min_length=1, description="Deposit events, processed in order")
+
+
+class ZandBulkDepositResult(BaseModel):
+    """Processing result for one event of a bulk deposit webhook"""
+    provider_event_id: str = Field(..., description="Unique event ID from ZAND Bank")
+    status: str = Field(..., description="Processing status (accepted, duplicate, failed)")
+    transaction_id: Optional[str] = Field(None, description="Transaction UUID")
+    operation_id: Optional[str] = Field(None, description="Operation UUID")
+    error: Optional[str] = Field(None, description="Error message (failed only)")
+
 
+class ZandBulkDepositWebhookResponse(BaseModel):
+    """Bulk webhook response schema"""
+    accepted_count: int = Field(..., description="Events recorded by this request")
+    duplicate_count: int = Field(..., description="Events already recorded (idempotent replay)")
+    failed_count: int = Field(..., description="Events that could not be recorded")
+    results: List[ZandBulkDepositResult] = Field(..., description="One result per event, in request order")
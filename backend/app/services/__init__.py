@@ -5,31 +5,58 @@ Services layer - Application business logic
 from app.services.wallet_helpers import (
     ensure_wallet_accounts,
     get_account_balance,
+    ensure_wallet_accounts_bulk,
+    get_account_balances,
     get_wallet_balances,
+    get_wallet_balances_bulk,
 )
 from app.services.fund_services import (
     record_deposit_blocked,
     release_compliance_funds,
     lock_funds_for_investment,
     reject_deposit,
+    record_deposits_blocked_bulk,
+    DepositEvent,
+    DepositResult,
     InsufficientBalanceError,
     ValidationError,
 )
+from app.services.ledger_posting import (
+    LedgerLeg,
+    LedgerPosting,
+    AuditSpec,
+    post_ledger_operation,
+    post_ledger_operations,
+    PostingValidationError,
+)
 from app.services.transaction_engine import recompute_transaction_status
 
 __all__ = [
     # Wallet helpers
     "ensure_wallet_accounts",
+    "ensure_wallet_accounts_bulk",
     "get_account_balance",
+    "get_account_balances",
     "get_wallet_balances",
+    "get_wallet_balances_bulk",
     # Fund services
     "record_deposit_blocked",
     "release_compliance_funds",
     "lock_funds_for_investment",
     "reject_deposit",
+    "record_deposits_blocked_bulk",
+    "DepositEvent",
+    "DepositResult",
+    # Ledger posting engine
+    "LedgerLeg",
+    "LedgerPosting",
+    "AuditSpec",
+    "post_ledger_operation",
+    "post_ledger_operations",
     # Transaction engine
     "recompute_transaction_status",
     # Exceptions
     "InsufficientBalanceError",
     "ValidationError",
+    "PostingValidationError",
 ]
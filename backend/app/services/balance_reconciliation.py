@@ -0,0 +1,224 @@
+"""
+Balance reconciliation - Verify account_balances snapshots against the raw ledger
+
+The ledger (SUM(ledger_entries.amount), plus the checkpointed balances of
+archived ledger partitions) is the source of truth. The snapshot
+table is a performance cache maintained transactionally with every
+LedgerEntry insert; this module detects (and optionally repairs) drift and
+writes balance checkpoints for closed periods.
+"""
+
+import logging
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.core.accounts.models import Account
+from app.core.ledger.models import LedgerEntry
+from app.core.ledger.balances import AccountBalance, AccountBalanceCheckpoint
+from app.core.ledger.partitions import archived_balances_select
+from app.utils.metrics import record_ledger_invariant_violation
+
+logger = logging.getLogger(__name__)
+
+
+def reconcile_account_balances(
+    db: Session,
+    *,
+    account_ids: Optional[List[UUID]] = None,
+    repair: bool = False,
+    max_reported: int = 100,
+) -> Dict[str, Any]:
+    """
+    Compare account_balances against SUM(ledger_entries.amount) per account.
+
+    Both sides are read in a single statement (one MVCC snapshot), so
+    concurrent postings cannot produce false positives.
+
+    Args:
+        db: Database session
+        account_ids: Restrict the check to these accounts (default: all)
+        repair: If True, overwrite drifted snapshots with the ledger value (commits)
+        max_reported: Maximum number of mismatches included in the result
+
+    Returns:
+        Dict with summary statistics:
+        - checked_count: Number of accounts compared
+        - mismatch_count: Number of accounts whose snapshot differs from the ledger
+        - repaired_count: Number of snapshots rewritten (repair=True only)
+        - mismatches: List of {account_id, snapshot_balance, ledger_balance, ...}
+    """
+    # Ledger side: live entries plus archived balances (checkpoints at the archive horizon)
+    live = select(
+        LedgerEntry.account_id.label("account_id"),
+        func.sum(LedgerEntry.amount).label("amount"),
+        func.count(LedgerEntry.id).label("entry_count"),
+    ).group_by(LedgerEntry.account_id)
+    archived = archived_balances_select()
+    if account_ids is not None:
+        live = live.where(LedgerEntry.account_id.in_(account_ids))
+        archived = archived.where(AccountBalanceCheckpoint.account_id.in_(account_ids))
+    parts = union_all(live, archived).subquery()
+    ledger = select(
+        parts.c.account_id.label("account_id"),
+        func.sum(parts.c.amount).label("ledger_balance"),
+        func.sum(parts.c.entry_count).label("ledger_count"),
+    ).group_by(parts.c.account_id).subquery()
+
+    snapshot = select(
+        AccountBalance.account_id.label("account_id"),
+        AccountBalance.balance.label("snapshot_balance"),
+        AccountBalance.entry_count.label("snapshot_count"),
+    )
+    if account_ids is not None:
+        snapshot = snapshot.where(AccountBalance.account_id.in_(account_ids))
+    snapshot = snapshot.subquery()
+
+    rows = db.execute(
+        select(
+            func.coalesce(ledger.c.account_id, snapshot.c.account_id).label("account_id"),
+            func.coalesce(ledger.c.ledger_balance, 0).label("ledger_balance"),
+            func.coalesce(ledger.c.ledger_count, 0).label("ledger_count"),
+            func.coalesce(snapshot.c.snapshot_balance, 0).label("snapshot_balance"),
+            func.coalesce(snapshot.c.snapshot_count, 0).label("snapshot_count"),
+        ).select_from(
+            ledger.join(snapshot, ledger.c.account_id == snapshot.c.account_id, full=True)
+        )
+    ).all()
+
+    stats: Dict[str, Any] = {
+        'checked_count': len(rows),
+        'mismatch_count': 0,
+        'repaired_count': 0,
+        'mismatches': [],
+    }
+
+    drifted = []
+    for row in rows:
+        ledger_balance = Decimal(str(row.ledger_balance))
+        snapshot_balance = Decimal(str(row.snapshot_balance))
+        if ledger_balance == snapshot_balance and row.ledger_count == row.snapshot_count:
+            continue
+
+        drifted.append(row)
+        stats['mismatch_count'] += 1
+        if len(stats['mismatches']) < max_reported:
+            stats['mismatches'].append({
+                'account_id': str(row.account_id),
+                'snapshot_balance': str(snapshot_balance),
+                'ledger_balance': str(ledger_balance),
+                'snapshot_count': int(row.snapshot_count),
+                'ledger_count': int(row.ledger_count),
+            })
+
+    if drifted:
+        record_ledger_invariant_violation()
+        logger.error(
+            f"Account balance snapshot drift detected: {len(drifted)} account(s)",
+            extra={"mismatch_count": len(drifted)},
+        )
+
+    if repair and drifted:
+        stats['repaired_count'] = _repair_snapshots(db, drifted)
+        db.commit()
+
+    return stats
+
+
+def _repair_snapshots(db: Session, drifted: list) -> int:
+    """Overwrite drifted snapshots with the ledger value (row-locked, recomputed)."""
+    repaired = 0
+    for row in drifted:
+        # Lock the snapshot row first so concurrent postings wait, then recompute
+        # from the ledger under that lock (the value read above may be stale).
+        balance = db.query(AccountBalance).filter(
+            AccountBalance.account_id == row.account_id
+        ).with_for_update().first()
+
+        ledger_balance, ledger_count = db.query(
+            func.coalesce(func.sum(LedgerEntry.amount), Decimal('0')),
+            func.count(LedgerEntry.id),
+        ).filter(LedgerEntry.account_id == row.account_id).one()
+        archived = db.execute(
+            archived_balances_select().where(AccountBalanceCheckpoint.account_id == row.account_id)
+        ).first()
+        if archived is not None:
+            ledger_balance = Decimal(str(ledger_balance)) + Decimal(str(archived.balance))
+            ledger_count = int(ledger_count) + int(archived.entry_count)
+
+        if balance is None:
+            account = db.query(Account).filter(Account.id == row.account_id).first()
+            if account is None:
+                continue
+            balance = AccountBalance(account_id=account.id, currency=account.currency)
+            db.add(balance)
+
+        balance.balance = Decimal(str(ledger_balance))
+        balance.entry_count = int(ledger_count)
+        repaired += 1
+
+    db.flush()
+    return repaired
+
+
+def write_balance_checkpoints(
+    db: Session,
+    checkpoint_at: datetime,
+    *,
+    since: Optional[datetime] = None,
+) -> int:
+    """
+    Write one checkpoint per account as of checkpoint_at (entries created_at < checkpoint_at).
+
+    Incremental: each account's previous checkpoint is extended with only the
+    entries between the two checkpoints, so closed periods are never rescanned.
+    Idempotent: existing (account_id, checkpoint_at) rows are left untouched.
+
+    since: a boundary previously checkpointed by this function. Every account
+    with entries before it has a checkpoint at or after it, so only entries
+    from since onwards are read (a constant bound, which lets PostgreSQL prune
+    closed ledger_entries partitions).
+
+    checkpoint_at must be safely in the past (a closed period) - see
+    AccountBalanceCheckpoint.
+
+    NO COMMIT - caller must commit.
+
+    Returns:
+        Number of checkpoint rows inserted
+    """
+    result = db.execute(
+        text("""
+            WITH prev AS (
+                SELECT DISTINCT ON (account_id) account_id, checkpoint_at, balance, entry_count
+                FROM account_balance_checkpoints
+                WHERE checkpoint_at < :checkpoint_at
+                ORDER BY account_id, checkpoint_at DESC
+            ),
+            delta AS (
+                SELECT le.account_id, SUM(le.amount) AS amount, COUNT(*) AS entry_count
+                FROM ledger_entries le
+                LEFT JOIN prev p ON p.account_id = le.account_id
+                WHERE le.created_at < :checkpoint_at
+                  AND le.created_at >= :since
+                  AND (p.checkpoint_at IS NULL OR le.created_at >= p.checkpoint_at)
+                GROUP BY le.account_id
+            )
+            INSERT INTO account_balance_checkpoints (id, account_id, checkpoint_at, balance, entry_count, created_at)
+            SELECT gen_random_uuid(),
+                   COALESCE(p.account_id, d.account_id),
+                   :checkpoint_at,
+                   COALESCE(p.balance, 0) + COALESCE(d.amount, 0),
+                   COALESCE(p.entry_count, 0) + COALESCE(d.entry_count, 0),
+                   now()
+            FROM prev p
+            FULL OUTER JOIN delta d ON d.account_id = p.account_id
+            ON CONFLICT (account_id, checkpoint_at) DO NOTHING
+        """),
+        {"checkpoint_at": checkpoint_at, "since": since or datetime.min.replace(tzinfo=timezone.utc)},
+    )
+    return result.rowcount or 0
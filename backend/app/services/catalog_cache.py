@@ -0,0 +1,394 @@
+"""
+Catalog cache - serialized public catalog responses, versioned per entity
+
+The public catalog (LIVE offers, published articles, partners) is read ~100x
+more often than it is written. Responses of the read helpers are cached as
+JSON, keyed by the helper, its arguments and the current version of every
+catalog entity the response depends on:
+- L1: in-process LRU with TTL (per API replica / worker)
+- L2: Redis, shared by every replica
+  (key: catalog:{helper}:{entity versions}:{URL epoch}:{argument hash})
+
+Versions (Redis: catalog:version:{entity}) are bumped after commit by any
+transaction that writes a catalog table - admin publish/update/close paths,
+media uploads, link tables, and investments moving committed_amount. A bump
+changes the key of every dependent response, so caches invalidate on the
+next read; stale entries simply age out.
+
+Cached responses embed presigned URLs: the TTL is capped at
+S3_PRESIGN_MIN_REMAINING_SECONDS so a cached URL is never expired, and the
+key includes the presigned URL epoch, so a response is never served (or
+revalidated) with the URLs of a previous epoch.
+
+The same versions drive HTTP conditional requests: ETag / Last-Modified of
+a response are derived from the entity versions (and the presigned URL
+epoch) without building it, see app/utils/conditional_requests.py.
+
+Request handlers go through catalog_cached(...).fetch(db, ...): version
+reads and cache lookups await redis.asyncio, and the sync helper only runs
+(through run_db) on a miss, so a hit never blocks the event loop on Redis.
+
+Redis is optional for correctness: when it is disabled, versions are kept in
+process (single-process deployments and tests); when it fails, reads bypass
+the cache and go to the database.
+"""
+
+import functools
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple, TypeVar
+
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.infrastructure.database import run_db
+from app.infrastructure.settings import get_settings
+from app.services.storage.presign_cache import presign_epoch
+from app.utils.local_cache import TTLLRUCache
+from app.utils.session_pending import add_pending, register_pending_namespace
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+OFFERS = "offers"
+ARTICLES = "articles"
+PARTNERS = "partners"
+
+# Catalog tables -> entity whose version they bump
+CATALOG_TABLES: Dict[str, str] = {
+    "offers": OFFERS,
+    "offer_media": OFFERS,
+    "offer_documents": OFFERS,
+    "offer_timeline_events": OFFERS,
+    "articles": ARTICLES,
+    "article_media": ARTICLES,
+    "article_offers": ARTICLES,
+    "partners": PARTNERS,
+    "partner_team_members": PARTNERS,
+    "partner_media": PARTNERS,
+    "partner_documents": PARTNERS,
+    "partner_portfolio_projects": PARTNERS,
+    "partner_portfolio_media": PARTNERS,
+    "partner_offers": PARTNERS,
+}
+
+_REDIS_KEY_PREFIX = "catalog"
+_PENDING_CATALOG_BUMPS = "catalog_version_bumps"
+
+
+def _version_key(entity: str) -> str:
+    return f"{_REDIS_KEY_PREFIX}:version:{entity}"
+
+
+def _modified_key(entity: str) -> str:
+    return f"{_REDIS_KEY_PREFIX}:modified:{entity}"
+
+
+@dataclass(frozen=True)
+class CatalogValidators:
+    """HTTP validators of a catalog response (computed without building it)"""
+    etag: str
+    last_modified: float  # Unix time
+
+
+class CatalogCache:
+    """Two-tier (local LRU + Redis) cache of serialized catalog responses"""
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self.local: TTLLRUCache[bytes] = TTLLRUCache(
+            maxsize=settings.CATALOG_CACHE_SIZE,
+            ttl_seconds=self.ttl_seconds(),
+        )
+        # Versions and bump times when Redis is disabled (this process only)
+        self.local_versions: Dict[str, int] = {}
+        self.local_modified: Dict[str, float] = {}
+
+    def ttl_seconds(self) -> int:
+        settings = get_settings()
+        return max(0, min(settings.CATALOG_CACHE_TTL_SECONDS, settings.S3_PRESIGN_MIN_REMAINING_SECONDS))
+
+    def _redis(self):
+        if not get_settings().CATALOG_CACHE_REDIS_ENABLED:
+            return None
+        from app.infrastructure.redis_client import get_redis_for_sync_code
+        return get_redis_for_sync_code()
+
+    def versions(self, entities: Iterable[str]) -> Optional[Dict[str, int]]:
+        """Current version of each entity (one Redis MGET); None if Redis is unavailable."""
+        entities = sorted(set(entities))
+        client = self._redis()
+        if client is None:
+            return {entity: self.local_versions.get(entity, 0) for entity in entities}
+
+        try:
+            values = client.mget([_version_key(entity) for entity in entities])
+        except Exception as e:
+            logger.warning(f"Catalog cache: Redis version read failed, reading from DB: {e}")
+            return None
+        return {entity: int(value or 0) for entity, value in zip(entities, values)}
+
+    def bump(self, entities: Iterable[str]) -> None:
+        """Invalidate every cached response depending on these entities."""
+        entities = sorted(set(entities))
+        now = time.time()
+        for entity in entities:
+            self.local_versions[entity] = self.local_versions.get(entity, 0) + 1
+            self.local_modified[entity] = now
+
+        client = self._redis()
+        if client is None or not entities:
+            return
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for entity in entities:
+                pipe.incr(_version_key(entity))
+                pipe.set(_modified_key(entity), repr(now))
+            pipe.execute()
+        except Exception as e:
+            # Other replicas serve the previous version until their entries expire (TTL)
+            logger.error(f"Catalog cache: Redis version bump failed for {', '.join(entities)}: {e}")
+
+    async def versions_async(self, entities: Iterable[str]) -> Optional[Tuple[Dict[str, int], float]]:
+        """
+        (version of each entity, latest bump time) for request handlers: one
+        redis.asyncio MGET, so the event loop is not blocked. None if Redis is unavailable.
+        """
+        entities = sorted(set(entities))
+        if not get_settings().CATALOG_CACHE_REDIS_ENABLED:
+            return (
+                {entity: self.local_versions.get(entity, 0) for entity in entities},
+                max((self.local_modified.get(entity, 0.0) for entity in entities), default=0.0),
+            )
+
+        from app.infrastructure.redis_client import get_async_redis
+        try:
+            values = await get_async_redis().mget(
+                [_version_key(entity) for entity in entities] + [_modified_key(entity) for entity in entities]
+            )
+        except Exception as e:
+            logger.warning(f"Catalog cache: Redis version read failed, skipping validators: {e}")
+            return None
+        versions = {entity: int(value or 0) for entity, value in zip(entities, values)}
+        modified = max((float(value) for value in values[len(entities):] if value), default=0.0)
+        return versions, modified
+
+    def get(self, key: str) -> Optional[bytes]:
+        payload = self.local.get(key)
+        if payload is not None:
+            return payload
+
+        client = self._redis()
+        if client is None:
+            return None
+
+        try:
+            payload = client.get(key)
+        except Exception as e:
+            logger.warning(f"Catalog cache: Redis read failed, reading from DB: {e}")
+            return None
+        if payload is None:
+            return None
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        self.local.set(key, payload)
+        return payload
+
+    def set(self, key: str, payload: bytes) -> None:
+        ttl = self.ttl_seconds()
+        self.local.set(key, payload, ttl_seconds=ttl)
+
+        client = self._redis()
+        if client is None:
+            return
+
+        try:
+            client.setex(key, ttl, payload)
+        except Exception as e:
+            logger.warning(f"Catalog cache: Redis write failed: {e}")
+
+    async def get_async(self, key: str) -> Optional[bytes]:
+        """get() for request handlers (redis.asyncio GET)."""
+        payload = self.local.get(key)
+        if payload is not None or not get_settings().CATALOG_CACHE_REDIS_ENABLED:
+            return payload
+
+        from app.infrastructure.redis_client import get_async_redis
+        try:
+            payload = await get_async_redis().get(key)
+        except Exception as e:
+            logger.warning(f"Catalog cache: Redis read failed, reading from DB: {e}")
+            return None
+        if payload is None:
+            return None
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        self.local.set(key, payload)
+        return payload
+
+    async def set_async(self, key: str, payload: bytes) -> None:
+        """set() for request handlers (redis.asyncio SETEX)."""
+        ttl = self.ttl_seconds()
+        self.local.set(key, payload, ttl_seconds=ttl)
+        if not get_settings().CATALOG_CACHE_REDIS_ENABLED:
+            return
+
+        from app.infrastructure.redis_client import get_async_redis
+        try:
+            await get_async_redis().setex(key, ttl, payload)
+        except Exception as e:
+            logger.warning(f"Catalog cache: Redis write failed: {e}")
+
+    def clear(self) -> None:
+        """Clear the local tier and local versions (Redis entries expire on their own)."""
+        self.local.clear()
+        self.local_versions.clear()
+        self.local_modified.clear()
+
+
+catalog_cache = CatalogCache()
+
+
+def clear_catalog_cache() -> None:
+    """Invalidate the local tier (must be called whenever the database is reset, e.g. test fixtures)."""
+    catalog_cache.clear()
+
+
+def catalog_response_key(
+    name: str,
+    versions: Dict[str, int],
+    epoch: int,
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+) -> str:
+    """Cache key of a catalog response: helper, entity versions, presigned URL epoch, arguments."""
+    version_part = ",".join(f"{entity}={version}" for entity, version in sorted(versions.items()))
+    arguments = repr((tuple(str(arg) for arg in args), sorted((k, str(v)) for k, v in kwargs.items())))
+    digest = hashlib.sha256(arguments.encode("utf-8")).hexdigest()[:32]
+    return f"{_REDIS_KEY_PREFIX}:{name}:{version_part}:{epoch}:{digest}"
+
+
+def catalog_cached(*entities: str, response_type: Any) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Cache a sync catalog read helper `fn(db, *args, **kwargs)`.
+
+    entities: catalog entities the response depends on.
+    response_type: the helper's return type (used to (de)serialize the JSON).
+
+    Exceptions (e.g. 404 HTTPException) are never cached. Every hit returns
+    freshly deserialized objects. The wrapper's async fetch(db, *args,
+    **kwargs) is the request handlers' entry point (cache I/O on
+    redis.asyncio, fn through run_db on a miss), and its async
+    validators(*args, **kwargs) returns the response's HTTP validators
+    (conditional GETs).
+    """
+    adapter = TypeAdapter(response_type)
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        name = fn.__name__.lstrip("_")
+
+        @functools.wraps(fn)
+        def wrapper(db: Session, *args: Any, **kwargs: Any) -> T:
+            if not get_settings().CATALOG_CACHE_ENABLED or catalog_cache.ttl_seconds() <= 0:
+                return fn(db, *args, **kwargs)
+
+            versions = catalog_cache.versions(entities)
+            if versions is None:
+                return fn(db, *args, **kwargs)
+
+            epoch, _ = presign_epoch()
+            key = catalog_response_key(name, versions, epoch, args, kwargs)
+            payload = catalog_cache.get(key)
+            if payload is not None:
+                return adapter.validate_json(payload)
+
+            result = fn(db, *args, **kwargs)
+            catalog_cache.set(key, adapter.dump_json(result))
+            return result
+
+        async def validators(*args: Any, **kwargs: Any) -> Optional[CatalogValidators]:
+            """
+            ETag / Last-Modified of the response for these arguments, from its
+            cache key: entity versions and presigned URL epoch (a new epoch
+            means new URLs, so clients must not keep a body across epochs).
+            """
+            state = await catalog_cache.versions_async(entities)
+            if state is None:
+                return None
+            versions, modified = state
+            epoch, epoch_start = presign_epoch()
+            key = catalog_response_key(name, versions, epoch, args, kwargs)
+            digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+            return CatalogValidators(etag=f'W/"{digest}"', last_modified=max(modified, epoch_start))
+
+        async def fetch(db: Any, *args: Any, **kwargs: Any) -> T:
+            """
+            Cached response for request handlers: versions and cache lookups
+            await redis.asyncio; fn runs through run_db only on a miss.
+            """
+            if not get_settings().CATALOG_CACHE_ENABLED or catalog_cache.ttl_seconds() <= 0:
+                return await run_db(db, fn, *args, **kwargs)
+
+            state = await catalog_cache.versions_async(entities)
+            if state is None:
+                return await run_db(db, fn, *args, **kwargs)
+
+            epoch, _ = presign_epoch()
+            key = catalog_response_key(name, state[0], epoch, args, kwargs)
+            payload = await catalog_cache.get_async(key)
+            if payload is not None:
+                return adapter.validate_json(payload)
+
+            result = await run_db(db, fn, *args, **kwargs)
+            await catalog_cache.set_async(key, adapter.dump_json(result))
+            return result
+
+        wrapper.fetch = fetch
+        wrapper.validators = validators
+        return wrapper
+
+    return decorator
+
+
+def bump_catalog_versions(db: Session, *entities: str) -> None:
+    """
+    Bump entity versions once db's transaction commits.
+
+    Writes through the ORM or session.execute() are detected automatically;
+    call this for writes done on another connection.
+    """
+    for entity in entities:
+        add_pending(db, _PENDING_CATALOG_BUMPS, entity, None)
+
+
+def _bump_committed(pending: Dict[Hashable, Any]) -> None:
+    catalog_cache.bump(pending)
+
+
+register_pending_namespace(_PENDING_CATALOG_BUMPS, _bump_committed)
+
+
+@event.listens_for(Session, "after_flush")
+def _catalog_rows_flushed(session: Session, flush_context) -> None:
+    """Inserted, updated or deleted catalog rows bump their entity after commit."""
+    for instances in (session.new, session.dirty, session.deleted):
+        for instance in instances:
+            table = getattr(instance, "__tablename__", None)
+            if table in CATALOG_TABLES:
+                add_pending(session, _PENDING_CATALOG_BUMPS, CATALOG_TABLES[table], None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _catalog_statement_executed(orm_execute_state) -> None:
+    """Bulk UPDATE/DELETE/INSERT statements (query.update(), link tables) on catalog tables."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    entity = CATALOG_TABLES.get(getattr(table, "name", None))
+    if entity is not None:
+        add_pending(orm_execute_state.session, _PENDING_CATALOG_BUMPS, entity, None)
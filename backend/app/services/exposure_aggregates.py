@@ -0,0 +1,182 @@
+"""
+Exposure aggregates - O(1) instrument totals, and their rebuild from wallet_locks / vault_accounts
+
+wallet_locks and vault_accounts are the source of truth; exposure_aggregates
+is a performance cache maintained transactionally with every write to them
+(see app/core/accounts/exposures.py). This module reads it and detects (and
+repairs) drift by recomputing every key from the source rows.
+"""
+
+import logging
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, literal, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.accounts.exposures import ExposureAggregate, ExposureKey, VAULT_PRINCIPAL_CURRENCY, VAULT_PRINCIPAL_REASON
+from app.core.accounts.wallet_locks import LockStatus, ReferenceType, WalletLock
+from app.core.vaults.models import VaultAccount
+
+logger = logging.getLogger(__name__)
+
+ZERO = (Decimal("0.00"), 0)
+
+
+def get_exposure(db: Session, key: ExposureKey) -> Tuple[Decimal, int]:
+    """
+    (total_amount, item_count) of one key, (0.00, 0) when nothing was ever
+    locked for it. One unique-key lookup.
+    """
+    reference_type, reference_id, reason, currency = key
+    row = db.execute(
+        select(ExposureAggregate.total_amount, ExposureAggregate.item_count).where(
+            ExposureAggregate.reference_type == reference_type,
+            ExposureAggregate.reference_id == reference_id,
+            ExposureAggregate.reason == reason,
+            ExposureAggregate.currency == currency,
+        )
+    ).first()
+    return (Decimal(str(row.total_amount)), row.item_count) if row else ZERO
+
+
+def get_vault_principals(db: Session, vault_ids: Iterable[UUID]) -> Dict[UUID, Tuple[Decimal, int]]:
+    """vault_id -> (SUM(principal), number of vault accounts), one query for all vaults"""
+    vault_ids = list(vault_ids)
+    rows = db.execute(
+        select(ExposureAggregate.reference_id, ExposureAggregate.total_amount, ExposureAggregate.item_count).where(
+            ExposureAggregate.reference_type == ReferenceType.VAULT.value,
+            ExposureAggregate.reference_id.in_(vault_ids),
+            ExposureAggregate.reason == VAULT_PRINCIPAL_REASON,
+            ExposureAggregate.currency == VAULT_PRINCIPAL_CURRENCY,
+        )
+    ).all() if vault_ids else []
+    principals = {vault_id: ZERO for vault_id in vault_ids}
+    principals.update({row.reference_id: (Decimal(str(row.total_amount)), row.item_count) for row in rows})
+    return principals
+
+
+def _source_exposures(db: Session) -> Dict[ExposureKey, Tuple[Decimal, int]]:
+    """Every key recomputed from wallet_locks and vault_accounts (one statement)"""
+    locks = select(
+        WalletLock.reference_type.label("reference_type"),
+        WalletLock.reference_id.label("reference_id"),
+        WalletLock.reason.label("reason"),
+        WalletLock.currency.label("currency"),
+        func.sum(WalletLock.amount - WalletLock.consumed_amount).label("total_amount"),
+        func.count(WalletLock.id).label("item_count"),
+    ).where(
+        WalletLock.status == LockStatus.ACTIVE.value,
+    ).group_by(WalletLock.reference_type, WalletLock.reference_id, WalletLock.reason, WalletLock.currency)
+    principals = select(
+        literal(ReferenceType.VAULT.value).label("reference_type"),
+        VaultAccount.vault_id.label("reference_id"),
+        literal(VAULT_PRINCIPAL_REASON).label("reason"),
+        literal(VAULT_PRINCIPAL_CURRENCY).label("currency"),
+        func.sum(VaultAccount.principal).label("total_amount"),
+        func.count(VaultAccount.id).label("item_count"),
+    ).group_by(VaultAccount.vault_id)
+
+    return {
+        (row.reference_type, row.reference_id, row.reason, row.currency): (Decimal(str(row.total_amount)), int(row.item_count))
+        for row in db.execute(union_all(locks, principals)).all()
+    }
+
+
+def rebuild_exposure_aggregates(
+    db: Session,
+    *,
+    repair: bool = True,
+    max_reported: int = 100,
+) -> Dict[str, Any]:
+    """
+    Recompute every exposure aggregate from wallet_locks and vault_accounts
+    and rewrite the ones that drifted.
+
+    The aggregates table is locked (SHARE ROW EXCLUSIVE) before the source
+    rows are read: transactions that already folded their deltas have
+    committed and are in the snapshot, the others wait on their upsert and
+    fold their deltas on top of the rebuilt values after the commit.
+
+    Args:
+        db: Database session
+        repair: If False, only report the drift (no lock, no write)
+        max_reported: Maximum number of mismatches included in the result
+
+    Returns:
+        Dict with summary statistics:
+        - checked_count: Number of keys compared
+        - mismatch_count: Number of keys whose aggregate differs from the source
+        - repaired_count: Number of aggregates rewritten (repair=True only, commits)
+        - mismatches: List of {reference_type, reference_id, reason, currency, aggregate_*, source_*}
+    """
+    if repair:
+        db.execute(text("LOCK TABLE exposure_aggregates IN SHARE ROW EXCLUSIVE MODE"))
+
+    source = _source_exposures(db)
+    aggregates = {
+        (row.reference_type, row.reference_id, row.reason, row.currency): (Decimal(str(row.total_amount)), row.item_count)
+        for row in db.execute(select(
+            ExposureAggregate.reference_type, ExposureAggregate.reference_id,
+            ExposureAggregate.reason, ExposureAggregate.currency,
+            ExposureAggregate.total_amount, ExposureAggregate.item_count,
+        )).all()
+    }
+
+    keys = set(source) | set(aggregates)
+    drifted = {key: source.get(key, ZERO) for key in keys if source.get(key, ZERO) != aggregates.get(key, ZERO)}
+    stats: Dict[str, Any] = {
+        'checked_count': len(keys),
+        'mismatch_count': len(drifted),
+        'repaired_count': 0,
+        'mismatches': [
+            {
+                'reference_type': key[0],
+                'reference_id': str(key[1]),
+                'reason': key[2],
+                'currency': key[3],
+                'aggregate_amount': str(aggregates.get(key, ZERO)[0]),
+                'aggregate_count': aggregates.get(key, ZERO)[1],
+                'source_amount': str(drifted[key][0]),
+                'source_count': drifted[key][1],
+            }
+            for key in sorted(drifted, key=lambda key: tuple(str(part) for part in key))[:max_reported]
+        ],
+    }
+
+    if drifted:
+        logger.error(
+            f"Exposure aggregate drift detected: {len(drifted)} key(s)",
+            extra={"mismatch_count": len(drifted)},
+        )
+
+    if repair and drifted:
+        table = ExposureAggregate.__table__
+        stmt = pg_insert(table).values([
+            {
+                "id": uuid4(),
+                "reference_type": reference_type,
+                "reference_id": reference_id,
+                "reason": reason,
+                "currency": currency,
+                "total_amount": amount,
+                "item_count": count,
+            }
+            for (reference_type, reference_id, reason, currency), (amount, count) in drifted.items()
+        ])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.reference_type, table.c.reference_id, table.c.reason, table.c.currency],
+            set_={
+                "total_amount": stmt.excluded.total_amount,
+                "item_count": stmt.excluded.item_count,
+                "updated_at": func.now(),
+            },
+        ))
+        stats['repaired_count'] = len(drifted)
+        db.commit()
+    elif repair:
+        db.commit()  # Release the table lock
+
+    return stats
@@ -2,19 +2,38 @@
 Fund movement services - Move funds between wallet compartments using Operations + LedgerEntries
 """
 
+import logging
+from dataclasses import dataclass
+from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from uuid import UUID, uuid4
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from app.core.accounts.models import Account, AccountType
-from app.core.ledger.models import Operation, OperationType, OperationStatus, LedgerEntry, LedgerEntryType
-from app.utils.ledger_validator import validate_double_entry_invariant
-from app.core.compliance.models import AuditLog
+from app.core.accounts.models import AccountType
+from app.core.ledger.models import Operation, OperationType
 from app.core.security.models import Role
-from app.services.wallet_helpers import ensure_wallet_accounts, get_account_balance
-from app.services.transaction_engine import recompute_transaction_status
+from app.core.transactions.models import Transaction, TransactionType, TransactionStatus
+from app.core.users.models import User
+from app.infrastructure.settings import get_settings
+from app.services.ledger_posting import (
+    AuditSpec,
+    LedgerLeg,
+    LedgerPosting,
+    PostingValidationError,
+    post_ledger_operation,
+    post_ledger_operations,
+)
+from app.services.wallet_helpers import (
+    ensure_wallet_accounts,
+    ensure_wallet_accounts_bulk,
+    get_account_balance,
+)
+from app.services.system_accounts import get_or_create_system_account_id
+from app.services.transaction_engine import compute_transaction_status, recompute_transaction_status
+
+logger = logging.getLogger(__name__)
 
 
 class InsufficientBalanceError(Exception):
@@ -27,6 +46,41 @@ class ValidationError(Exception):
     pass
 
 
+@dataclass
+class DepositEvent:
+    """One provider deposit notification (e.g. a ZAND webhook event)"""
+    provider_event_id: str
+    user_id: UUID
+    amount: Decimal
+    currency: str
+    iban: Optional[str] = None
+    occurred_at: Optional[datetime] = None
+
+    @property
+    def idempotency_key(self) -> str:
+        return deposit_idempotency_key(self.provider_event_id)
+
+
+@dataclass
+class DepositResult:
+    """Outcome of one DepositEvent in a bulk ingestion"""
+    provider_event_id: str
+    status: str  # accepted | duplicate | failed
+    transaction_id: Optional[UUID] = None
+    operation_id: Optional[UUID] = None
+    error: Optional[str] = None
+
+
+DEPOSIT_ACCEPTED = "accepted"
+DEPOSIT_DUPLICATE = "duplicate"
+DEPOSIT_FAILED = "failed"
+
+
+def deposit_idempotency_key(provider_event_id: str) -> str:
+    """Operation idempotency key for a ZAND deposit event"""
+    return f"zand-{provider_event_id}"
+
+
 def record_deposit_blocked(
     *,
     db: Session,
@@ -36,6 +90,7 @@ def record_deposit_blocked(
     transaction_id: Optional[UUID] = None,
     idempotency_key: Optional[str] = None,
     provider_reference: Optional[str] = None,
+    commit: bool = True,
 ) -> Operation:
     """
     Record a deposit into WALLET_BLOCKED compartment.
@@ -64,97 +119,20 @@ def record_deposit_blocked(
     blocked_account_id = wallet_accounts[AccountType.WALLET_BLOCKED.value]
     
     # Get or create INTERNAL_OMNIBUS account (system-wide, not user-specific)
-    # Idempotent: create if not exists (DEV-friendly, safe in prod too)
-    omnibus_account = db.query(Account).filter(
-        Account.account_type == AccountType.INTERNAL_OMNIBUS,
-        Account.currency == currency,
-    ).first()
-    
-    if not omnibus_account:
-        # Create INTERNAL_OMNIBUS account if it doesn't exist (idempotent)
-        omnibus_account = Account(
-            id=uuid4(),
-            user_id=None,  # System account (no user)
-            currency=currency,
-            account_type=AccountType.INTERNAL_OMNIBUS,
-        )
-        db.add(omnibus_account)
-        db.flush()  # Get account.id
-    
-    omnibus_account_id = omnibus_account.id
+    omnibus_account_id = get_or_create_system_account_id(db, AccountType.INTERNAL_OMNIBUS, currency)
     
-    # Create operation
-    operation = Operation(
+    posting = _deposit_posting(
+        user_id=user_id,
+        currency=currency,
+        amount=amount,
+        blocked_account_id=blocked_account_id,
+        omnibus_account_id=omnibus_account_id,
         transaction_id=transaction_id,
-        type=OperationType.DEPOSIT_AED,
-        status=OperationStatus.COMPLETED,
         idempotency_key=idempotency_key,
-        metadata={
-            'provider_reference': provider_reference,
-            'currency': currency,
-        } if provider_reference else {'currency': currency},
-    )
-    db.add(operation)
-    db.flush()  # Get operation.id
-    
-    # Create ledger entries (double-entry)
-    # CREDIT user's WALLET_BLOCKED
-    credit_entry = LedgerEntry(
-        operation_id=operation.id,
-        account_id=blocked_account_id,
-        amount=amount,
-        currency=currency,
-        entry_type=LedgerEntryType.CREDIT,
+        provider_reference=provider_reference,
     )
     
-    # DEBIT INTERNAL_OMNIBUS
-    debit_entry = LedgerEntry(
-        operation_id=operation.id,
-        account_id=omnibus_account_id,
-        amount=-amount,  # Negative for DEBIT
-        currency=currency,
-        entry_type=LedgerEntryType.DEBIT,
-    )
-    
-    db.add(credit_entry)
-    db.add(debit_entry)
-    db.flush()
-    
-    # Create audit log
-    audit_log = AuditLog(
-        actor_user_id=None,  # System operation
-        actor_role=Role.OPS,
-        action="DEPOSIT_RECORDED",
-        entity_type="Operation",
-        entity_id=operation.id,
-        before=None,
-        after={
-            'operation_id': str(operation.id),
-            'user_id': str(user_id),
-            'currency': currency,
-            'amount': str(amount),
-            'account_type': AccountType.WALLET_BLOCKED.value,
-        },
-        reason=None,
-    )
-    db.add(audit_log)
-    
-    # Validate double-entry invariant before commit
-    if not validate_double_entry_invariant(db, operation.id):
-        db.rollback()
-        raise ValidationError("Double-entry accounting invariant violation detected")
-    
-    # Recompute Transaction status if transaction_id provided
-    if transaction_id:
-        try:
-            recompute_transaction_status(db=db, transaction_id=transaction_id)
-        except Exception:
-            # If transaction doesn't exist or error, continue
-            # Status recomputation is non-critical for operation completion
-            pass
-    
-    db.commit()
-    return operation
+    return _post_and_finalize(db, posting, commit=commit)
 
 
 def release_compliance_funds(
@@ -166,6 +144,7 @@ def release_compliance_funds(
     transaction_id: Optional[UUID] = None,
     reason: str,
     actor_user_id: Optional[UUID] = None,
+    commit: bool = True,
 ) -> Operation:
     """
     Release funds from WALLET_BLOCKED to WALLET_AVAILABLE after compliance review.
@@ -193,81 +172,37 @@ def release_compliance_funds(
             f"Insufficient balance in WALLET_BLOCKED: {blocked_balance} < {amount}"
         )
     
-    # Create operation
-    operation = Operation(
+    posting = LedgerPosting(
+        operation_type=OperationType.RELEASE_FUNDS,
+        currency=currency,
         transaction_id=transaction_id,
-        type=OperationType.RELEASE_FUNDS,
-        status=OperationStatus.COMPLETED,
-        idempotency_key=None,
         metadata={
             'currency': currency,
             'reason': reason,
         },
+        legs=[
+            LedgerLeg(account_id=blocked_account_id, amount=-amount),  # DEBIT WALLET_BLOCKED
+            LedgerLeg(account_id=available_account_id, amount=amount),  # CREDIT WALLET_AVAILABLE
+        ],
+        audit=AuditSpec(
+            actor_user_id=actor_user_id,
+            actor_role=Role.COMPLIANCE,
+            action="COMPLIANCE_RELEASE",
+            before={
+                'blocked_balance': str(blocked_balance),
+                'transaction_id': str(transaction_id) if transaction_id else None,
+            },
+            after={
+                'user_id': str(user_id),
+                'currency': currency,
+                'amount': str(amount),
+                'new_blocked_balance': str(blocked_balance - amount),
+            },
+            reason=reason,
+        ),
     )
-    db.add(operation)
-    db.flush()
-    
-    # Create ledger entries (double-entry)
-    # DEBIT WALLET_BLOCKED
-    debit_entry = LedgerEntry(
-        operation_id=operation.id,
-        account_id=blocked_account_id,
-        amount=-amount,  # Negative for DEBIT
-        currency=currency,
-        entry_type=LedgerEntryType.DEBIT,
-    )
-    
-    # CREDIT WALLET_AVAILABLE
-    credit_entry = LedgerEntry(
-        operation_id=operation.id,
-        account_id=available_account_id,
-        amount=amount,
-        currency=currency,
-        entry_type=LedgerEntryType.CREDIT,
-    )
-    
-    db.add(debit_entry)
-    db.add(credit_entry)
-    db.flush()
-    
-    # Create audit log
-    audit_log = AuditLog(
-        actor_user_id=actor_user_id,
-        actor_role=Role.COMPLIANCE,
-        action="COMPLIANCE_RELEASE",
-        entity_type="Operation",
-        entity_id=operation.id,
-        before={
-            'blocked_balance': str(blocked_balance),
-            'transaction_id': str(transaction_id) if transaction_id else None,
-        },
-        after={
-            'operation_id': str(operation.id),
-            'user_id': str(user_id),
-            'currency': currency,
-            'amount': str(amount),
-            'new_blocked_balance': str(blocked_balance - amount),
-        },
-        reason=reason,
-    )
-    db.add(audit_log)
-    
-    # Validate double-entry invariant before commit
-    if not validate_double_entry_invariant(db, operation.id):
-        db.rollback()
-        raise ValidationError("Double-entry accounting invariant violation detected")
     
-    # Recompute Transaction status if transaction_id provided
-    if transaction_id:
-        try:
-            recompute_transaction_status(db=db, transaction_id=transaction_id)
-        except Exception:
-            # If transaction doesn't exist or error, continue
-            # Status recomputation is non-critical for operation completion
-            pass
-    
-    db.commit()
-    return operation
+    return _post_and_finalize(db, posting, commit=commit)
 
 
 def lock_funds_for_investment(
@@ -278,6 +213,7 @@ def lock_funds_for_investment(
     amount: Decimal,
     transaction_id: Optional[UUID] = None,
     reason: Optional[str] = None,
+    commit: bool = True,
 ) -> Operation:
     """
     Lock funds from WALLET_AVAILABLE to WALLET_LOCKED for investment.
@@ -305,81 +241,66 @@ def lock_funds_for_investment(
             f"Insufficient balance in WALLET_AVAILABLE: {available_balance} < {amount}"
         )
     
-    # Create operation
-    operation = Operation(
-        transaction_id=transaction_id,
-        type=OperationType.INVEST_EXCLUSIVE,
-        status=OperationStatus.COMPLETED,
-        idempotency_key=None,
-        metadata={
-            'currency': currency,
-            'reason': reason,
-        } if reason else {'currency': currency},
-    )
-    db.add(operation)
-    db.flush()
-    
-    # Create ledger entries (double-entry)
-    # DEBIT WALLET_AVAILABLE
-    debit_entry = LedgerEntry(
-        operation_id=operation.id,
-        account_id=available_account_id,
-        amount=-amount,  # Negative for DEBIT
+    posting = investment_lock_posting(
+        user_id=user_id,
         currency=currency,
-        entry_type=LedgerEntryType.DEBIT,
-    )
-    
-    # CREDIT WALLET_LOCKED
-    credit_entry = LedgerEntry(
-        operation_id=operation.id,
-        account_id=locked_account_id,
         amount=amount,
-        currency=currency,
-        entry_type=LedgerEntryType.CREDIT,
+        available_account_id=available_account_id,
+        locked_account_id=locked_account_id,
+        available_balance=available_balance,
+        transaction_id=transaction_id,
+        reason=reason,
     )
     
-    db.add(debit_entry)
-    db.add(credit_entry)
-    db.flush()
+    return _post_and_finalize(db, posting, commit=commit)
+
+
+def investment_lock_posting(
+    *,
+    user_id: UUID,
+    currency: str,
+    amount: Decimal,
+    available_account_id: UUID,
+    locked_account_id: UUID,
+    available_balance: Decimal,
+    transaction_id: Optional[UUID] = None,
+    reason: Optional[str] = None,
+) -> LedgerPosting:
+    """
+    Build the INVEST_EXCLUSIVE posting (WALLET_AVAILABLE -> WALLET_LOCKED).
     
-    # Create audit log
-    audit_log = AuditLog(
-        actor_user_id=None,  # User-initiated (future: pass user_id from authenticated user)
-        actor_role=Role.USER,
-        action="FUNDS_LOCKED_FOR_INVESTMENT",
-        entity_type="Operation",
-        entity_id=operation.id,
-        before={
-            'available_balance': str(available_balance),
-            'transaction_id': str(transaction_id) if transaction_id else None,
-        },
-        after={
-            'operation_id': str(operation.id),
-            'user_id': str(user_id),
+    The balance check is the caller's: available_balance is only recorded in the audit entry.
+    Shared by lock_funds_for_investment and batched offer allocation.
+    """
+    return LedgerPosting(
+        operation_type=OperationType.INVEST_EXCLUSIVE,
+        currency=currency,
+        transaction_id=transaction_id,
+        metadata={
             'currency': currency,
-            'amount': str(amount),
-            'new_available_balance': str(available_balance - amount),
-        },
-        reason=reason,
+            'reason': reason,
+        } if reason else {'currency': currency},
+        legs=[
+            LedgerLeg(account_id=available_account_id, amount=-amount),  # DEBIT WALLET_AVAILABLE
+            LedgerLeg(account_id=locked_account_id, amount=amount),  # CREDIT WALLET_LOCKED
+        ],
+        audit=AuditSpec(
+            actor_user_id=None,  # User-initiated (future: pass user_id from authenticated user)
+            actor_role=Role.USER,
+            action="FUNDS_LOCKED_FOR_INVESTMENT",
+            before={
+                'available_balance': str(available_balance),
+                'transaction_id': str(transaction_id) if transaction_id else None,
+            },
+            after={
+                'user_id': str(user_id),
+                'currency': currency,
+                'amount': str(amount),
+                'new_available_balance': str(available_balance - amount),
+            },
+            reason=reason,
+        ),
     )
-    db.add(audit_log)
-    
-    # Validate double-entry invariant before commit
-    if not validate_double_entry_invariant(db, operation.id):
-        db.rollback()
-        raise ValidationError("Double-entry accounting invariant violation detected")
-    
-    # Recompute Transaction status if transaction_id provided
-    if transaction_id:
-        try:
-            recompute_transaction_status(db=db, transaction_id=transaction_id)
-        except Exception:
-            # If transaction doesn't exist or error, continue
-            # Status recomputation is non-critical for operation completion
-            pass
-    
-    db.commit()
-    return operation
 
 
 def reject_deposit(
@@ -391,6 +312,7 @@ def reject_deposit(
     amount: Decimal,
     reason: str,
     actor_user_id: Optional[UUID] = None,
+    commit: bool = True,
 ) -> Operation:
     """
     Reject a deposit by reversing it (moving funds from BLOCKED back to INTERNAL_OMNIBUS).
@@ -418,23 +340,7 @@ def reject_deposit(
     blocked_account_id = wallet_accounts[AccountType.WALLET_BLOCKED.value]
     
     # Get or create INTERNAL_OMNIBUS account (idempotent)
-    omnibus_account = db.query(Account).filter(
-        Account.account_type == AccountType.INTERNAL_OMNIBUS,
-        Account.currency == currency,
-    ).first()
-    
-    if not omnibus_account:
-        # Create INTERNAL_OMNIBUS account if it doesn't exist (idempotent)
-        omnibus_account = Account(
-            id=uuid4(),
-            user_id=None,  # System account (no user)
-            currency=currency,
-            account_type=AccountType.INTERNAL_OMNIBUS,
-        )
-        db.add(omnibus_account)
-        db.flush()  # Get account.id
-    
-    omnibus_account_id = omnibus_account.id
+    omnibus_account_id = get_or_create_system_account_id(db, AccountType.INTERNAL_OMNIBUS, currency)
     
     # Check blocked balance
     blocked_balance = get_account_balance(db, blocked_account_id)
@@ -443,80 +349,317 @@ def reject_deposit(
             f"Insufficient balance in WALLET_BLOCKED: {blocked_balance} < {amount}"
         )
     
-    # Create reversal operation
-    operation = Operation(
+    posting = LedgerPosting(
+        operation_type=OperationType.REVERSAL_DEPOSIT,
+        currency=currency,
         transaction_id=transaction_id,
-        type=OperationType.REVERSAL_DEPOSIT,
-        status=OperationStatus.COMPLETED,
-        idempotency_key=None,
         metadata={
             'currency': currency,
             'reason': reason,
             'reversal_type': 'deposit_rejection',
         },
+        legs=[
+            LedgerLeg(account_id=blocked_account_id, amount=-amount),  # DEBIT WALLET_BLOCKED (remove funds from user)
+            LedgerLeg(account_id=omnibus_account_id, amount=amount),  # CREDIT INTERNAL_OMNIBUS (return funds)
+        ],
+        audit=AuditSpec(
+            actor_user_id=actor_user_id,
+            actor_role=Role.COMPLIANCE,
+            action="DEPOSIT_REJECTED",
+            before={
+                'blocked_balance': str(blocked_balance),
+                'transaction_id': str(transaction_id),
+            },
+            after={
+                'user_id': str(user_id),
+                'currency': currency,
+                'amount': str(amount),
+                'new_blocked_balance': str(blocked_balance - amount),
+                'reversal_type': 'deposit_rejection',
+            },
+            reason=reason,  # Required for compliance actions
+        ),
     )
-    db.add(operation)
-    db.flush()
     
-    # Create ledger entries (double-entry reversal)
-    # DEBIT WALLET_BLOCKED (remove funds from user)
-    debit_entry = LedgerEntry(
-        operation_id=operation.id,
-        account_id=blocked_account_id,
-        amount=-amount,  # Negative for DEBIT
-        currency=currency,
-        entry_type=LedgerEntryType.DEBIT,
-    )
+    return _post_and_finalize(db, posting, commit=commit)
+
+
+def record_deposits_blocked_bulk(
+    *,
+    db: Session,
+    events: Sequence[DepositEvent],
+    chunk_size: Optional[int] = None,
+) -> List[DepositResult]:
+    """
+    Record many deposits into WALLET_BLOCKED compartments (webhook backlog replay).
     
-    # CREDIT INTERNAL_OMNIBUS (return funds to internal account)
-    credit_entry = LedgerEntry(
-        operation_id=operation.id,
-        account_id=omnibus_account_id,
-        amount=amount,
-        currency=currency,
-        entry_type=LedgerEntryType.CREDIT,
-    )
+    Same ledger effect per event as record_deposit_blocked (Transaction DEPOSIT +
+    DEPOSIT_AED Operation + LedgerEntries + AuditLog), but set-based:
+    - idempotency: one IN lookup on operations.idempotency_key for the whole batch
+      (duplicates inside the batch are detected in memory)
+    - users validated with one IN lookup
+    - per chunk: wallet accounts resolved in bulk, every row written in one flush,
+      one commit
     
-    db.add(debit_entry)
-    db.add(credit_entry)
-    db.flush()
+    If a chunk fails (e.g. a concurrent delivery of the same event), it is rolled
+    back and replayed event by event so every event still gets its own result.
     
-    # Create audit log
-    audit_log = AuditLog(
-        actor_user_id=actor_user_id,
-        actor_role=Role.COMPLIANCE,
-        action="DEPOSIT_REJECTED",
-        entity_type="Operation",
-        entity_id=operation.id,
-        before={
-            'blocked_balance': str(blocked_balance),
-            'transaction_id': str(transaction_id),
-        },
-        after={
-            'operation_id': str(operation.id),
-            'user_id': str(user_id),
-            'currency': currency,
-            'amount': str(amount),
-            'new_blocked_balance': str(blocked_balance - amount),
-            'reversal_type': 'deposit_rejection',
-        },
-        reason=reason,  # Required for compliance actions
+    Commits (one transaction per chunk).
+    
+    Returns:
+        One DepositResult per event, in input order
+    """
+    if chunk_size is None:
+        chunk_size = get_settings().ZAND_BULK_CHUNK_SIZE
+    chunk_size = max(1, chunk_size)
+    
+    results: List[Optional[DepositResult]] = [None] * len(events)
+    
+    # Idempotency: one IN lookup for every key in the batch
+    keys = {event.idempotency_key for event in events}
+    existing: Dict[str, Tuple[UUID, Optional[UUID]]] = {}
+    if keys:
+        existing = {
+            key: (operation_id, transaction_id)
+            for key, operation_id, transaction_id in db.query(
+                Operation.idempotency_key, Operation.id, Operation.transaction_id,
+            ).filter(Operation.idempotency_key.in_(keys)).all()
+        }
+    
+    known_users = set()
+    user_ids = {event.user_id for event in events}
+    if user_ids:
+        known_users = {row[0] for row in db.query(User.id).filter(User.id.in_(user_ids)).all()}
+    
+    pending: List[int] = []
+    first_index: Dict[str, int] = {}
+    for index, event in enumerate(events):
+        key = event.idempotency_key
+        if key in existing:
+            operation_id, transaction_id = existing[key]
+            results[index] = DepositResult(
+                provider_event_id=event.provider_event_id,
+                status=DEPOSIT_DUPLICATE,
+                transaction_id=transaction_id,
+                operation_id=operation_id,
+            )
+        elif key in first_index:
+            continue  # Resolved from the first occurrence below
+        elif event.amount <= 0:
+            results[index] = DepositResult(
+                provider_event_id=event.provider_event_id,
+                status=DEPOSIT_FAILED,
+                error="Amount must be greater than 0",
+            )
+        elif event.user_id not in known_users:
+            results[index] = DepositResult(
+                provider_event_id=event.provider_event_id,
+                status=DEPOSIT_FAILED,
+                error=f"User {event.user_id} not found",
+            )
+        else:
+            first_index[key] = index
+            pending.append(index)
+    
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        try:
+            posted = _post_deposit_chunk(db, [events[i] for i in chunk])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(
+                f"Bulk deposit chunk failed, replaying event by event: {type(e).__name__}: {str(e)}",
+                extra={"chunk_size": len(chunk)},
+            )
+            for index in chunk:
+                results[index] = _post_deposit_single(db, events[index])
+            continue
+        
+        for index, (transaction_id, operation_id) in zip(chunk, posted):
+            results[index] = DepositResult(
+                provider_event_id=events[index].provider_event_id,
+                status=DEPOSIT_ACCEPTED,
+                transaction_id=transaction_id,
+                operation_id=operation_id,
+            )
+    
+    # In-batch duplicates point at the first occurrence's outcome
+    for index, event in enumerate(events):
+        if results[index] is None:
+            first = results[first_index[event.idempotency_key]]
+            results[index] = DepositResult(
+                provider_event_id=event.provider_event_id,
+                status=DEPOSIT_DUPLICATE if first.status != DEPOSIT_FAILED else DEPOSIT_FAILED,
+                transaction_id=first.transaction_id,
+                operation_id=first.operation_id,
+                error=first.error,
+            )
+    
+    return results
+
+
+def _post_deposit_chunk(db: Session, events: Sequence[DepositEvent]) -> List[Tuple[UUID, UUID]]:
+    """
+    Stage Transactions + deposit postings for a chunk and flush them once.
+    
+    NO COMMIT - caller must commit.
+    
+    Returns:
+        (transaction_id, operation_id) per event, in order
+    """
+    wallet_accounts = ensure_wallet_accounts_bulk(
+        db, [(event.user_id, event.currency) for event in events]
     )
-    db.add(audit_log)
+    omnibus_account_ids = {
+        currency: get_or_create_system_account_id(db, AccountType.INTERNAL_OMNIBUS, currency)
+        for currency in {event.currency for event in events}
+    }
+    
+    transactions = []
+    postings = []
+    for event in events:
+        transaction = Transaction(
+            id=uuid4(),
+            user_id=event.user_id,
+            type=TransactionType.DEPOSIT,
+            status=TransactionStatus.INITIATED,
+            transaction_metadata={
+                "provider_event_id": event.provider_event_id,
+                "iban": event.iban,
+                "amount": str(event.amount),
+                "currency": event.currency,
+                "occurred_at": event.occurred_at.isoformat() if event.occurred_at else None,
+            },
+        )
+        transactions.append(transaction)
+        postings.append(_deposit_posting(
+            user_id=event.user_id,
+            currency=event.currency,
+            amount=event.amount,
+            blocked_account_id=wallet_accounts[(event.user_id, event.currency)][AccountType.WALLET_BLOCKED.value],
+            omnibus_account_id=omnibus_account_ids[event.currency],
+            transaction_id=transaction.id,
+            idempotency_key=event.idempotency_key,
+            provider_reference=event.provider_event_id,
+        ))
+    
+    db.add_all(transactions)
+    try:
+        operations = post_ledger_operations(db, postings)
+    except PostingValidationError as e:
+        raise ValidationError(str(e)) from e
+    
+    # Every Operation of these new Transactions is in hand: compute status without re-reading
+    for transaction, operation in zip(transactions, operations):
+        transaction.status = compute_transaction_status(transaction.type, [operation])
+    db.flush()
     
-    # Validate double-entry invariant before commit
-    if not validate_double_entry_invariant(db, operation.id):
+    return [(transaction.id, operation.id) for transaction, operation in zip(transactions, operations)]
+
+
+def _post_deposit_single(db: Session, event: DepositEvent) -> DepositResult:
+    """Fallback for a failed chunk: post one event in its own transaction."""
+    try:
+        [(transaction_id, operation_id)] = _post_deposit_chunk(db, [event])
+        db.commit()
+        return DepositResult(
+            provider_event_id=event.provider_event_id,
+            status=DEPOSIT_ACCEPTED,
+            transaction_id=transaction_id,
+            operation_id=operation_id,
+        )
+    except IntegrityError as e:
+        db.rollback()
+        # Idempotency key taken by a concurrent delivery of the same event
+        existing = db.query(Operation).filter(
+            Operation.idempotency_key == event.idempotency_key
+        ).first()
+        if existing:
+            return DepositResult(
+                provider_event_id=event.provider_event_id,
+                status=DEPOSIT_DUPLICATE,
+                transaction_id=existing.transaction_id,
+                operation_id=existing.id,
+            )
+        return DepositResult(
+            provider_event_id=event.provider_event_id,
+            status=DEPOSIT_FAILED,
+            error=f"{type(e).__name__}: {str(e.orig) if e.orig else str(e)}",
+        )
+    except Exception as e:
         db.rollback()
-        raise ValidationError("Double-entry accounting invariant violation detected")
+        return DepositResult(
+            provider_event_id=event.provider_event_id,
+            status=DEPOSIT_FAILED,
+            error=f"{type(e).__name__}: {str(e)}",
+        )
+
+
+def _post_and_finalize(db: Session, posting: LedgerPosting, *, commit: bool) -> Operation:
+    """
+    Post a fund movement and recompute its Transaction status in the same DB transaction.
+    
+    The double-entry invariant is checked in memory before any row is written,
+    and the Operation, its LedgerEntries and the AuditLog go out in a single
+    flush. Commits once at the end unless commit=False (caller owns the
+    transaction, e.g. to keep row locks held across several movements).
+    """
+    try:
+        operation = post_ledger_operation(db, posting)
+    except PostingValidationError as e:
+        raise ValidationError(str(e)) from e
     
     # Recompute Transaction status if transaction_id provided
-    if transaction_id:
+    if posting.transaction_id:
         try:
-            recompute_transaction_status(db=db, transaction_id=transaction_id)
+            recompute_transaction_status(db=db, transaction_id=posting.transaction_id, commit=False)
         except Exception:
             # If transaction doesn't exist or error, continue
             # Status recomputation is non-critical for operation completion
             pass
     
-    db.commit()
+    if commit:
+        db.commit()
     return operation
+
+
+def _deposit_posting(
+    *,
+    user_id: UUID,
+    currency: str,
+    amount: Decimal,
+    blocked_account_id: UUID,
+    omnibus_account_id: UUID,
+    transaction_id: Optional[UUID],
+    idempotency_key: Optional[str],
+    provider_reference: Optional[str],
+) -> LedgerPosting:
+    """Build the DEPOSIT_AED posting: CREDIT WALLET_BLOCKED, DEBIT INTERNAL_OMNIBUS."""
+    return LedgerPosting(
+        operation_type=OperationType.DEPOSIT_AED,
+        currency=currency,
+        transaction_id=transaction_id,
+        idempotency_key=idempotency_key,
+        metadata={
+            'provider_reference': provider_reference,
+            'currency': currency,
+        } if provider_reference else {'currency': currency},
+        legs=[
+            LedgerLeg(account_id=blocked_account_id, amount=amount),  # CREDIT user's WALLET_BLOCKED
+            LedgerLeg(account_id=omnibus_account_id, amount=-amount),  # DEBIT INTERNAL_OMNIBUS
+        ],
+        audit=AuditSpec(
+            actor_user_id=None,  # System operation
+            actor_role=Role.OPS,
+            action="DEPOSIT_RECORDED",
+            before=None,
+            after={
+                'user_id': str(user_id),
+                'currency': currency,
+                'amount': str(amount),
+                'account_type': AccountType.WALLET_BLOCKED.value,
+            },
+            reason=None,
+        ),
+    )
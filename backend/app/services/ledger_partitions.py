@@ -0,0 +1,298 @@
+"""
+Ledger partition maintenance - Monthly ledger_entries partitions, checkpoints, archival
+
+ledger_entries is range-partitioned by created_at month (migration
+partition_ledger_20261016), one partition per month named
+ledger_entries_yYYYYmMM, plus a DEFAULT partition that must stay empty.
+Queries filtered on created_at (checkpoint deltas, history pages) only
+touch the matching months.
+
+Maintenance (scripts/run_ledger_partition_maintenance.py, daily):
+1. ensure_ledger_partitions: create the partitions of the coming months
+2. checkpoint_closed_months: write a balance checkpoint for every account at
+   each closed month boundary (incremental - a closed month is read once)
+3. archive_ledger_partitions (opt-in): detach closed months older than the
+   retention into the archive schema, oldest first
+
+operations is not partitioned: its global idempotency_key uniqueness and the
+foreign keys referencing operations.id cannot be kept on a partitioned table.
+
+Everything except checkpointing is a no-op when ledger_entries is a plain
+table (test databases built with metadata.create_all).
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.core.ledger.balances import AccountBalanceCheckpoint
+from app.core.ledger.models import LedgerEntry
+from app.core.ledger.partitions import LedgerPartitionArchive
+from app.infrastructure.settings import get_settings
+from app.services.balance_reconciliation import write_balance_checkpoints
+
+logger = logging.getLogger(__name__)
+
+LEDGER_TABLE = "ledger_entries"
+
+_PARTITION_NAME = re.compile(r"^ledger_entries_y(\d{4})m(\d{2})$")
+
+
+class LedgerArchiveError(Exception):
+    """Raised when a partition cannot be archived safely"""
+    pass
+
+
+@dataclass(frozen=True)
+class LedgerPartition:
+    """A monthly ledger_entries partition: [range_start, range_end)"""
+    name: str
+    range_start: datetime
+    range_end: datetime
+
+
+def month_start(value: datetime) -> datetime:
+    """First instant (UTC) of the month containing value."""
+    value = value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Shift a month start by a number of months."""
+    index = value.year * 12 + (value.month - 1) + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def ledger_partition_for(month: datetime) -> LedgerPartition:
+    """Partition covering the month that starts at month."""
+    start = month_start(month)
+    return LedgerPartition(
+        name=f"{LEDGER_TABLE}_y{start.year:04d}m{start.month:02d}",
+        range_start=start,
+        range_end=add_months(start, 1),
+    )
+
+
+def last_closed_boundary(now: Optional[datetime] = None) -> datetime:
+    """
+    Latest month boundary that is safely closed.
+
+    created_at is the transaction start time: a boundary is closed once
+    LEDGER_MONTH_CLOSE_GRACE_HOURS have passed, so no in-flight transaction
+    can still commit entries dated before it.
+    """
+    now = now or datetime.now(timezone.utc)
+    return month_start(now - timedelta(hours=get_settings().LEDGER_MONTH_CLOSE_GRACE_HOURS))
+
+
+def is_ledger_partitioned(db: Session) -> bool:
+    """True if ledger_entries is a partitioned table."""
+    return bool(db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+    ), {"table": LEDGER_TABLE}).scalar())
+
+
+def list_ledger_partitions(db: Session) -> List[LedgerPartition]:
+    """Monthly partitions attached to ledger_entries, oldest first (DEFAULT excluded)."""
+    names = db.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits i
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:table)
+    """), {"table": LEDGER_TABLE}).scalars().all()
+
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append(ledger_partition_for(
+                datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+            ))
+    return sorted(partitions, key=lambda p: p.range_start)
+
+
+def ensure_ledger_partitions(
+    db: Session,
+    *,
+    months_ahead: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """
+    Create the partitions of the current month and the next months_ahead months.
+
+    NO COMMIT - caller must commit.
+
+    Returns:
+        Names of the partitions created
+    """
+    if not is_ledger_partitioned(db):
+        return []
+
+    months_ahead = get_settings().LEDGER_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    existing = {p.name for p in list_ledger_partitions(db)}
+    current = month_start(now or datetime.now(timezone.utc))
+
+    created = []
+    for offset in range(months_ahead + 1):
+        partition = ledger_partition_for(add_months(current, offset))
+        if partition.name in existing:
+            continue
+        # Fails if the DEFAULT partition already holds rows of this month
+        db.execute(text(
+            f'CREATE TABLE "{partition.name}" PARTITION OF {LEDGER_TABLE} '
+            f"FOR VALUES FROM ('{partition.range_start.isoformat()}') TO ('{partition.range_end.isoformat()}')"
+        ))
+        created.append(partition.name)
+
+    if created:
+        logger.info(f"Created ledger partitions: {', '.join(created)}")
+    return created
+
+
+def checkpoint_closed_months(db: Session, *, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Write balance checkpoints at every closed month boundary not yet checkpointed.
+
+    Boundaries run from the end of the oldest live month (oldest partition, or
+    oldest entry on an unpartitioned table) up to last_closed_boundary(). Each
+    boundary extends the previous checkpoint with that month's entries only
+    (write_balance_checkpoints), so a closed month is scanned once; boundaries
+    that already have checkpoints are skipped.
+
+    NO COMMIT - caller must commit.
+
+    Returns:
+        {boundary ISO timestamp: checkpoint rows inserted}
+    """
+    if is_ledger_partitioned(db):
+        partitions = list_ledger_partitions(db)
+        oldest = partitions[0].range_start if partitions else None
+    else:
+        oldest = db.query(func.min(LedgerEntry.created_at)).scalar()
+    if oldest is None:
+        return {}
+
+    end = last_closed_boundary(now)
+    boundaries = []
+    boundary = add_months(month_start(oldest), 1)
+    while boundary <= end:
+        boundaries.append(boundary)
+        boundary = add_months(boundary, 1)
+    if not boundaries:
+        return {}
+
+    done = {
+        row[0] for row in db.query(AccountBalanceCheckpoint.checkpoint_at).filter(
+            AccountBalanceCheckpoint.checkpoint_at.in_(boundaries)
+        ).distinct().all()
+    }
+
+    written = {}
+    previous = None
+    for boundary in boundaries:
+        if boundary not in done:
+            written[boundary.isoformat()] = write_balance_checkpoints(db, boundary, since=previous)
+        previous = boundary
+    return written
+
+
+def archive_ledger_partition(db: Session, partition: LedgerPartition) -> LedgerPartitionArchive:
+    """
+    Detach one closed partition and move it to the archive schema.
+
+    The checkpoints at partition.range_end must already exist (see
+    checkpoint_closed_months): they carry the archived balances.
+
+    NO COMMIT - caller must commit (one partition per transaction: DETACH
+    takes an ACCESS EXCLUSIVE lock on ledger_entries until commit).
+    """
+    settings = get_settings()
+
+    has_entries = db.execute(text(f'SELECT EXISTS (SELECT 1 FROM "{partition.name}")')).scalar()
+    has_checkpoint = db.query(AccountBalanceCheckpoint.id).filter(
+        AccountBalanceCheckpoint.checkpoint_at == partition.range_end
+    ).first() is not None
+    if has_entries and not has_checkpoint:
+        raise LedgerArchiveError(f"No balance checkpoint at {partition.range_end.isoformat()} for {partition.name}")
+
+    entry_count, amount_sum = db.execute(text(
+        f'SELECT COUNT(*), COALESCE(SUM(amount), 0) FROM "{partition.name}"'
+    )).one()
+
+    db.execute(text(f'ALTER TABLE {LEDGER_TABLE} DETACH PARTITION "{partition.name}"'))
+    db.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{settings.LEDGER_ARCHIVE_SCHEMA}"'))
+    db.execute(text(f'ALTER TABLE "{partition.name}" SET SCHEMA "{settings.LEDGER_ARCHIVE_SCHEMA}"'))
+
+    archive = LedgerPartitionArchive(
+        partition_name=partition.name,
+        archive_schema=settings.LEDGER_ARCHIVE_SCHEMA,
+        range_start=partition.range_start,
+        range_end=partition.range_end,
+        entry_count=int(entry_count),
+        amount_sum=Decimal(str(amount_sum)),
+    )
+    db.add(archive)
+    db.flush()
+
+    if archive.amount_sum != 0:
+        logger.error(
+            f"Archived ledger partition {partition.name} is not balanced",
+            extra={"partition": partition.name, "amount_sum": str(archive.amount_sum)},
+        )
+    return archive
+
+
+def archive_ledger_partitions(
+    db: Session,
+    *,
+    retention_months: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Archive every closed partition older than retention_months, oldest first.
+
+    Checkpoints the closed boundaries first. Stops at the first partition that
+    cannot be archived, so archives stay contiguous.
+
+    Commits after each partition.
+
+    Returns:
+        One summary dict per archived partition
+    """
+    if not is_ledger_partitioned(db):
+        return []
+
+    retention_months = get_settings().LEDGER_RETENTION_MONTHS if retention_months is None else retention_months
+    cutoff = min(
+        add_months(month_start(now or datetime.now(timezone.utc)), -retention_months),
+        last_closed_boundary(now),
+    )
+
+    checkpoint_closed_months(db, now=now)
+    db.commit()
+
+    archived = []
+    for partition in list_ledger_partitions(db):
+        if partition.range_end > cutoff:
+            break
+        try:
+            archive = archive_ledger_partition(db, partition)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        archived.append({
+            "partition": archive.partition_name,
+            "range_start": archive.range_start.isoformat(),
+            "range_end": archive.range_end.isoformat(),
+            "entry_count": archive.entry_count,
+            "amount_sum": str(archive.amount_sum),
+        })
+        logger.info(f"Archived ledger partition {archive.partition_name}", extra=archived[-1])
+    return archived
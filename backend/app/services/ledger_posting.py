@@ -0,0 +1,243 @@
+"""
+Ledger posting engine - Post Operations + LedgerEntries + AuditLogs in one flush
+
+Every fund movement follows the same shape: one Operation, a set of balanced
+ledger legs, and an AuditLog row. This module:
+- validates the double-entry invariant IN MEMORY, before anything touches the DB
+- generates all ids client-side (no flush needed to learn operation.id)
+- writes every row of a batch in a single flush: one INSERT for operations,
+  one multi-row INSERT for ledger_entries, one for audit_logs, plus the
+  account_balances upsert (see app/core/ledger/balances.py)
+
+insert_ledger_operations() writes the same rows with Core multi-row INSERTs
+and no ORM objects, for batch jobs posting thousands of operations per
+transaction.
+
+Nothing here commits - the caller owns the transaction boundary.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.compliance.models import AuditLog
+from app.core.ledger.balances import apply_balance_deltas
+from app.core.ledger.models import Operation, OperationType, OperationStatus, LedgerEntry, LedgerEntryType
+from app.core.security.models import Role
+from app.utils.ledger_validator import validate_legs_balanced
+
+
+class PostingValidationError(Exception):
+    """Raised when a posting is rejected before reaching the database"""
+    pass
+
+
+@dataclass(frozen=True)
+class LedgerLeg:
+    """
+    One side of a double-entry posting.
+
+    amount is signed: positive = CREDIT, negative = DEBIT (same convention as LedgerEntry.amount).
+    """
+    account_id: UUID
+    amount: Decimal
+
+    @property
+    def entry_type(self) -> LedgerEntryType:
+        return LedgerEntryType.CREDIT if self.amount > 0 else LedgerEntryType.DEBIT
+
+
+@dataclass
+class AuditSpec:
+    """
+    AuditLog content for a posting.
+
+    entity_type/entity_id are filled with the Operation, and 'operation_id'
+    is prepended to `after` by the engine.
+    """
+    action: str
+    actor_role: Role
+    actor_user_id: Optional[UUID] = None
+    before: Optional[Dict[str, Any]] = None
+    after: Optional[Dict[str, Any]] = None
+    reason: Optional[str] = None
+
+
+@dataclass
+class LedgerPosting:
+    """A complete Operation to post: type, balanced legs and optional audit entry."""
+    operation_type: OperationType
+    currency: str
+    legs: Sequence[LedgerLeg]
+    transaction_id: Optional[UUID] = None
+    idempotency_key: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+    audit: Optional[AuditSpec] = None
+    operation_id: UUID = field(default_factory=uuid4)
+
+
+def validate_posting(posting: LedgerPosting) -> None:
+    """
+    Validate a posting in memory.
+
+    Raises PostingValidationError if:
+    - fewer than two legs
+    - a leg has a zero amount
+    - credits != debits (double-entry invariant)
+    """
+    if len(posting.legs) < 2:
+        raise PostingValidationError(
+            f"Posting {posting.operation_id} must have at least two legs"
+        )
+
+    if any(leg.amount == 0 for leg in posting.legs):
+        raise PostingValidationError(
+            f"Posting {posting.operation_id} has a zero-amount leg"
+        )
+
+    if not validate_legs_balanced(posting.operation_id, [leg.amount for leg in posting.legs]):
+        raise PostingValidationError("Double-entry accounting invariant violation detected")
+
+
+def post_ledger_operations(db: Session, postings: Sequence[LedgerPosting]) -> List[Operation]:
+    """
+    Post a batch of Operations in a single flush.
+
+    All postings are validated before any row is added to the session; if one
+    is invalid, nothing is written.
+
+    NO COMMIT - caller must commit.
+
+    Returns:
+        The created Operations, in the same order as postings
+    """
+    for posting in postings:
+        validate_posting(posting)
+
+    operations: List[Operation] = []
+    rows: List[Any] = []
+
+    for posting in postings:
+        operation = Operation(
+            id=posting.operation_id,
+            transaction_id=posting.transaction_id,
+            type=posting.operation_type,
+            status=OperationStatus.COMPLETED,
+            idempotency_key=posting.idempotency_key,
+            operation_metadata=posting.metadata,
+        )
+        operations.append(operation)
+        rows.append(operation)
+
+        for leg in posting.legs:
+            rows.append(LedgerEntry(
+                id=uuid4(),
+                operation_id=posting.operation_id,
+                account_id=leg.account_id,
+                amount=leg.amount,
+                currency=posting.currency,
+                entry_type=leg.entry_type,
+            ))
+
+        if posting.audit is not None:
+            audit = posting.audit
+            rows.append(AuditLog(
+                id=uuid4(),
+                actor_user_id=audit.actor_user_id,
+                actor_role=audit.actor_role,
+                action=audit.action,
+                entity_type="Operation",
+                entity_id=posting.operation_id,
+                before=audit.before,
+                after={'operation_id': str(posting.operation_id), **(audit.after or {})},
+                reason=audit.reason,
+            ))
+
+    db.add_all(rows)
+    db.flush()
+
+    return operations
+
+
+def post_ledger_operation(db: Session, posting: LedgerPosting) -> Operation:
+    """
+    Post a single Operation (see post_ledger_operations).
+
+    NO COMMIT - caller must commit.
+    """
+    return post_ledger_operations(db, [posting])[0]
+
+
+def insert_ledger_operations(db: Session, postings: Sequence[LedgerPosting]) -> List[UUID]:
+    """
+    Post a batch of Operations with Core multi-row INSERTs (see post_ledger_operations).
+
+    Same rows and validation, but no ORM objects are created: one INSERT per
+    table (batched by the driver's insertmanyvalues), and account_balances is
+    updated with apply_balance_deltas() directly since the after_flush hook
+    only sees ORM inserts.
+
+    Pending ORM changes are flushed first. NO COMMIT - caller must commit.
+
+    Returns:
+        The operation ids, in the same order as postings
+    """
+    for posting in postings:
+        validate_posting(posting)
+    if not postings:
+        return []
+
+    db.flush()
+
+    operation_rows: List[Dict[str, Any]] = []
+    entry_rows: List[Dict[str, Any]] = []
+    audit_rows: List[Dict[str, Any]] = []
+    deltas: Dict[UUID, Any] = {}
+
+    for posting in postings:
+        operation_rows.append({
+            "id": posting.operation_id,
+            "transaction_id": posting.transaction_id,
+            "type": posting.operation_type,
+            "status": OperationStatus.COMPLETED,
+            "idempotency_key": posting.idempotency_key,
+            "operation_metadata": posting.metadata,
+        })
+
+        for leg in posting.legs:
+            entry_rows.append({
+                "id": uuid4(),
+                "operation_id": posting.operation_id,
+                "account_id": leg.account_id,
+                "amount": leg.amount,
+                "currency": posting.currency,
+                "entry_type": leg.entry_type,
+            })
+            currency, amount, count = deltas.get(leg.account_id, (posting.currency, Decimal("0"), 0))
+            deltas[leg.account_id] = (currency, amount + leg.amount, count + 1)
+
+        if posting.audit is not None:
+            audit = posting.audit
+            audit_rows.append({
+                "id": uuid4(),
+                "actor_user_id": audit.actor_user_id,
+                "actor_role": audit.actor_role,
+                "action": audit.action,
+                "entity_type": "Operation",
+                "entity_id": posting.operation_id,
+                "before": audit.before,
+                "after": {'operation_id': str(posting.operation_id), **(audit.after or {})},
+                "reason": audit.reason,
+            })
+
+    db.execute(insert(Operation.__table__), operation_rows)
+    db.execute(insert(LedgerEntry.__table__), entry_rows)
+    if audit_rows:
+        db.execute(insert(AuditLog.__table__), audit_rows)
+    apply_balance_deltas(db.connection(), deltas)
+
+    return [posting.operation_id for posting in postings]
@@ -0,0 +1,473 @@
+"""
+Offer allocation queue - Queued, batched allocation of InvestmentIntents
+
+Offers with queued_allocation (hot launches) do not allocate inside the
+invest request. Instead:
+
+Intake (HTTP request path, enqueue_investment_intent):
+- validate offer status / currency (no offer lock), INSERT a PENDING intent
+  numbered from investment_intent_queue_seq, commit, schedule the offer
+- the client polls GET /api/v1/offers/{offer_id}/investments/{id} or gets a
+  callback (callback_url) once the intent is decided
+
+Allocation (RQ worker, app/workers/jobs.py):
+- allocate_offer_batch locks the offer row (FOR UPDATE: one allocator per
+  offer at a time), takes the next OFFER_ALLOCATION_BATCH_SIZE PENDING intents
+  in queue_position order and decides them exactly like invest_in_offer_v1_1
+  (partial fill of the intent that crosses max_amount, then OFFER_FULL)
+- every confirmed intent's ledger posting goes out in one flush
+  (post_ledger_operations), offers.invested_amount is updated once per batch
+- each decided intent records its allocation_batch_id: the order and the
+  batch boundaries are auditable after the fact
+
+The investment_intents table, not the RQ queue, is the source of truth:
+offers whose job was lost are re-enqueued by the sweeper
+(scripts/run_offer_allocation_sweeper.py). Queued allocation and capacity
+shards are mutually exclusive per offer.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import urllib.request
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.accounts.models import AccountType
+from app.core.accounts.wallet_locks import LockReason, LockStatus, ReferenceType, WalletLock
+from app.core.offers.models import (
+    INTENT_QUEUE_SEQUENCE,
+    InvestmentIntent,
+    InvestmentIntentStatus,
+    Offer,
+    OfferStatus,
+)
+from app.core.transactions.models import Transaction, TransactionStatus, TransactionType
+from app.infrastructure.settings import get_settings
+from app.services.fund_services import ValidationError, investment_lock_posting
+from app.services.ledger_posting import post_ledger_operations
+from app.services.offers.service_v1_1 import (
+    OfferClosedError,
+    OfferCurrencyMismatchError,
+    OfferNotFoundError,
+    OfferNotLiveError,
+)
+from app.services.transaction_engine import compute_transaction_status
+from app.services.wallet_helpers import ensure_wallet_accounts_bulk, get_account_balances
+
+logger = logging.getLogger(__name__)
+
+# Job paths (string form, so this module does not import the workers package)
+ALLOCATE_OFFER_JOB = "app.workers.jobs.allocate_offer_intents"
+DELIVER_CALLBACK_JOB = "app.workers.jobs.deliver_investment_intent_callback"
+
+# Redis flag: an allocation job for the offer is queued and has not started yet
+_SCHEDULED_KEY = "offer_allocation:scheduled:{offer_id}"
+_SCHEDULED_TTL_SECONDS = 60
+
+# Rejection reasons (investment_intents.rejection_reason, same codes as the sync API errors)
+OFFER_FULL = "OFFER_FULL"
+OFFER_CLOSED = "OFFER_CLOSED"
+OFFER_NOT_LIVE = "OFFER_NOT_LIVE"
+OFFER_CURRENCY_MISMATCH = "OFFER_CURRENCY_MISMATCH"
+INSUFFICIENT_AVAILABLE_FUNDS = "INSUFFICIENT_AVAILABLE_FUNDS"
+
+
+@dataclass
+class AllocationBatch:
+    """Outcome of one allocation batch of an offer"""
+    offer_id: UUID
+    batch_id: UUID = field(default_factory=uuid4)
+    decided: List[UUID] = field(default_factory=list)  # Intent ids, in queue order
+    callbacks: List[UUID] = field(default_factory=list)  # Decided intents with a callback_url
+    confirmed: int = 0
+    rejected: int = 0
+    allocated_amount: Decimal = Decimal("0")
+
+    def summary(self) -> Dict[str, str]:
+        return {
+            "offer_id": str(self.offer_id),
+            "batch_id": str(self.batch_id),
+            "confirmed": str(self.confirmed),
+            "rejected": str(self.rejected),
+            "allocated_amount": str(self.allocated_amount),
+        }
+
+
+def validate_callback_url(callback_url: str) -> str:
+    """
+    Check a client callback URL: https and a host in INVESTMENT_CALLBACK_ALLOWED_HOSTS.
+
+    Raises ValidationError otherwise (callbacks are disabled when the allowlist
+    is empty, or without INVESTMENT_CALLBACK_SECRET: they are never sent unsigned).
+    """
+    settings = get_settings()
+    allowed = settings.investment_callback_allowed_hosts_list
+    parsed = urlparse(callback_url)
+    if not allowed or not settings.INVESTMENT_CALLBACK_SECRET:
+        raise ValidationError("Investment callbacks are not enabled")
+    if parsed.scheme != "https" or (parsed.hostname or "").lower() not in allowed:
+        raise ValidationError("callback_url must be an https URL on an allowed host")
+    return callback_url
+
+
+def enqueue_investment_intent(
+    db: Session,
+    *,
+    user_id: UUID,
+    offer_id: UUID,
+    amount: Decimal,
+    currency: str,
+    idempotency_key: Optional[str] = None,
+    callback_url: Optional[str] = None,
+) -> Tuple[InvestmentIntent, bool]:
+    """
+    Queue an investment in an offer with queued_allocation.
+
+    No offer lock: status and currency are checked again by the allocator.
+    NO COMMIT - caller must commit, then call schedule_offer_allocation().
+
+    Returns:
+        (intent, created) - created is False for a replayed idempotency_key
+
+    Raises:
+        ValidationError, OfferNotFoundError, OfferClosedError, OfferNotLiveError,
+        OfferCurrencyMismatchError
+    """
+    if amount <= 0:
+        raise ValidationError("Amount must be greater than 0")
+    if callback_url:
+        validate_callback_url(callback_url)
+
+    if idempotency_key:
+        existing_intent = db.query(InvestmentIntent).filter(
+            InvestmentIntent.idempotency_key == idempotency_key
+        ).first()
+        if existing_intent:
+            return existing_intent, False
+
+    offer = db.query(Offer).filter(Offer.id == offer_id).first()
+    if not offer:
+        raise OfferNotFoundError(f"Offer {offer_id} not found")
+    if offer.status == OfferStatus.CLOSED:
+        raise OfferClosedError("Offer is CLOSED")
+    if offer.status != OfferStatus.LIVE:
+        raise OfferNotLiveError(f"Offer is not LIVE (current status: {offer.status})")
+    if offer.currency != currency:
+        raise OfferCurrencyMismatchError(f"Offer currency {offer.currency} does not match request {currency}")
+
+    intent = InvestmentIntent(
+        offer_id=offer_id,
+        user_id=user_id,
+        requested_amount=amount,
+        allocated_amount=Decimal("0"),
+        currency=currency,
+        status=InvestmentIntentStatus.PENDING,
+        idempotency_key=idempotency_key,
+        queue_position=INTENT_QUEUE_SEQUENCE.next_value(),
+        callback_url=callback_url,
+    )
+    savepoint = db.begin_nested()
+    try:
+        db.add(intent)
+        db.flush()
+        savepoint.commit()
+    except IntegrityError:
+        # Same idempotency_key inserted by a concurrent request
+        savepoint.rollback()
+        existing_intent = db.query(InvestmentIntent).filter(
+            InvestmentIntent.idempotency_key == idempotency_key
+        ).first() if idempotency_key else None
+        if existing_intent is None:
+            raise
+        return existing_intent, False
+    return intent, True
+
+
+def schedule_offer_allocation(offer_id: UUID, *, force: bool = False) -> bool:
+    """
+    Enqueue an allocation job for the offer, unless one is already queued
+    (force: enqueue anyway, e.g. the sweeper after a lost job).
+
+    Call after the intents are committed. Returns True if a job was enqueued.
+    """
+    from rq import Queue
+    from app.infrastructure.redis_client import get_redis, get_rq_redis
+
+    # One queued job per offer is enough: it drains every intent committed before it starts
+    scheduled = get_redis().set(_SCHEDULED_KEY.format(offer_id=offer_id), "1", nx=not force, ex=_SCHEDULED_TTL_SECONDS)
+    if not scheduled:
+        return False
+    queue = Queue(get_settings().OFFER_ALLOCATION_QUEUE, connection=get_rq_redis())
+    queue.enqueue(ALLOCATE_OFFER_JOB, str(offer_id))
+    return True
+
+
+def clear_offer_allocation_scheduled(offer_id: UUID) -> None:
+    """Called by the job before draining: intents committed from now on schedule a new job."""
+    from app.infrastructure.redis_client import get_redis
+    get_redis().delete(_SCHEDULED_KEY.format(offer_id=offer_id))
+
+
+def _reject(intent: InvestmentIntent, reason: str, batch: AllocationBatch) -> None:
+    intent.status = InvestmentIntentStatus.REJECTED
+    intent.allocated_amount = Decimal("0")
+    intent.rejection_reason = reason
+    batch.rejected += 1
+
+
+def allocate_offer_batch(db: Session, offer_id: UUID, *, batch_size: Optional[int] = None) -> AllocationBatch:
+    """
+    Decide the next batch of queued intents of an offer, in queue_position order.
+
+    Locks the offer row for the whole batch. NO COMMIT - caller must commit.
+
+    Returns:
+        AllocationBatch (decided is empty when nothing is pending)
+    """
+    batch_size = batch_size or get_settings().OFFER_ALLOCATION_BATCH_SIZE
+    batch = AllocationBatch(offer_id=offer_id)
+
+    offer = db.execute(
+        select(Offer).where(Offer.id == offer_id).with_for_update()
+    ).scalar_one_or_none()
+    if offer is None:
+        return batch
+
+    intents = db.execute(
+        select(InvestmentIntent)
+        .where(
+            InvestmentIntent.offer_id == offer_id,
+            InvestmentIntent.status == InvestmentIntentStatus.PENDING,
+            InvestmentIntent.queue_position.isnot(None),
+        )
+        .order_by(InvestmentIntent.queue_position)
+        .limit(batch_size)
+        .with_for_update()
+    ).scalars().all()
+    if not intents:
+        return batch
+
+    confirmed: List[Tuple[InvestmentIntent, Transaction]] = []
+    postings = []
+
+    if offer.status != OfferStatus.LIVE:
+        reason = OFFER_CLOSED if offer.status == OfferStatus.CLOSED else OFFER_NOT_LIVE
+        for intent in intents:
+            _reject(intent, reason, batch)
+    else:
+        wallet_accounts = ensure_wallet_accounts_bulk(db, [(intent.user_id, intent.currency) for intent in intents])
+        available = get_account_balances(db, [
+            accounts[AccountType.WALLET_AVAILABLE.value] for accounts in wallet_accounts.values()
+        ])
+        remaining = max(offer.max_amount - offer.invested_amount, Decimal("0"))
+
+        for intent in intents:
+            if intent.currency != offer.currency:
+                _reject(intent, OFFER_CURRENCY_MISMATCH, batch)
+                continue
+            allocated = min(intent.requested_amount, remaining)
+            if allocated <= 0:
+                _reject(intent, OFFER_FULL, batch)
+                continue
+
+            accounts = wallet_accounts[(intent.user_id, intent.currency)]
+            available_account_id = accounts[AccountType.WALLET_AVAILABLE.value]
+            available_balance = available.get(available_account_id, Decimal("0"))
+            if available_balance < allocated:
+                _reject(intent, INSUFFICIENT_AVAILABLE_FUNDS, batch)
+                continue
+
+            # Running balances: a user may have several intents in the batch
+            available[available_account_id] = available_balance - allocated
+            remaining -= allocated
+
+            transaction = Transaction(
+                id=uuid4(),
+                user_id=intent.user_id,
+                type=TransactionType.INVESTMENT,
+                status=TransactionStatus.INITIATED,
+                transaction_metadata={
+                    "offer_id": str(offer_id),
+                    "offer_code": offer.code,
+                    "offer_name": offer.name,
+                    "currency": intent.currency,
+                    "requested_amount": str(intent.requested_amount),
+                    "allocated_amount": str(allocated),
+                    "allocation_batch_id": str(batch.batch_id),
+                },
+            )
+            postings.append(investment_lock_posting(
+                user_id=intent.user_id,
+                currency=intent.currency,
+                amount=allocated,
+                available_account_id=available_account_id,
+                locked_account_id=accounts[AccountType.WALLET_LOCKED.value],
+                available_balance=available_balance,
+                transaction_id=transaction.id,
+                reason=f"Investment in offer {offer.code}",
+            ))
+            intent.allocated_amount = allocated
+            confirmed.append((intent, transaction))
+
+    if confirmed:
+        db.add_all([transaction for _, transaction in confirmed])
+        operations = post_ledger_operations(db, postings)
+
+        wallet_locks = []
+        for (intent, transaction), operation in zip(confirmed, operations):
+            # Every Operation of these new Transactions is in hand: compute status without re-reading
+            transaction.status = compute_transaction_status(transaction.type, [operation])
+            intent.status = InvestmentIntentStatus.CONFIRMED
+            intent.operation_id = operation.id
+            wallet_locks.append(WalletLock(
+                user_id=intent.user_id,
+                currency=intent.currency,
+                amount=intent.allocated_amount,
+                reason=LockReason.OFFER_INVEST.value,
+                reference_type=ReferenceType.OFFER.value,
+                reference_id=offer_id,
+                status=LockStatus.ACTIVE.value,
+                intent_id=intent.id,
+                operation_id=operation.id,
+            ))
+            batch.confirmed += 1
+            batch.allocated_amount += intent.allocated_amount
+        db.add_all(wallet_locks)
+
+        db.execute(
+            update(Offer)
+            .where(Offer.id == offer_id)
+            .values(
+                invested_amount=Offer.invested_amount + batch.allocated_amount,
+                committed_amount=Offer.invested_amount + batch.allocated_amount  # Keep in sync
+            )
+        )
+
+    for intent in intents:
+        intent.allocation_batch_id = batch.batch_id
+        batch.decided.append(intent.id)
+        if intent.callback_url:
+            batch.callbacks.append(intent.id)
+    db.flush()
+
+    logger.info(
+        f"Allocated batch of {len(intents)} queued intent(s) for offer {offer.code}",
+        extra=batch.summary(),
+    )
+    return batch
+
+
+def drain_offer_allocation_queue(db: Session, offer_id: UUID, *, max_batches: Optional[int] = None) -> List[AllocationBatch]:
+    """
+    Allocate batches until the offer's queue is empty (or max_batches is reached).
+
+    Commits after each batch; callbacks of decided intents are enqueued after
+    the commit when OFFER_ALLOCATION_ASYNC is enabled.
+    """
+    batches = []
+    while max_batches is None or len(batches) < max_batches:
+        try:
+            batch = allocate_offer_batch(db, offer_id)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if not batch.decided:
+            break
+        batches.append(batch)
+        if batch.callbacks and get_settings().OFFER_ALLOCATION_ASYNC:
+            _enqueue_callbacks(batch.callbacks)
+    return batches
+
+
+def list_offers_with_stale_intents(db: Session, *, stale_after_seconds: Optional[int] = None) -> List[UUID]:
+    """Offers whose oldest queued PENDING intent has waited longer than stale_after_seconds."""
+    if stale_after_seconds is None:
+        stale_after_seconds = get_settings().OFFER_ALLOCATION_STALE_SECONDS
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after_seconds)
+    rows = db.query(InvestmentIntent.offer_id).filter(
+        InvestmentIntent.status == InvestmentIntentStatus.PENDING,
+        InvestmentIntent.queue_position.isnot(None),
+    ).group_by(InvestmentIntent.offer_id).having(
+        func.min(InvestmentIntent.created_at) < cutoff
+    ).all()
+    return [row[0] for row in rows]
+
+
+def count_queued_intents(db: Session, offer_id: UUID) -> int:
+    """Queued intents of the offer still waiting for allocation."""
+    return db.query(func.count(InvestmentIntent.id)).filter(
+        InvestmentIntent.offer_id == offer_id,
+        InvestmentIntent.status == InvestmentIntentStatus.PENDING,
+        InvestmentIntent.queue_position.isnot(None),
+    ).scalar()
+
+
+def _enqueue_callbacks(intent_ids: List[UUID]) -> None:
+    from rq import Queue, Retry
+    from app.infrastructure.redis_client import get_rq_redis
+
+    try:
+        queue = Queue(get_settings().OFFER_ALLOCATION_QUEUE, connection=get_rq_redis())
+        for intent_id in intent_ids:
+            queue.enqueue(DELIVER_CALLBACK_JOB, str(intent_id), retry=Retry(max=3, interval=[10, 60, 300]))
+    except Exception as e:
+        # Decisions are committed: clients still get them by polling
+        logger.warning(f"Failed to enqueue investment callbacks: {type(e).__name__}: {str(e)}")
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Callbacks go to the allowlisted host only: redirects fail the delivery."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def intent_callback_payload(intent: InvestmentIntent) -> Dict[str, Optional[str]]:
+    """JSON body sent to the intent's callback_url."""
+    return {
+        "investment_id": str(intent.id),
+        "offer_id": str(intent.offer_id),
+        "status": intent.status.value,
+        "requested_amount": str(intent.requested_amount),
+        "accepted_amount": str(intent.allocated_amount),
+        "currency": intent.currency,
+        "rejection_reason": intent.rejection_reason,
+        "queue_position": str(intent.queue_position) if intent.queue_position is not None else None,
+        "allocation_batch_id": str(intent.allocation_batch_id) if intent.allocation_batch_id else None,
+    }
+
+
+def deliver_intent_callback(db: Session, intent_id: UUID) -> bool:
+    """
+    POST the decided intent to its callback_url (signed with INVESTMENT_CALLBACK_SECRET).
+
+    Raises on delivery failure (the RQ job retries). Returns False if there is nothing to send.
+    """
+    settings = get_settings()
+    intent = db.query(InvestmentIntent).filter(InvestmentIntent.id == intent_id).first()
+    if intent is None or not intent.callback_url or intent.status == InvestmentIntentStatus.PENDING:
+        return False
+    # Re-checked at delivery: the allowlist (or the secret) may have changed since intake
+    validate_callback_url(intent.callback_url)
+
+    body = json.dumps(intent_callback_payload(intent)).encode("utf-8")
+    signature = hmac.new(settings.INVESTMENT_CALLBACK_SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    headers = {"Content-Type": "application/json", "X-Signature": f"sha256={signature}"}
+
+    request = urllib.request.Request(intent.callback_url, data=body, headers=headers, method="POST")
+    opener = urllib.request.build_opener(_NoRedirect)
+    with opener.open(request, timeout=settings.INVESTMENT_CALLBACK_TIMEOUT_SECONDS) as response:
+        if response.status >= 300:
+            raise RuntimeError(f"Callback for intent {intent_id} returned HTTP {response.status}")
+    return True
@@ -0,0 +1,269 @@
+"""
+Offer capacity shards - Concurrent capacity reservations for hot offer launches
+
+By default invest_in_offer_v1_1 serializes investors on SELECT ... FOR UPDATE
+of the offer row, held across the whole ledger posting. A sharded offer
+splits its remaining capacity over N offer_capacity_shards rows instead:
+
+- investors take FOR SHARE on the offer row (status / currency stay stable,
+  investors do not block each other) and reserve from shards, starting at a
+  home shard derived from user_id, so concurrent investors mostly lock
+  different rows
+- reserved_amount <= capacity (CHECK constraint) on every shard, and
+  invested_amount + SUM(capacity) == max_amount: the offer can not be overfilled
+- fold_capacity_shards() moves the reservations into offers.invested_amount
+  and re-splits the remaining capacity evenly (scripts/run_offer_capacity_fold.py,
+  every minute while shards exist; admin pause/close fold synchronously)
+
+Reservation never waits while holding a shard lock: a first pass takes
+shards with FOR UPDATE SKIP LOCKED. Only when that pass falls short while
+other shards are locked, it is rolled back (SAVEPOINT, releasing its locks)
+and a second pass locks every shard with capacity in shard_no order, which
+waits for in-flight investors and sees exactly what is left. Lock order:
+offer row, then shards - deadlock-free.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_DOWN
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.offers.models import Offer, OfferCapacityShard
+
+logger = logging.getLogger(__name__)
+
+AMOUNT_QUANTUM = Decimal("0.00000001")  # Numeric(24, 8)
+
+
+class CapacityShardError(Exception):
+    """Raised when an offer can not be (re)sharded"""
+    pass
+
+
+@dataclass
+class CapacityReservation:
+    """Capacity taken from shards by one investment (not committed yet)"""
+    offer_id: UUID
+    allocated: Decimal = Decimal("0")
+    shards: Dict[UUID, Decimal] = field(default_factory=dict)  # shard id -> amount taken
+
+
+def split_capacity(remaining: Decimal, shard_count: int) -> List[Decimal]:
+    """Split remaining into shard_count parts (8 decimals); the first shard gets the rounding remainder."""
+    if shard_count < 1:
+        return []
+    part = (remaining / shard_count).quantize(AMOUNT_QUANTUM, rounding=ROUND_DOWN)
+    parts = [part] * shard_count
+    parts[0] += remaining - part * shard_count
+    return parts
+
+
+def has_capacity_shards(db: Session, offer_id: UUID) -> bool:
+    """True if investments in this offer reserve from capacity shards."""
+    return db.query(
+        select(OfferCapacityShard.id).where(OfferCapacityShard.offer_id == offer_id).exists()
+    ).scalar()
+
+
+def shard_remaining(db: Session, offer_id: UUID) -> Decimal:
+    """Capacity left across the shards (as seen by this transaction)."""
+    remaining = db.query(
+        func.coalesce(func.sum(OfferCapacityShard.capacity - OfferCapacityShard.reserved_amount), 0)
+    ).filter(OfferCapacityShard.offer_id == offer_id).scalar()
+    return max(Decimal(str(remaining)), Decimal("0"))
+
+
+def _open_shards(offer_id: UUID, exclude: Dict[UUID, Decimal]) -> List[Any]:
+    """Filter: shards of the offer with capacity left, except those already taken."""
+    conditions = [
+        OfferCapacityShard.offer_id == offer_id,
+        OfferCapacityShard.reserved_amount < OfferCapacityShard.capacity,
+    ]
+    if exclude:
+        conditions.append(OfferCapacityShard.id.notin_(list(exclude)))
+    return conditions
+
+
+def _take(reservation: CapacityReservation, shard_id: UUID, available: Decimal, amount: Decimal) -> None:
+    take = min(available, amount - reservation.allocated)
+    if take > 0:
+        reservation.shards[shard_id] = reservation.shards.get(shard_id, Decimal("0")) + take
+        reservation.allocated += take
+
+
+def _reserve_skip_locked(db: Session, offer_id: UUID, amount: Decimal, home_shard: int, shard_count: int) -> CapacityReservation:
+    """Pass 1: lock shards one at a time from the home shard on, skipping locked ones."""
+    reservation = CapacityReservation(offer_id=offer_id)
+    while reservation.allocated < amount:
+        row = db.execute(
+            select(OfferCapacityShard.id, OfferCapacityShard.capacity, OfferCapacityShard.reserved_amount)
+            .where(*_open_shards(offer_id, reservation.shards))
+            # Cyclic order starting at the home shard
+            .order_by((OfferCapacityShard.shard_no - home_shard + shard_count) % shard_count)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).first()
+        if row is None:
+            break
+        _take(reservation, row.id, row.capacity - row.reserved_amount, amount)
+    return reservation
+
+
+def _reserve_blocking(db: Session, offer_id: UUID, amount: Decimal) -> CapacityReservation:
+    """Pass 2: lock every shard with capacity in shard_no order (waits for in-flight investors)."""
+    reservation = CapacityReservation(offer_id=offer_id)
+    rows = db.execute(
+        select(OfferCapacityShard.id, OfferCapacityShard.capacity, OfferCapacityShard.reserved_amount)
+        .where(*_open_shards(offer_id, {}))
+        .order_by(OfferCapacityShard.shard_no)
+        .with_for_update()
+    ).all()
+    for row in rows:
+        if reservation.allocated >= amount:
+            break
+        _take(reservation, row.id, row.capacity - row.reserved_amount, amount)
+    return reservation
+
+
+def reserve_capacity(db: Session, offer_id: UUID, amount: Decimal, *, home_key: UUID) -> CapacityReservation:
+    """
+    Reserve up to amount from the offer's shards (partial if less is left).
+
+    The caller must hold FOR SHARE (or FOR UPDATE) on the offer row.
+    NO COMMIT - the shard locks are held until the caller commits.
+
+    Returns:
+        CapacityReservation (allocated == 0 when the offer is full)
+    """
+    shard_count = db.query(func.count(OfferCapacityShard.id)).filter(
+        OfferCapacityShard.offer_id == offer_id
+    ).scalar()
+    if not shard_count:
+        return CapacityReservation(offer_id=offer_id)
+
+    home_shard = home_key.int % shard_count
+    savepoint = db.begin_nested()
+    reservation = _reserve_skip_locked(db, offer_id, amount, home_shard, shard_count)
+
+    if reservation.allocated < amount:
+        # Short: is capacity left in shards locked by other investors?
+        locked_with_capacity = db.query(OfferCapacityShard.id).filter(
+            *_open_shards(offer_id, reservation.shards)
+        ).first() is not None
+        if locked_with_capacity:
+            savepoint.rollback()  # Release pass 1 locks before waiting
+            reservation = _reserve_blocking(db, offer_id, amount)
+            savepoint = None
+
+    for shard_id, take in reservation.shards.items():
+        db.execute(
+            update(OfferCapacityShard)
+            .where(OfferCapacityShard.id == shard_id)
+            .values(reserved_amount=OfferCapacityShard.reserved_amount + take)
+        )
+    if savepoint is not None:
+        savepoint.commit()
+    return reservation
+
+
+def release_capacity(db: Session, reservation: CapacityReservation) -> None:
+    """
+    Give back a reservation of the current transaction (e.g. the investor's
+    funds were insufficient). The shard locks are still held.
+
+    NO COMMIT - caller must commit.
+    """
+    for shard_id, take in reservation.shards.items():
+        db.execute(
+            update(OfferCapacityShard)
+            .where(OfferCapacityShard.id == shard_id)
+            .values(reserved_amount=OfferCapacityShard.reserved_amount - take)
+        )
+    reservation.shards = {}
+    reservation.allocated = Decimal("0")
+
+
+def fold_capacity_shards(db: Session, offer_id: UUID, *, shard_count: Optional[int] = None) -> Dict[str, str]:
+    """
+    Fold reservations into offers.invested_amount and re-split the remaining
+    capacity over shard_count shards (default: keep the current count; 0
+    removes the shards and returns the offer to row locking).
+
+    Locks the offer row (FOR UPDATE: waits for in-flight investors) and then
+    every shard. NO COMMIT - caller must commit.
+
+    Returns:
+        Summary with folded amount, invested_amount and shard count
+    """
+    offer = db.execute(select(Offer).where(Offer.id == offer_id).with_for_update()).scalar_one_or_none()
+    if offer is None:
+        raise CapacityShardError(f"Offer {offer_id} not found")
+
+    shards = db.execute(
+        select(OfferCapacityShard)
+        .where(OfferCapacityShard.offer_id == offer_id)
+        .order_by(OfferCapacityShard.shard_no)
+        .with_for_update()
+    ).scalars().all()
+
+    folded = sum((shard.reserved_amount for shard in shards), Decimal("0"))
+    if folded:
+        db.execute(
+            update(Offer)
+            .where(Offer.id == offer_id)
+            .values(
+                invested_amount=Offer.invested_amount + folded,
+                committed_amount=Offer.invested_amount + folded  # Keep in sync
+            )
+        )
+        db.flush()
+        db.refresh(offer)
+
+    target = len(shards) if shard_count is None else shard_count
+    if target < 0:
+        raise CapacityShardError("shard_count must be >= 0")
+
+    capacities = split_capacity(offer.max_amount - offer.invested_amount, target)
+    for shard in shards[target:]:
+        db.delete(shard)
+    for shard_no, capacity in enumerate(capacities):
+        if shard_no < len(shards):
+            shards[shard_no].capacity = capacity
+            shards[shard_no].reserved_amount = Decimal("0")
+        else:
+            db.add(OfferCapacityShard(offer_id=offer_id, shard_no=shard_no, capacity=capacity, reserved_amount=Decimal("0")))
+    db.flush()
+
+    if folded:
+        logger.info(
+            f"Folded {folded} of capacity reservations into offer {offer.code}",
+            extra={"offer_id": str(offer_id), "folded": str(folded), "shards": target},
+        )
+    return {
+        "offer_id": str(offer_id),
+        "folded_amount": str(folded),
+        "invested_amount": str(offer.invested_amount),
+        "shard_count": str(target),
+    }
+
+
+def fold_all_capacity_shards(db: Session) -> List[Dict[str, str]]:
+    """
+    Fold every sharded offer, one offer per transaction.
+
+    Commits after each offer.
+    """
+    offer_ids = [row[0] for row in db.query(OfferCapacityShard.offer_id).distinct().all()]
+    results = []
+    for offer_id in offer_ids:
+        try:
+            results.append(fold_capacity_shards(db, offer_id))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return results
@@ -182,9 +182,10 @@ def invest_in_offer(
                 amount=accepted,
                 transaction_id=transaction.id,  # Link operation to transaction
                 reason=f"Investment in offer {offer.code}",
+                commit=False,  # Keep the offer row lock until the caller commits
             )
             # Recompute transaction status (should be LOCKED now)
-            recompute_transaction_status(db=db, transaction_id=transaction.id)
+            recompute_transaction_status(db=db, transaction_id=transaction.id, commit=False)
         except InsufficientBalanceError as e:
             # Update transaction status to FAILED
             transaction.status = TransactionStatus.FAILED
@@ -10,6 +10,9 @@ Business Rules:
 2. Concurrency safety (CRITICAL):
    - Use SELECT ... FOR UPDATE on Offer row
    - Investment decision must be atomic
+   - Sharded offers (hot launches): SELECT ... FOR SHARE on Offer row and
+     reserve from capacity shards instead (app/services/offers/capacity_shards.py);
+     offers.invested_amount then lags until the shards are folded
 
 3. Allocation logic:
    - If requested_amount <= remaining_amount: allocate full requested_amount
@@ -28,12 +31,18 @@ Business Rules:
 from decimal import Decimal
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import select, update
+from sqlalchemy import func, select, update
 
 from app.core.offers.models import Offer, InvestmentIntent, OfferStatus, InvestmentIntentStatus
 from app.core.ledger.models import Operation, OperationType
 from app.core.transactions.models import Transaction, TransactionType, TransactionStatus
 from app.services.fund_services import lock_funds_for_investment, InsufficientBalanceError, ValidationError
+from app.services.offers.capacity_shards import (
+    has_capacity_shards,
+    release_capacity,
+    reserve_capacity,
+    shard_remaining,
+)
 from app.services.transaction_engine import recompute_transaction_status
 
 
@@ -68,6 +77,16 @@ class OfferClosedError(Exception):
     pass
 
 
+def _lock_offer(db: Session, offer_id: UUID, *, shared: bool) -> Offer | None:
+    """SELECT offer FOR UPDATE (exclusive) or FOR SHARE (sharded capacity)."""
+    return db.execute(
+        select(Offer)
+        .where(Offer.id == offer_id)
+        .with_for_update(read=shared)
+        .execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+
+
 def invest_in_offer_v1_1(
     *,
     db: Session,
@@ -122,24 +141,39 @@ def invest_in_offer_v1_1(
     if amount <= 0:
         raise ValidationError("Amount must be greater than 0")
     
-    # Lock offer row for update FIRST (concurrency-safe)
-    offer = db.execute(
-        select(Offer)
-        .where(Offer.id == offer_id)
-        .with_for_update()
-    ).scalar_one_or_none()
-    
+    # Lock offer row FIRST (concurrency-safe): FOR UPDATE, or FOR SHARE when
+    # capacity is sharded (investors then serialize per shard, not per offer)
+    sharded = has_capacity_shards(db, offer_id)
+    savepoint = db.begin_nested()
+    offer = _lock_offer(db, offer_id, shared=sharded)
+
+    # (Un)sharding takes FOR UPDATE on the offer: re-check under our lock
+    if offer and has_capacity_shards(db, offer_id) != sharded:
+        if sharded:
+            # Unsharded meanwhile. Upgrading FOR SHARE to FOR UPDATE deadlocks
+            # two investors doing the same: release the share lock first
+            savepoint.rollback()
+            savepoint = None
+            offer = _lock_offer(db, offer_id, shared=False)
+        # FOR UPDATE serves both paths, re-check under it
+        sharded = has_capacity_shards(db, offer_id)
+    if savepoint is not None:
+        savepoint.commit()
+
     if not offer:
         raise OfferNotFoundError(f"Offer {offer_id} not found")
     
     # Check idempotency AFTER lock (within same transaction)
     if idempotency_key:
+        if sharded:
+            # FOR SHARE does not serialize investors: serialize retries of one key instead
+            db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(idempotency_key, 0))))
         existing_intent = db.query(InvestmentIntent).filter(
             InvestmentIntent.idempotency_key == idempotency_key
         ).first()
         if existing_intent:
             # Return existing intent + compute remaining_after
-            remaining_after = offer.max_amount - offer.invested_amount
+            remaining_after = shard_remaining(db, offer_id) if sharded else offer.max_amount - offer.invested_amount
             return existing_intent, max(remaining_after, Decimal('0'))
     
     # Validate offer status
@@ -189,7 +223,13 @@ def invest_in_offer_v1_1(
         raise OfferCurrencyMismatchError(f"Offer currency {offer.currency} does not match request {currency}")
     
     # Compute remaining capacity (while holding lock)
-    remaining = offer.max_amount - offer.invested_amount
+    reservation = None
+    if sharded:
+        # Reserve from the shards (locks only the shards taken from)
+        reservation = reserve_capacity(db, offer_id, amount, home_key=user_id)
+        remaining = reservation.allocated
+    else:
+        remaining = offer.max_amount - offer.invested_amount
     
     # Ensure remaining >= 0 (should never be negative due to constraints, but double-check)
     if remaining < 0:
@@ -248,9 +288,10 @@ def invest_in_offer_v1_1(
                 amount=allocated,
                 transaction_id=transaction.id,
                 reason=f"Investment in offer {offer.code}",
+                commit=False,  # Keep the offer row lock until the caller commits
             )
             # Recompute transaction status (should be LOCKED now)
-            recompute_transaction_status(db=db, transaction_id=transaction.id)
+            recompute_transaction_status(db=db, transaction_id=transaction.id, commit=False)
             
             # Update intent to CONFIRMED
             intent.status = InvestmentIntentStatus.CONFIRMED
@@ -281,22 +322,27 @@ def invest_in_offer_v1_1(
                 db.add(wallet_lock)
                 db.flush()
             
-            # Update offer.invested_amount atomically (while still holding lock)
-            # Use SQL UPDATE to prevent lost updates in concurrent scenarios
-            db.execute(
-                update(Offer)
-                .where(Offer.id == offer_id)
-                .values(
-                    invested_amount=Offer.invested_amount + allocated,
-                    committed_amount=Offer.invested_amount + allocated  # Keep in sync
+            # Sharded: the reservation is folded into invested_amount later
+            if not sharded:
+                # Update offer.invested_amount atomically (while still holding lock)
+                # Use SQL UPDATE to prevent lost updates in concurrent scenarios
+                db.execute(
+                    update(Offer)
+                    .where(Offer.id == offer_id)
+                    .values(
+                        invested_amount=Offer.invested_amount + allocated,
+                        committed_amount=Offer.invested_amount + allocated  # Keep in sync
+                    )
                 )
-            )
-            db.flush()
-            
-            # Refresh offer object to get updated invested_amount
-            db.refresh(offer)
+                db.flush()
+                
+                # Refresh offer object to get updated invested_amount
+                db.refresh(offer)
             
         except InsufficientBalanceError as e:
+            # Give the reserved capacity back (the intent is committed as REJECTED)
+            if reservation is not None:
+                release_capacity(db, reservation)
             # Update transaction status to FAILED
             transaction.status = TransactionStatus.FAILED
             db.flush()
@@ -313,7 +359,7 @@ def invest_in_offer_v1_1(
         db.flush()
     
     # Compute remaining_after for response
-    remaining_after = offer.max_amount - offer.invested_amount
+    remaining_after = shard_remaining(db, offer_id) if sharded else offer.max_amount - offer.invested_amount
     remaining_after = max(remaining_after, Decimal('0'))  # Ensure >= 0
     
     # Note: Caller MUST commit the transaction
@@ -0,0 +1,151 @@
+"""
+Presigned GET URL cache - (object key, expiry bucket) -> presigned URL
+
+Signing is deterministic only for a given signing time, so URLs are reused
+per expiry bucket: time is cut into buckets of
+    S3_PRESIGN_EXPIRES_SECONDS - S3_PRESIGN_MIN_REMAINING_SECONDS
+and the first URL signed for a key in a bucket is served until the bucket
+ends. A served URL is therefore always valid for at least
+S3_PRESIGN_MIN_REMAINING_SECONDS, and every replica hands out the same URL
+for a whole bucket, so browsers and CDNs can cache the media.
+
+- L1: in-process LRU, entries expire with their bucket
+- L2: Redis, shared by every replica (key: presign:get:{expires_in}:{bucket}:{object key})
+
+Under run_db (a catalog response built on the event loop), Redis commands
+await redis.asyncio instead of blocking the loop (get_redis_for_sync_code).
+
+Redis is optional for correctness: any Redis error is treated as a miss and
+the URL is signed locally.
+"""
+
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.infrastructure.settings import get_settings
+from app.utils.local_cache import TTLLRUCache
+
+logger = logging.getLogger(__name__)
+
+_REDIS_KEY_PREFIX = "presign:get"
+
+# (expires_in, bucket index, object key)
+PresignKey = Tuple[int, int, str]
+
+
+def _redis_key(key: PresignKey) -> str:
+    expires_in, bucket, object_key = key
+    return f"{_REDIS_KEY_PREFIX}:{expires_in}:{bucket}:{object_key}"
+
+
+class PresignedUrlCache:
+    """Two-tier (local LRU + Redis) cache of presigned GET URLs"""
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self.local: TTLLRUCache[str] = TTLLRUCache(
+            maxsize=settings.S3_PRESIGN_CACHE_SIZE,
+            ttl_seconds=settings.S3_PRESIGN_EXPIRES_SECONDS,
+        )
+
+    def bucket_seconds(self, expires_in: int) -> int:
+        """Reuse period of a URL valid for expires_in seconds (0: caching disabled)."""
+        settings = get_settings()
+        if not settings.S3_PRESIGN_CACHE_ENABLED:
+            return 0
+        return max(0, expires_in - settings.S3_PRESIGN_MIN_REMAINING_SECONDS)
+
+    def _keys(self, object_keys: Iterable[str], expires_in: int, now: float) -> Tuple[Dict[str, PresignKey], float]:
+        """Cache keys of the current bucket and the seconds left in it."""
+        period = self.bucket_seconds(expires_in)
+        bucket = int(now // period)
+        remaining = (bucket + 1) * period - now
+        return {object_key: (expires_in, bucket, object_key) for object_key in object_keys}, remaining
+
+    def _redis(self):
+        if not get_settings().S3_PRESIGN_CACHE_REDIS_ENABLED:
+            return None
+        from app.infrastructure.redis_client import get_redis_for_sync_code
+        return get_redis_for_sync_code()
+
+    def get_many(self, object_keys: Iterable[str], expires_in: int) -> Dict[str, str]:
+        """Cached URLs of the current bucket for the keys that are known (local first, then one Redis MGET)."""
+        if self.bucket_seconds(expires_in) <= 0:
+            return {}
+        keys, remaining = self._keys(object_keys, expires_in, time.time())
+
+        found: Dict[str, str] = {}
+        remote: List[str] = []
+        for object_key, key in keys.items():
+            url = self.local.get(key)
+            if url is not None:
+                found[object_key] = url
+            else:
+                remote.append(object_key)
+
+        client = self._redis()
+        if not remote or client is None:
+            return found
+
+        try:
+            values = client.mget([_redis_key(keys[object_key]) for object_key in remote])
+        except Exception as e:
+            logger.warning(f"Presigned URL cache: Redis read failed, signing locally: {e}")
+            return found
+
+        for object_key, url in zip(remote, values):
+            if url is None:
+                continue
+            self.local.set(keys[object_key], url, ttl_seconds=remaining)
+            found[object_key] = url
+        return found
+
+    def get(self, object_key: str, expires_in: int) -> Optional[str]:
+        return self.get_many([object_key], expires_in).get(object_key)
+
+    def put_many(self, urls: Dict[str, str], expires_in: int) -> None:
+        """Cache URLs signed now for the rest of the current bucket, in both tiers."""
+        if not urls or self.bucket_seconds(expires_in) <= 0:
+            return
+        keys, remaining = self._keys(urls, expires_in, time.time())
+        for object_key, url in urls.items():
+            self.local.set(keys[object_key], url, ttl_seconds=remaining)
+
+        client = self._redis()
+        if client is None:
+            return
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for object_key, url in urls.items():
+                # SET NX: the first URL of the bucket wins, replicas converge on it
+                pipe.set(_redis_key(keys[object_key]), url, nx=True, px=max(1, int(remaining * 1000)))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Presigned URL cache: Redis write failed: {e}")
+
+    def clear(self) -> None:
+        """Clear the local tier (Redis entries expire on their own)."""
+        self.local.clear()
+
+
+presigned_url_cache = PresignedUrlCache()
+
+
+def presign_epoch(expires_in: Optional[int] = None, now: Optional[float] = None) -> Tuple[int, float]:
+    """
+    (index, start time) of the current URL epoch: within an epoch, presigned
+    URLs of a key are stable and stay valid until the epoch ends (with the
+    cache disabled, epochs are half the URL lifetime). Conditional GETs must
+    revalidate across epochs.
+    """
+    expires_in = expires_in or get_settings().S3_PRESIGN_EXPIRES_SECONDS
+    period = presigned_url_cache.bucket_seconds(expires_in) or max(1, expires_in // 2)
+    index = int((time.time() if now is None else now) // period)
+    return index, float(index * period)
+
+
+def clear_presigned_url_cache() -> None:
+    """Invalidate the local tier (e.g. after changing storage settings)."""
+    presigned_url_cache.clear()
@@ -4,12 +4,13 @@ S3/R2 Storage Service - Handles presigned URLs and object operations
 
 import boto3
 from botocore.exceptions import ClientError
-from typing import Optional
+from typing import Dict, Iterable, Optional
 from uuid import UUID
 from datetime import timedelta
 from app.infrastructure.settings import get_settings
 from app.services.storage.storage_client import assert_configured, create_s3_client
 from app.services.storage.exceptions import StorageNotConfiguredError
+from app.services.storage.presign_cache import presigned_url_cache
 
 
 class S3Service:
@@ -79,6 +80,9 @@ class S3Service:
         """
         Generate a presigned GET URL for downloading a file
         
+        URLs are reused per expiry bucket (see presign_cache): the returned
+        URL stays valid for at least S3_PRESIGN_MIN_REMAINING_SECONDS.
+        
         Args:
             key: S3 object key (full path)
             expires_in: Expiration time in seconds (defaults to S3_PRESIGN_EXPIRES_SECONDS)
@@ -86,6 +90,27 @@ class S3Service:
         Returns:
             Presigned GET URL
         
+        Raises:
+            StorageNotConfiguredError: If S3 is not configured
+            ValueError: If boto3 fails
+        """
+        return self.generate_presigned_get_urls([key], expires_in=expires_in)[key]
+    
+    def generate_presigned_get_urls(
+        self,
+        keys: Iterable[str],
+        expires_in: Optional[int] = None,
+    ) -> Dict[str, str]:
+        """
+        Generate presigned GET URLs for several files (one cache lookup for all keys)
+        
+        Args:
+            keys: S3 object keys (full paths)
+            expires_in: Expiration time in seconds (defaults to S3_PRESIGN_EXPIRES_SECONDS)
+        
+        Returns:
+            {key: presigned GET URL}
+        
         Raises:
             StorageNotConfiguredError: If S3 is not configured
             ValueError: If boto3 fails
@@ -94,7 +119,16 @@ class S3Service:
         assert_configured(self.settings)
         
         expires_in = expires_in or self.settings.S3_PRESIGN_EXPIRES_SECONDS
+        keys = list(dict.fromkeys(keys))
         
+        urls = presigned_url_cache.get_many(keys, expires_in)
+        signed = {key: self._sign_get_url(key, expires_in) for key in keys if key not in urls}
+        presigned_url_cache.put_many(signed, expires_in)
+        urls.update(signed)
+        return urls
+    
+    def _sign_get_url(self, key: str, expires_in: int) -> str:
+        """Sign a GET URL (local HMAC, no network call)."""
         try:
             url = self.client.generate_presigned_url(
                 'get_object',
@@ -0,0 +1,155 @@
+"""
+System account registry - Process-wide cache of system account ids
+
+System accounts (user_id=None: INTERNAL_OMNIBUS, offer pools, vault pools) are
+created once and never change, yet every fund movement used to look them up.
+The registry maps (account_type, currency, vault_id, offer_id) -> account_id:
+- warmed at startup with one query (warm_system_account_registry)
+- filled on a miss by get-or-create (get_or_create_system_account_id)
+
+Safety:
+- an id is cached only once its row is committed: accounts created by a
+  session are kept on that session until it commits, and dropped on any
+  rollback (app/utils/session_pending.py)
+- clear_system_account_registry() must be called whenever the database is
+  reset (test fixtures, migrations run in-process)
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy.orm import Session
+
+from app.core.accounts.models import Account, AccountType
+from app.utils.session_pending import add_pending, get_pending, register_pending_namespace
+
+SystemAccountKey = Tuple[AccountType, str, Optional[UUID], Optional[UUID]]
+
+_PENDING_KEY = "system_accounts_pending"
+
+
+class SystemAccountRegistry:
+    """Thread-safe (account_type, currency, vault_id, offer_id) -> account_id map"""
+
+    def __init__(self) -> None:
+        self._ids: Dict[SystemAccountKey, UUID] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: SystemAccountKey) -> Optional[UUID]:
+        return self._ids.get(key)
+
+    def put(self, key: SystemAccountKey, account_id: UUID) -> None:
+        with self._lock:
+            self._ids[key] = account_id
+
+    def update(self, ids: Dict[SystemAccountKey, UUID]) -> None:
+        with self._lock:
+            self._ids.update(ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+system_account_registry = SystemAccountRegistry()
+
+
+def system_account_key(
+    account_type: AccountType,
+    currency: str,
+    *,
+    vault_id: Optional[UUID] = None,
+    offer_id: Optional[UUID] = None,
+) -> SystemAccountKey:
+    """Build a registry key"""
+    return (account_type, currency, vault_id, offer_id)
+
+
+def get_or_create_system_account_id(
+    db: Session,
+    account_type: AccountType,
+    currency: str,
+    *,
+    vault_id: Optional[UUID] = None,
+    offer_id: Optional[UUID] = None,
+) -> UUID:
+    """
+    Get (or create) a system account id, served from the registry when known.
+
+    A miss costs one SELECT (plus one INSERT on first use); the result is cached
+    for the lifetime of the process.
+
+    Created accounts are flushed, not committed - caller owns the transaction.
+
+    Returns:
+        UUID: Account ID
+    """
+    key = system_account_key(account_type, currency, vault_id=vault_id, offer_id=offer_id)
+
+    account_id = system_account_registry.get(key)
+    if account_id is not None:
+        return account_id
+
+    pending = get_pending(db, _PENDING_KEY)
+    if key in pending:
+        return pending[key]
+
+    query = db.query(Account.id).filter(
+        Account.account_type == account_type,
+        Account.currency == currency,
+        Account.user_id.is_(None),  # System account
+    )
+    query = query.filter(Account.vault_id == vault_id) if vault_id is not None else query.filter(Account.vault_id.is_(None))
+    query = query.filter(Account.offer_id == offer_id) if offer_id is not None else query.filter(Account.offer_id.is_(None))
+    # Oldest row wins if concurrent first uses ever created duplicates
+    account_id = query.order_by(Account.created_at).limit(1).scalar()
+
+    if account_id is not None:
+        system_account_registry.put(key, account_id)
+        return account_id
+
+    account = Account(
+        id=uuid4(),
+        user_id=None,  # System account (no user)
+        currency=currency,
+        account_type=account_type,
+        vault_id=vault_id,
+        offer_id=offer_id,
+    )
+    db.add(account)
+    db.flush()
+
+    # Cached once committed
+    add_pending(db, _PENDING_KEY, key, account.id)
+    return account.id
+
+
+def warm_system_account_registry(db: Session) -> int:
+    """
+    Load every existing system account into the registry (one query).
+
+    Returns:
+        Number of registry entries
+    """
+    rows = db.query(
+        Account.id, Account.account_type, Account.currency, Account.vault_id, Account.offer_id,
+    ).filter(Account.user_id.is_(None)).order_by(Account.created_at.desc()).all()
+
+    # Newest first, so the oldest row of a duplicated key is the one kept
+    system_account_registry.update({
+        system_account_key(row.account_type, row.currency, vault_id=row.vault_id, offer_id=row.offer_id): row.id
+        for row in rows
+    })
+    return len(system_account_registry)
+
+
+def clear_system_account_registry() -> None:
+    """Invalidate the registry (call after the database has been reset)."""
+    system_account_registry.clear()
+
+
+register_pending_namespace(_PENDING_KEY, system_account_registry.update)
@@ -3,13 +3,19 @@ System wallet helpers - Ensure system wallets exist for Offers and Vaults
 
 System wallets are accounts with user_id=None, scoped by offer_id or vault_id.
 They have 3 buckets: AVAILABLE, LOCKED, BLOCKED.
+
+Bucket account ids are served from the system account registry
+(app/services/system_accounts.py) after first use.
 """
 from decimal import Decimal
-from typing import Dict
+from typing import Dict, Iterable, Tuple
 from uuid import UUID
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 from app.core.accounts.models import Account, AccountType
-from app.services.wallet_helpers import get_account_balance
+from app.core.ledger.balances import AccountBalance
+from app.services.system_accounts import get_or_create_system_account_id
+from app.services.wallet_helpers import get_account_balances
 
 
 def get_or_create_offer_pool_account(
@@ -38,30 +44,7 @@ def get_or_create_offer_pool_account(
     ]:
         raise ValueError(f"Invalid bucket_account_type for offer pool: {bucket_account_type}")
     
-    # Find existing account
-    account = db.query(Account).filter(
-        Account.account_type == bucket_account_type,
-        Account.offer_id == offer_id,
-        Account.currency == currency,
-        Account.user_id.is_(None),  # System account
-        Account.vault_id.is_(None),  # Not a vault account
-    ).first()
-    
-    if account:
-        return account.id
-    
-    # Create new account
-    account = Account(
-        user_id=None,  # System account
-        currency=currency,
-        account_type=bucket_account_type,
-        offer_id=offer_id,
-        vault_id=None,
-    )
-    db.add(account)
-    db.flush()  # Flush to get the ID
-    
-    return account.id
+    return get_or_create_system_account_id(db, bucket_account_type, currency, offer_id=offer_id)
 
 
 def ensure_offer_system_wallet(
@@ -133,30 +116,7 @@ def get_or_create_vault_pool_account(
     ]:
         raise ValueError(f"Invalid account_type for vault pool: {account_type}")
     
-    # Find existing account
-    account = db.query(Account).filter(
-        Account.account_type == account_type,
-        Account.vault_id == vault_id,
-        Account.currency == currency,
-        Account.user_id.is_(None),  # System account
-        Account.offer_id.is_(None),  # Not an offer account
-    ).first()
-    
-    if account:
-        return account.id
-    
-    # Create new account
-    account = Account(
-        user_id=None,  # System account
-        currency=currency,
-        account_type=account_type,
-        vault_id=vault_id,
-        offer_id=None,
-    )
-    db.add(account)
-    db.flush()  # Flush to get the ID
-    
-    return account.id
+    return get_or_create_system_account_id(db, account_type, currency, vault_id=vault_id)
 
 
 def ensure_vault_system_wallet(
@@ -226,11 +186,9 @@ def get_offer_system_wallet_balances(
     """
     wallet = ensure_offer_system_wallet(db, offer_id, currency)
     
-    return {
-        "available": get_account_balance(db, wallet["available"]),
-        "locked": get_account_balance(db, wallet["locked"]),
-        "blocked": get_account_balance(db, wallet["blocked"]),
-    }
+    balances = get_account_balances(db, wallet.values())
+    
+    return {bucket: balances[account_id] for bucket, account_id in wallet.items()}
 
 
 def get_vault_system_wallet_balances(
@@ -256,10 +214,81 @@ def get_vault_system_wallet_balances(
     """
     wallet = ensure_vault_system_wallet(db, vault_id, currency)
     
-    return {
-        "available": get_account_balance(db, wallet["available"]),
-        "locked": get_account_balance(db, wallet["locked"]),
-        "blocked": get_account_balance(db, wallet["blocked"]),
-    }
+    balances = get_account_balances(db, wallet.values())
+    
+    return {bucket: balances[account_id] for bucket, account_id in wallet.items()}
+
 
+_POOL_BUCKETS = {
+    AccountType.VAULT_POOL_CASH: "available",
+    AccountType.VAULT_POOL_LOCKED: "locked",
+    AccountType.VAULT_POOL_BLOCKED: "blocked",
+    AccountType.OFFER_POOL_AVAILABLE: "available",
+    AccountType.OFFER_POOL_LOCKED: "locked",
+    AccountType.OFFER_POOL_BLOCKED: "blocked",
+}
 
+
+def get_system_wallet_balances_bulk(
+    db: Session,
+    *,
+    vault_ids: Iterable[UUID] = (),
+    offer_ids: Iterable[UUID] = (),
+) -> Dict[Tuple[UUID, str], Dict[str, Decimal]]:
+    """
+    Get bucket balances for many vault/offer system wallets in one grouped query
+    over the account_balances snapshots.
+    
+    Read-only: buckets that do not exist yet are reported as zero (no get-or-create).
+    
+    Args:
+        db: Database session
+        vault_ids: Vault UUIDs
+        offer_ids: Offer UUIDs
+    
+    Returns:
+        Dict mapping (vault_id or offer_id, currency) to:
+        {
+            "available": Decimal,
+            "locked": Decimal,
+            "blocked": Decimal,
+        }
+        Missing keys mean the wallet has no bucket accounts in that currency.
+    """
+    vault_ids = list(vault_ids)
+    offer_ids = list(offer_ids)
+    if not vault_ids and not offer_ids:
+        return {}
+    
+    scope_filters = []
+    if vault_ids:
+        scope_filters.append(Account.vault_id.in_(vault_ids))
+    if offer_ids:
+        scope_filters.append(Account.offer_id.in_(offer_ids))
+    
+    rows = db.query(
+        Account.vault_id,
+        Account.offer_id,
+        Account.currency,
+        Account.account_type,
+        func.sum(AccountBalance.balance),
+    ).outerjoin(
+        AccountBalance, AccountBalance.account_id == Account.id
+    ).filter(
+        Account.user_id.is_(None),  # System accounts
+        Account.account_type.in_(list(_POOL_BUCKETS.keys())),
+        or_(*scope_filters),
+    ).group_by(
+        Account.vault_id, Account.offer_id, Account.currency, Account.account_type,
+    ).all()
+    
+    result: Dict[Tuple[UUID, str], Dict[str, Decimal]] = {}
+    for vault_id, offer_id, currency, account_type, balance in rows:
+        scope_id = vault_id if account_type.value.startswith("VAULT_POOL_") else offer_id
+        buckets = result.setdefault(
+            (scope_id, currency),
+            {"available": Decimal("0"), "locked": Decimal("0"), "blocked": Decimal("0")},
+        )
+        buckets[_POOL_BUCKETS[account_type]] += Decimal(str(balance)) if balance is not None else Decimal("0")
+    
+    return result
@@ -14,6 +14,7 @@ def recompute_transaction_status(
     *,
     db: Session,
     transaction_id: UUID,
+    commit: bool = True,
 ) -> TransactionStatus:
     """
     Recompute and update Transaction.status based on completed Operations.
@@ -32,6 +33,9 @@ def recompute_transaction_status(
     - Deterministic: Same Operations → same status
     - Side-effect free: Only updates Transaction.status
     
+    commit=False leaves the status change in the caller's transaction
+    (used by the ledger posting path, which commits once at the end).
+    
     Returns the computed TransactionStatus.
     """
     # Load Transaction
@@ -53,11 +57,27 @@ def recompute_transaction_status(
     # Update Transaction.status ONLY if changed
     if transaction.status != computed_status:
         transaction.status = computed_status
-        db.commit()
+        if commit:
+            db.commit()
+        else:
+            db.flush()
     
     return computed_status
 
 
+def compute_transaction_status(
+    transaction_type: TransactionType,
+    operations: list[Operation],
+) -> TransactionStatus:
+    """
+    Compute TransactionStatus from Operations already in hand (no DB access).
+    
+    Same rules as recompute_transaction_status, for callers that created the
+    Transaction and all of its Operations themselves (e.g. bulk ingestion).
+    """
+    return _compute_status(transaction_type, operations)
+
+
 def _compute_status(
     transaction_type: TransactionType,
     operations: list[Operation],
@@ -5,7 +5,8 @@ Vault account helpers
 from decimal import Decimal
 from uuid import UUID
 from sqlalchemy.orm import Session
-from app.core.accounts.models import Account, AccountType
+from app.core.accounts.models import AccountType
+from app.services.system_accounts import get_or_create_system_account_id
 from app.services.wallet_helpers import ensure_wallet_accounts, get_account_balance
 
 
@@ -27,32 +28,12 @@ def get_or_create_vault_pool_cash_account(db: Session, vault_id: UUID, currency:
     Get or create vault pool cash account (VAULT_POOL_CASH account type).
     
     Vault pool accounts are system accounts (user_id=None) with vault_id set.
+    Served from the system account registry after first use.
     
     Returns:
         UUID: Account ID for VAULT_POOL_CASH account
     """
-    # Find existing account
-    account = db.query(Account).filter(
-        Account.account_type == AccountType.VAULT_POOL_CASH,
-        Account.vault_id == vault_id,
-        Account.currency == currency,
-        Account.user_id.is_(None),  # System account
-    ).first()
-    
-    if account:
-        return account.id
-    
-    # Create new vault pool cash account
-    account = Account(
-        user_id=None,  # System account (no user)
-        currency=currency,
-        account_type=AccountType.VAULT_POOL_CASH,
-        vault_id=vault_id,
-    )
-    db.add(account)
-    db.flush()  # Flush to get the ID
-    
-    return account.id
+    return get_or_create_system_account_id(db, AccountType.VAULT_POOL_CASH, currency, vault_id=vault_id)
 
 
 def get_vault_cash_balance(db: Session, vault_id: UUID, currency: str) -> Decimal:
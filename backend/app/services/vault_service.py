@@ -2,22 +2,32 @@
 Vault service - Deposit and withdrawal logic
 """
 
+from dataclasses import dataclass
 from decimal import Decimal
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence, Set, Tuple
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import Numeric, Text, cast, column, select, tuple_, update, values
 from app.core.vaults.models import Vault, VaultAccount, WithdrawalRequest, VaultStatus, WithdrawalRequestStatus
 from app.core.ledger.models import Operation, OperationType, OperationStatus, LedgerEntry, LedgerEntryType
-from app.core.accounts.models import Account
+from app.core.accounts.models import Account, AccountType
+from app.core.accounts.exposures import (
+    VAULT_PRINCIPAL_CURRENCY,
+    apply_exposure_deltas,
+    vault_principal_key,
+)
 from app.core.accounts.wallet_locks import WalletLock, LockReason, ReferenceType, LockStatus
 from app.services.vault_helpers import (
     get_user_wallet_available_account,
     get_or_create_vault_pool_cash_account,
     get_vault_cash_balance,
 )
-from app.services.wallet_helpers import get_account_balance
+from app.infrastructure.settings import get_settings
+from app.services.ledger_posting import LedgerLeg, LedgerPosting, insert_ledger_operations
+from app.services.wallet_helpers import ensure_wallet_accounts_bulk, get_account_balance
+from app.services.wallet_lock_helpers import consume_wallet_locks_fifo
 from app.utils.ledger_validator import validate_double_entry_invariant
 
 
@@ -420,51 +430,13 @@ def request_withdrawal(
         
         # For AVENIR: release wallet_locks proportionally (oldest ACTIVE rows first)
         if vault_code.upper() == "AVENIR":
-            # Get active wallet_locks for this vault + user, ordered by created_at (oldest first)
-            active_locks = db.execute(
-                select(WalletLock)
-                .where(
-                    WalletLock.user_id == user_id,
-                    WalletLock.reference_type == "VAULT",
-                    WalletLock.reference_id == vault.id,
-                    WalletLock.reason == LockReason.VAULT_AVENIR_VESTING.value,
-                    WalletLock.status == LockStatus.ACTIVE.value,
-                )
-                .order_by(WalletLock.created_at)
-                .with_for_update()
-            ).scalars().all()
-            
-            remaining_to_release = amount
-            
-            for lock in active_locks:
-                if remaining_to_release <= 0:
-                    break
-                
-                if lock.amount <= remaining_to_release:
-                    # Release entire lock
-                    lock.status = LockStatus.RELEASED.value
-                    lock.released_at = datetime.now(timezone.utc)
-                    remaining_to_release -= lock.amount
-                else:
-                    # Partial release: create new row for remaining amount, mark current as released
-                    remaining_amount = lock.amount - remaining_to_release
-                    lock.status = LockStatus.RELEASED.value
-                    lock.released_at = datetime.now(timezone.utc)
-                    
-                    # Create new lock for remaining amount
-                    new_lock = WalletLock(
-                        user_id=user_id,
-                        currency=lock.currency,
-                        amount=remaining_amount,
-                        reason=LockReason.VAULT_AVENIR_VESTING.value,
-                        reference_type=lock.reference_type,
-                        reference_id=lock.reference_id,
-                        status=LockStatus.ACTIVE.value,
-                        intent_id=None,
-                        operation_id=None,  # Original operation_id not applicable for partial release
-                    )
-                    db.add(new_lock)
-                    remaining_to_release = Decimal("0.00")
+            consume_wallet_locks_fifo(
+                db,
+                {user_id: amount},
+                reason=LockReason.VAULT_AVENIR_VESTING.value,
+                reference_type="VAULT",
+                reference_id=vault.id,
+            )
         
         # Update vault deprecated fields
         vault.cash_balance -= amount
@@ -526,20 +498,121 @@ def request_withdrawal(
         }
 
 
-def process_pending_withdrawals(
+# Decisions of the batched withdrawal processor (see plan_withdrawal_batch)
+WITHDRAWAL_EXECUTE = "EXECUTE"
+WITHDRAWAL_CANCEL = "CANCEL"
+WITHDRAWAL_WAIT = "WAIT"  # Vault cash does not cover it: stays PENDING, later requests wait behind it
+
+
+@dataclass(frozen=True)
+class WithdrawalDecision:
+    """Planned outcome of one PENDING WithdrawalRequest"""
+    request_id: UUID
+    user_id: UUID
+    amount: Decimal
+    decision: str
+    reason: Optional[str] = None
+
+
+def plan_withdrawal_batch(
+    requests: Sequence[WithdrawalRequest],
+    principals: Dict[UUID, Decimal],
+    vault_cash: Decimal,
+) -> Tuple[List[WithdrawalDecision], Decimal]:
+    """
+    Decide PENDING requests in FIFO order against one vault cash snapshot.
+    
+    In memory, no DB access. A request whose user has no VaultAccount (not in
+    principals) or not enough principal is cancelled; the first request the
+    vault cash does not cover gets WITHDRAWAL_WAIT and planning stops there.
+    
+    principals (user_id -> principal) is updated in place with running
+    principals: a user may have several requests in the batch.
+    
+    Returns:
+        (decisions in queue order, vault cash left)
+    """
+    decisions: List[WithdrawalDecision] = []
+    for request in requests:
+        principal = principals.get(request.user_id)
+        if principal is None:
+            decisions.append(WithdrawalDecision(
+                request.id, request.user_id, request.amount, WITHDRAWAL_CANCEL, "Vault account not found",
+            ))
+            continue
+        if principal < request.amount:
+            decisions.append(WithdrawalDecision(
+                request.id, request.user_id, request.amount, WITHDRAWAL_CANCEL,
+                f"Insufficient principal: {principal} < {request.amount}",
+            ))
+            continue
+        if vault_cash < request.amount:
+            decisions.append(WithdrawalDecision(request.id, request.user_id, request.amount, WITHDRAWAL_WAIT))
+            break
+        principals[request.user_id] = principal - request.amount
+        vault_cash -= request.amount
+        decisions.append(WithdrawalDecision(request.id, request.user_id, request.amount, WITHDRAWAL_EXECUTE))
+    return decisions, vault_cash
+
+
+def _pending_withdrawals_query(vault_id: UUID, limit: int, after: Optional[Tuple[datetime, UUID]] = None):
+    """Next PENDING requests of a vault in FIFO order (keyset on created_at, id)."""
+    query = select(WithdrawalRequest).where(
+        WithdrawalRequest.vault_id == vault_id,
+        WithdrawalRequest.status == WithdrawalRequestStatus.PENDING,
+    )
+    if after is not None:
+        query = query.where(tuple_(WithdrawalRequest.created_at, WithdrawalRequest.id) > after)
+    return query.order_by(WithdrawalRequest.created_at, WithdrawalRequest.id).limit(limit)
+
+
+def _count_pending_withdrawals(db: Session, vault_id: UUID) -> int:
+    return db.query(WithdrawalRequest).filter(
+        WithdrawalRequest.vault_id == vault_id,
+        WithdrawalRequest.status == WithdrawalRequestStatus.PENDING,
+    ).count()
+
+
+def process_withdrawal_batch(
     db: Session,
     vault_code: str,
-) -> Dict[str, int]:
+    *,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
     """
-    Process pending withdrawal requests in FIFO order.
-    
-    Locks vault and processes requests one by one until vault cash is insufficient.
+    Process the next batch of PENDING withdrawal requests in FIFO order.
+    
+    One vault cash snapshot per batch: the vault row, the next batch_size
+    requests (SKIP LOCKED), their VaultAccounts and the vault pool cash
+    account are locked with one statement each, the batch is decided in
+    memory (plan_withdrawal_batch), then written in bulk:
+    - all Operations + LedgerEntries by insert_ledger_operations()
+    - VaultAccount principals with one UPDATE ... FROM (VALUES ...), and
+      the vault's principal exposure aggregate with one upsert
+    - executed and cancelled requests with one UPDATE each
+    - AVENIR: the users' ACTIVE vesting WalletLocks consumed oldest first
+      with one UPDATE (consume_wallet_locks_fifo)
+    
+    Request and VaultAccount objects are expired (their rows were updated
+    with Core statements).
     
     NO COMMIT - caller must commit.
     
     Returns:
-        Dict with processed_count, remaining_count
+        Dict with processed_count, cancelled_count, executed_amount (Decimal),
+        decisions (List[WithdrawalDecision]) and waiting (True when the vault
+        cash does not cover the next request)
     """
+    currency = VAULT_PRINCIPAL_CURRENCY  # vaults are AED-only
+    batch_size = batch_size or get_settings().VAULT_WITHDRAWAL_BATCH_SIZE
+    result: Dict[str, Any] = {
+        "processed_count": 0,
+        "cancelled_count": 0,
+        "executed_amount": Decimal("0.00"),
+        "decisions": [],
+        "waiting": False,
+    }
+    
     # Get and lock vault row
     vault = db.execute(
         select(Vault)
@@ -550,180 +623,250 @@ def process_pending_withdrawals(
     if not vault:
         raise VaultNotFoundError(f"Vault with code '{vault_code}' not found")
     
-    # Get pending requests ordered by created_at (FIFO) with SKIP LOCKED
-    pending_requests = db.execute(
-        select(WithdrawalRequest)
-        .where(
-            WithdrawalRequest.vault_id == vault.id,
-            WithdrawalRequest.status == WithdrawalRequestStatus.PENDING,
-        )
-        .order_by(WithdrawalRequest.created_at)
-        .with_for_update(skip_locked=True)
+    requests = db.execute(
+        _pending_withdrawals_query(vault.id, batch_size).with_for_update(skip_locked=True)
     ).scalars().all()
+    if not requests:
+        return result
     
-    processed_count = 0
-    
-    for request in pending_requests:
-        # Lock VaultAccount
-        vault_account = db.execute(
+    vault_accounts = {
+        vault_account.user_id: vault_account
+        for vault_account in db.execute(
             select(VaultAccount)
             .where(
                 VaultAccount.vault_id == vault.id,
-                VaultAccount.user_id == request.user_id,
+                VaultAccount.user_id.in_({request.user_id for request in requests}),
             )
+            .order_by(VaultAccount.id)
             .with_for_update()
-        ).scalar_one_or_none()
-        
-        if not vault_account:
-            # VaultAccount doesn't exist - reject request
-            request.status = WithdrawalRequestStatus.CANCELLED
-            request.reason = "Vault account not found"
-            continue
-        
-        # Check principal
-        if vault_account.principal < request.amount:
-            # Insufficient principal - reject
-            request.status = WithdrawalRequestStatus.CANCELLED
-            request.reason = f"Insufficient principal: {vault_account.principal} < {request.amount}"
-            continue
-        
-        # Get vault cash balance (from ledger, source of truth)
-        vault_cash_balance = get_vault_cash_balance(db, vault.id, "AED")  # TODO: support multi-currency
-        
-        # Check if vault has sufficient cash
-        if vault_cash_balance < request.amount:
-            # Break - no more withdrawals can be processed
-            break
-        
-        # Execute withdrawal
-        # Get and lock accounts
-        user_account_id = get_user_wallet_available_account(db, request.user_id, "AED")
-        user_account = db.execute(
-            select(Account)
-            .where(Account.id == user_account_id)
+        ).scalars()
+    }
+    
+    vault_pool_account_id = get_or_create_vault_pool_cash_account(db, vault.id, currency)
+    db.execute(select(Account.id).where(Account.id == vault_pool_account_id).with_for_update())
+    vault_cash_balance = get_account_balance(db, vault_pool_account_id)
+    
+    decisions, _ = plan_withdrawal_batch(
+        requests,
+        {user_id: vault_account.principal for user_id, vault_account in vault_accounts.items()},
+        vault_cash_balance,
+    )
+    executed = [decision for decision in decisions if decision.decision == WITHDRAWAL_EXECUTE]
+    cancelled = [decision for decision in decisions if decision.decision == WITHDRAWAL_CANCEL]
+    now = datetime.now(timezone.utc)
+    request_table = WithdrawalRequest.__table__
+    
+    if executed:
+        wallet_accounts = ensure_wallet_accounts_bulk(db, [(decision.user_id, currency) for decision in executed])
+        db.execute(
+            select(Account.id)
+            .where(Account.id.in_({
+                accounts[AccountType.WALLET_AVAILABLE.value] for accounts in wallet_accounts.values()
+            }))
+            .order_by(Account.id)
             .with_for_update()
-        ).scalar_one()
+        )
         
-        vault_pool_account_id = get_or_create_vault_pool_cash_account(db, vault.id, "AED")
-        vault_pool_account = db.execute(
-            select(Account)
-            .where(Account.id == vault_pool_account_id)
-            .with_for_update()
-        ).scalar_one()
+        # DEBIT vault VAULT_POOL_CASH, CREDIT user WALLET_AVAILABLE
+        insert_ledger_operations(db, [
+            LedgerPosting(
+                operation_type=OperationType.VAULT_WITHDRAW_EXECUTED,
+                currency=currency,
+                legs=[
+                    LedgerLeg(vault_pool_account_id, -decision.amount),
+                    LedgerLeg(wallet_accounts[(decision.user_id, currency)][AccountType.WALLET_AVAILABLE.value], decision.amount),
+                ],
+                metadata={
+                    'currency': currency,
+                    'vault_code': vault.code,
+                    'vault_id': str(vault.id),
+                    'withdrawal_request_id': str(decision.request_id),
+                },
+            )
+            for decision in executed
+        ])
         
-        # Create Operation
-        operation = Operation(
-            transaction_id=None,
-            type=OperationType.VAULT_WITHDRAW_EXECUTED,
-            status=OperationStatus.COMPLETED,
-            idempotency_key=None,
-            operation_metadata={
-                'currency': "AED",
-                'vault_code': vault_code,
-                'vault_id': str(vault.id),
-                'withdrawal_request_id': str(request.id),
-            },
-        )
-        db.add(operation)
-        db.flush()
+        withdrawn: Dict[UUID, Decimal] = {}
+        for decision in executed:
+            withdrawn[decision.user_id] = withdrawn.get(decision.user_id, Decimal("0.00")) + decision.amount
         
-        # Create ledger entries
-        debit_entry = LedgerEntry(
-            operation_id=operation.id,
-            account_id=vault_pool_account_id,
-            amount=-request.amount,
-            currency="AED",
-            entry_type=LedgerEntryType.DEBIT,
+        vault_account_table = VaultAccount.__table__
+        withdrawn_values = values(
+            column("vault_account_id", PG_UUID(as_uuid=True)),
+            column("amount", Numeric(20, 2)),
+            name="withdrawn_amounts",
+        ).data([(vault_accounts[user_id].id, amount) for user_id, amount in withdrawn.items()])
+        amount = cast(withdrawn_values.c.amount, Numeric(20, 2))
+        db.execute(
+            update(vault_account_table)
+            .where(vault_account_table.c.id == cast(withdrawn_values.c.vault_account_id, PG_UUID(as_uuid=True)))
+            .values(
+                principal=vault_account_table.c.principal - amount,
+                available_balance=vault_account_table.c.available_balance - amount,
+            )
         )
+        apply_exposure_deltas(db.connection(), {
+            vault_principal_key(vault.id): (-sum(withdrawn.values(), Decimal("0.00")), 0),
+        })
         
-        credit_entry = LedgerEntry(
-            operation_id=operation.id,
-            account_id=user_account_id,
-            amount=request.amount,
-            currency="AED",
-            entry_type=LedgerEntryType.CREDIT,
+        db.execute(
+            update(request_table)
+            .where(request_table.c.id.in_([decision.request_id for decision in executed]))
+            .values(status=WithdrawalRequestStatus.EXECUTED, executed_at=now)
         )
         
-        db.add(debit_entry)
-        db.add(credit_entry)
-        db.flush()
-        
-        # Validate double-entry invariant
-        if not validate_double_entry_invariant(db, str(operation.id)):
-            db.rollback()
-            raise ValueError("Double-entry accounting invariant violation detected")
-        
-        # Update VaultAccount
-        vault_account.principal -= request.amount
-        vault_account.available_balance -= request.amount
-        
         # For AVENIR: release wallet_locks proportionally (oldest ACTIVE rows first)
         if vault.code.upper() == "AVENIR":
-            # Get active wallet_locks for this vault + user, ordered by created_at (oldest first)
-            active_locks = db.execute(
-                select(WalletLock)
-                .where(
-                    WalletLock.user_id == request.user_id,
-                    WalletLock.reference_type == "VAULT",
-                    WalletLock.reference_id == vault.id,
-                    WalletLock.reason == LockReason.VAULT_AVENIR_VESTING.value,
-                    WalletLock.status == LockStatus.ACTIVE.value,
-                )
-                .order_by(WalletLock.created_at)
-                .with_for_update()
-            ).scalars().all()
-            
-            remaining_to_release = request.amount
-            
-            for lock in active_locks:
-                if remaining_to_release <= 0:
-                    break
-                
-                if lock.amount <= remaining_to_release:
-                    # Release entire lock
-                    lock.status = LockStatus.RELEASED.value
-                    lock.released_at = datetime.now(timezone.utc)
-                    remaining_to_release -= lock.amount
-                else:
-                    # Partial release: create new row for remaining amount, mark current as released
-                    remaining_amount = lock.amount - remaining_to_release
-                    lock.status = LockStatus.RELEASED.value
-                    lock.released_at = datetime.now(timezone.utc)
-                    
-                    # Create new lock for remaining amount
-                    new_lock = WalletLock(
-                        user_id=request.user_id,
-                        currency=lock.currency,
-                        amount=remaining_amount,
-                        reason=LockReason.VAULT_AVENIR_VESTING.value,
-                        reference_type=lock.reference_type,
-                        reference_id=lock.reference_id,
-                        status=LockStatus.ACTIVE.value,
-                        intent_id=None,
-                        operation_id=None,
-                    )
-                    db.add(new_lock)
-                    remaining_to_release = Decimal("0.00")
-        
-        # Update vault deprecated fields
-        vault.cash_balance -= request.amount
-        vault.total_aum -= request.amount
+            consume_wallet_locks_fifo(
+                db,
+                withdrawn,
+                reason=LockReason.VAULT_AVENIR_VESTING.value,
+                reference_type="VAULT",
+                reference_id=vault.id,
+                now=now,
+            )
         
-        # Mark request as EXECUTED
-        request.status = WithdrawalRequestStatus.EXECUTED
-        request.executed_at = datetime.now(timezone.utc)
+        result["processed_count"] = len(executed)
+        result["executed_amount"] = sum((decision.amount for decision in executed), Decimal("0.00"))
         
-        processed_count += 1
+        # Update vault deprecated fields
+        vault.cash_balance -= result["executed_amount"]
+        vault.total_aum -= result["executed_amount"]
+    
+    if cancelled:
+        cancelled_values = values(
+            column("request_id", PG_UUID(as_uuid=True)),
+            column("reason", Text),
+            name="cancelled_requests",
+        ).data([(decision.request_id, decision.reason) for decision in cancelled])
+        db.execute(
+            update(request_table)
+            .where(request_table.c.id == cast(cancelled_values.c.request_id, PG_UUID(as_uuid=True)))
+            .values(status=WithdrawalRequestStatus.CANCELLED, reason=cast(cancelled_values.c.reason, Text))
+        )
+        result["cancelled_count"] = len(cancelled)
     
+    for request in requests:
+        db.expire(request)
+    for vault_account in vault_accounts.values():
+        db.expire(vault_account)
     db.flush()
     
-    # Count remaining pending requests
-    remaining_count = db.query(WithdrawalRequest).filter(
-        WithdrawalRequest.vault_id == vault.id,
-        WithdrawalRequest.status == WithdrawalRequestStatus.PENDING,
-    ).count()
+    result["decisions"] = decisions
+    result["waiting"] = bool(decisions) and decisions[-1].decision == WITHDRAWAL_WAIT
+    return result
+
+
+def process_pending_withdrawals(
+    db: Session,
+    vault_code: str,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Process pending withdrawal requests in FIFO order.
+    
+    Runs process_withdrawal_batch() until the vault cash does not cover the
+    next request or the queue is empty. Each batch costs a constant number of
+    statements, so the work grows with the requests processed, not with the
+    length of the pending queue.
+    
+    NO COMMIT - caller must commit.
+    
+    Returns:
+        Dict with processed_count, cancelled_count, executed_amount (Decimal),
+        waiting_request_id (first request waiting for vault cash, or None),
+        remaining_count
+    """
+    batch_size = batch_size or get_settings().VAULT_WITHDRAWAL_BATCH_SIZE
+    processed_count = 0
+    cancelled_count = 0
+    executed_amount = Decimal("0.00")
+    waiting_request_id = None
+    
+    while True:
+        batch = process_withdrawal_batch(db, vault_code, batch_size=batch_size)
+        processed_count += batch["processed_count"]
+        cancelled_count += batch["cancelled_count"]
+        executed_amount += batch["executed_amount"]
+        if batch["waiting"]:
+            waiting_request_id = batch["decisions"][-1].request_id
+            break
+        if len(batch["decisions"]) < batch_size:
+            break
     
+    vault = get_vault_by_code(db, vault_code)
     return {
         "processed_count": processed_count,
-        "remaining_count": remaining_count,
+        "cancelled_count": cancelled_count,
+        "executed_amount": executed_amount,
+        "waiting_request_id": waiting_request_id,
+        "remaining_count": _count_pending_withdrawals(db, vault.id),
+    }
+
+
+def project_pending_withdrawals(
+    db: Session,
+    vault_code: str,
+    *,
+    batch_size: Optional[int] = None,
+    max_requests: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Dry run of process_pending_withdrawals: what would execute now.
+    
+    Walks the PENDING queue in FIFO batches with plan_withdrawal_batch(),
+    carrying the vault cash and the users' principals from one batch to the
+    next, until a request waits for vault cash, the queue ends or
+    max_requests requests are decided. Reads only, takes no row lock.
+    
+    Returns:
+        Dict with vault_cash_balance, projected_cash_balance (Decimal),
+        executable_count, executable_amount (Decimal), cancellable_count,
+        waiting_request_id, decisions (List[WithdrawalDecision]), remaining_count
+    """
+    currency = VAULT_PRINCIPAL_CURRENCY  # vaults are AED-only
+    batch_size = batch_size or get_settings().VAULT_WITHDRAWAL_BATCH_SIZE
+    vault = get_vault_by_code(db, vault_code)
+    vault_cash_balance = get_vault_cash_balance(db, vault.id, currency)
+    
+    cash = vault_cash_balance
+    principals: Dict[UUID, Decimal] = {}
+    known_users: Set[UUID] = set()
+    decisions: List[WithdrawalDecision] = []
+    cursor: Optional[Tuple[datetime, UUID]] = None
+    
+    while max_requests is None or len(decisions) < max_requests:
+        limit = batch_size if max_requests is None else min(batch_size, max_requests - len(decisions))
+        requests = db.execute(_pending_withdrawals_query(vault.id, limit, cursor)).scalars().all()
+        if not requests:
+            break
+        
+        new_users = {request.user_id for request in requests} - known_users
+        if new_users:
+            principals.update(db.execute(
+                select(VaultAccount.user_id, VaultAccount.principal).where(
+                    VaultAccount.vault_id == vault.id,
+                    VaultAccount.user_id.in_(new_users),
+                )
+            ).all())
+            known_users |= new_users
+        
+        batch_decisions, cash = plan_withdrawal_batch(requests, principals, cash)
+        decisions.extend(batch_decisions)
+        if batch_decisions[-1].decision == WITHDRAWAL_WAIT or len(requests) < limit:
+            break
+        cursor = (requests[-1].created_at, requests[-1].id)
+    
+    executable = [decision for decision in decisions if decision.decision == WITHDRAWAL_EXECUTE]
+    cancellable = [decision for decision in decisions if decision.decision == WITHDRAWAL_CANCEL]
+    waiting = [decision for decision in decisions if decision.decision == WITHDRAWAL_WAIT]
+    return {
+        "vault_cash_balance": vault_cash_balance,
+        "projected_cash_balance": cash,
+        "executable_count": len(executable),
+        "executable_amount": sum((decision.amount for decision in executable), Decimal("0.00")),
+        "cancellable_count": len(cancellable),
+        "waiting_request_id": waiting[0].request_id if waiting else None,
+        "decisions": decisions,
+        "remaining_count": _count_pending_withdrawals(db, vault.id) - len(executable) - len(cancellable),
     }
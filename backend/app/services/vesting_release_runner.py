@@ -0,0 +1,389 @@
+"""
+Parallel AVENIR vesting release - user-hash shards, chunked postings, checkpoints
+
+release_avenir_vesting_lots handles one lot per transaction in one process.
+When a whole launch cohort matures on the same day, this runner releases the
+lots with N worker processes instead:
+
+- lots are partitioned by user: shard = (hashtext(user_id) & 0x7fffffff) % N,
+  so every lot of a user (and every write to that user's wallet accounts and
+  WalletLocks) belongs to one worker - workers never contend on the same rows
+- each worker walks its shard in lot id order (keyset) and releases it in
+  chunks: lots locked FOR UPDATE SKIP LOCKED, then release_vesting_lot_chunk()
+  releases them with a constant number of statements per chunk
+- per (trace_id, shard) a VestingReleaseCheckpoint holds the cursor and
+  counters, updated in the chunk's transaction: re-running the same trace_id
+  resumes each unfinished shard right after its last committed chunk
+
+A chunk that fails is rolled back to a SAVEPOINT and replayed lot by lot, so
+one bad lot does not hold back its chunk; lots that still fail are counted in
+errors_count and left VESTED (a later run with a new trace_id picks them up).
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import String, cast, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401 - every mapper registered (spawned workers start from this module)
+from app.core.vaults.models import (
+    VestingLot,
+    VestingLotStatus,
+    VestingReleaseCheckpoint,
+    VestingReleaseCheckpointStatus,
+)
+from app.infrastructure.database import SessionLocal
+from app.infrastructure.settings import get_settings
+from app.services.vesting_service import VestingReleaseError, release_vesting_chunk_with_replay
+
+logger = logging.getLogger(__name__)
+
+VAULT_CODE = "AVENIR"
+
+
+def user_shard_expression(shard_count: int):
+    """SQL expression: shard number (0..shard_count-1) of a lot's user."""
+    return (func.hashtext(cast(VestingLot.user_id, String)).op("&")(0x7FFFFFFF)) % shard_count
+
+
+def _mature_lot_filters(as_of_date: date, currency: str) -> List[Any]:
+    """Same selection as release_avenir_vesting_lots."""
+    return [
+        VestingLot.vault_code == VAULT_CODE,
+        VestingLot.release_day <= as_of_date,
+        VestingLot.status == VestingLotStatus.VESTED.value,
+        VestingLot.released_amount < VestingLot.amount,
+        VestingLot.currency == currency,
+    ]
+
+
+def count_mature_lots_by_shard(
+    db: Session,
+    *,
+    shard_count: int,
+    as_of_date: date,
+    currency: str,
+) -> List[Dict[str, Any]]:
+    """
+    Dry run: lots and amount left to release per shard (one grouped query, no lock).
+    """
+    shard = user_shard_expression(shard_count).label("shard_no")
+    rows = db.execute(
+        select(
+            shard,
+            func.count(VestingLot.id),
+            func.coalesce(func.sum(VestingLot.amount - VestingLot.released_amount), 0),
+        )
+        .where(*_mature_lot_filters(as_of_date, currency))
+        .group_by(shard)
+    ).all()
+    by_shard = {row[0]: (row[1], Decimal(str(row[2]))) for row in rows}
+    report = []
+    for shard_no in range(shard_count):
+        lots, amount = by_shard.get(shard_no, (0, Decimal("0")))
+        report.append({"shard_no": shard_no, "lots": lots, "amount": str(amount.quantize(Decimal("0.01")))})
+    return report
+
+
+def start_vesting_release_run(
+    db: Session,
+    *,
+    trace_id: UUID,
+    shard_count: int,
+    as_of_date: date,
+    currency: str,
+) -> List[VestingReleaseCheckpoint]:
+    """
+    Create the checkpoints of a run, or load them when resuming trace_id.
+
+    A resumed run keeps its original shard_count, as_of_date and currency
+    (the shard of a lot depends on shard_count); passing different values
+    raises VestingReleaseError.
+
+    Commits.
+    """
+    if shard_count < 1:
+        raise VestingReleaseError("shard_count must be >= 1")
+
+    existing = db.query(VestingReleaseCheckpoint).filter(
+        VestingReleaseCheckpoint.trace_id == trace_id
+    ).order_by(VestingReleaseCheckpoint.shard_no).all()
+    if existing:
+        first = existing[0]
+        if (first.shard_count, first.as_of_date, first.currency) != (shard_count, as_of_date, currency):
+            raise VestingReleaseError(
+                f"Run {trace_id} was started with shard_count={first.shard_count}, "
+                f"as_of={first.as_of_date.isoformat()}, currency={first.currency}"
+            )
+        if len(existing) == shard_count:
+            return existing
+
+    # Concurrent starts of the same run create each shard once
+    db.execute(
+        pg_insert(VestingReleaseCheckpoint.__table__)
+        .values([
+            {
+                "id": uuid4(),
+                "trace_id": trace_id,
+                "shard_no": shard_no,
+                "shard_count": shard_count,
+                "vault_code": VAULT_CODE,
+                "currency": currency,
+                "as_of_date": as_of_date,
+                "status": VestingReleaseCheckpointStatus.PENDING.value,
+                "lots_released": 0,
+                "amount_released": Decimal("0.00"),
+                "lots_skipped": 0,
+                "errors_count": 0,
+                "locks_missing_count": 0,
+            }
+            for shard_no in range(shard_count)
+        ])
+        .on_conflict_do_nothing(constraint="uq_vesting_release_checkpoints_trace_shard")
+    )
+    db.commit()
+
+    return db.query(VestingReleaseCheckpoint).filter(
+        VestingReleaseCheckpoint.trace_id == trace_id
+    ).order_by(VestingReleaseCheckpoint.shard_no).all()
+
+
+def _load_checkpoints(db: Session, trace_id: UUID) -> List[VestingReleaseCheckpoint]:
+    return db.query(VestingReleaseCheckpoint).filter(
+        VestingReleaseCheckpoint.trace_id == trace_id
+    ).order_by(VestingReleaseCheckpoint.shard_no).populate_existing().all()
+
+
+def _elapsed_seconds(started_at: Optional[datetime], finished_at: Optional[datetime], now: datetime) -> float:
+    if started_at is None:
+        return 0.0
+    return max((finished_at or now) - started_at, timedelta(0)).total_seconds()
+
+
+def _shard_report(checkpoint: VestingReleaseCheckpoint, now: datetime) -> Dict[str, Any]:
+    elapsed = _elapsed_seconds(checkpoint.started_at, checkpoint.finished_at, now)
+    return {
+        "shard_no": checkpoint.shard_no,
+        "status": checkpoint.status,
+        "lots_released": checkpoint.lots_released,
+        "amount_released": str(checkpoint.amount_released),
+        "lots_skipped": checkpoint.lots_skipped,
+        "errors_count": checkpoint.errors_count,
+        "locks_missing_count": checkpoint.locks_missing_count,
+        "last_error": checkpoint.last_error,
+        "elapsed_seconds": round(elapsed, 3),
+        "lots_per_second": round(checkpoint.lots_released / elapsed, 2) if elapsed else None,
+    }
+
+
+def vesting_release_progress(db: Session, trace_id: UUID) -> Dict[str, Any]:
+    """
+    Progress / throughput report of a run, read from its checkpoints.
+
+    Totals are cumulative across resumes; elapsed time runs from the first
+    shard start to the last shard finish (or now while shards are running).
+    """
+    checkpoints = _load_checkpoints(db, trace_id)
+    if not checkpoints:
+        raise VestingReleaseError(f"Vesting release run {trace_id} not found")
+
+    now = datetime.now(timezone.utc)
+    statuses = {checkpoint.status for checkpoint in checkpoints}
+    if statuses == {VestingReleaseCheckpointStatus.COMPLETED.value}:
+        status = VestingReleaseCheckpointStatus.COMPLETED.value
+    elif VestingReleaseCheckpointStatus.RUNNING.value in statuses:
+        status = VestingReleaseCheckpointStatus.RUNNING.value
+    elif VestingReleaseCheckpointStatus.FAILED.value in statuses:
+        status = VestingReleaseCheckpointStatus.FAILED.value
+    else:
+        status = VestingReleaseCheckpointStatus.PENDING.value
+
+    started = [c.started_at for c in checkpoints if c.started_at is not None]
+    finished = [c.finished_at for c in checkpoints if c.finished_at is not None]
+    elapsed = _elapsed_seconds(
+        min(started) if started else None,
+        max(finished) if status == VestingReleaseCheckpointStatus.COMPLETED.value and finished else None,
+        now,
+    )
+    lots_released = sum(c.lots_released for c in checkpoints)
+
+    return {
+        "trace_id": str(trace_id),
+        "as_of_date": checkpoints[0].as_of_date.isoformat(),
+        "currency": checkpoints[0].currency,
+        "status": status,
+        "shard_count": len(checkpoints),
+        "shards_completed": sum(1 for c in checkpoints if c.status == VestingReleaseCheckpointStatus.COMPLETED.value),
+        "lots_released": lots_released,
+        "amount_released": str(sum((c.amount_released for c in checkpoints), Decimal("0.00"))),
+        "lots_skipped": sum(c.lots_skipped for c in checkpoints),
+        "errors_count": sum(c.errors_count for c in checkpoints),
+        "locks_missing_count": sum(c.locks_missing_count for c in checkpoints),
+        "elapsed_seconds": round(elapsed, 3),
+        "lots_per_second": round(lots_released / elapsed, 2) if elapsed else None,
+        "shards": [_shard_report(c, now) for c in checkpoints],
+    }
+
+
+def release_vesting_shard(
+    db: Session,
+    *,
+    trace_id: UUID,
+    shard_no: int,
+    chunk_size: Optional[int] = None,
+    max_chunks: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Release the mature lots of one shard of a run (see start_vesting_release_run),
+    starting after the checkpoint's cursor.
+
+    Per chunk, one transaction: checkpoint row locked (a second worker on the
+    same shard waits, then continues after the first one's cursor), next
+    chunk_size lots of the shard locked FOR UPDATE SKIP LOCKED in id order,
+    released, checkpoint advanced. Lots skipped because another job holds
+    them are left to that job.
+
+    Commits (one transaction per chunk). max_chunks stops early (the shard
+    stays RUNNING and is resumed by the next call).
+
+    Returns:
+        Shard report (see vesting_release_progress)
+    """
+    if chunk_size is None:
+        chunk_size = get_settings().VESTING_RELEASE_CHUNK_SIZE
+    chunk_size = max(1, chunk_size)
+
+    chunks = 0
+    while True:
+        checkpoint = db.query(VestingReleaseCheckpoint).filter(
+            VestingReleaseCheckpoint.trace_id == trace_id,
+            VestingReleaseCheckpoint.shard_no == shard_no,
+        ).populate_existing().with_for_update().one_or_none()
+        if checkpoint is None:
+            raise VestingReleaseError(f"Vesting release run {trace_id} has no shard {shard_no}")
+        if checkpoint.status == VestingReleaseCheckpointStatus.COMPLETED.value or (
+            max_chunks is not None and chunks >= max_chunks
+        ):
+            db.commit()
+            break
+
+        now = datetime.now(timezone.utc)
+        if checkpoint.started_at is None:
+            checkpoint.started_at = now
+        checkpoint.status = VestingReleaseCheckpointStatus.RUNNING.value
+
+        query = select(VestingLot).where(*_mature_lot_filters(checkpoint.as_of_date, checkpoint.currency))
+        if checkpoint.shard_count > 1:
+            query = query.where(user_shard_expression(checkpoint.shard_count) == shard_no)
+        if checkpoint.last_lot_id is not None:
+            query = query.where(VestingLot.id > checkpoint.last_lot_id)
+        lots = db.execute(
+            query.order_by(VestingLot.id).limit(chunk_size).with_for_update(skip_locked=True)
+        ).scalars().all()
+
+        if not lots:
+            checkpoint.status = VestingReleaseCheckpointStatus.COMPLETED.value
+            checkpoint.finished_at = now
+            db.commit()
+            break
+
+        cursor = lots[-1].id
+        stats = release_vesting_chunk_with_replay(
+            db, lots, as_of_date=checkpoint.as_of_date, currency=checkpoint.currency, trace_id=str(trace_id),
+        )
+        checkpoint.last_lot_id = cursor
+        checkpoint.lots_released += stats["released_count"]
+        checkpoint.amount_released += stats["released_amount"]
+        checkpoint.lots_skipped += stats["skipped_count"]
+        checkpoint.errors_count += len(stats["errors"])
+        checkpoint.locks_missing_count += stats["locks_missing_count"]
+        if stats["errors"]:
+            checkpoint.last_error = stats["errors"][-1]
+            for error in stats["errors"]:
+                logger.warning(error, extra={"trace_id": str(trace_id), "shard_no": shard_no})
+        db.commit()
+        chunks += 1
+
+    return _shard_report(checkpoint, datetime.now(timezone.utc))
+
+
+def _release_shard_process(trace_id: str, shard_no: int, chunk_size: Optional[int]) -> Dict[str, Any]:
+    """Worker process entry point (spawned: own engine and connections)."""
+    db = SessionLocal()
+    try:
+        return release_vesting_shard(db, trace_id=UUID(trace_id), shard_no=shard_no, chunk_size=chunk_size)
+    except Exception as e:
+        db.rollback()
+        checkpoint = db.query(VestingReleaseCheckpoint).filter(
+            VestingReleaseCheckpoint.trace_id == UUID(trace_id),
+            VestingReleaseCheckpoint.shard_no == shard_no,
+        ).one_or_none()
+        if checkpoint is not None:
+            checkpoint.status = VestingReleaseCheckpointStatus.FAILED.value
+            checkpoint.last_error = f"{type(e).__name__}: {str(e)}"
+            db.commit()
+        raise
+    finally:
+        db.close()
+
+
+def run_vesting_release(
+    db: Session,
+    *,
+    trace_id: UUID,
+    shard_count: int,
+    workers: int,
+    as_of_date: date,
+    currency: str,
+    chunk_size: Optional[int] = None,
+    progress_interval: float = 10.0,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run (or resume) a parallel release: every unfinished shard of trace_id in
+    a pool of `workers` processes. A shard that fails is marked FAILED and
+    does not stop the others; run again with the same trace_id to resume.
+
+    on_progress gets the progress report every progress_interval seconds.
+
+    Returns:
+        Final progress report (see vesting_release_progress)
+    """
+    checkpoints = start_vesting_release_run(
+        db, trace_id=trace_id, shard_count=shard_count, as_of_date=as_of_date, currency=currency,
+    )
+    todo = [c.shard_no for c in checkpoints if c.status != VestingReleaseCheckpointStatus.COMPLETED.value]
+    db.commit()
+
+    if todo:
+        context = multiprocessing.get_context("spawn")  # No inherited DB connections
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(todo))), mp_context=context) as pool:
+            pending = {pool.submit(_release_shard_process, str(trace_id), shard_no, chunk_size) for shard_no in todo}
+            while pending:
+                done, pending = wait(pending, timeout=progress_interval)
+                for future in done:
+                    if future.exception() is not None:
+                        logger.error(
+                            f"Vesting release shard failed: {type(future.exception()).__name__}: {str(future.exception())}",
+                            extra={"trace_id": str(trace_id)},
+                        )
+                report = vesting_release_progress(db, trace_id)
+                db.commit()
+                logger.info(
+                    f"Vesting release {trace_id}: {report['shards_completed']}/{report['shard_count']} shards, "
+                    f"{report['lots_released']} lots ({report['lots_per_second']} lots/s)",
+                    extra={"trace_id": str(trace_id)},
+                )
+                if on_progress is not None:
+                    on_progress(report)
+
+    report = vesting_release_progress(db, trace_id)
+    db.commit()
+    return report
@@ -4,17 +4,20 @@ Vesting service - Release AVENIR vesting lots
 
 from decimal import Decimal
 from datetime import date, datetime, timezone
-from uuid import UUID, uuid4
-from typing import Dict, Any, Optional, List
+from uuid import NAMESPACE_OID, UUID, uuid4, uuid5
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import Date, Numeric, and_, case, cast, column, func, select, tuple_, update, values
 import logging
 
 from app.core.vaults.models import VestingLot, VestingLotStatus
 from app.core.ledger.models import Operation, OperationType, OperationStatus, LedgerEntry, LedgerEntryType
 from app.core.accounts.models import Account, AccountType
 from app.core.accounts.wallet_locks import WalletLock, LockReason, LockStatus
-from app.services.wallet_helpers import ensure_wallet_accounts, get_account_balance
+from app.services.ledger_posting import LedgerLeg, LedgerPosting, insert_ledger_operations
+from app.services.wallet_helpers import ensure_wallet_accounts, ensure_wallet_accounts_bulk, get_account_balance, get_account_balances
+from app.services.wallet_lock_helpers import consume_wallet_locks
 from app.utils.ledger_validator import validate_double_entry_invariant
 
 logger = logging.getLogger(__name__)
@@ -77,6 +80,7 @@ def release_avenir_vesting_lots(
     dry_run: bool = False,
     trace_id: Optional[str] = None,
     max_lots: int = 200,  # Reduced default for better concurrency (batching)
+    batch_size: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Release mature AVENIR vesting lots.
@@ -92,6 +96,9 @@ def release_avenir_vesting_lots(
         dry_run: If True, simulate without committing (default: False)
         trace_id: Unique trace ID for idempotence (default: generated UUID)
         max_lots: Maximum lots to process in one run (default: 1000)
+        batch_size: Batch mode - release lots in chunks of batch_size, one
+            transaction and a constant number of statements per chunk
+            (see release_vesting_lot_chunk). Ignored for dry runs.
     
     Returns:
         Dict with summary statistics:
@@ -129,6 +136,14 @@ def release_avenir_vesting_lots(
     }
     
     try:
+        if batch_size and not dry_run:
+            _release_avenir_vesting_lots_batched(
+                db, stats, as_of_date=as_of_date, currency=currency, trace_id=trace_id,
+                max_lots=max_lots, batch_size=batch_size,
+            )
+            stats['executed_amount'] = str(stats['executed_amount'].quantize(Decimal('0.01')))
+            return stats
+        
         # Query mature lots
         # SELECT ... FOR UPDATE SKIP LOCKED for concurrency safety
         mature_lots = db.query(VestingLot).filter(
@@ -256,85 +271,9 @@ def release_avenir_vesting_lots(
                     lot.status = VestingLotStatus.RELEASED.value
                 
                 # Update wallet_lock if exists (for Wallet Matrix coherence)
-                # Priority 1: Direct link via operation_id
-                wallet_lock = db.query(WalletLock).filter(
-                    WalletLock.operation_id == lot.source_operation_id,
-                    WalletLock.reason == LockReason.VAULT_AVENIR_VESTING.value,
-                    WalletLock.status == LockStatus.ACTIVE.value,
-                ).with_for_update(skip_locked=True).first()
-                
-                # Priority 2: Fallback if operation_id link missing
-                if not wallet_lock:
-                    # Try to find by user_id, vault_id, reason, status, amount match
-                    # Note: and_ and func are already imported at module level
-                    wallet_lock = db.query(WalletLock).filter(
-                        and_(
-                            WalletLock.user_id == lot.user_id,
-                            WalletLock.currency == currency,
-                            WalletLock.reason == LockReason.VAULT_AVENIR_VESTING.value,
-                            WalletLock.reference_type == 'VAULT',
-                            WalletLock.reference_id == lot.vault_id,
-                            WalletLock.status == LockStatus.ACTIVE.value,
-                            # Amount match (within tolerance)
-                            func.abs(WalletLock.amount - lot.amount) <= Decimal('0.01'),
-                            # Created on same day as deposit
-                            func.date(WalletLock.created_at) == lot.deposit_day,
-                        )
-                    ).order_by(WalletLock.created_at.asc()).with_for_update(skip_locked=True).first()
-                    
-                    if wallet_lock:
-                        # Log warning for fallback match
-                        logger.warning(
-                            f"Wallet lock found via fallback (not operation_id) for lot {lot.id}",
-                            extra={
-                                "lot_id": str(lot.id),
-                                "source_operation_id": str(lot.source_operation_id),
-                                "wallet_lock_id": str(wallet_lock.id),
-                                "wallet_lock_operation_id": str(wallet_lock.operation_id),
-                                "trace_id": trace_id,
-                            }
-                        )
-                
-                if wallet_lock:
-                    if wallet_lock.amount <= release_amount:
-                        # Full release
-                        wallet_lock.status = LockStatus.RELEASED.value
-                        wallet_lock.released_at = datetime.now(timezone.utc)
-                        # Optionally link to release operation for traceability
-                        # wallet_lock.operation_id = operation.id  # Could update, but keep original for audit
-                    else:
-                        # Partial release: create new lock for remaining
-                        remaining_lock_amount = wallet_lock.amount - release_amount
-                        wallet_lock.status = LockStatus.RELEASED.value
-                        wallet_lock.released_at = datetime.now(timezone.utc)
-                        
-                        new_lock = WalletLock(
-                            user_id=lot.user_id,
-                            currency=currency,
-                            amount=remaining_lock_amount,
-                            reason=LockReason.VAULT_AVENIR_VESTING.value,
-                            reference_type='VAULT',
-                            reference_id=lot.vault_id,
-                            status=LockStatus.ACTIVE.value,
-                            operation_id=None,  # No source operation for partial lock
-                        )
-                        db.add(new_lock)
-                    
+                if _close_vesting_wallet_lock(db, lot, release_amount, currency, trace_id):
                     stats['locks_closed_count'] += 1
                 else:
-                    # Lock not found - log warning but don't fail
-                    logger.warning(
-                        f"Wallet lock not found for lot {lot.id} (source_operation_id={lot.source_operation_id})",
-                        extra={
-                            "lot_id": str(lot.id),
-                            "source_operation_id": str(lot.source_operation_id),
-                            "user_id": str(lot.user_id),
-                            "vault_id": str(lot.vault_id),
-                            "amount": str(lot.amount),
-                            "deposit_day": lot.deposit_day.isoformat(),
-                            "trace_id": trace_id,
-                        }
-                    )
                     stats['locks_missing_count'] += 1
                 
                 # Commit transaction
@@ -362,3 +301,442 @@ def release_avenir_vesting_lots(
         stats['errors_count'] += 1
         raise VestingReleaseError(error_msg) from e
 
+
+
+def _release_avenir_vesting_lots_batched(
+    db: Session,
+    stats: Dict[str, Any],
+    *,
+    as_of_date: date,
+    currency: str,
+    trace_id: str,
+    max_lots: int,
+    batch_size: int,
+) -> None:
+    """
+    Batch mode of release_avenir_vesting_lots: each chunk is selected
+    (FOR UPDATE SKIP LOCKED, same order as the per-lot mode), released and
+    committed in its own transaction, so its lots stay locked until their
+    release is committed. Updates stats in place.
+    
+    Commits (one transaction per chunk).
+    """
+    cursor = None
+    while stats['matured_found'] < max_lots:
+        query = db.query(VestingLot).filter(
+            VestingLot.vault_code == 'AVENIR',
+            VestingLot.release_day <= as_of_date,
+            VestingLot.status == VestingLotStatus.VESTED.value,
+            VestingLot.released_amount < VestingLot.amount,
+            VestingLot.currency == currency,
+        )
+        if cursor is not None:
+            # Lots left VESTED by an error in a previous chunk are not retried in this run
+            query = query.filter(tuple_(VestingLot.release_day, VestingLot.created_at, VestingLot.id) > cursor)
+        lots = query.order_by(
+            VestingLot.release_day.asc(),
+            VestingLot.created_at.asc(),
+            VestingLot.id.asc(),
+        ).limit(min(batch_size, max_lots - stats['matured_found'])).with_for_update(skip_locked=True).all()
+        if not lots:
+            break
+        
+        stats['matured_found'] += len(lots)
+        cursor = (lots[-1].release_day, lots[-1].created_at, lots[-1].id)
+        chunk_stats = release_vesting_chunk_with_replay(
+            db, lots, as_of_date=as_of_date, currency=currency, trace_id=trace_id,
+        )
+        db.commit()
+        
+        stats['executed_count'] += chunk_stats['released_count']
+        stats['executed_amount'] += chunk_stats['released_amount']
+        stats['skipped_count'] += chunk_stats['skipped_count']
+        stats['errors'].extend(chunk_stats['errors'])
+        stats['errors_count'] += len(chunk_stats['errors'])
+        stats['locks_closed_count'] += chunk_stats['locks_closed_count']
+        stats['locks_missing_count'] += chunk_stats['locks_missing_count']
+
+
+def _close_vesting_wallet_lock(
+    db: Session,
+    lot: VestingLot,
+    release_amount: Decimal,
+    currency: str,
+    trace_id: Any,
+) -> bool:
+    """
+    Consume the release amount from the ACTIVE WalletLock of a released lot
+    (RELEASED once fully consumed).
+    
+    NO COMMIT - caller must commit.
+    
+    Returns:
+        True if a lock was found, False if it is missing (logged, not an error)
+    """
+    # Priority 1: Direct link via operation_id
+    wallet_lock = db.query(WalletLock).filter(
+        WalletLock.operation_id == lot.source_operation_id,
+        WalletLock.reason == LockReason.VAULT_AVENIR_VESTING.value,
+        WalletLock.status == LockStatus.ACTIVE.value,
+    ).with_for_update(skip_locked=True).first()
+    
+    # Priority 2: Fallback if operation_id link missing
+    if not wallet_lock:
+        # Try to find by user_id, vault_id, reason, status, amount match
+        wallet_lock = db.query(WalletLock).filter(
+            and_(
+                WalletLock.user_id == lot.user_id,
+                WalletLock.currency == currency,
+                WalletLock.reason == LockReason.VAULT_AVENIR_VESTING.value,
+                WalletLock.reference_type == 'VAULT',
+                WalletLock.reference_id == lot.vault_id,
+                WalletLock.status == LockStatus.ACTIVE.value,
+                # Amount match (within tolerance)
+                func.abs(WalletLock.amount - lot.amount) <= Decimal('0.01'),
+                # Created on same day as deposit
+                func.date(WalletLock.created_at) == lot.deposit_day,
+            )
+        ).order_by(WalletLock.created_at.asc()).with_for_update(skip_locked=True).first()
+        
+        if wallet_lock:
+            # Log warning for fallback match
+            logger.warning(
+                f"Wallet lock found via fallback (not operation_id) for lot {lot.id}",
+                extra={
+                    "lot_id": str(lot.id),
+                    "source_operation_id": str(lot.source_operation_id),
+                    "wallet_lock_id": str(wallet_lock.id),
+                    "wallet_lock_operation_id": str(wallet_lock.operation_id),
+                    "trace_id": str(trace_id),
+                }
+            )
+    
+    if not wallet_lock:
+        # Lock not found - log warning but don't fail
+        logger.warning(
+            f"Wallet lock not found for lot {lot.id} (source_operation_id={lot.source_operation_id})",
+            extra={
+                "lot_id": str(lot.id),
+                "source_operation_id": str(lot.source_operation_id),
+                "user_id": str(lot.user_id),
+                "vault_id": str(lot.vault_id),
+                "amount": str(lot.amount),
+                "deposit_day": lot.deposit_day.isoformat(),
+                "trace_id": str(trace_id),
+            }
+        )
+        return False
+    
+    # Partial release: the lock stays ACTIVE for what is left
+    wallet_lock.consumed_amount = min(wallet_lock.amount, wallet_lock.consumed_amount + release_amount)
+    if wallet_lock.consumed_amount >= wallet_lock.amount:
+        wallet_lock.status = LockStatus.RELEASED.value
+        wallet_lock.released_at = datetime.now(timezone.utc)
+    return True
+
+
+def _trace_uuid(trace_id: str) -> UUID:
+    """release_job_trace_id for a trace_id string (job runner ids are not UUIDs: mapped with uuid5)."""
+    try:
+        return UUID(str(trace_id))
+    except ValueError:
+        return uuid5(NAMESPACE_OID, str(trace_id))
+
+
+def _match_vesting_wallet_locks(
+    db: Session,
+    released: Sequence[Tuple[VestingLot, Decimal]],
+    currency: str,
+    trace_id: str,
+) -> Dict[UUID, UUID]:
+    """
+    Find the ACTIVE WalletLock of every released lot, same rules as
+    _close_vesting_wallet_lock, with two statements for the whole chunk:
+    one IN lookup by source operation, one fallback join against a VALUES
+    list of the unmatched lots. Locks are taken FOR UPDATE SKIP LOCKED; a
+    lock is assigned to one lot at most (oldest candidate first).
+    
+    Returns:
+        lot_id -> wallet_lock_id
+    """
+    locks = WalletLock.__table__
+    matched: Dict[UUID, UUID] = {}
+    taken = set()
+    
+    # Priority 1: Direct link via operation_id
+    by_operation: Dict[UUID, UUID] = {}
+    for lock_id, operation_id in db.execute(
+        select(locks.c.id, locks.c.operation_id)
+        .where(
+            locks.c.operation_id.in_([lot.source_operation_id for lot, _ in released]),
+            locks.c.reason == LockReason.VAULT_AVENIR_VESTING.value,
+            locks.c.status == LockStatus.ACTIVE.value,
+        )
+        .order_by(locks.c.created_at)
+        .with_for_update(skip_locked=True)
+    ).all():
+        by_operation.setdefault(operation_id, lock_id)
+    for lot, _ in released:
+        lock_id = by_operation.get(lot.source_operation_id)
+        if lock_id is not None and lock_id not in taken:
+            matched[lot.id] = lock_id
+            taken.add(lock_id)
+    
+    # Priority 2: Fallback (user, vault, amount within 0.01, created on the deposit day)
+    unmatched = [lot for lot, _ in released if lot.id not in matched]
+    if not unmatched:
+        return matched
+    
+    lot_values = values(
+        column("lot_id", PG_UUID(as_uuid=True)),
+        column("user_id", PG_UUID(as_uuid=True)),
+        column("vault_id", PG_UUID(as_uuid=True)),
+        column("amount", Numeric(20, 2)),
+        column("deposit_day", Date),
+        name="vesting_lots_batch",
+    ).data([(lot.id, lot.user_id, lot.vault_id, lot.amount, lot.deposit_day) for lot in unmatched])
+    candidates: Dict[UUID, List[Tuple[UUID, Any]]] = {}
+    for lot_id, lock_id, operation_id in db.execute(
+        select(cast(lot_values.c.lot_id, PG_UUID(as_uuid=True)), locks.c.id, locks.c.operation_id)
+        .select_from(locks)
+        .join(lot_values, and_(
+            locks.c.user_id == cast(lot_values.c.user_id, PG_UUID(as_uuid=True)),
+            locks.c.reference_id == cast(lot_values.c.vault_id, PG_UUID(as_uuid=True)),
+            func.abs(locks.c.amount - cast(lot_values.c.amount, Numeric(20, 2))) <= Decimal('0.01'),
+            func.date(locks.c.created_at) == cast(lot_values.c.deposit_day, Date),
+        ))
+        .where(
+            locks.c.currency == currency,
+            locks.c.reason == LockReason.VAULT_AVENIR_VESTING.value,
+            locks.c.reference_type == 'VAULT',
+            locks.c.status == LockStatus.ACTIVE.value,
+        )
+        .order_by(locks.c.created_at)
+        .with_for_update(of=locks, skip_locked=True)
+    ).all():
+        candidates.setdefault(lot_id, []).append((lock_id, operation_id))
+    
+    for lot in unmatched:
+        for lock_id, operation_id in candidates.get(lot.id, []):
+            if lock_id in taken:
+                continue
+            matched[lot.id] = lock_id
+            taken.add(lock_id)
+            logger.warning(
+                f"Wallet lock found via fallback (not operation_id) for lot {lot.id}",
+                extra={
+                    "lot_id": str(lot.id),
+                    "source_operation_id": str(lot.source_operation_id),
+                    "wallet_lock_id": str(lock_id),
+                    "wallet_lock_operation_id": str(operation_id),
+                    "trace_id": str(trace_id),
+                }
+            )
+            break
+        else:
+            logger.warning(
+                f"Wallet lock not found for lot {lot.id} (source_operation_id={lot.source_operation_id})",
+                extra={
+                    "lot_id": str(lot.id),
+                    "source_operation_id": str(lot.source_operation_id),
+                    "user_id": str(lot.user_id),
+                    "vault_id": str(lot.vault_id),
+                    "amount": str(lot.amount),
+                    "deposit_day": lot.deposit_day.isoformat(),
+                    "trace_id": str(trace_id),
+                }
+            )
+    return matched
+
+
+def release_vesting_lot_chunk(
+    db: Session,
+    lots: Sequence[VestingLot],
+    *,
+    as_of_date: date,
+    currency: str,
+    trace_id: str,
+) -> Dict[str, Any]:
+    """
+    Release a chunk of mature lots (already locked FOR UPDATE by the caller)
+    with a constant number of statements, whatever the chunk size.
+    
+    Same effect per lot as release_avenir_vesting_lots - one
+    VAULT_VESTING_RELEASE Operation moving the remaining amount from
+    WALLET_LOCKED to WALLET_AVAILABLE, lot updated, WalletLock closed - but:
+    - wallet accounts resolved with ensure_wallet_accounts_bulk
+    - locked balances read with one query; the amount required per account
+      is aggregated over the chunk, and only users whose balance does not
+      cover all their lots are checked lot by lot (running balance)
+    - all Operations + LedgerEntries written by insert_ledger_operations()
+      (multi-row INSERTs, double-entry invariant checked in memory)
+    - lots updated with one UPDATE ... FROM (VALUES ...)
+    - WalletLocks matched with two SELECTs, consumed with one UPDATE ... FROM
+      (VALUES ...) (consume_wallet_locks)
+    
+    Lots that are no longer eligible are skipped; a lot with insufficient
+    locked balance is reported in errors and not posted. Lot objects are
+    expired (their rows were updated with Core statements).
+    
+    NO COMMIT - caller must commit.
+    
+    Returns:
+        Dict with released_count, released_amount (Decimal), skipped_count,
+        errors, locks_closed_count, locks_missing_count
+    """
+    stats: Dict[str, Any] = {
+        'released_count': 0,
+        'released_amount': Decimal('0.00'),
+        'skipped_count': 0,
+        'errors': [],
+        'locks_closed_count': 0,
+        'locks_missing_count': 0,
+    }
+    
+    eligible = [
+        lot for lot in lots
+        if lot.status == VestingLotStatus.VESTED.value
+        and lot.released_amount < lot.amount
+        and lot.release_day <= as_of_date
+        and lot.currency == currency
+    ]
+    stats['skipped_count'] = len(lots) - len(eligible)
+    if not eligible:
+        return stats
+    
+    wallet_accounts = ensure_wallet_accounts_bulk(db, [(lot.user_id, currency) for lot in eligible])
+    required: Dict[UUID, Decimal] = {}
+    for lot in eligible:
+        locked_account_id = wallet_accounts[(lot.user_id, currency)][AccountType.WALLET_LOCKED.value]
+        required[locked_account_id] = required.get(locked_account_id, Decimal('0')) + (lot.amount - lot.released_amount)
+    locked_balances = get_account_balances(db, required)
+    
+    released: List[Tuple[VestingLot, Decimal]] = []
+    postings: List[LedgerPosting] = []
+    for lot in eligible:
+        accounts = wallet_accounts[(lot.user_id, currency)]
+        locked_account_id = accounts[AccountType.WALLET_LOCKED.value]
+        release_amount = lot.amount - lot.released_amount
+        
+        if required[locked_account_id] > locked_balances[locked_account_id]:
+            # Not enough for all of this user's lots: check them in chunk order
+            if locked_balances[locked_account_id] < release_amount:
+                stats['errors'].append(
+                    f"Insufficient locked balance for lot {lot.id}: {locked_balances[locked_account_id]} < {release_amount}"
+                )
+                continue
+            locked_balances[locked_account_id] -= release_amount
+        
+        released.append((lot, release_amount))
+        postings.append(LedgerPosting(
+            operation_type=OperationType.VAULT_VESTING_RELEASE,
+            currency=currency,
+            legs=[
+                LedgerLeg(locked_account_id, -release_amount),  # DEBIT WALLET_LOCKED
+                LedgerLeg(accounts[AccountType.WALLET_AVAILABLE.value], release_amount),  # CREDIT WALLET_AVAILABLE
+            ],
+            metadata={
+                'vault_code': 'AVENIR',
+                'vault_id': str(lot.vault_id),
+                'vesting_lot_id': str(lot.id),
+                'release_date': as_of_date.isoformat(),
+                'trace_id': str(trace_id),
+                'release_amount': str(release_amount),
+                'currency': currency,
+            },
+        ))
+    if not released:
+        return stats
+    
+    operation_ids = insert_ledger_operations(db, postings)
+    now = datetime.now(timezone.utc)
+    
+    lot_table = VestingLot.__table__
+    lot_values = values(
+        column("lot_id", PG_UUID(as_uuid=True)),
+        column("release_amount", Numeric(20, 2)),
+        column("operation_id", PG_UUID(as_uuid=True)),
+        name="released_lots",
+    ).data([(lot.id, amount, operation_id) for (lot, amount), operation_id in zip(released, operation_ids)])
+    released_amount = lot_table.c.released_amount + cast(lot_values.c.release_amount, Numeric(20, 2))
+    db.execute(
+        update(lot_table)
+        .where(lot_table.c.id == cast(lot_values.c.lot_id, PG_UUID(as_uuid=True)))
+        .values(
+            released_amount=released_amount,
+            status=case((released_amount >= lot_table.c.amount, VestingLotStatus.RELEASED.value), else_=lot_table.c.status),
+            last_released_at=now,
+            last_release_operation_id=cast(lot_values.c.operation_id, PG_UUID(as_uuid=True)),
+            release_job_trace_id=_trace_uuid(trace_id),
+            release_job_run_at=now,
+        )
+    )
+    
+    # Update wallet_locks (for Wallet Matrix coherence)
+    matched = _match_vesting_wallet_locks(db, released, currency, trace_id)
+    consume_wallet_locks(
+        db,
+        {matched[lot.id]: amount for lot, amount in released if lot.id in matched},
+        now=now,
+    )
+    
+    for lot, amount in released:
+        stats['released_count'] += 1
+        stats['released_amount'] += amount
+    stats['locks_closed_count'] = len(matched)
+    stats['locks_missing_count'] = len(released) - len(matched)
+    
+    for lot in lots:
+        db.expire(lot)
+    return stats
+
+
+def release_vesting_chunk_with_replay(
+    db: Session,
+    lots: Sequence[VestingLot],
+    *,
+    as_of_date: date,
+    currency: str,
+    trace_id: str,
+) -> Dict[str, Any]:
+    """
+    release_vesting_lot_chunk() inside a SAVEPOINT; if the chunk fails it is
+    rolled back and replayed lot by lot (one SAVEPOINT each), so one bad lot
+    is reported in errors instead of failing its whole chunk.
+    
+    The row locks on lots stay held. NO COMMIT - caller must commit.
+    """
+    options = {"as_of_date": as_of_date, "currency": currency, "trace_id": trace_id}
+    lot_ids = [lot.id for lot in lots]
+    savepoint = db.begin_nested()
+    try:
+        stats = release_vesting_lot_chunk(db, lots, **options)
+        savepoint.commit()
+        return stats
+    except Exception as e:
+        savepoint.rollback()
+        logger.warning(
+            f"Vesting release chunk failed, replaying lot by lot: {type(e).__name__}: {str(e)}",
+            extra={"trace_id": str(trace_id), "chunk_size": len(lots)},
+        )
+    
+    stats: Dict[str, Any] = {
+        'released_count': 0,
+        'released_amount': Decimal('0.00'),
+        'skipped_count': 0,
+        'errors': [],
+        'locks_closed_count': 0,
+        'locks_missing_count': 0,
+    }
+    for lot, lot_id in zip(lots, lot_ids):
+        savepoint = db.begin_nested()
+        try:
+            lot_stats = release_vesting_lot_chunk(db, [lot], **options)
+            savepoint.commit()
+        except Exception as e:
+            savepoint.rollback()
+            stats['errors'].append(f"Error processing lot {lot_id}: {str(e)}")
+            continue
+        for key, value in lot_stats.items():
+            stats[key] += value
+    return stats
@@ -0,0 +1,120 @@
+"""
+Wallet account id cache - (user_id, currency) -> wallet account ids
+
+Wallet accounts are immutable and never deleted, so the ids returned by
+ensure_wallet_accounts() can be cached indefinitely once committed:
+- L1: in-process LRU with TTL (per API replica / worker)
+- L2: Redis, shared by every replica (key: wallet_accounts:{user_id}:{currency})
+
+Redis is optional for correctness: any Redis error is treated as a miss and
+the caller falls back to the database.
+
+Ids of accounts created by an open transaction are only published here after
+it commits (app/utils/session_pending.py). clear_wallet_account_cache() must be
+called whenever the database is reset (test fixtures).
+"""
+
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from app.infrastructure.settings import get_settings
+from app.utils.local_cache import TTLLRUCache
+
+logger = logging.getLogger(__name__)
+
+WalletAccountKey = Tuple[UUID, str]
+WalletAccountIds = Dict[str, UUID]
+
+_REDIS_KEY_PREFIX = "wallet_accounts"
+
+
+def _redis_key(key: WalletAccountKey) -> str:
+    user_id, currency = key
+    return f"{_REDIS_KEY_PREFIX}:{user_id}:{currency}"
+
+
+class WalletAccountCache:
+    """Two-tier (local LRU + Redis) cache of wallet account ids"""
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self.local: TTLLRUCache[WalletAccountIds] = TTLLRUCache(
+            maxsize=settings.WALLET_ACCOUNT_CACHE_SIZE,
+            ttl_seconds=settings.WALLET_ACCOUNT_CACHE_TTL_SECONDS,
+        )
+
+    def _redis(self):
+        if not get_settings().WALLET_ACCOUNT_CACHE_REDIS_ENABLED:
+            return None
+        from app.infrastructure.redis_client import get_redis
+        return get_redis()
+
+    def get_many(self, keys: Iterable[WalletAccountKey]) -> Dict[WalletAccountKey, WalletAccountIds]:
+        """Return cached ids for the keys that are known (local first, then one Redis MGET)."""
+        found: Dict[WalletAccountKey, WalletAccountIds] = {}
+        remote: List[WalletAccountKey] = []
+        for key in keys:
+            ids = self.local.get(key)
+            if ids is not None:
+                found[key] = ids
+            else:
+                remote.append(key)
+
+        client = self._redis()
+        if not remote or client is None:
+            return found
+
+        try:
+            values = client.mget([_redis_key(key) for key in remote])
+        except Exception as e:
+            logger.warning(f"Wallet account cache: Redis read failed, falling back to DB: {e}")
+            return found
+
+        for key, value in zip(remote, values):
+            if value is None:
+                continue
+            ids = {account_type: UUID(account_id) for account_type, account_id in json.loads(value).items()}
+            self.local.set(key, ids)
+            found[key] = ids
+        return found
+
+    def get(self, key: WalletAccountKey) -> Optional[WalletAccountIds]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, entries: Dict[WalletAccountKey, WalletAccountIds]) -> None:
+        """Cache committed ids in both tiers."""
+        if not entries:
+            return
+        for key, ids in entries.items():
+            self.local.set(key, dict(ids))
+
+        client = self._redis()
+        if client is None:
+            return
+
+        ttl = get_settings().WALLET_ACCOUNT_CACHE_REDIS_TTL_SECONDS
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key, ids in entries.items():
+                pipe.setex(
+                    _redis_key(key),
+                    ttl,
+                    json.dumps({account_type: str(account_id) for account_type, account_id in ids.items()}),
+                )
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Wallet account cache: Redis write failed: {e}")
+
+    def clear(self) -> None:
+        """Clear the local tier (Redis entries expire on their own)."""
+        self.local.clear()
+
+
+wallet_account_cache = WalletAccountCache()
+
+
+def clear_wallet_account_cache() -> None:
+    """Invalidate the local tier (call after the database has been reset)."""
+    wallet_account_cache.clear()
@@ -3,12 +3,34 @@ Wallet account provisioning and balance helpers
 """
 
 from decimal import Decimal
-from typing import Dict
-from uuid import UUID
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
 from sqlalchemy.orm import Session
-from sqlalchemy import func, select
+from sqlalchemy import and_, func, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.core.accounts.models import Account, AccountType
 from app.core.ledger.models import LedgerEntry
+from app.core.ledger.balances import AccountBalance, AccountBalanceCheckpoint
+from app.core.ledger.partitions import archive_horizon_subquery
+from app.infrastructure.settings import get_settings
+from app.services.wallet_account_cache import wallet_account_cache
+from app.utils.session_pending import add_pending, get_pending, register_pending_namespace
+
+
+WALLET_ACCOUNT_TYPES = (
+    AccountType.WALLET_AVAILABLE,
+    AccountType.WALLET_BLOCKED,
+    AccountType.WALLET_LOCKED,
+)
+
+_PENDING_WALLET_ACCOUNTS = "wallet_accounts_pending"
+register_pending_namespace(_PENDING_WALLET_ACCOUNTS, wallet_account_cache.put_many)
+
+_WALLET_BALANCE_KEYS = {
+    AccountType.WALLET_AVAILABLE: 'available_balance',
+    AccountType.WALLET_BLOCKED: 'blocked_balance',
+    AccountType.WALLET_LOCKED: 'locked_balance',
+}
 
 
 def ensure_wallet_accounts(db: Session, user_id: UUID, currency: str) -> Dict[str, UUID]:
@@ -20,100 +42,353 @@ def ensure_wallet_accounts(db: Session, user_id: UUID, currency: str) -> Dict[st
     - WALLET_BLOCKED
     - WALLET_LOCKED
     
+    Served from the wallet account cache when known; otherwise one SELECT for
+    the three types, plus one INSERT ... ON CONFLICT DO NOTHING for any that
+    are missing (see ensure_wallet_accounts_bulk).
+    
     Returns a dict mapping account_type to account_id.
     """
-    required_types = [
-        AccountType.WALLET_AVAILABLE,
-        AccountType.WALLET_BLOCKED,
-        AccountType.WALLET_LOCKED,
-    ]
+    key = (user_id, currency)
+    return ensure_wallet_accounts_bulk(db, [key])[key]
+
+
+def ensure_wallet_accounts_bulk(
+    db: Session,
+    user_currencies: Iterable[Tuple[UUID, str]],
+) -> Dict[Tuple[UUID, str], Dict[str, UUID]]:
+    """
+    Ensure wallet accounts exist for many (user_id, currency) pairs.
     
-    result = {}
+    Pairs known to the wallet account cache cost no query. The rest take one
+    SELECT for all their wallet accounts, then every missing account is
+    created by a single INSERT ... ON CONFLICT DO NOTHING RETURNING on
+    uq_accounts_user_wallet. Rows that lost a race with a concurrent insert
+    are read back with one more SELECT.
+    
+    Ids of accounts created here are cached only after the caller commits.
+    
+    Returns a dict mapping (user_id, currency) to the ensure_wallet_accounts() dict.
+    """
+    pairs = list(dict.fromkeys(user_currencies))
+    if not pairs:
+        return {}
     
-    for account_type in required_types:
-        # Check if account exists
-        account = db.query(Account).filter(
-            Account.user_id == user_id,
-            Account.currency == currency,
-            Account.account_type == account_type,
-        ).first()
+    result: Dict[Tuple[UUID, str], Dict[str, UUID]] = {}
+    pending = get_pending(db, _PENDING_WALLET_ACCOUNTS)
+    for pair in pairs:
+        if pair in pending:
+            result[pair] = dict(pending[pair])
+    result.update(wallet_account_cache.get_many(pair for pair in pairs if pair not in result))
+    
+    lookup = [pair for pair in pairs if pair not in result]
+    if not lookup:
+        return result
+    
+    found = _select_wallet_accounts(db, lookup)
+    missing = [
+        (user_id, currency, account_type)
+        for user_id, currency in lookup
+        for account_type in WALLET_ACCOUNT_TYPES
+        if account_type.value not in found[(user_id, currency)]
+    ]
+    
+    created_pairs = set()
+    if missing:
+        inserted = _insert_wallet_accounts(db, missing)
+        for user_id, currency, account_type, account_id in inserted:
+            found[(user_id, currency)][account_type.value] = account_id
+            created_pairs.add((user_id, currency))
         
-        if account:
-            result[account_type.value] = account.id
+        raced = list(dict.fromkeys(
+            (user_id, currency)
+            for user_id, currency, account_type in missing
+            if account_type.value not in found[(user_id, currency)]
+        ))
+        if raced:
+            for pair, accounts in _select_wallet_accounts(db, raced).items():
+                found[pair].update(accounts)
+    
+    committed = {}
+    for pair in lookup:
+        accounts = found[pair]
+        result[pair] = accounts
+        if pair in created_pairs:
+            # Cached once committed
+            add_pending(db, _PENDING_WALLET_ACCOUNTS, pair, dict(accounts))
         else:
-            # Create missing account
-            account = Account(
-                user_id=user_id,
-                currency=currency,
-                account_type=account_type,
-            )
-            db.add(account)
-            db.flush()  # Flush to get the ID
-            result[account_type.value] = account.id
+            committed[pair] = accounts
+    wallet_account_cache.put_many(committed)
     
     return result
 
 
+def _select_wallet_accounts(
+    db: Session,
+    pairs: List[Tuple[UUID, str]],
+) -> Dict[Tuple[UUID, str], Dict[str, UUID]]:
+    """One SELECT of the wallet accounts of many (user_id, currency) pairs."""
+    rows = db.query(
+        Account.user_id, Account.currency, Account.account_type, Account.id,
+    ).filter(
+        tuple_(Account.user_id, Account.currency).in_(pairs),
+        Account.account_type.in_(WALLET_ACCOUNT_TYPES),
+        Account.vault_id.is_(None),
+        Account.offer_id.is_(None),
+    ).all()
+    
+    found: Dict[Tuple[UUID, str], Dict[str, UUID]] = {pair: {} for pair in pairs}
+    for user_id, currency, account_type, account_id in rows:
+        found[(user_id, currency)][account_type.value] = account_id
+    return found
+
+
+def _insert_wallet_accounts(
+    db: Session,
+    missing: List[Tuple[UUID, str, AccountType]],
+) -> List[Tuple[UUID, str, AccountType, UUID]]:
+    """
+    INSERT missing wallet accounts, skipping rows a concurrent transaction
+    created first. Returns (user_id, currency, account_type, id) of inserted rows.
+    """
+    table = Account.__table__
+    stmt = pg_insert(table).values([
+        {
+            "id": uuid4(),
+            "user_id": user_id,
+            "currency": currency,
+            "account_type": account_type,
+        }
+        for user_id, currency, account_type in missing
+    ]).on_conflict_do_nothing(
+        index_elements=[table.c.user_id, table.c.currency, table.c.account_type],
+        index_where=and_(
+            table.c.user_id.isnot(None),
+            table.c.vault_id.is_(None),
+            table.c.offer_id.is_(None),
+        ),
+    ).returning(table.c.user_id, table.c.currency, table.c.account_type, table.c.id)
+    
+    return [tuple(row) for row in db.execute(stmt)]
+
+
 def get_account_balance(db: Session, account_id: UUID) -> Decimal:
     """
-    Get account balance by summing all ledger entries.
+    Get account balance.
+    
+    Reads the materialized snapshot (account_balances) by default, which is a
+    single indexed lookup regardless of ledger history length. The read path
+    is selected by settings.BALANCE_READ_MODE (snapshot | checkpoint | ledger).
     
     Returns Decimal(0) if no entries exist.
     """
-    result = db.query(
+    mode = get_settings().BALANCE_READ_MODE.lower()
+    if mode == "ledger":
+        return get_ledger_balance(db, account_id)
+    if mode == "checkpoint":
+        return get_checkpoint_balance(db, account_id)
+    return get_snapshot_balance(db, account_id)
+
+
+def get_snapshot_balance(db: Session, account_id: UUID) -> Decimal:
+    """
+    Get account balance from the account_balances snapshot (O(1)).
+    
+    The snapshot is updated in the same DB transaction as each LedgerEntry
+    insert, so a missing row means the account has no entries.
+    """
+    result = db.query(AccountBalance.balance).filter(
+        AccountBalance.account_id == account_id
+    ).scalar()
+    
+    return Decimal(str(result)) if result is not None else Decimal('0')
+
+
+def get_checkpoint_balance(db: Session, account_id: UUID) -> Decimal:
+    """
+    Get account balance as latest checkpoint + SUM(entries after checkpoint).
+    
+    Only the entries written since the last checkpoint are scanned
+    (ix_ledger_entries_account_created). Falls back to a full ledger SUM when
+    the account has no checkpoint yet.
+    """
+    checkpoint = db.query(AccountBalanceCheckpoint).filter(
+        AccountBalanceCheckpoint.account_id == account_id
+    ).order_by(AccountBalanceCheckpoint.checkpoint_at.desc()).first()
+    
+    if checkpoint is None:
+        return get_ledger_balance(db, account_id)
+    
+    delta = db.query(
         func.coalesce(func.sum(LedgerEntry.amount), Decimal('0'))
     ).filter(
-        LedgerEntry.account_id == account_id
+        LedgerEntry.account_id == account_id,
+        LedgerEntry.created_at >= checkpoint.checkpoint_at,
+    ).scalar()
+    
+    return Decimal(str(checkpoint.balance)) + (Decimal(str(delta)) if delta is not None else Decimal('0'))
+
+
+def get_ledger_balance(db: Session, account_id: UUID) -> Decimal:
+    """
+    Get account balance by summing all ledger entries (source of truth).
+    
+    Entries of archived ledger partitions are counted through the balance
+    checkpoint at the archive horizon (see app/core/ledger/partitions.py).
+    
+    Cost grows with the account's history - use for reconciliation and
+    audits, not on request paths.
+    
+    Returns Decimal(0) if no entries exist.
+    """
+    amounts = _ledger_amounts([account_id])
+    result = db.query(
+        func.coalesce(func.sum(amounts.c.amount), Decimal('0'))
     ).scalar()
     
     return Decimal(str(result)) if result is not None else Decimal('0')
 
 
-def get_wallet_balances(db: Session, user_id: UUID, currency: str) -> Dict[str, Decimal]:
+def _ledger_amounts(account_ids):
     """
-    Get wallet balances for all compartments.
+    Subquery of (account_id, amount) rows whose per-account SUM is the ledger
+    balance: live ledger entries plus archived balances.
+    
+    account_ids: list of ids, or a SELECT of account ids
+    """
+    live = select(
+        LedgerEntry.account_id.label("account_id"),
+        LedgerEntry.amount.label("amount"),
+    ).where(LedgerEntry.account_id.in_(account_ids))
+    archived = select(
+        AccountBalanceCheckpoint.account_id,
+        AccountBalanceCheckpoint.balance,
+    ).where(
+        AccountBalanceCheckpoint.checkpoint_at == archive_horizon_subquery(),
+        AccountBalanceCheckpoint.account_id.in_(account_ids),
+    )
+    return union_all(live, archived).subquery()
+
+
+def get_account_balances(db: Session, account_ids: Iterable[UUID]) -> Dict[UUID, Decimal]:
+    """
+    Get balances for many accounts in one query.
+    
+    Reads account_balances snapshots, or SUM(ledger_entries.amount) grouped
+    by account when settings.BALANCE_READ_MODE == "ledger".
+    
+    Returns a dict mapping account_id to balance (Decimal(0) for accounts without entries).
+    """
+    account_ids = list(account_ids)
+    if not account_ids:
+        return {}
+    
+    if get_settings().BALANCE_READ_MODE.lower() == "ledger":
+        amounts = _ledger_amounts(account_ids)
+        rows = db.query(
+            amounts.c.account_id,
+            func.sum(amounts.c.amount),
+        ).group_by(amounts.c.account_id).all()
+    else:
+        rows = db.query(
+            AccountBalance.account_id,
+            AccountBalance.balance,
+        ).filter(
+            AccountBalance.account_id.in_(account_ids)
+        ).all()
+    
+    balances = {account_id: Decimal('0') for account_id in account_ids}
+    for account_id, balance in rows:
+        balances[account_id] = Decimal(str(balance)) if balance is not None else Decimal('0')
+    return balances
+
+
+def get_wallet_balances_bulk(
+    db: Session,
+    user_ids: Iterable[UUID],
+    currencies: Optional[Iterable[str]] = None,
+) -> Dict[Tuple[UUID, str], Dict[str, Decimal]]:
+    """
+    Get wallet compartment balances for many users (and currencies) in one query.
+    
+    Single grouped aggregate over the user's wallet accounts:
+        GROUP BY accounts.user_id, accounts.currency, accounts.account_type
+    joined to account_balances (or ledger_entries when BALANCE_READ_MODE == "ledger").
+    
+    Args:
+        db: Database session
+        user_ids: Users to read
+        currencies: Currencies to read (default: every currency the users hold)
     
     Returns:
-    - total_balance: Sum of all wallet accounts
-    - available_balance: WALLET_AVAILABLE balance
-    - blocked_balance: WALLET_BLOCKED balance
-    - locked_balance: WALLET_LOCKED balance
+        Dict mapping (user_id, currency) to the get_wallet_balances() dict.
+        When currencies is given, every requested (user_id, currency) pair is
+        present (zero balances if the user has no accounts yet).
     """
-    # Get account IDs for wallet compartments
-    accounts = db.query(Account).filter(
-        Account.user_id == user_id,
-        Account.currency == currency,
-        Account.account_type.in_([
-            AccountType.WALLET_AVAILABLE,
-            AccountType.WALLET_BLOCKED,
-            AccountType.WALLET_LOCKED,
-        ])
-    ).all()
+    user_ids = list(user_ids)
+    currencies = list(currencies) if currencies is not None else None
+    if not user_ids:
+        return {}
     
-    # Map account_type to account_id
-    account_map = {acc.account_type: acc.id for acc in accounts}
+    if get_settings().BALANCE_READ_MODE.lower() == "ledger":
+        wallet_account_ids = select(Account.id).where(
+            Account.user_id.in_(user_ids),
+            Account.account_type.in_(WALLET_ACCOUNT_TYPES),
+        )
+        if currencies is not None:
+            wallet_account_ids = wallet_account_ids.where(Account.currency.in_(currencies))
+        amounts = _ledger_amounts(wallet_account_ids)
+        balance_column = func.sum(amounts.c.amount)
+        query = db.query(
+            Account.user_id, Account.currency, Account.account_type, balance_column,
+        ).outerjoin(amounts, amounts.c.account_id == Account.id)
+    else:
+        balance_column = func.sum(AccountBalance.balance)
+        query = db.query(
+            Account.user_id, Account.currency, Account.account_type, balance_column,
+        ).outerjoin(AccountBalance, AccountBalance.account_id == Account.id)
     
-    # Calculate balances
-    available_balance = get_account_balance(
-        db, account_map.get(AccountType.WALLET_AVAILABLE)
-    ) if AccountType.WALLET_AVAILABLE in account_map else Decimal('0')
+    query = query.filter(
+        Account.user_id.in_(user_ids),
+        Account.account_type.in_(WALLET_ACCOUNT_TYPES),
+    )
+    if currencies is not None:
+        query = query.filter(Account.currency.in_(currencies))
     
-    blocked_balance = get_account_balance(
-        db, account_map.get(AccountType.WALLET_BLOCKED)
-    ) if AccountType.WALLET_BLOCKED in account_map else Decimal('0')
+    rows = query.group_by(Account.user_id, Account.currency, Account.account_type).all()
     
-    locked_balance = get_account_balance(
-        db, account_map.get(AccountType.WALLET_LOCKED)
-    ) if AccountType.WALLET_LOCKED in account_map else Decimal('0')
+    def empty() -> Dict[str, Decimal]:
+        return {
+            'total_balance': Decimal('0'),
+            'available_balance': Decimal('0'),
+            'blocked_balance': Decimal('0'),
+            'locked_balance': Decimal('0'),
+        }
     
-    total_balance = available_balance + blocked_balance + locked_balance
+    result: Dict[Tuple[UUID, str], Dict[str, Decimal]] = {}
+    if currencies is not None:
+        for user_id in user_ids:
+            for currency in currencies:
+                result[(user_id, currency)] = empty()
     
-    return {
-        'total_balance': total_balance,
-        'available_balance': available_balance,
-        'blocked_balance': blocked_balance,
-        'locked_balance': locked_balance,
-    }
-
+    for user_id, currency, account_type, balance in rows:
+        balances = result.setdefault((user_id, currency), empty())
+        amount = Decimal(str(balance)) if balance is not None else Decimal('0')
+        balances[_WALLET_BALANCE_KEYS[account_type]] += amount
+        balances['total_balance'] += amount
+    
+    return result
 
 
+def get_wallet_balances(db: Session, user_id: UUID, currency: str) -> Dict[str, Decimal]:
+    """
+    Get wallet balances for all compartments.
+    
+    Single grouped query (see get_wallet_balances_bulk).
+    
+    Returns:
+    - total_balance: Sum of all wallet accounts
+    - available_balance: WALLET_AVAILABLE balance
+    - blocked_balance: WALLET_BLOCKED balance
+    - locked_balance: WALLET_LOCKED balance
+    """
+    return get_wallet_balances_bulk(db, [user_id], [currency])[(user_id, currency)]
@@ -0,0 +1,173 @@
+"""
+WalletLock helpers - Range consumption of locks on partial releases
+
+A release consumes locks instead of splitting them: consumed_amount grows
+and a lock is RELEASED once fully consumed (see WalletLock). Each helper
+is one row-locking SELECT and one UPDATE, whatever the number of locks or
+users involved.
+
+Both helpers first lock the candidate rows (SELECT id ... ORDER BY id FOR
+UPDATE, one statement): withdrawals serialize on the vault row but vesting
+releases serialize on lot ids, so the two can race on the same lock. The
+UPDATE that follows reads a new snapshot, with the current consumed_amount
+and status of every row it touches.
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import Numeric, case, cast, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.core.accounts.exposures import apply_exposure_deltas, collect_lock_consumption_deltas
+from app.core.accounts.wallet_locks import LockStatus, WalletLock
+
+
+def consume_wallet_locks_fifo(
+    db: Session,
+    amounts: Dict[UUID, Decimal],
+    *,
+    reason: str,
+    reference_type: str,
+    reference_id: UUID,
+    now: Optional[datetime] = None,
+) -> int:
+    """
+    Release amounts[user_id] from each user's ACTIVE locks on one
+    instrument, oldest first (created_at, id).
+
+    One ordered scan of the ACTIVE locks (ix_wallet_locks_active_fifo) with
+    a running total per user; the locks before the cut-off are fully
+    consumed (RELEASED), the one crossing it is consumed in part and stays
+    ACTIVE. A user whose locks do not cover the amount has them all
+    released.
+
+    NO COMMIT - caller must commit.
+
+    Returns:
+        Number of locks updated
+    """
+    amounts = {user_id: amount for user_id, amount in amounts.items() if amount > 0}
+    if not amounts:
+        return 0
+    now = now or datetime.now(timezone.utc)
+    db.flush()
+
+    locks = WalletLock.__table__
+    _lock_rows(db, select(locks.c.id).where(
+        locks.c.user_id.in_(list(amounts)),
+        locks.c.reference_type == reference_type,
+        locks.c.reference_id == reference_id,
+        locks.c.reason == reason,
+        locks.c.status == LockStatus.ACTIVE.value,
+    ))
+    targets = values(
+        column("user_id", PG_UUID(as_uuid=True)),
+        column("amount", Numeric(20, 2)),
+        name="lock_consumption",
+    ).data(list(amounts.items()))
+    remaining = locks.c.amount - locks.c.consumed_amount
+    ranked = (
+        select(
+            locks.c.id,
+            remaining.label("remaining"),
+            func.sum(remaining).over(
+                partition_by=locks.c.user_id,
+                order_by=(locks.c.created_at, locks.c.id),
+            ).label("running"),
+            cast(targets.c.amount, Numeric(20, 2)).label("target"),
+        )
+        .select_from(locks.join(targets, locks.c.user_id == cast(targets.c.user_id, PG_UUID(as_uuid=True))))
+        .where(
+            locks.c.reference_type == reference_type,
+            locks.c.reference_id == reference_id,
+            locks.c.reason == reason,
+            locks.c.status == LockStatus.ACTIVE.value,
+        )
+        .subquery("ranked_locks")
+    )
+    consumed_before = ranked.c.running - ranked.c.remaining  # By the user's older locks
+    consumed = func.least(ranked.c.remaining, ranked.c.target - consumed_before)
+    fully_consumed = ranked.c.running <= ranked.c.target
+    rows = db.execute(
+        update(locks)
+        .where(locks.c.id == ranked.c.id, consumed_before < ranked.c.target)
+        .values(
+            consumed_amount=locks.c.consumed_amount + consumed,
+            status=case((fully_consumed, LockStatus.RELEASED.value), else_=locks.c.status),
+            released_at=case((fully_consumed, now), else_=locks.c.released_at),
+        )
+        .returning(*_exposure_columns(locks), consumed.label("consumed"))
+    ).all()
+    apply_exposure_deltas(db.connection(), collect_lock_consumption_deltas(rows))
+    return len(rows)
+
+
+def consume_wallet_locks(
+    db: Session,
+    amounts: Dict[UUID, Decimal],
+    *,
+    now: Optional[datetime] = None,
+) -> int:
+    """
+    Release amounts[lock_id] from given ACTIVE locks (capped at what each
+    lock has left); a lock fully consumed is RELEASED.
+
+    NO COMMIT - caller must commit.
+
+    Returns:
+        Number of locks updated
+    """
+    if not amounts:
+        return 0
+    now = now or datetime.now(timezone.utc)
+    db.flush()
+
+    locks = WalletLock.__table__
+    _lock_rows(db, select(locks.c.id).where(
+        locks.c.id.in_(list(amounts)),
+        locks.c.status == LockStatus.ACTIVE.value,
+    ))
+    released = values(
+        column("lock_id", PG_UUID(as_uuid=True)),
+        column("amount", Numeric(20, 2)),
+        name="released_amounts",
+    ).data(list(amounts.items()))
+    taken = (
+        select(
+            locks.c.id,
+            func.least(
+                locks.c.amount - locks.c.consumed_amount,
+                cast(released.c.amount, Numeric(20, 2)),
+            ).label("consumed"),
+        )
+        .select_from(locks.join(released, locks.c.id == cast(released.c.lock_id, PG_UUID(as_uuid=True))))
+        .where(locks.c.status == LockStatus.ACTIVE.value)
+        .subquery("consumed_locks")
+    )
+    fully_consumed = locks.c.consumed_amount + taken.c.consumed >= locks.c.amount
+    rows = db.execute(
+        update(locks)
+        .where(locks.c.id == taken.c.id)
+        .values(
+            consumed_amount=locks.c.consumed_amount + taken.c.consumed,
+            status=case((fully_consumed, LockStatus.RELEASED.value), else_=locks.c.status),
+            released_at=case((fully_consumed, now), else_=locks.c.released_at),
+        )
+        .returning(*_exposure_columns(locks), taken.c.consumed)
+    ).all()
+    apply_exposure_deltas(db.connection(), collect_lock_consumption_deltas(rows))
+    return len(rows)
+
+
+def _lock_rows(db: Session, candidates) -> None:
+    """Row-lock the candidate locks in id order (same order in every caller: no deadlocks)"""
+    db.execute(candidates.order_by(WalletLock.__table__.c.id).with_for_update()).all()
+
+
+def _exposure_columns(locks):
+    """RETURNING columns of a consumption UPDATE (new status: RELEASED if fully consumed)"""
+    return (locks.c.reference_type, locks.c.reference_id, locks.c.reason, locks.c.currency, locks.c.status)
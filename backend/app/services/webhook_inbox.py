@@ -0,0 +1,336 @@
+"""
+Webhook inbox - Durable intake of provider webhooks, processed asynchronously
+
+Intake (HTTP request path):
+- validate the payload, INSERT it into webhook_inbox_events keyed by
+  (provider, provider_event_id) with ON CONFLICT DO NOTHING, commit, enqueue
+  (a deposit already recorded, e.g. by bulk ingestion, is answered as a
+  duplicate with its Transaction)
+- no ledger work, so webhook latency does not depend on ledger write time
+
+Processing (RQ worker, app/workers/jobs.py):
+- the inbox row is locked (FOR UPDATE SKIP LOCKED) for the whole attempt
+- ledger work runs in a SAVEPOINT: a failure rolls back the ledger rows but
+  keeps the attempt bookkeeping
+- retriable failures are rescheduled with exponential backoff; after
+  WEBHOOK_INBOX_MAX_ATTEMPTS (or a non-retriable error) the event is
+  moved to DEAD_LETTER for manual action
+
+The inbox table, not the RQ queue, is the source of truth: events whose job was
+lost (Redis down at intake, worker crash) are re-enqueued by the sweeper
+(scripts/run_webhook_inbox_sweeper.py). One RQ job id per attempt
+(inbox_job_id) keeps the sweeper from queueing an attempt twice.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.ledger.models import Operation
+from app.core.transactions.models import Transaction, TransactionType, TransactionStatus
+from app.core.webhooks.models import (
+    WebhookEventType,
+    WebhookInboxEvent,
+    WebhookInboxStatus,
+    WebhookProvider,
+)
+from app.infrastructure.settings import get_settings
+from app.services.fund_services import ValidationError, deposit_idempotency_key, record_deposit_blocked
+from app.utils.metrics import record_webhook_inbox_outcome
+
+logger = logging.getLogger(__name__)
+
+# Job path (string form, so this module does not import the workers package)
+PROCESS_INBOX_EVENT_JOB = "app.workers.jobs.process_webhook_inbox_event"
+
+# Errors that will fail the same way on every attempt
+NON_RETRIABLE_ERRORS = (ValidationError,)
+
+
+def store_zand_deposit_event(
+    db: Session,
+    *,
+    provider_event_id: str,
+    payload: Dict[str, Any],
+) -> Tuple[Optional[UUID], UUID, bool]:
+    """
+    Persist a ZAND deposit webhook in the inbox (idempotent on provider_event_id).
+
+    A deposit already recorded (e.g. through bulk ingestion) is a duplicate:
+    nothing is stored and its Transaction is returned. Otherwise one
+    INSERT ... ON CONFLICT DO NOTHING RETURNING; a duplicate delivery costs
+    one extra SELECT to return the original row.
+
+    NO COMMIT - caller must commit (before enqueueing).
+
+    Args:
+        db: Database session
+        provider_event_id: ZAND event id
+        payload: Validated payload, JSON-serializable
+
+    Returns:
+        (inbox_event_id, transaction_id, created) - created is False for
+        duplicates; inbox_event_id is None if the deposit was already recorded
+    """
+    recorded = db.query(Operation.transaction_id).filter(
+        Operation.idempotency_key == deposit_idempotency_key(provider_event_id)
+    ).first()
+    if recorded is not None and recorded.transaction_id is not None:
+        return None, recorded.transaction_id, False
+
+    table = WebhookInboxEvent.__table__
+    stmt = pg_insert(table).values(
+        id=uuid4(),
+        provider=WebhookProvider.ZAND.value,
+        event_type=WebhookEventType.DEPOSIT.value,
+        provider_event_id=provider_event_id,
+        payload=payload,
+        status=WebhookInboxStatus.RECEIVED.value,
+        attempts=0,
+        transaction_id=uuid4(),
+    ).on_conflict_do_nothing(
+        constraint="uq_webhook_inbox_events_provider_event",
+    ).returning(table.c.id, table.c.transaction_id)
+
+    row = db.execute(stmt).first()
+    if row is not None:
+        return row.id, row.transaction_id, True
+
+    existing = db.query(WebhookInboxEvent.id, WebhookInboxEvent.transaction_id).filter(
+        WebhookInboxEvent.provider == WebhookProvider.ZAND.value,
+        WebhookInboxEvent.provider_event_id == provider_event_id,
+    ).one()
+    return existing.id, existing.transaction_id, False
+
+
+def inbox_job_id(event_id: UUID, attempts: int) -> str:
+    """
+    RQ job id of the next attempt of an inbox event.
+
+    Deterministic per (event, attempts already made): the intake, the
+    job's own backoff retry and the sweeper all compute the same id for the
+    same attempt, while the retry scheduled by a running job never collides
+    with the id of that running job.
+    """
+    return f"webhook-inbox:{event_id}:{attempts}"
+
+
+def enqueue_inbox_event(event_id: UUID, *, attempts: int = 0, delay_seconds: Optional[int] = None) -> bool:
+    """
+    Enqueue (or schedule) processing of an inbox event on the webhook RQ queue.
+
+    No-op if the job of this attempt is already queued, scheduled or
+    running (the sweeper re-enqueueing an event whose job is only slow).
+    Delayed jobs need a worker started with the scheduler (app/workers/worker.py).
+
+    Returns True if a job was enqueued.
+    """
+    from rq import Queue
+    from rq.exceptions import NoSuchJobError
+    from rq.job import Job, JobStatus
+    from app.infrastructure.redis_client import get_rq_redis
+
+    connection = get_rq_redis()
+    job_id = inbox_job_id(event_id, attempts)
+    try:
+        pending = Job.fetch(job_id, connection=connection).get_status() in (
+            JobStatus.QUEUED, JobStatus.SCHEDULED, JobStatus.DEFERRED, JobStatus.STARTED,
+        )
+    except NoSuchJobError:
+        pending = False
+    if pending:
+        return False
+
+    queue = Queue(get_settings().WEBHOOK_INBOX_QUEUE, connection=connection)
+    if delay_seconds:
+        queue.enqueue_in(timedelta(seconds=delay_seconds), PROCESS_INBOX_EVENT_JOB, str(event_id), job_id=job_id)
+    else:
+        queue.enqueue(PROCESS_INBOX_EVENT_JOB, str(event_id), job_id=job_id)
+    return True
+
+
+def retry_delay_seconds(attempts: int) -> int:
+    """Exponential backoff: BACKOFF_SECONDS * 2^(attempts-1), capped at BACKOFF_MAX_SECONDS."""
+    settings = get_settings()
+    delay = settings.WEBHOOK_INBOX_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+    return min(delay, settings.WEBHOOK_INBOX_BACKOFF_MAX_SECONDS)
+
+
+def process_inbox_event(db: Session, event_id: UUID) -> Tuple[Optional[str], Optional[int], Optional[UUID]]:
+    """
+    Run one processing attempt for an inbox event.
+
+    Commits (ledger work and inbox bookkeeping in one transaction).
+
+    Returns:
+        (status, retry_in_seconds, transaction_id):
+        - status is None if the event does not exist, another worker holds
+          it, or it FAILED and its retry is not due yet (the retry job is
+          already scheduled: an early duplicate must not spend an attempt)
+        - retry_in_seconds is set only when status == FAILED
+        - transaction_id is the deposit's Transaction once PROCESSED (an
+          existing one if the deposit was recorded through another path),
+          else the id assigned at intake; None when status is None
+    """
+    event = db.query(WebhookInboxEvent).filter(
+        WebhookInboxEvent.id == event_id
+    ).with_for_update(skip_locked=True).first()
+
+    if event is None:
+        return None, None, None
+
+    if event.status in (WebhookInboxStatus.PROCESSED.value, WebhookInboxStatus.DEAD_LETTER.value):
+        return event.status, None, event.transaction_id
+
+    now = datetime.now(timezone.utc)
+    if event.status == WebhookInboxStatus.FAILED.value and event.next_attempt_at and event.next_attempt_at > now:
+        db.rollback()  # Release the row lock
+        return None, None, None
+
+    event.attempts += 1
+    retry_in = None
+
+    try:
+        with db.begin_nested():
+            transaction_id, operation_id = _apply_event(db, event)
+    except Exception as e:
+        event.last_error = f"{type(e).__name__}: {str(e)}"
+        if isinstance(e, NON_RETRIABLE_ERRORS) or event.attempts >= get_settings().WEBHOOK_INBOX_MAX_ATTEMPTS:
+            event.status = WebhookInboxStatus.DEAD_LETTER.value
+            event.next_attempt_at = None
+            logger.error(
+                f"Webhook inbox event dead-lettered: {event.provider}/{event.provider_event_id}",
+                extra={"inbox_event_id": str(event.id), "attempts": event.attempts, "error": event.last_error},
+            )
+        else:
+            retry_in = retry_delay_seconds(event.attempts)
+            event.status = WebhookInboxStatus.FAILED.value
+            event.next_attempt_at = now + timedelta(seconds=retry_in)
+            logger.warning(
+                f"Webhook inbox event failed, retrying in {retry_in}s: {event.provider}/{event.provider_event_id}",
+                extra={"inbox_event_id": str(event.id), "attempts": event.attempts, "error": event.last_error},
+            )
+    else:
+        event.status = WebhookInboxStatus.PROCESSED.value
+        event.transaction_id = transaction_id
+        event.operation_id = operation_id
+        event.processed_at = now
+        event.next_attempt_at = None
+        event.last_error = None
+
+    status, provider, transaction_id = event.status, event.provider, event.transaction_id
+    db.commit()
+
+    record_webhook_inbox_outcome(provider, status.lower())
+    return status, retry_in, transaction_id
+
+
+def _apply_event(db: Session, event: WebhookInboxEvent) -> Tuple[UUID, UUID]:
+    """Dispatch an inbox event to its ledger handler. NO COMMIT."""
+    if event.provider == WebhookProvider.ZAND.value and event.event_type == WebhookEventType.DEPOSIT.value:
+        return _apply_zand_deposit(db, event)
+    raise ValidationError(f"Unsupported webhook event: {event.provider}/{event.event_type}")
+
+
+def _apply_zand_deposit(db: Session, event: WebhookInboxEvent) -> Tuple[UUID, UUID]:
+    """
+    Create the deposit Transaction (id assigned at intake) and record the deposit
+    in WALLET_BLOCKED. NO COMMIT.
+
+    If the deposit was already recorded through another path (bulk ingestion),
+    the existing Operation is returned and no Transaction is created.
+    """
+    payload = event.payload
+    idempotency_key = deposit_idempotency_key(event.provider_event_id)
+
+    existing = db.query(Operation).filter(
+        Operation.idempotency_key == idempotency_key
+    ).first()
+    if existing:
+        return existing.transaction_id or event.transaction_id, existing.id
+
+    transaction = Transaction(
+        id=event.transaction_id,
+        user_id=UUID(payload["user_id"]),
+        type=TransactionType.DEPOSIT,
+        status=TransactionStatus.INITIATED,
+        transaction_metadata={
+            "provider_event_id": event.provider_event_id,
+            "iban": payload.get("iban"),
+            "amount": payload["amount"],
+            "currency": payload["currency"],
+            "occurred_at": payload.get("occurred_at"),
+        },
+    )
+    db.add(transaction)
+
+    operation = record_deposit_blocked(
+        db=db,
+        user_id=transaction.user_id,
+        currency=payload["currency"],
+        amount=Decimal(payload["amount"]),
+        transaction_id=transaction.id,
+        idempotency_key=idempotency_key,
+        provider_reference=event.provider_event_id,
+        commit=False,
+    )
+    return transaction.id, operation.id
+
+
+def list_due_inbox_events(
+    db: Session,
+    *,
+    stale_after_seconds: int = 60,
+    limit: int = 500,
+) -> List[Tuple[UUID, int]]:
+    """
+    Find inbox events that need (re-)enqueueing, as (event_id, attempts)
+    pairs (attempts identifies the job, see inbox_job_id).
+
+    - FAILED events whose next_attempt_at has passed
+    - RECEIVED events older than stale_after_seconds (job lost or never enqueued)
+    """
+    now = datetime.now(timezone.utc)
+    rows = db.query(WebhookInboxEvent.id, WebhookInboxEvent.attempts).filter(
+        or_(
+            and_(
+                WebhookInboxEvent.status == WebhookInboxStatus.FAILED.value,
+                WebhookInboxEvent.next_attempt_at <= now,
+            ),
+            and_(
+                WebhookInboxEvent.status == WebhookInboxStatus.RECEIVED.value,
+                WebhookInboxEvent.created_at <= now - timedelta(seconds=stale_after_seconds),
+            ),
+        )
+    ).order_by(WebhookInboxEvent.created_at).limit(limit).all()
+    return [(row.id, row.attempts) for row in rows]
+
+
+def reset_dead_letter_events(db: Session, event_ids: Sequence[UUID]) -> int:
+    """
+    Move DEAD_LETTER events back to RECEIVED with a fresh attempt budget.
+
+    NO COMMIT - caller must commit (then enqueue the events).
+
+    Returns:
+        Number of events reset
+    """
+    if not event_ids:
+        return 0
+    return db.query(WebhookInboxEvent).filter(
+        WebhookInboxEvent.id.in_(list(event_ids)),
+        WebhookInboxEvent.status == WebhookInboxStatus.DEAD_LETTER.value,
+    ).update(
+        {
+            WebhookInboxEvent.status: WebhookInboxStatus.RECEIVED.value,
+            WebhookInboxEvent.attempts: 0,
+            WebhookInboxEvent.next_attempt_at: None,
+        },
+        synchronize_session=False,
+    )
@@ -0,0 +1,77 @@
+"""
+HTTP conditional requests - ETag / Last-Modified validators and 304 responses
+
+Catalog endpoints compute their validators before doing any work (see
+catalog_cached(...).validators); a client revalidating with If-None-Match
+(or If-Modified-Since when no ETag is sent) gets an empty 304 and the
+response is never built - no media queries, no URL signing.
+"""
+
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+
+# Clients may store responses but must revalidate before reuse (presigned URLs rotate)
+CACHE_CONTROL = "private, no-cache"
+
+
+def _opaque(etag: str) -> str:
+    """ETag without its weak prefix (If-None-Match uses weak comparison)."""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (weak comparison)."""
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or _opaque(etag) in {_opaque(c) for c in candidates if c}
+
+
+def is_not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """
+    Whether the client's copy is current (RFC 9110 13.2.2: If-None-Match
+    takes precedence; If-Modified-Since only applies without it).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def validator_headers(etag: str, last_modified: float) -> Dict[str, str]:
+    """ETag, Last-Modified and Cache-Control headers of a cacheable response."""
+    return {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+    }
+
+
+def not_modified_response(etag: str, last_modified: float) -> Response:
+    """Empty 304 carrying the current validators."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validator_headers(etag, last_modified))
+
+
+def check_not_modified(request: Request, response: Response, validators) -> Optional[Response]:
+    """
+    304 response if the client's copy is current; otherwise set the
+    validators on the (200) response and return None.
+
+    validators: CatalogValidators-like (etag, last_modified) or None (no
+    validators available: always a full response).
+    """
+    if validators is None:
+        return None
+    if is_not_modified(request, validators.etag, validators.last_modified):
+        return not_modified_response(validators.etag, validators.last_modified)
+    response.headers.update(validator_headers(validators.etag, validators.last_modified))
+    return None
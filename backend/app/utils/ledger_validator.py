@@ -4,6 +4,7 @@ Ledger invariant validation utilities
 
 import logging
 from decimal import Decimal
+from typing import Iterable
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
@@ -63,6 +64,46 @@ def validate_double_entry_invariant(
     return True
 
 
+def validate_legs_balanced(
+    operation_id,
+    amounts: Iterable[Decimal],
+) -> bool:
+    """
+    Validate double-entry accounting invariant for legs not yet written.
+    
+    Same invariant as validate_double_entry_invariant, checked in memory
+    (no query): sum of credits (positive amounts) == sum of debits (negative amounts).
+    
+    Args:
+        operation_id: Operation ID (for logging only)
+        amounts: Signed leg amounts (positive = CREDIT, negative = DEBIT)
+    
+    Returns:
+        True if invariant holds, False otherwise
+    
+    Side effects:
+        Records metric if violation detected
+    """
+    credit_sum = Decimal('0')
+    debit_sum = Decimal('0')
+    
+    for amount in amounts:
+        if amount > 0:
+            credit_sum += amount
+        else:
+            debit_sum += abs(amount)
+    
+    if credit_sum != debit_sum:
+        logger.error(
+            f"Double-entry invariant violation: operation_id={operation_id}, "
+            f"credit_sum={credit_sum}, debit_sum={debit_sum}"
+        )
+        record_ledger_invariant_violation()
+        return False
+    
+    return True
+
+
 def validate_operation_balance(
     db: Session,
     operation_id: str,
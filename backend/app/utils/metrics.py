@@ -40,6 +40,13 @@ zand_webhook_rejected_total = Counter(
     registry=metrics_registry,
 )
 
+webhook_inbox_events_total = Counter(
+    "webhook_inbox_events_total",
+    "Total webhook inbox processing attempts by outcome",
+    ["provider", "outcome"],  # processed, failed, dead_letter
+    registry=metrics_registry,
+)
+
 # Rate limiting metrics
 rate_limited_total = Counter(
     "rate_limited_total",
@@ -116,6 +123,17 @@ def record_webhook_rejected(reason: str) -> None:
     zand_webhook_rejected_total.labels(reason=reason).inc()
 
 
+def record_webhook_inbox_outcome(provider: str, outcome: str) -> None:
+    """
+    Record the outcome of one webhook inbox processing attempt.
+    
+    Args:
+        provider: Webhook provider (ZAND)
+        outcome: processed, failed (retry scheduled) or dead_letter
+    """
+    webhook_inbox_events_total.labels(provider=provider, outcome=outcome).inc()
+
+
 def record_rate_limit_exceeded(group: str) -> None:
     """
     Record rate limit exceeded.
@@ -1,21 +1,55 @@
 """
-Rate limiting middleware using Redis-backed sliding window
+Rate limiting using Redis-backed sliding window
+
+The request pipeline checks limits on the redis.asyncio client (no event loop
+stall). A Redis check is bounded by RL_REDIS_TIMEOUT_MS; on timeout or error
+the request is limited by a per-process token bucket instead, and Redis is
+left alone for RL_REDIS_RETRY_SECONDS so an outage does not add latency to
+every request.
 """
 
+import asyncio
+import math
 import time
 import logging
-from typing import Optional, Tuple
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from uuid import uuid4
+from typing import Callable, Dict, Optional, Tuple
+from fastapi import Request, status
+from starlette.responses import JSONResponse, Response
+
+from redis.exceptions import RedisError
 
-from app.infrastructure.redis_client import get_redis
+from app.infrastructure.redis_client import get_async_redis
 from app.infrastructure.settings import get_settings
-from app.infrastructure.logging_config import trace_id_context
+from app.utils.local_cache import TTLLRUCache
 
 logger = logging.getLogger(__name__)
 
 
+# Sliding window check-and-record, atomic and in one round-trip (EVALSHA).
+# KEYS[1]: window key
+# ARGV: now_ms, window_ms, limit, member (unique per request), ttl_ms
+# Returns {allowed (0/1), remaining, reset_ms}
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    local reset = now + window
+    if oldest[2] then
+        reset = tonumber(oldest[2]) + window
+    end
+    return {0, 0, reset}
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], ARGV[5])
+return {1, limit - count - 1, now + window}
+"""
+
+
 class RateLimitExceeded(Exception):
     """Raised when rate limit is exceeded"""
     pass
@@ -27,6 +61,10 @@ class RateLimiter:
     
     Uses Redis sorted sets to implement a sliding window rate limiter.
     Key format: "ratelimit:{endpoint_group}:{identifier}"
+    
+    Scores are millisecond timestamps and every request adds a unique member,
+    so requests within the same second are all counted. The whole check runs
+    server-side in one script call (SLIDING_WINDOW_SCRIPT).
     """
     
     def __init__(
@@ -46,6 +84,8 @@ class RateLimiter:
         self.redis = redis_client
         self.limit = limit
         self.window_seconds = window_seconds
+        # EVALSHA, reloading the script if the server does not know it (NOSCRIPT)
+        self._script = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
     
     def get_key(self, endpoint_group: str, identifier: str) -> str:
         """Generate Redis key for rate limit"""
@@ -70,39 +110,132 @@ class RateLimiter:
             - limit: Total limit
             - reset_time: Unix timestamp when limit resets
         """
-        key = self.get_key(endpoint_group, identifier)
-        now = int(time.time())
-        window_start = now - self.window_seconds
-        
-        # Clean old entries (outside window)
-        self.redis.zremrangebyscore(key, 0, window_start)
-        
-        # Count requests in current window
-        current_count = self.redis.zcard(key)
-        
-        # Check if limit exceeded
-        if current_count >= self.limit:
-            # Calculate reset time (oldest entry + window_seconds)
-            oldest_entry = self.redis.zrange(key, 0, 0, withscores=True)
-            if oldest_entry:
-                reset_time = int(oldest_entry[0][1]) + self.window_seconds
-            else:
-                reset_time = now + self.window_seconds
-            
-            return False, 0, self.limit, reset_time
+        result = self._script(
+            keys=[self.get_key(endpoint_group, identifier)],
+            args=self._script_args(),
+        )
+        return self._parse_result(result)
+    
+    def _script_args(self) -> list:
+        """SLIDING_WINDOW_SCRIPT arguments for a request made now"""
+        now_ms = int(time.time() * 1000)
+        window_ms = self.window_seconds * 1000
+        return [now_ms, window_ms, self.limit, f"{now_ms}:{uuid4().hex}", window_ms + 10000]
+    
+    def _parse_result(self, result) -> Tuple[bool, int, int, int]:
+        """(is_allowed, remaining, limit, reset_time) from the script reply"""
+        allowed, remaining, reset_ms = result
+        # Reset time in whole seconds (X-RateLimit-Reset), rounded up
+        reset_time = -(-int(reset_ms) // 1000)
+        return bool(int(allowed)), int(remaining), self.limit, reset_time
+
+
+class LocalTokenBucket:
+    """
+    Per-process token bucket limiter (fallback when Redis is unavailable).
+    
+    Each identifier gets `limit` tokens refilled continuously over
+    window_seconds. Not shared between processes or replicas: the effective
+    limit is multiplied by the number of workers while degraded.
+    """
+    
+    def __init__(self, limit: int, window_seconds: int = 60, max_keys: int = 10000):
+        self.limit = limit
+        self.rate = limit / window_seconds  # Tokens per second
+        # (tokens, last refill time); idle buckets are full again after window_seconds
+        self._buckets: TTLLRUCache[Tuple[float, float]] = TTLLRUCache(maxsize=max_keys, ttl_seconds=window_seconds)
+    
+    def check_rate_limit(self, endpoint_group: str, identifier: str) -> Tuple[bool, int, int, int]:
+        """Same contract as RateLimiter.check_rate_limit"""
+        key = (endpoint_group, identifier)
+        now = time.time()
+        tokens, last = self._buckets.get(key) or (float(self.limit), now)
+        tokens = min(float(self.limit), tokens + (now - last) * self.rate)
         
-        # Add current request to window
-        self.redis.zadd(key, {str(now): now})
-        self.redis.expire(key, self.window_seconds + 10)  # Expire slightly after window
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+            reset_time = math.ceil(now + (self.limit - tokens) / self.rate)
+        else:
+            reset_time = math.ceil(now + (1 - tokens) / self.rate)
+        self._buckets.set(key, (tokens, now))
+        return allowed, int(tokens), self.limit, reset_time
+
+
+class AsyncRateLimiter(RateLimiter):
+    """
+    RateLimiter on redis.asyncio with a bounded wait and a local fallback.
+    
+    check_rate_limit awaits the same SLIDING_WINDOW_SCRIPT. When Redis errors
+    or does not answer within timeout_ms, the request is counted by a
+    LocalTokenBucket and Redis is skipped for retry_seconds.
+    """
+    
+    def __init__(
+        self,
+        redis_provider: Callable,
+        limit: int,
+        window_seconds: int = 60,
+        timeout_ms: int = 50,
+        retry_seconds: int = 5,
+        max_local_keys: int = 10000,
+    ):
+        """
+        Initialize rate limiter.
         
-        # Recalculate remaining (after adding)
-        current_count = self.redis.zcard(key)
-        remaining = max(0, self.limit - current_count)
+        Args:
+            redis_provider: Returns the redis.asyncio client of the running loop
+            limit: Maximum number of requests allowed
+            window_seconds: Time window in seconds
+            timeout_ms: Redis budget per check
+            retry_seconds: Local-only period after a Redis failure
+            max_local_keys: Identifiers tracked by the local fallback
+        """
+        self.redis_provider = redis_provider
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.timeout = timeout_ms / 1000
+        self.retry_seconds = retry_seconds
+        self.fallback = LocalTokenBucket(limit, window_seconds, max_local_keys)
+        self._script = None
+        self._redis_retry_at = 0.0
+    
+    @property
+    def degraded(self) -> bool:
+        """True while checks bypass Redis after a failure"""
+        return time.monotonic() < self._redis_retry_at
+    
+    async def check_rate_limit(
+        self,
+        endpoint_group: str,
+        identifier: str,
+    ) -> Tuple[bool, int, int, int]:
+        """Check if request is within rate limit (see RateLimiter.check_rate_limit)"""
+        if self.degraded:
+            return self.fallback.check_rate_limit(endpoint_group, identifier)
         
-        # Reset time is now + window_seconds
-        reset_time = now + self.window_seconds
+        try:
+            client = self.redis_provider()
+            if self._script is None:
+                self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+            result = await asyncio.wait_for(
+                self._script(
+                    keys=[self.get_key(endpoint_group, identifier)],
+                    args=self._script_args(),
+                    client=client,
+                ),
+                timeout=self.timeout,
+            )
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            self._redis_retry_at = time.monotonic() + self.retry_seconds
+            logger.warning(
+                f"Rate limiter Redis unavailable, using local limits for {self.retry_seconds}s: "
+                f"{type(e).__name__}: {e}",
+                extra={"endpoint_group": endpoint_group},
+            )
+            return self.fallback.check_rate_limit(endpoint_group, identifier)
         
-        return True, remaining, self.limit, reset_time
+        return self._parse_result(result)
 
 
 def get_client_identifier(request: Request) -> str:
@@ -130,42 +263,43 @@ def get_client_identifier(request: Request) -> str:
     return "unknown"
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class EndpointRateLimits:
     """
-    FastAPI middleware for rate limiting.
-    
-    Configures rate limits per endpoint group:
+    Rate limits per endpoint group, applied by the request pipeline
+    (app/utils/request_pipeline.py):
     - /webhooks/v1/* -> webhook
     - /admin/v1/* -> admin
     - /api/v1/* -> api
     """
     
-    def __init__(self, app, redis_client):
-        super().__init__(app)
-        self.redis = redis_client
+    # Never rate limited (health checks and docs)
+    EXEMPT_PATHS = frozenset({"/health", "/ready", "/docs", "/openapi.json", "/redoc"})
+    
+    def __init__(self, redis_provider: Callable = get_async_redis):
+        self.redis_provider = redis_provider
         self.settings = get_settings()
         
         # Initialize rate limiters per endpoint group
         self.limiters = {
-            "webhook": RateLimiter(
-                redis_client=redis_client,
-                limit=self.settings.RL_WEBHOOK_PER_MIN,
-                window_seconds=60,
-            ),
-            "admin": RateLimiter(
-                redis_client=redis_client,
-                limit=self.settings.RL_ADMIN_PER_MIN,
+            group: AsyncRateLimiter(
+                redis_provider=redis_provider,
+                limit=limit,
                 window_seconds=60,
-            ),
-            "api": RateLimiter(
-                redis_client=redis_client,
-                limit=self.settings.RL_API_PER_MIN,
-                window_seconds=60,
-            ),
+                timeout_ms=self.settings.RL_REDIS_TIMEOUT_MS,
+                retry_seconds=self.settings.RL_REDIS_RETRY_SECONDS,
+                max_local_keys=self.settings.RL_LOCAL_MAX_KEYS,
+            )
+            for group, limit in (
+                ("webhook", self.settings.RL_WEBHOOK_PER_MIN),
+                ("admin", self.settings.RL_ADMIN_PER_MIN),
+                ("api", self.settings.RL_API_PER_MIN),
+            )
         }
     
     def get_endpoint_group(self, path: str) -> Optional[str]:
         """Determine endpoint group from path"""
+        if path in self.EXEMPT_PATHS:
+            return None
         if path.startswith("/webhooks/v1/"):
             return "webhook"
         elif path.startswith("/admin/v1/"):
@@ -174,95 +308,90 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             return "api"
         return None
     
-    async def dispatch(self, request: Request, call_next):
-        """Process request with rate limiting"""
-        # Skip rate limiting for health checks and docs
-        if request.url.path in ["/health", "/ready", "/docs", "/openapi.json", "/redoc"]:
-            return await call_next(request)
+    async def check(self, request: Request, trace_id: str) -> Tuple[Dict[str, str], Optional[Response]]:
+        """
+        Check and record a request against its group's limit.
         
+        Returns:
+            (X-RateLimit-* headers for the response, 429 response if blocked else None).
+            No headers for paths outside the rate limited groups.
+        """
         endpoint_group = self.get_endpoint_group(request.url.path)
         if not endpoint_group:
-            # No rate limiting for non-API endpoints
-            return await call_next(request)
+            return {}, None
         
         identifier = get_client_identifier(request)
         limiter = self.limiters[endpoint_group]
         
-        # Check rate limit
-        is_allowed, remaining, limit, reset_time = limiter.check_rate_limit(
+        is_allowed, remaining, limit, reset_time = await limiter.check_rate_limit(
             endpoint_group=endpoint_group,
             identifier=identifier,
         )
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset_time),
+        }
+        if is_allowed:
+            return headers, None
         
-        # Get trace_id for logging
-        trace_id = trace_id_context.get("unknown")
+        await self._on_blocked(request, endpoint_group, identifier, limiter, trace_id)
         
-        if not is_allowed:
-            # Record metrics
-            from app.utils.metrics import record_rate_limit_exceeded
-            record_rate_limit_exceeded(group=endpoint_group)
-            
-            # Rate limit exceeded - log security event
-            from app.utils.security_logging import log_security_event, track_abuse_pattern, log_repeated_abuse
-            
-            log_security_event(
-                action="RATE_LIMIT_EXCEEDED",
-                details={
-                    "endpoint_group": endpoint_group,
-                    "identifier": identifier,
-                    "path": request.url.path,
-                    "method": request.method,
-                },
-                trace_id=trace_id,
-            )
-            
-            # Check for repeated abuse (especially on admin endpoints)
-            if endpoint_group == "admin":
-                abuse_detected = track_abuse_pattern(
-                    redis_client=self.redis,
-                    endpoint_group=endpoint_group,
-                    identifier=identifier,
-                    threshold=5,  # 5 violations in 10 minutes
-                    window_seconds=600,  # 10 minutes
-                )
-                
-                if abuse_detected:
-                    # Log repeated abuse (would normally write AuditLog but we don't have DB here)
-                    # The abuse detection itself is logged above
-                    violation_count = self.redis.zcard(f"abuse:{endpoint_group}:{identifier}")
-                    logger.error(
-                        f"Repeated abuse on admin endpoint: identifier={identifier}, "
-                        f"violations={violation_count}, trace_id={trace_id}"
-                    )
-            
-            # Return 429 with standard error format
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail={
-                    "error": {
-                        "code": "RATE_LIMITED",
-                        "message": f"Rate limit exceeded. Maximum {limit} requests per minute.",
-                        "details": {
-                            "endpoint_group": endpoint_group,
-                            "reset_at": reset_time,
-                        },
-                        "trace_id": trace_id,
-                    }
-                },
-                headers={
-                    "X-RateLimit-Limit": str(limit),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(reset_time),
-                },
-            )
+        # 429 with standard error format
+        return headers, JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={
+                "error": {
+                    "code": "RATE_LIMITED",
+                    "message": f"Rate limit exceeded. Maximum {limit} requests per minute.",
+                    "details": {
+                        "endpoint_group": endpoint_group,
+                        "reset_at": reset_time,
+                    },
+                    "trace_id": trace_id,
+                }
+            },
+        )
+    
+    async def _on_blocked(
+        self,
+        request: Request,
+        endpoint_group: str,
+        identifier: str,
+        limiter: AsyncRateLimiter,
+        trace_id: str,
+    ) -> None:
+        """Metrics, security event and abuse tracking for a blocked request"""
+        from app.utils.metrics import record_rate_limit_exceeded
+        from app.utils.security_logging import log_security_event, track_abuse_pattern_async
         
-        # Process request
-        response = await call_next(request)
+        record_rate_limit_exceeded(group=endpoint_group)
         
-        # Add rate limit headers to response
-        response.headers["X-RateLimit-Limit"] = str(limit)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(reset_time)
+        log_security_event(
+            action="RATE_LIMIT_EXCEEDED",
+            details={
+                "endpoint_group": endpoint_group,
+                "identifier": identifier,
+                "path": request.url.path,
+                "method": request.method,
+            },
+            trace_id=trace_id,
+        )
         
-        return response
-
+        # Check for repeated abuse (especially on admin endpoints; needs Redis)
+        if endpoint_group == "admin" and not limiter.degraded:
+            abuse_detected = await track_abuse_pattern_async(
+                redis_client=self.redis_provider(),
+                endpoint_group=endpoint_group,
+                identifier=identifier,
+                threshold=5,  # 5 violations in 10 minutes
+                window_seconds=600,  # 10 minutes
+                timeout_seconds=limiter.timeout,
+            )
+            
+            if abuse_detected:
+                # Log repeated abuse (would normally write AuditLog but we don't have DB here)
+                # The violation count is logged by track_abuse_pattern_async
+                logger.error(
+                    f"Repeated abuse on admin endpoint: identifier={identifier}, trace_id={trace_id}"
+                )
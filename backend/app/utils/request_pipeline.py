@@ -0,0 +1,110 @@
+"""
+Request pipeline - one pure ASGI middleware for every cross-cutting request concern
+
+Replaces the former BaseHTTPMiddleware stack (TraceID, SecurityHeaders,
+RequestLogging, RateLimit). BaseHTTPMiddleware runs each layer in its own
+task and re-wraps the response body stream, once per layer. This pipeline
+runs all the stages in a single layer and only rewrites the
+http.response.start message, so streaming responses pass through untouched.
+
+Stages, in order (each can be disabled):
+1. trace_id: X-Trace-ID / X-Request-Id / X-Correlation-Id or a new id, in
+   request.state.trace_id, the logging context and the response header
+2. security_headers: static security headers on every response
+3. request_logging: structured log line + HTTP metrics per request
+4. rate_limits: per endpoint group limits (EndpointRateLimits); blocked
+   requests get a 429 without reaching the app
+
+Benchmark: scripts/benchmark_request_pipeline.py
+"""
+
+import time
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.logging_config import trace_id_context
+from app.utils.rate_limiter import EndpointRateLimits
+from app.utils.request_logging import log_request, request_actor
+from app.utils.security_headers import security_headers as build_security_headers
+from app.utils.trace_id import resolve_trace_id
+
+
+class RequestPipelineMiddleware:
+    """Pure ASGI middleware running the request pipeline stages in one layer"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        trace_id: bool = True,
+        security_headers: bool = True,
+        request_logging: bool = True,
+        rate_limits: Optional[EndpointRateLimits] = None,
+    ) -> None:
+        self.app = app
+        self.trace_id = trace_id
+        self.request_logging = request_logging
+        self.rate_limits = rate_limits
+        # Computed once: settings do not change at runtime
+        self.static_headers: List[Tuple[str, str]] = build_security_headers() if security_headers else []
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        response_headers = list(self.static_headers)
+
+        trace_id = None
+        context_token = None
+        if self.trace_id:
+            trace_id = resolve_trace_id(request.headers)
+            request.state.trace_id = trace_id
+            context_token = trace_id_context.set(trace_id)
+            response_headers.append(("X-Trace-ID", trace_id))
+
+        status_code = 500
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                headers = MutableHeaders(scope=message)
+                for name, value in response_headers:
+                    headers[name] = value
+            await send(message)
+
+        start_time = time.perf_counter()
+        error = None
+        try:
+            app = self.app
+            if self.rate_limits is not None:
+                limit_headers, blocked = await self.rate_limits.check(request, trace_id or "unknown")
+                response_headers.extend(limit_headers.items())
+                if blocked is not None:
+                    app = blocked  # 429 response, the app is not called
+            await app(scope, receive, send_with_headers)
+        except Exception as e:
+            status_code = 500
+            error = str(e)
+            raise
+        finally:
+            if self.request_logging:
+                actor_id, actor_role = request_actor(scope.get("state", {}))
+                log_request(
+                    trace_id=trace_id,
+                    path=request.url.path,
+                    method=request.method,
+                    status_code=status_code,
+                    duration_ms=(time.perf_counter() - start_time) * 1000,
+                    actor_id=actor_id,
+                    actor_role=actor_role,
+                    error=error,
+                )
+            if context_token is not None:
+                trace_id_context.reset(context_token)
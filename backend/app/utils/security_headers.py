@@ -1,16 +1,15 @@
 """
-Security headers middleware
+Security headers added to every response (by the request pipeline)
 """
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from typing import List, Optional, Tuple
 
-from app.infrastructure.settings import get_settings
+from app.infrastructure.settings import Settings, get_settings
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+def security_headers(settings: Optional[Settings] = None) -> List[Tuple[str, str]]:
     """
-    Middleware to add security headers to all responses.
+    Security headers for all responses.
     
     Sets:
     - X-Content-Type-Options: nosniff
@@ -19,30 +18,21 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     - Permissions-Policy: camera=(), microphone=(), geolocation=()
     - Strict-Transport-Security: (only if ENABLE_HSTS env is set)
     """
+    settings = settings or get_settings()
     
-    async def dispatch(self, request: Request, call_next):
-        """Add security headers to response"""
-        response = await call_next(request)
-        
-        settings = get_settings()
-        
+    headers = [
         # Content Type Options - prevent MIME sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        
+        ("X-Content-Type-Options", "nosniff"),
         # Frame Options - prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
-        
+        ("X-Frame-Options", "DENY"),
         # Referrer Policy - no referrer info leaked
-        response.headers["Referrer-Policy"] = "no-referrer"
-        
+        ("Referrer-Policy", "no-referrer"),
         # Permissions Policy - restrict browser features
-        response.headers["Permissions-Policy"] = "camera=(), microphone=(), geolocation=()"
-        
-        # HSTS - only if explicitly enabled (not in local dev by default)
-        if settings.ENABLE_HSTS:
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        
-        return response
-
-
-
+        ("Permissions-Policy", "camera=(), microphone=(), geolocation=()"),
+    ]
+    
+    # HSTS - only if explicitly enabled (not in local dev by default)
+    if settings.ENABLE_HSTS:
+        headers.append(("Strict-Transport-Security", "max-age=31536000; includeSubDomains"))
+    
+    return headers
@@ -2,9 +2,12 @@
 Security event logging and audit
 """
 
+import asyncio
 import logging
 import time
 from typing import Dict, Any, Optional
+from uuid import uuid4
+from redis.exceptions import RedisError
 from sqlalchemy.orm import Session
 
 from app.infrastructure.logging_config import trace_id_context
@@ -84,6 +87,19 @@ def _sanitize_details(details: Dict[str, Any]) -> Dict[str, Any]:
     return sanitized
 
 
+# Sliding window record-and-count (see SLIDING_WINDOW_SCRIPT in app/utils/rate_limiter.py)
+# KEYS[1]: abuse key
+# ARGV: now_ms, window_ms, member (unique per violation), ttl_ms
+# Returns the number of violations in the window, this one included
+ABUSE_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[2]))
+redis.call('ZADD', KEYS[1], now, ARGV[3])
+redis.call('PEXPIRE', KEYS[1], ARGV[4])
+return redis.call('ZCARD', KEYS[1])
+"""
+
+
 def track_abuse_pattern(
     redis_client,
     endpoint_group: str,
@@ -105,18 +121,54 @@ def track_abuse_pattern(
         True if abuse pattern detected, False otherwise
     """
     key = f"abuse:{endpoint_group}:{identifier}"
-    now = int(time.time())
-    window_start = now - window_seconds
+    now_ms = int(time.time() * 1000)
+    window_ms = window_seconds * 1000
     
-    # Clean old entries
-    redis_client.zremrangebyscore(key, 0, window_start)
+    # Record the violation and count the window in one atomic round-trip
+    count = int(redis_client.register_script(ABUSE_WINDOW_SCRIPT)(
+        keys=[key],
+        args=[now_ms, window_ms, f"{now_ms}:{uuid4().hex}", window_ms + 10000],
+    ))
     
-    # Increment counter
-    redis_client.zadd(key, {str(now): now})
-    redis_client.expire(key, window_seconds + 10)
+    if count >= threshold:
+        logger.error(
+            f"Abuse pattern detected: endpoint_group={endpoint_group}, "
+            f"identifier={identifier}, violations={count} in {window_seconds}s"
+        )
+        return True
+    
+    return False
+
+
+async def track_abuse_pattern_async(
+    redis_client,
+    endpoint_group: str,
+    identifier: str,
+    threshold: int = 5,
+    window_seconds: int = 600,  # 10 minutes
+    timeout_seconds: float = 0.05,
+) -> bool:
+    """
+    track_abuse_pattern on a redis.asyncio client (request path).
     
-    # Count violations in window
-    count = redis_client.zcard(key)
+    Best effort: if Redis fails or takes longer than timeout_seconds, the
+    violation is not recorded and False is returned.
+    """
+    key = f"abuse:{endpoint_group}:{identifier}"
+    now_ms = int(time.time() * 1000)
+    window_ms = window_seconds * 1000
+    
+    try:
+        count = int(await asyncio.wait_for(
+            redis_client.register_script(ABUSE_WINDOW_SCRIPT)(
+                keys=[key],
+                args=[now_ms, window_ms, f"{now_ms}:{uuid4().hex}", window_ms + 10000],
+            ),
+            timeout=timeout_seconds,
+        ))
+    except (RedisError, OSError, asyncio.TimeoutError) as e:
+        logger.warning(f"Abuse tracking skipped (Redis unavailable): {type(e).__name__}: {e}")
+        return False
     
     if count >= threshold:
         logger.error(
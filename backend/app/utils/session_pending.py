@@ -0,0 +1,59 @@
+"""
+Session-scoped pending values - publish data to process caches only on commit
+
+Caches of database ids must never hold ids of rows that may still be rolled
+back. A service that creates such rows records them on the session under a
+namespace (add_pending); the namespace's handler receives them once the outer
+transaction commits. Any rollback (including a savepoint) discards them.
+
+Until then, the creating session can still read its own pending values
+(get_pending) so repeated calls in one transaction do not create duplicates.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_handlers: Dict[str, Callable[[Dict[Hashable, Any]], None]] = {}
+
+
+def register_pending_namespace(namespace: str, on_commit: Callable[[Dict[Hashable, Any]], None]) -> None:
+    """Register the handler that publishes a namespace's values after commit."""
+    _handlers[namespace] = on_commit
+
+
+def add_pending(session: Session, namespace: str, key: Hashable, value: Any) -> None:
+    """Hold a value on the session until its transaction commits."""
+    session.info.setdefault(namespace, {})[key] = value
+
+
+def get_pending(session: Session, namespace: str) -> Dict[Hashable, Any]:
+    """Values recorded by this session's open transaction (read-only view)."""
+    return session.info.get(namespace, {})
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    """Rows written by the committed transaction are now safe to cache."""
+    if session.in_nested_transaction():
+        return  # SAVEPOINT release: the outer transaction can still roll back
+    for namespace, handler in _handlers.items():
+        pending = session.info.pop(namespace, None)
+        if not pending:
+            continue
+        try:
+            handler(pending)
+        except Exception as e:
+            # Cache publication is an optimization: never fail the commit path
+            logger.warning(f"Failed to publish pending '{namespace}' values: {e}")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session: Session, previous_transaction) -> None:
+    """Any rollback (including a savepoint) may have removed the rows."""
+    for namespace in _handlers:
+        session.info.pop(namespace, None)
@@ -4,10 +4,11 @@ Trace ID utilities for request tracking
 
 import uuid
 from typing import Optional
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
 from starlette.requests import Request
-from starlette.responses import Response
-from app.infrastructure.logging_config import trace_id_context
+
+# Incoming headers accepted as trace id, in order of preference
+TRACE_ID_HEADERS = ("X-Trace-ID", "X-Request-Id", "X-Correlation-Id")
 
 
 def generate_trace_id() -> str:
@@ -15,37 +16,15 @@ def generate_trace_id() -> str:
     return str(uuid.uuid4())
 
 
-class TraceIDMiddleware(BaseHTTPMiddleware):
-    """Middleware to inject trace_id into request, logs, and response headers"""
-
-    async def dispatch(self, request: Request, call_next):
-        # Get trace_id from header (support multiple header names) or generate new one
-        trace_id = (
-            request.headers.get("X-Trace-ID") or
-            request.headers.get("X-Request-Id") or
-            request.headers.get("X-Correlation-Id") or
-            generate_trace_id()
-        )
-
-        # Add trace_id to request state
-        request.state.trace_id = trace_id
-
-        # Set trace_id in context variable for logging
-        trace_id_context.set(trace_id)
-
-        # Process request
-        response = await call_next(request)
-
-        # Add trace_id to response header
-        response.headers["X-Trace-ID"] = trace_id
-
-        # Clear context variable after request
-        trace_id_context.set(None)
-
-        return response
+def resolve_trace_id(headers: Headers) -> str:
+    """Trace id from the request headers (several header names supported), or a new one"""
+    for name in TRACE_ID_HEADERS:
+        trace_id = headers.get(name)
+        if trace_id:
+            return trace_id
+    return generate_trace_id()
 
 
 def get_trace_id(request: Request) -> Optional[str]:
-    """Get trace_id from request state"""
+    """Get trace_id from request state (set by the request pipeline)"""
     return getattr(request.state, "trace_id", None)
-
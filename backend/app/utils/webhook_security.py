@@ -1 +1,70 @@
+"""
+Webhook security - HMAC signature verification of provider webhooks
 
+ZAND signs the request timestamp and the raw body: X-Zand-Signature is the
+hex HMAC-SHA256 of "{X-Zand-Timestamp}.{body}" with the shared
+ZAND_WEBHOOK_SECRET. X-Zand-Timestamp (Unix seconds) must be within
+ZAND_WEBHOOK_TOLERANCE_SECONDS of now, so a captured request can not be
+replayed once the tolerance has passed.
+"""
+
+import hashlib
+import hmac
+import time
+from typing import Optional, Tuple
+
+from app.infrastructure.settings import get_settings
+
+
+def zand_signature(secret: str, timestamp: str, payload_body: bytes) -> str:
+    """Hex HMAC-SHA256 of "{timestamp}.{body}" (the X-Zand-Signature value)."""
+    message = timestamp.encode("utf-8") + b"." + payload_body
+    return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def verify_zand_webhook_security(
+    payload_body: bytes,
+    signature_header: Optional[str],
+    timestamp_header: Optional[str] = None,
+    now: Optional[float] = None,
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify the X-Zand-Signature and X-Zand-Timestamp of a ZAND webhook request.
+
+    Without ZAND_WEBHOOK_SECRET, requests are only accepted in DEV_MODE
+    (an unset secret must not turn a deposit endpoint into an open one).
+
+    Args:
+        payload_body: Raw request body, as received
+        signature_header: X-Zand-Signature header value
+        timestamp_header: X-Zand-Timestamp header value (Unix seconds, signed)
+        now: Current Unix time (defaults to time.time())
+
+    Returns:
+        (valid, error) - error is a short reason when valid is False
+    """
+    settings = get_settings()
+    secret = settings.ZAND_WEBHOOK_SECRET
+    if not secret:
+        if settings.DEV_MODE:
+            return True, None
+        return False, "Webhook secret not configured"
+
+    if not signature_header:
+        return False, "Missing signature"
+    if not timestamp_header:
+        return False, "Missing timestamp"
+
+    timestamp = timestamp_header.strip()
+    try:
+        sent_at = int(timestamp)
+    except ValueError:
+        return False, "Invalid timestamp"
+    now = time.time() if now is None else now
+    if abs(now - sent_at) > settings.ZAND_WEBHOOK_TOLERANCE_SECONDS:
+        return False, "Timestamp outside tolerance"
+
+    expected = zand_signature(secret, timestamp, payload_body)
+    if not hmac.compare_digest(expected, signature_header.strip().lower()):
+        return False, "Invalid signature"
+    return True, None
@@ -5,6 +5,8 @@ RQ Jobs - Background tasks
 import logging
 from uuid import UUID
 from app.infrastructure.redis_client import get_redis
+from app.infrastructure.database import SessionLocal
+from app.core.webhooks.models import WebhookInboxEvent, WebhookInboxStatus
 
 logger = logging.getLogger(__name__)
 
@@ -19,4 +21,64 @@ def send_welcome_email(user_id: UUID) -> None:
     logger.info(f"Welcome email sent to user {user_id} (simulated)")
 
 
+def process_webhook_inbox_event(inbox_event_id: str) -> None:
+    """
+    Process one webhook inbox event (ledger work for an accepted webhook).
+    
+    Retries: a failed attempt reschedules this job with exponential backoff
+    (retry state lives on the inbox row); exhausted events end in DEAD_LETTER.
+    """
+    from app.services.webhook_inbox import enqueue_inbox_event, process_inbox_event
+    
+    event_id = UUID(inbox_event_id)
+    db = SessionLocal()
+    try:
+        status, retry_in, _ = process_inbox_event(db, event_id)
+        if status == WebhookInboxStatus.FAILED.value:
+            # The retry job id is keyed by the attempts made so far (see inbox_job_id)
+            attempts = db.query(WebhookInboxEvent.attempts).filter(WebhookInboxEvent.id == event_id).scalar()
+    except Exception:
+        # Bookkeeping could not be committed (e.g. DB unavailable): the event
+        # stays RECEIVED/FAILED and is picked up again by the sweeper
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    
+    if status == WebhookInboxStatus.FAILED.value:
+        enqueue_inbox_event(event_id, attempts=attempts, delay_seconds=retry_in)
+    
+    logger.info(f"Webhook inbox event {inbox_event_id}: {status}")
+
+
+def allocate_offer_intents(offer_id: str) -> None:
+    """
+    Drain the allocation queue of one offer (FIFO batches, see
+    app/services/offers/allocation_queue.py). Jobs of the same offer
+    serialize on the offer row lock.
+    """
+    from app.services.offers.allocation_queue import clear_offer_allocation_scheduled, drain_offer_allocation_queue
+    
+    offer_uuid = UUID(offer_id)
+    # Intents committed from now on schedule a new job
+    clear_offer_allocation_scheduled(offer_uuid)
+    db = SessionLocal()
+    try:
+        batches = drain_offer_allocation_queue(db, offer_uuid)
+    finally:
+        db.close()
+    
+    logger.info(f"Offer {offer_id}: {len(batches)} allocation batch(es), {sum(len(b.decided) for b in batches)} intent(s) decided")
+
 
+def deliver_investment_intent_callback(intent_id: str) -> None:
+    """POST a decided queued intent to its callback_url (retried by RQ on failure)."""
+    from app.services.offers.allocation_queue import deliver_intent_callback
+    
+    db = SessionLocal()
+    try:
+        delivered = deliver_intent_callback(db, UUID(intent_id))
+    finally:
+        db.close()
+    
+    logger.info(f"Investment intent {intent_id}: callback {'delivered' if delivered else 'skipped'}")
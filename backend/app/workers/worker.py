@@ -4,16 +4,23 @@ RQ Worker bootstrap
 
 import os
 from rq import Worker, Queue, Connection
-from app.infrastructure.redis_client import get_redis
-from app.workers.jobs import send_welcome_email  # Import jobs to register them
+from app.infrastructure.redis_client import get_rq_redis
+from app.infrastructure.settings import get_settings
+from app.workers.jobs import (  # Import jobs to register them
+    send_welcome_email,
+    process_webhook_inbox_event,
+    allocate_offer_intents,
+    deliver_investment_intent_callback,
+)
 
-listen = ["default"]
+listen = [get_settings().WEBHOOK_INBOX_QUEUE, get_settings().OFFER_ALLOCATION_QUEUE, "default"]
 
 if __name__ == "__main__":
-    redis_conn = get_redis()
+    redis_conn = get_rq_redis()
     with Connection(redis_conn):
         worker = Worker(list(map(Queue, listen)))
-        worker.work()
+        # Scheduler is required for delayed retries (Queue.enqueue_in)
+        worker.work(with_scheduler=True)
 
 
 
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Request middleware overhead benchmark
+
+Measures the per-request cost of the middleware stack on a trivial /health
+route, in process (httpx ASGITransport, no network, no Redis: /health is
+exempt from rate limiting):
+
+- bare: no middleware (baseline)
+- legacy: the former four BaseHTTPMiddleware layers (TraceID,
+  SecurityHeaders, RequestLogging, RateLimit), reproduced below
+- pipeline: RequestPipelineMiddleware (one pure ASGI layer, all stages on)
+
+Usage:
+    python -m scripts.benchmark_request_pipeline
+    python -m scripts.benchmark_request_pipeline --requests 20000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, '.')
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.infrastructure.logging_config import trace_id_context
+from app.utils.rate_limiter import EndpointRateLimits
+from app.utils.request_logging import log_request, request_actor
+from app.utils.request_pipeline import RequestPipelineMiddleware
+from app.utils.security_headers import security_headers
+from app.utils.trace_id import resolve_trace_id
+
+
+class LegacyTraceIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        trace_id = resolve_trace_id(request.headers)
+        request.state.trace_id = trace_id
+        trace_id_context.set(trace_id)
+        response = await call_next(request)
+        response.headers["X-Trace-ID"] = trace_id
+        trace_id_context.set(None)
+        return response
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        for name, value in security_headers():
+            response.headers[name] = value
+        return response
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        actor_id, actor_role = request_actor(request.scope.get("state", {}))
+        log_request(
+            trace_id=trace_id_context.get(),
+            path=request.url.path,
+            method=request.method,
+            status_code=response.status_code,
+            duration_ms=(time.time() - start_time) * 1000,
+            actor_id=actor_id,
+            actor_role=actor_role,
+        )
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        if request.url.path in EndpointRateLimits.EXEMPT_PATHS:
+            return await call_next(request)
+        raise RuntimeError("benchmark only covers exempt paths")
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    if stack == "legacy":
+        # add_middleware: last added is outermost
+        app.add_middleware(LegacyTraceIDMiddleware)
+        app.add_middleware(LegacySecurityHeadersMiddleware)
+        app.add_middleware(LegacyRequestLoggingMiddleware)
+        app.add_middleware(LegacyRateLimitMiddleware)
+    elif stack == "pipeline":
+        app.add_middleware(RequestPipelineMiddleware, rate_limits=EndpointRateLimits())
+    return app
+
+
+async def measure(app: FastAPI, requests: int) -> float:
+    """Mean microseconds per request"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(200):  # Warm-up
+            await client.get("/health")
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get("/health")
+            assert response.status_code == 200
+        return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def run(requests: int, rounds: int) -> dict:
+    results = {}
+    for stack in ("bare", "legacy", "pipeline"):
+        app = build_app(stack)
+        samples = [await measure(app, requests) for _ in range(rounds)]
+        results[stack] = round(statistics.median(samples), 1)
+    return {
+        "requests_per_round": requests,
+        "rounds": rounds,
+        "us_per_request": results,
+        "middleware_overhead_us": {
+            "legacy": round(results["legacy"] - results["bare"], 1),
+            "pipeline": round(results["pipeline"] - results["bare"], 1),
+        },
+    }
+
+
+def main():
+    """Main entry point for the benchmark"""
+    parser = argparse.ArgumentParser(
+        description='Benchmark request middleware overhead on /health',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--requests', type=int, default=5000, help='Requests per round (default: 5000)')
+    parser.add_argument('--rounds', type=int, default=3, help='Rounds per stack, median reported (default: 3)')
+    args = parser.parse_args()
+
+    # Request log lines are below the threshold: measure the middleware, not log I/O
+    logging.basicConfig(level=logging.WARNING)
+
+    print(json.dumps(asyncio.run(run(args.requests, args.rounds))))
+
+
+if __name__ == "__main__":
+    main()
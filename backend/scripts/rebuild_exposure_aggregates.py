@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Exposure aggregates rebuild command
+
+Recomputes exposure_aggregates (per-instrument totals of ACTIVE wallet_locks
+and vault_accounts.principal) from the source rows and rewrites the keys
+that drifted. Safe to run while the application is writing. Exits non-zero
+when drift was found, so it can also be run by cron and alerted on.
+
+Usage:
+    # Rebuild (rewrite drifted aggregates)
+    python -m scripts.rebuild_exposure_aggregates
+
+    # Report drift only (read-only)
+    python -m scripts.rebuild_exposure_aggregates --check
+"""
+
+import argparse
+import json
+import sys
+
+# Add backend to path
+sys.path.insert(0, '.')
+
+import app.models  # noqa: F401 - every mapper registered (User relationships)
+from app.infrastructure.database import SessionLocal
+from app.services.exposure_aggregates import rebuild_exposure_aggregates
+
+
+def main():
+    """Main entry point for the rebuild command"""
+    parser = argparse.ArgumentParser(
+        description='Rebuild exposure aggregates from wallet_locks and vault_accounts',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Only report drifted aggregates, do not rewrite them (default: false)'
+    )
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        summary = rebuild_exposure_aggregates(db, repair=not args.check)
+
+        # Drift is an alert condition even when repaired
+        output = {
+            "job": "exposure_aggregates_rebuild",
+            "check": args.check,
+            "summary": summary,
+            "exit_code": 0 if summary['mismatch_count'] == 0 else 1
+        }
+
+        print(json.dumps(output))
+        sys.exit(output["exit_code"])
+
+    except Exception as e:
+        db.rollback()
+        error_output = {
+            "job": "exposure_aggregates_rebuild",
+            "check": args.check,
+            "error": f"Unexpected error: {type(e).__name__}: {str(e)}",
+            "exit_code": 1
+        }
+        print(json.dumps(error_output), file=sys.stderr)
+        sys.exit(1)
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
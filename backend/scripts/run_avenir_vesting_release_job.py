@@ -17,6 +17,9 @@ Usage:
 
     # Custom currency and max lots
     python -m scripts.run_avenir_vesting_release_job --currency USD --max-lots 500
+
+    # Batch mode: release in chunks of 200 lots (one transaction each)
+    python -m scripts.run_avenir_vesting_release_job --max-lots 5000 --batch-size 200
 """
 
 import argparse
@@ -99,6 +102,13 @@ def main():
         help='Maximum lots to process in one run (default: 200)'
     )
     
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=None,
+        help='Batch mode: lots released per transaction (default: one lot per transaction)'
+    )
+    
     args = parser.parse_args()
     
     # Parse as_of_date
@@ -127,6 +137,7 @@ def main():
             dry_run=args.dry_run,
             trace_id=trace_id,
             max_lots=args.max_lots,
+            batch_size=args.batch_size,
         )
         
         # Prepare output JSON
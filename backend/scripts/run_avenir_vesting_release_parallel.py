@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Parallel AVENIR vesting release runner (user-hash shards, resumable)
+
+For days where a large cohort matures at once (see
+app/services/vesting_release_runner.py). The daily cron job
+(run_avenir_vesting_release_job.py) stays the default path.
+
+Usage:
+    # Release today's mature lots with 8 worker processes / shards
+    python -m scripts.run_avenir_vesting_release_parallel --workers 8
+
+    # Dry-run: lots and amount per shard, nothing written
+    python -m scripts.run_avenir_vesting_release_parallel --workers 8 --dry-run
+
+    # Resume an interrupted run (same shards, as-of date and currency)
+    python -m scripts.run_avenir_vesting_release_parallel --trace-id <uuid> --as-of 2026-01-27
+
+    # Progress report of a run (e.g. from another terminal)
+    python -m scripts.run_avenir_vesting_release_parallel --trace-id <uuid> --report
+"""
+
+import argparse
+import json
+import sys
+from datetime import date, datetime, timezone
+from uuid import UUID, uuid4
+
+# Add backend to path
+sys.path.insert(0, '.')
+
+from app.infrastructure.database import SessionLocal
+from app.infrastructure.settings import get_settings
+from app.services.vesting_service import VestingReleaseError
+from app.services.vesting_release_runner import (
+    count_mature_lots_by_shard,
+    run_vesting_release,
+    vesting_release_progress,
+)
+
+
+def main():
+    """Main entry point for the parallel release runner"""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description='Run AVENIR vesting release in parallel shards',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--as-of', type=str, default=None, help='Date for maturity check (YYYY-MM-DD, default: today UTC)')
+    parser.add_argument('--currency', type=str, default='AED', help='Currency filter (default: AED)')
+    parser.add_argument('--workers', type=int, default=settings.VESTING_RELEASE_WORKERS, help='Worker processes')
+    parser.add_argument('--shards', type=int, default=None, help='User-hash shards of a new run (default: --workers)')
+    parser.add_argument('--chunk-size', type=int, default=settings.VESTING_RELEASE_CHUNK_SIZE, help='Lots per DB transaction')
+    parser.add_argument('--trace-id', type=str, default=None, help='Resume (or report on) this run')
+    parser.add_argument('--dry-run', action='store_true', help='Count lots per shard, write nothing')
+    parser.add_argument('--report', action='store_true', help='Print the progress report of --trace-id and exit')
+    parser.add_argument('--progress-interval', type=float, default=10.0, help='Seconds between progress lines (stderr)')
+    args = parser.parse_args()
+
+    output = {"job": "avenir_vesting_release_parallel"}
+    try:
+        as_of_date = date.fromisoformat(args.as_of) if args.as_of else datetime.now(timezone.utc).date()
+        trace_id = UUID(args.trace_id) if args.trace_id else uuid4()
+    except ValueError as e:
+        print(json.dumps({**output, "error": str(e), "exit_code": 1}), file=sys.stderr)
+        sys.exit(1)
+    if args.report and not args.trace_id:
+        print(json.dumps({**output, "error": "--report requires --trace-id", "exit_code": 1}), file=sys.stderr)
+        sys.exit(1)
+
+    currency = args.currency.upper()
+    shard_count = args.shards or args.workers
+    output.update({"trace_id": str(trace_id), "as_of": as_of_date.isoformat(), "currency": currency, "dry_run": args.dry_run})
+
+    db = SessionLocal()
+    try:
+        if args.report:
+            summary = vesting_release_progress(db, trace_id)
+            exit_code = 0
+        elif args.dry_run:
+            summary = {"shards": count_mature_lots_by_shard(db, shard_count=shard_count, as_of_date=as_of_date, currency=currency)}
+            exit_code = 0
+        else:
+            summary = run_vesting_release(
+                db,
+                trace_id=trace_id,
+                shard_count=shard_count,
+                workers=args.workers,
+                as_of_date=as_of_date,
+                currency=currency,
+                chunk_size=args.chunk_size,
+                progress_interval=args.progress_interval,
+                on_progress=lambda report: print(json.dumps({
+                    "progress": f"{report['shards_completed']}/{report['shard_count']}",
+                    "lots_released": report["lots_released"],
+                    "lots_per_second": report["lots_per_second"],
+                }), file=sys.stderr),
+            )
+            exit_code = 0 if summary["status"] == "COMPLETED" and summary["errors_count"] == 0 else 1
+
+        print(json.dumps({**output, "summary": summary, "exit_code": exit_code}))
+        sys.exit(exit_code)
+
+    except VestingReleaseError as e:
+        print(json.dumps({**output, "error": str(e), "exit_code": 1}), file=sys.stderr)
+        sys.exit(1)
+
+    except Exception as e:
+        print(json.dumps({**output, "error": f"Unexpected error: {type(e).__name__}: {str(e)}", "exit_code": 1}), file=sys.stderr)
+        sys.exit(1)
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Account balance reconciliation job runner
+
+Verifies the materialized account_balances snapshots against the raw ledger
+(SUM(ledger_entries.amount)). Designed to be run by cron (e.g. hourly) and
+alerted on a non-zero exit code.
+
+Usage:
+    # Check all accounts (read-only)
+    python -m scripts.run_balance_reconciliation_job
+
+    # Check and repair drifted snapshots
+    python -m scripts.run_balance_reconciliation_job --repair
+
+    # Check specific accounts
+    python -m scripts.run_balance_reconciliation_job --account-id <uuid> --account-id <uuid>
+"""
+
+import argparse
+import json
+import sys
+from uuid import UUID
+
+# Add backend to path
+sys.path.insert(0, '.')
+
+from app.infrastructure.database import SessionLocal
+from app.services.balance_reconciliation import reconcile_account_balances
+
+
+def main():
+    """Main entry point for the job runner"""
+    parser = argparse.ArgumentParser(
+        description='Reconcile account balance snapshots against the ledger',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    parser.add_argument(
+        '--repair',
+        action='store_true',
+        help='Rewrite drifted snapshots from the ledger (default: false)'
+    )
+
+    parser.add_argument(
+        '--account-id',
+        action='append',
+        type=UUID,
+        default=None,
+        help='Restrict the check to this account (repeatable)'
+    )
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        summary = reconcile_account_balances(
+            db,
+            account_ids=args.account_id,
+            repair=args.repair,
+        )
+
+        # Drift is an alert condition even when repaired
+        output = {
+            "job": "balance_reconciliation",
+            "repair": args.repair,
+            "summary": summary,
+            "exit_code": 0 if summary['mismatch_count'] == 0 else 1
+        }
+
+        print(json.dumps(output))
+        sys.exit(output["exit_code"])
+
+    except Exception as e:
+        db.rollback()
+        error_output = {
+            "job": "balance_reconciliation",
+            "repair": args.repair,
+            "error": f"Unexpected error: {type(e).__name__}: {str(e)}",
+            "exit_code": 1
+        }
+        print(json.dumps(error_output), file=sys.stderr)
+        sys.exit(1)
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Ledger partition maintenance job runner
+
+Keeps the monthly ledger_entries partitions ahead of time and writes the
+balance checkpoints of closed months. With --archive, also detaches closed
+months older than the retention into the archive schema. Designed to be run
+by cron (e.g. daily).
+
+Usage:
+    # Create upcoming partitions and checkpoint closed months
+    python -m scripts.run_ledger_partition_maintenance
+
+    # Also archive months older than LEDGER_RETENTION_MONTHS
+    python -m scripts.run_ledger_partition_maintenance --archive
+
+    # Archive with an explicit retention
+    python -m scripts.run_ledger_partition_maintenance --archive --retention-months 36
+"""
+
+import argparse
+import json
+import sys
+
+# Add backend to path
+sys.path.insert(0, '.')
+
+from app.infrastructure.database import SessionLocal
+from app.services.ledger_partitions import (
+    archive_ledger_partitions,
+    checkpoint_closed_months,
+    ensure_ledger_partitions,
+)
+
+
+def main():
+    """Main entry point for the job runner"""
+    parser = argparse.ArgumentParser(
+        description='Maintain monthly ledger_entries partitions',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    parser.add_argument(
+        '--archive',
+        action='store_true',
+        help='Detach closed months older than the retention (default: false)'
+    )
+
+    parser.add_argument(
+        '--retention-months',
+        type=int,
+        default=None,
+        help='Months kept in the live table (default: LEDGER_RETENTION_MONTHS)'
+    )
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        created = ensure_ledger_partitions(db)
+        checkpoints = checkpoint_closed_months(db)
+        db.commit()
+
+        archived = []
+        if args.archive:
+            archived = archive_ledger_partitions(db, retention_months=args.retention_months)
+
+        output = {
+            "job": "ledger_partition_maintenance",
+            "archive": args.archive,
+            "summary": {
+                "partitions_created": created,
+                "checkpoints_written": checkpoints,
+                "partitions_archived": archived,
+            },
+            "exit_code": 0
+        }
+
+        print(json.dumps(output))
+        sys.exit(0)
+
+    except Exception as e:
+        db.rollback()
+        error_output = {
+            "job": "ledger_partition_maintenance",
+            "archive": args.archive,
+            "error": f"Unexpected error: {type(e).__name__}: {str(e)}",
+            "exit_code": 1
+        }
+        print(json.dumps(error_output), file=sys.stderr)
+        sys.exit(1)
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
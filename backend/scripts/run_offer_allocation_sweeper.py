@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Offer allocation sweeper
+
+Re-enqueues the allocation job of offers with queued investment intents
+that have been PENDING for longer than --stale-after seconds (job lost:
+Redis down at intake, worker crash). Designed to be run by cron (e.g.
+every minute).
+
+Usage:
+    # Re-enqueue offers with stale queued intents
+    python -m scripts.run_offer_allocation_sweeper
+
+    # Allocate in this process instead (no RQ worker available)
+    python -m scripts.run_offer_allocation_sweeper --inline
+"""
+
+import argparse
+import json
+import sys
+
+# Add backend to path
+sys.path.insert(0, '.')
+
+from app.infrastructure.database import SessionLocal
+from app.services.offers.allocation_queue import (
+    drain_offer_allocation_queue,
+    list_offers_with_stale_intents,
+    schedule_offer_allocation,
+)
+
+
+def main():
+    """Main entry point for the sweeper"""
+    parser = argparse.ArgumentParser(
+        description='Re-enqueue allocation of offers with stale queued investment intents',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    parser.add_argument(
+        '--stale-after',
+        type=int,
+        default=None,
+        help='Seconds after which a PENDING queued intent is considered stuck (default: OFFER_ALLOCATION_STALE_SECONDS)'
+    )
+
+    parser.add_argument(
+        '--inline',
+        action='store_true',
+        help='Drain the queues in this process instead of enqueuing jobs (default: false)'
+    )
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        offer_ids = list_offers_with_stale_intents(db, stale_after_seconds=args.stale_after)
+        db.commit()
+
+        decided = 0
+        for offer_id in offer_ids:
+            if args.inline:
+                decided += sum(len(batch.decided) for batch in drain_offer_allocation_queue(db, offer_id))
+            else:
+                schedule_offer_allocation(offer_id, force=True)
+
+        output = {
+            "job": "offer_allocation_sweeper",
+            "inline": args.inline,
+            "summary": {
+                "offers_count": len(offer_ids),
+                "intents_decided": decided,
+            },
+            "exit_code": 0
+        }
+
+        print(json.dumps(output))
+        sys.exit(0)
+
+    except Exception as e:
+        db.rollback()
+        error_output = {
+            "job": "offer_allocation_sweeper",
+            "inline": args.inline,
+            "error": f"Unexpected error: {type(e).__name__}: {str(e)}",
+            "exit_code": 1
+        }
+        print(json.dumps(error_output), file=sys.stderr)
+        sys.exit(1)
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
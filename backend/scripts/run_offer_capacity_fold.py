@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Offer capacity fold job runner
+
+Folds the capacity reserved in offer_capacity_shards into
+offers.invested_amount / committed_amount and re-splits the remaining
+capacity of every sharded offer. Designed to be run by cron (e.g. every
+minute): it bounds how long committed_amount lags behind investments.
+
+Usage:
+    # Fold every sharded offer
+    python -m scripts.run_offer_capacity_fold
+"""
+
+import argparse
+import json
+import sys
+
+# Add backend to path
+sys.path.insert(0, '.')
+
+from app.infrastructure.database import SessionLocal
+from app.services.offers.capacity_shards import fold_all_capacity_shards
+
+
+def main():
+    """Main entry point for the job runner"""
+    parser = argparse.ArgumentParser(
+        description='Fold offer capacity shard reservations into offers',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        folded = fold_all_capacity_shards(db)
+
+        output = {
+            "job": "offer_capacity_fold",
+            "summary": {
+                "offers_folded": len(folded),
+                "offers": folded,
+            },
+            "exit_code": 0
+        }
+
+        print(json.dumps(output))
+        sys.exit(0)
+
+    except Exception as e:
+        db.rollback()
+        error_output = {
+            "job": "offer_capacity_fold",
+            "error": f"Unexpected error: {type(e).__name__}: {str(e)}",
+            "exit_code": 1
+        }
+        print(json.dumps(error_output), file=sys.stderr)
+        sys.exit(1)
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
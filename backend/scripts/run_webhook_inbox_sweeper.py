@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Webhook inbox sweeper
+
+Re-enqueues webhook inbox events whose RQ job is due or was lost:
+- FAILED events whose retry time has passed
+- RECEIVED events older than --stale-after seconds (Redis down at intake, worker crash)
+
+Designed to be run by cron (e.g. every minute). Dead-lettered events are only
+touched when explicitly requested.
+
+Usage:
+    # Re-enqueue due / stale events
+    python -m scripts.run_webhook_inbox_sweeper
+
+    # Give dead-lettered events a fresh attempt budget and re-enqueue them
+    python -m scripts.run_webhook_inbox_sweeper --requeue-dead-letter <uuid> --requeue-dead-letter <uuid>
+"""
+
+import argparse
+import json
+import sys
+from uuid import UUID
+
+# Add backend to path
+sys.path.insert(0, '.')
+
+from app.infrastructure.database import SessionLocal
+from app.services.webhook_inbox import enqueue_inbox_event, list_due_inbox_events, reset_dead_letter_events
+
+
+def main():
+    """Main entry point for the sweeper"""
+    parser = argparse.ArgumentParser(
+        description='Re-enqueue due or stale webhook inbox events',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    parser.add_argument(
+        '--stale-after',
+        type=int,
+        default=60,
+        help='Seconds after which a RECEIVED event is considered lost (default: 60)'
+    )
+
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=500,
+        help='Maximum number of events to enqueue (default: 500)'
+    )
+
+    parser.add_argument(
+        '--requeue-dead-letter',
+        action='append',
+        type=UUID,
+        default=None,
+        help='Reset this DEAD_LETTER event and enqueue it (repeatable)'
+    )
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        reset_count = 0
+        if args.requeue_dead_letter:
+            reset_count = reset_dead_letter_events(db, args.requeue_dead_letter)
+            db.commit()
+
+        due_events = dict(list_due_inbox_events(db, stale_after_seconds=args.stale_after, limit=args.limit))
+        for event_id in args.requeue_dead_letter or []:
+            due_events.setdefault(event_id, 0)  # Reset to a fresh attempt budget
+
+        # Events whose job for this attempt is still queued / scheduled are skipped
+        enqueued_count = sum(
+            enqueue_inbox_event(event_id, attempts=attempts) for event_id, attempts in due_events.items()
+        )
+
+        output = {
+            "job": "webhook_inbox_sweeper",
+            "summary": {
+                "due_count": len(due_events),
+                "enqueued_count": enqueued_count,
+                "dead_letter_reset_count": reset_count,
+            },
+            "exit_code": 0
+        }
+
+        print(json.dumps(output))
+        sys.exit(0)
+
+    except Exception as e:
+        db.rollback()
+        error_output = {
+            "job": "webhook_inbox_sweeper",
+            "error": f"Unexpected error: {type(e).__name__}: {str(e)}",
+            "exit_code": 1
+        }
+        print(json.dumps(error_output), file=sys.stderr)
+        sys.exit(1)
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
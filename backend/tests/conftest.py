@@ -2,8 +2,11 @@
 Pytest configuration and fixtures for end-to-end tests
 """
 
+import json
 import pytest
 import os
+import time
+from typing import Optional
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
@@ -21,17 +24,29 @@ redis_host = os.getenv("TEST_REDIS_HOST", "redis")  # Default to 'redis' for Doc
 os.environ["REDIS_URL"] = f"redis://{redis_host}:6379/1"  # Use DB 1 for tests
 os.environ["SECRET_KEY"] = "test-secret-key-min-32-chars-for-testing-only"
 os.environ["LOG_LEVEL"] = "DEBUG"
+os.environ["WEBHOOK_INBOX_ASYNC"] = "false"  # Process webhook inbox events inline (no RQ worker in tests)
+os.environ["OFFER_ALLOCATION_ASYNC"] = "false"  # Allocate queued investment intents inline (no RQ worker in tests)
+os.environ["WALLET_ACCOUNT_CACHE_REDIS_ENABLED"] = "false"  # Redis outlives the per-test database reset
+os.environ["S3_PRESIGN_CACHE_REDIS_ENABLED"] = "false"
+os.environ["CATALOG_CACHE_REDIS_ENABLED"] = "false"
 
 # OIDC test configuration
 os.environ["OIDC_ISSUER_URL"] = "https://test-issuer.example.com"
 os.environ["OIDC_AUDIENCE"] = "test-audience"
 os.environ["OIDC_JWKS_URL"] = ""  # Will be mocked in tests
 
-from app.infrastructure.database import Base, get_db
+from app.infrastructure.database import Base, get_async_db, get_db
+from app.infrastructure.settings import get_settings
 from app.main import app
 from app.core.users.models import User, UserStatus
 from app.core.accounts.models import Account, AccountType
 from app.core.vaults.models import Vault, VaultStatus
+from app.services.system_accounts import clear_system_account_registry
+from app.services.wallet_account_cache import clear_wallet_account_cache
+from app.auth.principal_cache import clear_auth_caches
+from app.services.storage.presign_cache import clear_presigned_url_cache
+from app.services.catalog_cache import clear_catalog_cache
+from app.utils.webhook_security import zand_signature
 from uuid import uuid4
 from decimal import Decimal
 
@@ -55,6 +70,12 @@ def db_session() -> Session:
     # Drop and recreate all tables
     Base.metadata.drop_all(bind=test_engine)
     Base.metadata.create_all(bind=test_engine)
+    # Cached system / wallet account ids point at the dropped tables
+    clear_system_account_registry()
+    clear_wallet_account_cache()
+    clear_auth_caches()
+    clear_presigned_url_cache()
+    clear_catalog_cache()
     
     db = TestSessionLocal()
     try:
@@ -63,6 +84,9 @@ def db_session() -> Session:
         db.close()
         # Clean up after test
         Base.metadata.drop_all(bind=test_engine)
+        clear_system_account_registry()
+        clear_wallet_account_cache()
+        clear_catalog_cache()
 
 
 @pytest.fixture(scope="function")
@@ -95,6 +119,8 @@ def client(db_session: Session, redis_client: Redis):
     
     # Override database dependency
     app.dependency_overrides[get_db] = override_get_db
+    # Async endpoints get the same sync session: run_db() accepts both session types
+    app.dependency_overrides[get_async_db] = override_get_db
     
     # Mock webhook signature verification for tests
     # Set a test secret that will be used for signature verification
@@ -147,6 +173,30 @@ def client(db_session: Session, redis_client: Redis):
             pass
 
 
+ZAND_TEST_WEBHOOK_SECRET = "test-webhook-secret-for-testing-only"
+
+
+@pytest.fixture
+def zand_post(client: TestClient, monkeypatch):
+    """POST a JSON body to a ZAND webhook route, signed as ZAND does (X-Zand-Signature / X-Zand-Timestamp)"""
+    monkeypatch.setattr(get_settings(), "ZAND_WEBHOOK_SECRET", ZAND_TEST_WEBHOOK_SECRET)
+
+    def post(path: str, body: dict, secret: str = ZAND_TEST_WEBHOOK_SECRET, timestamp: Optional[int] = None):
+        raw = json.dumps(body).encode("utf-8")
+        sent_at = str(int(time.time()) if timestamp is None else timestamp)
+        return client.post(
+            f"/webhooks/v1{path}",
+            content=raw,
+            headers={
+                "Content-Type": "application/json",
+                "X-Zand-Signature": zand_signature(secret, sent_at, raw),
+                "X-Zand-Timestamp": sent_at,
+            },
+        )
+
+    return post
+
+
 @pytest.fixture
 def test_user(db_session: Session) -> User:
     """Create a test user"""
@@ -0,0 +1,133 @@
+"""
+Tests for materialized account balances (account_balances snapshot, batched reads, reconciliation)
+"""
+from decimal import Decimal
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.users.models import User
+from app.core.accounts.models import AccountType
+from app.core.ledger.models import Operation, OperationType, OperationStatus, LedgerEntry, LedgerEntryType
+from app.core.ledger.balances import AccountBalance
+from app.services.fund_services import record_deposit_blocked, release_compliance_funds
+from app.services.wallet_helpers import (
+    ensure_wallet_accounts,
+    get_account_balance,
+    get_checkpoint_balance,
+    get_ledger_balance,
+    get_snapshot_balance,
+    get_wallet_balances,
+    get_wallet_balances_bulk,
+)
+from app.services.balance_reconciliation import reconcile_account_balances, write_balance_checkpoints
+
+
+def test_snapshot_follows_ledger_postings(db_session: Session, test_user: User):
+    """Snapshot is updated in the same transaction as each ledger insert"""
+    record_deposit_blocked(db=db_session, user_id=test_user.id, currency="AED", amount=Decimal("1000.00"))
+    release_compliance_funds(
+        db=db_session, user_id=test_user.id, currency="AED", amount=Decimal("400.00"), reason="ok",
+    )
+
+    wallet_accounts = ensure_wallet_accounts(db_session, test_user.id, "AED")
+    blocked_id = wallet_accounts[AccountType.WALLET_BLOCKED.value]
+    available_id = wallet_accounts[AccountType.WALLET_AVAILABLE.value]
+
+    assert get_snapshot_balance(db_session, blocked_id) == Decimal("600.00")
+    assert get_snapshot_balance(db_session, available_id) == Decimal("400.00")
+    assert get_snapshot_balance(db_session, blocked_id) == get_ledger_balance(db_session, blocked_id)
+    assert get_account_balance(db_session, available_id) == Decimal("400.00")
+
+    snapshot = db_session.query(AccountBalance).filter(AccountBalance.account_id == blocked_id).one()
+    assert snapshot.entry_count == 2
+
+
+def test_snapshot_discarded_on_rollback(db_session: Session, test_user: User):
+    """A rolled-back posting leaves no trace in the snapshot"""
+    wallet_accounts = ensure_wallet_accounts(db_session, test_user.id, "AED")
+    available_id = wallet_accounts[AccountType.WALLET_AVAILABLE.value]
+    db_session.commit()
+
+    operation = Operation(type=OperationType.ADJUSTMENT, status=OperationStatus.COMPLETED)
+    db_session.add(operation)
+    db_session.flush()
+    db_session.add(LedgerEntry(
+        operation_id=operation.id,
+        account_id=available_id,
+        amount=Decimal("50.00"),
+        currency="AED",
+        entry_type=LedgerEntryType.CREDIT,
+    ))
+    db_session.flush()
+    assert get_snapshot_balance(db_session, available_id) == Decimal("50.00")
+
+    db_session.rollback()
+    assert get_snapshot_balance(db_session, available_id) == Decimal("0")
+
+
+def test_reconciliation_detects_and_repairs_drift(db_session: Session, test_user: User):
+    """Reconciliation compares snapshot with SUM(ledger_entries) and repairs drift"""
+    record_deposit_blocked(db=db_session, user_id=test_user.id, currency="AED", amount=Decimal("250.00"))
+
+    clean = reconcile_account_balances(db_session)
+    assert clean['checked_count'] == 2  # WALLET_BLOCKED + INTERNAL_OMNIBUS
+    assert clean['mismatch_count'] == 0
+
+    blocked_id = ensure_wallet_accounts(db_session, test_user.id, "AED")[AccountType.WALLET_BLOCKED.value]
+    snapshot = db_session.query(AccountBalance).filter(AccountBalance.account_id == blocked_id).one()
+    snapshot.balance = Decimal("999.00")
+    db_session.commit()
+
+    drift = reconcile_account_balances(db_session, repair=True)
+    assert drift['mismatch_count'] == 1
+    assert drift['repaired_count'] == 1
+    assert drift['mismatches'][0]['account_id'] == str(blocked_id)
+    assert get_snapshot_balance(db_session, blocked_id) == Decimal("250.00")
+
+    assert reconcile_account_balances(db_session)['mismatch_count'] == 0
+
+
+def test_checkpoint_plus_delta_balance(db_session: Session, test_user: User):
+    """Checkpoint read path = checkpoint balance + entries written after it"""
+    record_deposit_blocked(db=db_session, user_id=test_user.id, currency="AED", amount=Decimal("100.00"))
+    blocked_id = ensure_wallet_accounts(db_session, test_user.id, "AED")[AccountType.WALLET_BLOCKED.value]
+
+    # No checkpoint yet -> falls back to the ledger sum
+    assert get_checkpoint_balance(db_session, blocked_id) == Decimal("100.00")
+
+    # Use DB clock: every later transaction starts (and dates its entries) after this instant
+    checkpoint_at = db_session.execute(text("SELECT clock_timestamp()")).scalar()
+    db_session.commit()
+
+    inserted = write_balance_checkpoints(db_session, checkpoint_at)
+    db_session.commit()
+    assert inserted == 2
+
+    record_deposit_blocked(db=db_session, user_id=test_user.id, currency="AED", amount=Decimal("30.00"))
+    assert get_checkpoint_balance(db_session, blocked_id) == Decimal("130.00")
+
+
+def test_wallet_balances_bulk_single_query(db_session: Session, test_user: User):
+    """Batched compartment balances for several users/currencies match per-account reads"""
+    other_user = User(email="other@example.com", status=test_user.status)
+    db_session.add(other_user)
+    db_session.commit()
+
+    record_deposit_blocked(db=db_session, user_id=test_user.id, currency="AED", amount=Decimal("300.00"))
+    release_compliance_funds(
+        db=db_session, user_id=test_user.id, currency="AED", amount=Decimal("100.00"), reason="ok",
+    )
+    record_deposit_blocked(db=db_session, user_id=other_user.id, currency="AED", amount=Decimal("75.00"))
+
+    balances = get_wallet_balances_bulk(db_session, [test_user.id, other_user.id], ["AED", "USD"])
+
+    assert balances[(test_user.id, "AED")] == {
+        'total_balance': Decimal("300.00"),
+        'available_balance': Decimal("100.00"),
+        'blocked_balance': Decimal("200.00"),
+        'locked_balance': Decimal("0"),
+    }
+    assert balances[(other_user.id, "AED")]['blocked_balance'] == Decimal("75.00")
+    assert balances[(other_user.id, "USD")]['total_balance'] == Decimal("0")
+    assert get_wallet_balances(db_session, test_user.id, "AED") == balances[(test_user.id, "AED")]
@@ -0,0 +1,50 @@
+"""
+Tests for the async database stack (driver URL, run_db compatibility shim)
+"""
+import os
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.users.models import User
+from app.infrastructure.database import async_database_url, run_db
+from app.services.fund_services import record_deposit_blocked
+from app.services.wallet_helpers import get_wallet_balances
+
+
+def test_async_database_url_swaps_driver():
+    """psycopg2 URLs map to asyncpg, credentials kept"""
+    assert async_database_url("postgresql://user:secret@db:5432/app") == "postgresql+asyncpg://user:secret@db:5432/app"
+    assert async_database_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/app")
+
+
+async def test_run_db_calls_sync_session_directly(db_session: Session, test_user: User):
+    """Callers still holding a sync Session get the plain call"""
+    record_deposit_blocked(db=db_session, user_id=test_user.id, currency="AED", amount=Decimal("80.00"))
+
+    balances = await run_db(db_session, get_wallet_balances, test_user.id, "AED")
+    assert balances["blocked_balance"] == Decimal("80.00")
+
+
+async def test_run_db_runs_sync_service_on_async_session(db_session: Session, test_user: User):
+    """A sync service runs unchanged on an AsyncSession (asyncpg connection)"""
+    pytest.importorskip("asyncpg")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    record_deposit_blocked(db=db_session, user_id=test_user.id, currency="AED", amount=Decimal("120.00"))
+    db_session.commit()
+
+    # NullPool: connections must not outlive the test's event loop
+    engine = create_async_engine(async_database_url(os.environ["DATABASE_URL"]), poolclass=NullPool)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            balances = await run_db(db, get_wallet_balances, test_user.id, "AED")
+    finally:
+        await engine.dispose()
+
+    assert balances["blocked_balance"] == Decimal("120.00")
+    assert balances["total_balance"] == Decimal("120.00")
@@ -0,0 +1,124 @@
+"""
+Tests for the parallel AVENIR vesting release runner - shards, chunks, checkpoints
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app.core.accounts.models import AccountType
+from app.core.accounts.wallet_locks import LockReason, LockStatus, WalletLock
+from app.core.ledger.models import Operation, OperationType
+from app.core.users.models import User
+from app.core.vaults.models import Vault, VestingLot, VestingLotStatus, VestingReleaseCheckpointStatus
+from app.services.ledger_posting import LedgerLeg, LedgerPosting, post_ledger_operation
+from app.services.system_accounts import get_or_create_system_account_id
+from app.services.vesting_release_runner import (
+    release_vesting_shard,
+    start_vesting_release_run,
+    vesting_release_progress,
+)
+from app.services.wallet_helpers import ensure_wallet_accounts, get_wallet_balances
+
+AS_OF = date.today()
+
+
+def _vested_lot(db: Session, vault: Vault, user: User, amount: str, *, locked: str = None) -> VestingLot:
+    """Mature lot backed by a WALLET_LOCKED balance (default: the lot amount) and an ACTIVE WalletLock"""
+    wallet_accounts = ensure_wallet_accounts(db, user.id, "AED")
+    omnibus_id = get_or_create_system_account_id(db, AccountType.INTERNAL_OMNIBUS, "AED")
+    locked = locked or amount
+    deposit = post_ledger_operation(db, LedgerPosting(
+        operation_type=OperationType.VAULT_DEPOSIT,
+        currency="AED",
+        legs=[
+            LedgerLeg(omnibus_id, Decimal(f"-{locked}")),
+            LedgerLeg(wallet_accounts[AccountType.WALLET_LOCKED.value], Decimal(locked)),
+        ],
+        metadata={"vault_code": "AVENIR", "currency": "AED"},
+    ))
+    db.add(WalletLock(
+        user_id=user.id, currency="AED", amount=Decimal(amount),
+        reason=LockReason.VAULT_AVENIR_VESTING.value, reference_type="VAULT", reference_id=vault.id,
+        status=LockStatus.ACTIVE.value, operation_id=deposit.id,
+    ))
+    lot = VestingLot(
+        vault_id=vault.id, vault_code="AVENIR", user_id=user.id, currency="AED",
+        deposit_day=AS_OF - timedelta(days=366), release_day=AS_OF - timedelta(days=1),
+        amount=Decimal(amount), released_amount=Decimal("0.00"),
+        status=VestingLotStatus.VESTED.value, source_operation_id=deposit.id,
+    )
+    db.add(lot)
+    db.flush()
+    return lot
+
+
+def _users(db: Session, count: int):
+    users = [User(email=f"vesting_{uuid4()}@example.com", password_hash="hashed_password") for _ in range(count)]
+    db.add_all(users)
+    db.flush()
+    return users
+
+
+def test_sharded_run_releases_every_lot_once(db_session: Session, avenir_vault: Vault):
+    """Two shards in chunks of 2: every lot released once, users with several lots included"""
+    users = _users(db_session, 5)
+    lots = [_vested_lot(db_session, avenir_vault, user, "100.00") for user in users]
+    lots.append(_vested_lot(db_session, avenir_vault, users[0], "50.00"))
+    db_session.commit()
+
+    trace_id = uuid4()
+    start_vesting_release_run(db_session, trace_id=trace_id, shard_count=2, as_of_date=AS_OF, currency="AED")
+    shards = [release_vesting_shard(db_session, trace_id=trace_id, shard_no=n, chunk_size=2) for n in range(2)]
+    assert all(shard["status"] == VestingReleaseCheckpointStatus.COMPLETED.value for shard in shards)
+
+    report = vesting_release_progress(db_session, trace_id)
+    assert report["status"] == VestingReleaseCheckpointStatus.COMPLETED.value
+    assert report["lots_released"] == 6
+    assert Decimal(report["amount_released"]) == Decimal("550.00")
+    assert report["errors_count"] == 0
+
+    for lot in lots:
+        db_session.refresh(lot)
+        assert lot.status == VestingLotStatus.RELEASED.value
+        assert lot.release_job_trace_id == trace_id
+    assert db_session.query(Operation).filter(Operation.type == OperationType.VAULT_VESTING_RELEASE).count() == 6
+    assert get_wallet_balances(db_session, users[0].id, "AED")["available_balance"] == Decimal("150.00")
+    assert db_session.query(WalletLock).filter(
+        WalletLock.reference_id == avenir_vault.id, WalletLock.status == LockStatus.ACTIVE.value,
+    ).count() == 0
+
+    # Re-running a completed run is a no-op
+    release_vesting_shard(db_session, trace_id=trace_id, shard_no=0, chunk_size=2)
+    assert db_session.query(Operation).filter(Operation.type == OperationType.VAULT_VESTING_RELEASE).count() == 6
+
+
+def test_resume_continues_after_checkpoint(db_session: Session, avenir_vault: Vault):
+    """An interrupted shard resumes after its last chunk; a bad lot is reported, not blocking"""
+    users = _users(db_session, 3)
+    good = [_vested_lot(db_session, avenir_vault, user, "200.00") for user in users[:2]]
+    bad = _vested_lot(db_session, avenir_vault, users[2], "200.00", locked="10.00")
+    db_session.commit()
+
+    trace_id = uuid4()
+    start_vesting_release_run(db_session, trace_id=trace_id, shard_count=1, as_of_date=AS_OF, currency="AED")
+    first = release_vesting_shard(db_session, trace_id=trace_id, shard_no=0, chunk_size=1, max_chunks=1)
+    assert first["status"] == VestingReleaseCheckpointStatus.RUNNING.value
+    assert first["lots_released"] + first["errors_count"] == 1
+
+    # Resume: same trace_id, the checkpoint keeps the cursor
+    start_vesting_release_run(db_session, trace_id=trace_id, shard_count=1, as_of_date=AS_OF, currency="AED")
+    final = release_vesting_shard(db_session, trace_id=trace_id, shard_no=0, chunk_size=1)
+    assert final["status"] == VestingReleaseCheckpointStatus.COMPLETED.value
+    assert final["lots_released"] == 2
+    assert final["errors_count"] == 1
+    assert str(bad.id) in final["last_error"]
+
+    for lot in good:
+        db_session.refresh(lot)
+        assert lot.status == VestingLotStatus.RELEASED.value
+    db_session.refresh(bad)
+    assert bad.status == VestingLotStatus.VESTED.value
+    assert db_session.query(Operation).filter(Operation.type == OperationType.VAULT_VESTING_RELEASE).count() == 2
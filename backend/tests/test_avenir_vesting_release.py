@@ -882,3 +882,75 @@ def test_transactions_include_release(db_session, test_user, avenir_vault):
         # For now, just verify the operation exists in DB with correct metadata
         assert release_op.operation_metadata.get('vault_code') == 'AVENIR'
 
+
+
+def test_batch_mode_releases_chunks_and_closes_locks(db_session, avenir_vault):
+    """
+    Batch mode (chunks of 2): linked and fallback-matched locks closed set-based,
+    partially consumed lock kept ACTIVE, insufficient balance reported, missing lock tolerated
+    """
+    from app.core.users.models import User
+    from app.services.ledger_posting import LedgerLeg, LedgerPosting, post_ledger_operation
+    from app.services.system_accounts import get_or_create_system_account_id
+
+    today = date.today()
+    omnibus_id = get_or_create_system_account_id(db_session, AccountType.INTERNAL_OMNIBUS, "AED")
+    users = [User(email=f"batch_{uuid4()}@example.com", password_hash="hashed_password") for _ in range(3)]
+    db_session.add_all(users)
+    db_session.flush()
+
+    def lot(user, amount, *, locked=None, lock_amount=None, link_lock=True):
+        accounts = ensure_wallet_accounts(db_session, user.id, "AED")
+        deposit = post_ledger_operation(db_session, LedgerPosting(
+            operation_type=OperationType.VAULT_DEPOSIT,
+            currency="AED",
+            legs=[
+                LedgerLeg(omnibus_id, -Decimal(locked or amount)),
+                LedgerLeg(accounts[AccountType.WALLET_LOCKED.value], Decimal(locked or amount)),
+            ],
+        ))
+        if lock_amount:
+            db_session.add(WalletLock(
+                user_id=user.id, currency="AED", amount=Decimal(lock_amount),
+                reason=LockReason.VAULT_AVENIR_VESTING.value, reference_type='VAULT', reference_id=avenir_vault.id,
+                status=LockStatus.ACTIVE.value, operation_id=deposit.id if link_lock else None,
+            ))
+        vesting_lot = VestingLot(
+            vault_id=avenir_vault.id, vault_code='AVENIR', user_id=user.id, currency="AED",
+            deposit_day=today, release_day=today, amount=Decimal(amount), released_amount=Decimal('0.00'),
+            status=VestingLotStatus.VESTED.value, source_operation_id=deposit.id,
+        )
+        db_session.add(vesting_lot)
+        db_session.flush()
+        return vesting_lot
+
+    linked = lot(users[0], "100.00", lock_amount="100.00")
+    fallback = lot(users[0], "50.00", lock_amount="50.01", link_lock=False)  # Partial: 0.01 stays locked
+    short = lot(users[1], "300.00", locked="10.00", lock_amount="300.00")
+    no_lock = lot(users[2], "20.00")
+    db_session.commit()
+
+    summary = release_avenir_vesting_lots(db=db_session, as_of_date=today, currency="AED", batch_size=2)
+
+    assert summary['matured_found'] == 4
+    assert summary['executed_count'] == 3
+    assert summary['executed_amount'] == "170.00"
+    assert summary['errors_count'] == 1
+    assert str(short.id) in summary['errors'][0]
+    assert summary['locks_closed_count'] == 2
+    assert summary['locks_missing_count'] == 1
+
+    for released in (linked, fallback, no_lock):
+        db_session.refresh(released)
+        assert released.status == VestingLotStatus.RELEASED.value
+        assert released.last_release_operation_id is not None
+    db_session.refresh(short)
+    assert short.status == VestingLotStatus.VESTED.value
+
+    active = db_session.query(WalletLock).filter(
+        WalletLock.user_id == users[0].id, WalletLock.status == LockStatus.ACTIVE.value,
+    ).all()
+    assert [(lock.amount, lock.consumed_amount, lock.remaining_amount) for lock in active] == [
+        (Decimal("50.01"), Decimal("50.00"), Decimal("0.01")),
+    ]
+    assert get_wallet_balances(db_session, users[0].id, "AED")['available_balance'] == Decimal("150.00")
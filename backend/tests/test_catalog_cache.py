@@ -0,0 +1,120 @@
+"""
+Tests for the public catalog response cache (versioned per entity, bumped after commit)
+"""
+import asyncio
+from decimal import Decimal
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.api.v1.offers import _list_live_offers
+from app.core.offers.models import Offer, OfferStatus
+from app.services import catalog_cache as catalog_cache_module
+from app.services.catalog_cache import OFFERS, PARTNERS, catalog_cache, catalog_cached
+
+
+class _AsyncRedis:
+    """redis.asyncio stand-in (GET / MGET / SETEX on a dict)"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class _FailingRedis:
+    def __getattr__(self, command):
+        raise ConnectionError("redis down")
+
+
+def _offer(db: Session, code: str) -> Offer:
+    offer = Offer(
+        code=code,
+        name=code,
+        currency="AED",
+        max_amount=Decimal("100000.00"),
+        invested_amount=Decimal("0.00"),
+        committed_amount=Decimal("0.00"),
+        status=OfferStatus.LIVE,
+    )
+    db.add(offer)
+    return offer
+
+
+def _count_statements(db: Session, fn):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    return result, len(statements)
+
+
+def test_cached_until_catalog_write_commits(db_session: Session):
+    """Hits skip the database; a committed write bumps the version, a rolled back one does not"""
+    offer = _offer(db_session, "CATALOG-1")
+    db_session.commit()
+    page = lambda: _list_live_offers(db_session, currency=None, limit=50, offset=0)
+
+    first, _ = _count_statements(db_session, page)
+    cached, statements = _count_statements(db_session, page)
+    assert statements == 0
+    assert cached == first and cached is not first  # Fresh objects on every hit
+
+    offer.name = "Rolled back"
+    db_session.flush()
+    db_session.rollback()
+    assert catalog_cache.versions([OFFERS]) == {OFFERS: 1}  # Only the insert above
+
+    offer.name = "Renamed"
+    db_session.commit()
+    assert [item.name for item in page()] == ["Renamed"]
+
+    # Bulk statements bump too
+    db_session.execute(update(Offer).where(Offer.id == offer.id).values(name="Bulk"))
+    db_session.commit()
+    assert [item.name for item in page()] == ["Bulk"]
+
+
+def test_redis_errors_bypass_the_cache(monkeypatch):
+    """When entity versions can not be read, every call reads from the database"""
+    monkeypatch.setattr(catalog_cache_module.get_settings(), "CATALOG_CACHE_REDIS_ENABLED", True)
+    monkeypatch.setattr(catalog_cache, "_redis", lambda: _FailingRedis())
+    calls = []
+
+    @catalog_cached(PARTNERS, response_type=int)
+    def _count(db, value):
+        calls.append(value)
+        return value
+
+    assert (_count(None, 1), _count(None, 1)) == (1, 1)
+    assert calls == [1, 1]
+
+
+def test_fetch_does_cache_io_on_redis_asyncio(monkeypatch):
+    """Request handlers' fetch(): versions and bodies come from redis.asyncio, the helper only runs on a miss"""
+    redis = _AsyncRedis()
+    monkeypatch.setattr(catalog_cache_module.get_settings(), "CATALOG_CACHE_REDIS_ENABLED", True)
+    monkeypatch.setattr(catalog_cache, "_redis", lambda: _FailingRedis())  # No blocking client on the loop
+    monkeypatch.setattr("app.infrastructure.redis_client.get_async_redis", lambda: redis)
+    calls = []
+
+    @catalog_cached(PARTNERS, response_type=int)
+    def _double(db, value):
+        calls.append(value)
+        return value * 2
+
+    assert asyncio.run(_double.fetch(None, 2)) == 4
+    catalog_cache.local.clear()  # Next read from the Redis tier
+    assert asyncio.run(_double.fetch(None, 2)) == 4
+    assert calls == [2]
+    assert len(redis.data) == 1
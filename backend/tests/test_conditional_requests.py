@@ -0,0 +1,81 @@
+"""
+Tests for ETag / Last-Modified revalidation of catalog endpoints
+"""
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from app.api.v1.partners import build_partner_list_items
+from app.core.partners.models import Partner, PartnerStatus
+from app.services import catalog_cache as catalog_cache_module
+from app.utils.conditional_requests import etag_matches, is_not_modified
+
+
+def _request(headers: dict) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+def test_validator_matching():
+    """If-None-Match uses weak comparison and wins over If-Modified-Since"""
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('W/"x", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('W/"abd"', 'W/"abc"')
+
+    since = "Fri, 16 Oct 2026 12:00:00 GMT"  # 1792152000
+    assert is_not_modified(_request({"If-Modified-Since": since}), 'W/"abc"', 1792152000.5)
+    assert not is_not_modified(_request({"If-Modified-Since": since}), 'W/"abc"', 1792152001)
+    assert not is_not_modified(_request({"If-None-Match": 'W/"old"', "If-Modified-Since": since}), 'W/"abc"', 0)
+    assert not is_not_modified(_request({"If-Modified-Since": "garbage"}), 'W/"abc"', 0)
+
+
+def test_partners_revalidate_until_catalog_changes(client: TestClient, db_session: Session):
+    """304 without building the response; a committed partner change issues a new ETag"""
+    db_session.add(Partner(code="etag-partner", legal_name="ETag Partner", status=PartnerStatus.PUBLISHED.value))
+    db_session.commit()
+
+    first = client.get("/api/v1/partners")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+
+    with patch("app.api.v1.partners.build_partner_list_items") as build:
+        revalidated = client.get("/api/v1/partners", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+    build.assert_not_called()
+
+    # Other arguments, other representation
+    assert client.get("/api/v1/partners?limit=5", headers={"If-None-Match": etag}).status_code == 200
+
+    db_session.add(Partner(code="etag-partner-2", legal_name="Second", status=PartnerStatus.PUBLISHED.value))
+    db_session.commit()
+    changed = client.get("/api/v1/partners", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert {item["code"] for item in changed.json()} == {"etag-partner", "etag-partner-2"}
+
+
+def test_new_url_epoch_rebuilds_warm_catalog(client: TestClient, db_session: Session, monkeypatch):
+    """Crossing a presigned URL epoch: the cached body is not served, nor revalidated, with the old epoch's URLs"""
+    db_session.add(Partner(code="epoch-partner", legal_name="Epoch Partner", status=PartnerStatus.PUBLISHED.value))
+    db_session.commit()
+    monkeypatch.setattr(catalog_cache_module, "presign_epoch", lambda: (100, 60000.0))
+
+    etag = client.get("/api/v1/partners").headers["ETag"]  # Warms the catalog cache
+    with patch("app.api.v1.partners.build_partner_list_items", wraps=build_partner_list_items) as build:
+        assert client.get("/api/v1/partners").status_code == 200
+        build.assert_not_called()
+
+        monkeypatch.setattr(catalog_cache_module, "presign_epoch", lambda: (101, 60600.0))
+        rebuilt = client.get("/api/v1/partners", headers={"If-None-Match": etag})
+    assert rebuilt.status_code == 200
+    assert rebuilt.headers["ETag"] != etag
+    build.assert_called_once()
+    assert client.get("/api/v1/partners", headers={"If-None-Match": rebuilt.headers["ETag"]}).status_code == 304
@@ -0,0 +1,143 @@
+"""
+Tests for exposure_aggregates (per-instrument totals maintained with wallet_locks / vault_accounts)
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import get_current_principal
+from app.auth.oidc import Principal
+from app.core.accounts.exposures import ExposureAggregate, vault_principal_key
+from app.core.accounts.models import AccountType
+from app.core.accounts.wallet_locks import LockReason, LockStatus, ReferenceType, WalletLock
+from app.core.ledger.models import OperationType
+from app.core.offers.models import Offer, OfferStatus
+from app.core.users.models import User
+from app.core.vaults.models import Vault, VaultAccount
+from app.main import app
+from app.services.exposure_aggregates import get_exposure, rebuild_exposure_aggregates
+from app.services.ledger_posting import LedgerLeg, LedgerPosting, post_ledger_operation
+from app.services.system_accounts import get_or_create_system_account_id
+from app.services.vault_helpers import get_or_create_vault_pool_cash_account
+from app.services.vault_service import request_withdrawal
+from app.services.wallet_lock_helpers import consume_wallet_locks
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _vesting_key(vault: Vault):
+    return (ReferenceType.VAULT.value, vault.id, LockReason.VAULT_AVENIR_VESTING.value, "AED")
+
+
+def _investor(db: Session, vault: Vault, *locks: str) -> User:
+    """User with an AVENIR position of sum(locks) and one ACTIVE vesting lock per amount"""
+    user = User(email=f"exposure_{uuid4()}@example.com", password_hash="hashed_password")
+    db.add(user)
+    db.flush()
+    total = sum((Decimal(amount) for amount in locks), Decimal("0.00"))
+    db.add(VaultAccount(vault_id=vault.id, user_id=user.id, principal=total, available_balance=total))
+    for n, amount in enumerate(locks):
+        db.add(WalletLock(
+            user_id=user.id, currency="AED", amount=Decimal(amount),
+            reason=LockReason.VAULT_AVENIR_VESTING.value, reference_type="VAULT", reference_id=vault.id,
+            status=LockStatus.ACTIVE.value, created_at=START + timedelta(days=n),
+        ))
+    db.flush()
+    return user
+
+
+def _fund_vault(db: Session, vault: Vault, amount: str) -> None:
+    omnibus_id = get_or_create_system_account_id(db, AccountType.INTERNAL_OMNIBUS, "AED")
+    post_ledger_operation(db, LedgerPosting(
+        operation_type=OperationType.VAULT_DEPOSIT,
+        currency="AED",
+        legs=[
+            LedgerLeg(omnibus_id, -Decimal(amount)),
+            LedgerLeg(get_or_create_vault_pool_cash_account(db, vault.id, "AED"), Decimal(amount)),
+        ],
+    ))
+
+
+def test_aggregates_follow_lock_and_principal_writes(db_session: Session, avenir_vault: Vault):
+    """ORM inserts, Core range consumption and ORM lock releases all fold into the aggregates"""
+    _fund_vault(db_session, avenir_vault, "1000.00")
+    alice = _investor(db_session, avenir_vault, "100.00", "200.00")
+    _investor(db_session, avenir_vault, "50.00")
+    db_session.commit()
+    assert get_exposure(db_session, _vesting_key(avenir_vault)) == (Decimal("350.00"), 3)
+    assert get_exposure(db_session, vault_principal_key(avenir_vault.id)) == (Decimal("350.00"), 2)
+
+    # 130 consumed oldest first: the 100 lock is RELEASED, 30 of the 200 lock
+    request_withdrawal(db_session, alice.id, "AVENIR", Decimal("130.00"))
+    db_session.commit()
+    assert get_exposure(db_session, _vesting_key(avenir_vault)) == (Decimal("220.00"), 2)
+    assert get_exposure(db_session, vault_principal_key(avenir_vault.id)) == (Decimal("220.00"), 2)
+
+    # Lock-id consumption (vesting release), then an ORM release of the last lock
+    locks = db_session.query(WalletLock).filter(
+        WalletLock.status == LockStatus.ACTIVE.value,
+    ).order_by(WalletLock.amount).all()
+    consume_wallet_locks(db_session, {locks[1].id: Decimal("20.00")})
+    locks[0].status = LockStatus.RELEASED.value
+    db_session.commit()
+    assert get_exposure(db_session, _vesting_key(avenir_vault)) == (Decimal("150.00"), 1)
+
+    assert rebuild_exposure_aggregates(db_session, repair=False)["mismatch_count"] == 0
+
+
+def test_rebuild_repairs_drift_and_admin_portfolio_reads_aggregate(client, db_session: Session, avenir_vault: Vault):
+    """Drifted and missing aggregates are rewritten from the source rows; the admin views read them"""
+    _investor(db_session, avenir_vault, "100.00", "200.00")
+    db_session.commit()
+    db_session.query(ExposureAggregate).filter(
+        ExposureAggregate.reason == LockReason.VAULT_AVENIR_VESTING.value,
+    ).update({"total_amount": Decimal("1.00")})
+    db_session.query(ExposureAggregate).filter(
+        ExposureAggregate.reason != LockReason.VAULT_AVENIR_VESTING.value,
+    ).delete()
+    db_session.commit()
+
+    check = rebuild_exposure_aggregates(db_session, repair=False)
+    assert (check["mismatch_count"], check["repaired_count"]) == (2, 0)
+    assert get_exposure(db_session, _vesting_key(avenir_vault)) == (Decimal("1.00"), 2)
+
+    result = rebuild_exposure_aggregates(db_session)
+    assert (result["mismatch_count"], result["repaired_count"]) == (2, 2)
+    assert get_exposure(db_session, _vesting_key(avenir_vault)) == (Decimal("300.00"), 2)
+    assert rebuild_exposure_aggregates(db_session)["mismatch_count"] == 0
+
+    app.dependency_overrides[get_current_principal] = lambda: Principal(sub=str(uuid4()), email="admin@example.com", roles=["ADMIN"])
+    response = client.get("/admin/v1/vaults/AVENIR/portfolio")
+    assert response.status_code == 200, response.json()
+    assert response.json()["accounts_count"] == 1
+    assert Decimal(response.json()["vault"]["total_aum"]) == Decimal("300.00")
+
+    response = client.get("/admin/v1/vaults")
+    assert response.status_code == 200, response.json()
+    assert [Decimal(row["total_aum"]) for row in response.json()["vaults"] if row["code"] == "AVENIR"] == [Decimal("300.00")]
+
+
+def test_offer_portfolio_reads_offer_exposure(client, db_session: Session, test_user: User):
+    """clients_locked_total is the remaining amount of the offer's ACTIVE OFFER_INVEST locks"""
+    offer = Offer(
+        code=f"EXPOSURE-{uuid4().hex[:8]}", name="Exposure Offer", currency="AED",
+        max_amount=Decimal("10000.00"), invested_amount=Decimal("0.00"), committed_amount=Decimal("0.00"),
+        status=OfferStatus.LIVE,
+    )
+    db_session.add(offer)
+    db_session.flush()
+    for amount, status in (("5000.00", LockStatus.ACTIVE), ("3000.00", LockStatus.ACTIVE), ("700.00", LockStatus.RELEASED)):
+        db_session.add(WalletLock(
+            user_id=test_user.id, currency="AED", amount=Decimal(amount),
+            reason=LockReason.OFFER_INVEST.value, reference_type=ReferenceType.OFFER.value, reference_id=offer.id,
+            status=status.value,
+        ))
+    db_session.commit()
+
+    app.dependency_overrides[get_current_principal] = lambda: Principal(sub=str(uuid4()), email="admin@example.com", roles=["ADMIN"])
+    response = client.get(f"/admin/v1/offers/{offer.id}/portfolio")
+    assert response.status_code == 200, response.json()
+    assert response.json()["clients_locked_total"] == "8000.00"
@@ -0,0 +1,57 @@
+"""
+Tests for ledger partition maintenance (month helpers, closed-month checkpoints)
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from app.core.accounts.models import AccountType
+from app.core.ledger.balances import AccountBalanceCheckpoint
+from app.core.users.models import User
+from app.services.balance_reconciliation import reconcile_account_balances
+from app.services.fund_services import record_deposit_blocked
+from app.services.ledger_partitions import (
+    add_months,
+    archive_ledger_partitions,
+    checkpoint_closed_months,
+    ensure_ledger_partitions,
+    ledger_partition_for,
+    month_start,
+)
+from app.services.wallet_helpers import ensure_wallet_accounts
+
+
+def test_month_helpers():
+    """Partitions cover [month start, next month start) across year boundaries"""
+    partition = ledger_partition_for(datetime(2025, 12, 17, 8, 30, tzinfo=timezone.utc))
+    assert partition.name == "ledger_entries_y2025m12"
+    assert partition.range_start == datetime(2025, 12, 1, tzinfo=timezone.utc)
+    assert partition.range_end == datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert add_months(datetime(2026, 1, 1, tzinfo=timezone.utc), -13) == datetime(2024, 12, 1, tzinfo=timezone.utc)
+
+
+def test_checkpoint_closed_months_is_incremental(db_session: Session, test_user: User):
+    """Closed month boundaries get one checkpoint per account, written once"""
+    record_deposit_blocked(db=db_session, user_id=test_user.id, currency="AED", amount=Decimal("250.00"))
+    blocked_id = ensure_wallet_accounts(db_session, test_user.id, "AED")[AccountType.WALLET_BLOCKED.value]
+
+    # Two boundaries are closed two months (plus grace) after the entries
+    later = add_months(month_start(datetime.now(timezone.utc)), 2).replace(day=3)
+    written = checkpoint_closed_months(db_session, now=later)
+    db_session.commit()
+    assert len(written) == 2 and all(count > 0 for count in written.values())
+
+    checkpoints = db_session.query(AccountBalanceCheckpoint).filter(
+        AccountBalanceCheckpoint.account_id == blocked_id
+    ).order_by(AccountBalanceCheckpoint.checkpoint_at).all()
+    assert [c.balance for c in checkpoints] == [Decimal("250.00"), Decimal("250.00")]
+
+    assert checkpoint_closed_months(db_session, now=later) == {}
+    assert reconcile_account_balances(db_session)["mismatch_count"] == 0
+
+
+def test_partition_management_skipped_on_plain_table(db_session: Session):
+    """Unpartitioned ledger_entries (metadata.create_all): nothing to create or archive"""
+    assert ensure_ledger_partitions(db_session) == []
+    assert archive_ledger_partitions(db_session, retention_months=0) == []
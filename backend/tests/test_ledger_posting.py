@@ -0,0 +1,109 @@
+"""
+Tests for the ledger posting engine (in-memory validation, single-flush posting)
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.users.models import User
+from app.core.accounts.models import AccountType
+from app.core.compliance.models import AuditLog
+from app.core.ledger.models import Operation, OperationType, LedgerEntry, LedgerEntryType
+from app.core.security.models import Role
+from app.services.ledger_posting import (
+    AuditSpec,
+    LedgerLeg,
+    LedgerPosting,
+    PostingValidationError,
+    insert_ledger_operations,
+    post_ledger_operations,
+)
+from app.services.wallet_helpers import ensure_wallet_accounts, get_snapshot_balance
+
+
+def test_unbalanced_posting_rejected_before_db(db_session: Session, test_user: User):
+    """An unbalanced posting in a batch rejects the whole batch without writing anything"""
+    wallet_accounts = ensure_wallet_accounts(db_session, test_user.id, "AED")
+    db_session.commit()
+    available_id = wallet_accounts[AccountType.WALLET_AVAILABLE.value]
+    blocked_id = wallet_accounts[AccountType.WALLET_BLOCKED.value]
+
+    balanced = LedgerPosting(
+        operation_type=OperationType.ADJUSTMENT,
+        currency="AED",
+        legs=[LedgerLeg(blocked_id, Decimal("-10.00")), LedgerLeg(available_id, Decimal("10.00"))],
+    )
+    unbalanced = LedgerPosting(
+        operation_type=OperationType.ADJUSTMENT,
+        currency="AED",
+        legs=[LedgerLeg(blocked_id, Decimal("-10.00")), LedgerLeg(available_id, Decimal("9.99"))],
+    )
+
+    with pytest.raises(PostingValidationError):
+        post_ledger_operations(db_session, [balanced, unbalanced])
+
+    assert db_session.query(Operation).count() == 0
+    assert db_session.query(LedgerEntry).count() == 0
+
+
+def test_batch_posting_writes_operations_entries_and_audit(db_session: Session, test_user: User):
+    """Several postings land in one flush with entries, audit rows and snapshot updates"""
+    wallet_accounts = ensure_wallet_accounts(db_session, test_user.id, "AED")
+    available_id = wallet_accounts[AccountType.WALLET_AVAILABLE.value]
+    locked_id = wallet_accounts[AccountType.WALLET_LOCKED.value]
+
+    postings = [
+        LedgerPosting(
+            operation_type=OperationType.ADJUSTMENT,
+            currency="AED",
+            legs=[LedgerLeg(available_id, Decimal("-25.00")), LedgerLeg(locked_id, Decimal("25.00"))],
+            metadata={'currency': "AED", 'batch': i},
+            audit=AuditSpec(action="TEST_POSTING", actor_role=Role.OPS, after={'batch': i}),
+        )
+        for i in range(3)
+    ]
+
+    operations = post_ledger_operations(db_session, postings)
+    db_session.commit()
+
+    assert [op.id for op in operations] == [p.operation_id for p in postings]
+    assert operations[1].operation_metadata == {'currency': "AED", 'batch': 1}
+
+    entries = db_session.query(LedgerEntry).filter(LedgerEntry.operation_id == operations[0].id).all()
+    assert {e.entry_type for e in entries} == {LedgerEntryType.DEBIT, LedgerEntryType.CREDIT}
+
+    audit = db_session.query(AuditLog).filter(AuditLog.entity_id == operations[2].id).one()
+    assert audit.after == {'operation_id': str(operations[2].id), 'batch': 2}
+
+    assert get_snapshot_balance(db_session, locked_id) == Decimal("75.00")
+    assert get_snapshot_balance(db_session, available_id) == Decimal("-75.00")
+
+
+def test_core_insert_posting_maintains_snapshots(db_session: Session, test_user: User):
+    """insert_ledger_operations writes the same rows without ORM objects and updates account_balances"""
+    wallet_accounts = ensure_wallet_accounts(db_session, test_user.id, "AED")
+    available_id = wallet_accounts[AccountType.WALLET_AVAILABLE.value]
+    locked_id = wallet_accounts[AccountType.WALLET_LOCKED.value]
+
+    postings = [
+        LedgerPosting(
+            operation_type=OperationType.ADJUSTMENT,
+            currency="AED",
+            legs=[LedgerLeg(locked_id, Decimal("-40.00")), LedgerLeg(available_id, Decimal("40.00"))],
+            metadata={'batch': i},
+            audit=AuditSpec(action="TEST_POSTING", actor_role=Role.OPS) if i == 0 else None,
+        )
+        for i in range(2)
+    ]
+
+    operation_ids = insert_ledger_operations(db_session, postings)
+    db_session.commit()
+
+    assert operation_ids == [p.operation_id for p in postings]
+    assert db_session.query(Operation).filter(Operation.id.in_(operation_ids)).count() == 2
+    assert db_session.query(LedgerEntry).filter(LedgerEntry.operation_id.in_(operation_ids)).count() == 4
+    assert db_session.query(AuditLog).filter(AuditLog.entity_id == operation_ids[0]).count() == 1
+
+    assert get_snapshot_balance(db_session, available_id) == Decimal("80.00")
+    assert get_snapshot_balance(db_session, locked_id) == Decimal("-80.00")
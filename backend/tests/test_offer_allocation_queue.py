@@ -0,0 +1,177 @@
+"""
+Tests for queued offer allocation - FIFO batches of InvestmentIntents
+"""
+
+import hashlib
+import hmac
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import get_current_principal
+from app.auth.oidc import Principal
+from app.core.accounts.models import AccountType
+from app.core.accounts.wallet_locks import WalletLock
+from app.core.ledger.models import OperationType
+from app.core.offers.models import InvestmentIntentStatus, Offer, OfferStatus
+from app.core.users.models import User
+from app.infrastructure.settings import get_settings
+from app.main import app
+from app.services.fund_services import ValidationError
+from app.services.ledger_posting import LedgerLeg, LedgerPosting, post_ledger_operation
+from app.services.offers.allocation_queue import (
+    INSUFFICIENT_AVAILABLE_FUNDS,
+    OFFER_FULL,
+    allocate_offer_batch,
+    deliver_intent_callback,
+    drain_offer_allocation_queue,
+    enqueue_investment_intent,
+)
+from app.services.system_accounts import get_or_create_system_account_id
+from app.services.wallet_helpers import ensure_wallet_accounts
+
+
+def _funded_user(db: Session, amount: str) -> User:
+    user = User(email=f"queue_{uuid4()}@example.com", password_hash="hashed_password")
+    db.add(user)
+    db.flush()
+    wallet_accounts = ensure_wallet_accounts(db, user.id, "AED")
+    omnibus_id = get_or_create_system_account_id(db, AccountType.INTERNAL_OMNIBUS, "AED")
+    post_ledger_operation(db, LedgerPosting(
+        operation_type=OperationType.DEPOSIT_AED,
+        currency="AED",
+        legs=[
+            LedgerLeg(omnibus_id, Decimal(f"-{amount}")),
+            LedgerLeg(wallet_accounts[AccountType.WALLET_AVAILABLE.value], Decimal(amount)),
+        ],
+    ))
+    return user
+
+
+@pytest.fixture
+def queued_offer(db_session: Session) -> Offer:
+    """LIVE offer of 2500 AED with queued allocation"""
+    offer = Offer(
+        code=f"QUEUE-{uuid4().hex[:8]}",
+        name="Queued Launch Offer",
+        currency="AED",
+        max_amount=Decimal("2500.00"),
+        invested_amount=Decimal("0.00"),
+        committed_amount=Decimal("0.00"),
+        status=OfferStatus.LIVE,
+        queued_allocation=True,
+    )
+    db_session.add(offer)
+    db_session.commit()
+    return offer
+
+
+def test_batches_allocate_in_fifo_order(db_session: Session, queued_offer: Offer):
+    """Intents are decided in arrival order: partial fill at max_amount, then OFFER_FULL"""
+    requests = [("100000.00", "1000.00"), ("100.00", "500.00"), ("100000.00", "2000.00"), ("100000.00", "500.00")]
+    intents = []
+    for balance, amount in requests:
+        user = _funded_user(db_session, balance)
+        intent, created = enqueue_investment_intent(
+            db_session, user_id=user.id, offer_id=queued_offer.id,
+            amount=Decimal(amount), currency="AED", idempotency_key=str(uuid4()),
+        )
+        assert created and intent.status == InvestmentIntentStatus.PENDING
+        intents.append(intent)
+    db_session.commit()
+    assert [intent.queue_position for intent in intents] == sorted(intent.queue_position for intent in intents)
+
+    first = allocate_offer_batch(db_session, queued_offer.id, batch_size=2)
+    db_session.commit()
+    assert first.decided == [intents[0].id, intents[1].id]
+    rest = drain_offer_allocation_queue(db_session, queued_offer.id)
+    assert [batch.decided for batch in rest] == [[intents[2].id, intents[3].id]]
+
+    for intent in intents:
+        db_session.refresh(intent)
+    assert [(i.status, i.allocated_amount, i.rejection_reason) for i in intents] == [
+        (InvestmentIntentStatus.CONFIRMED, Decimal("1000.00"), None),
+        (InvestmentIntentStatus.REJECTED, Decimal("0"), INSUFFICIENT_AVAILABLE_FUNDS),
+        (InvestmentIntentStatus.CONFIRMED, Decimal("1500.00"), None),  # Partial fill
+        (InvestmentIntentStatus.REJECTED, Decimal("0"), OFFER_FULL),
+    ]
+    assert intents[0].allocation_batch_id == intents[1].allocation_batch_id == first.batch_id
+    assert intents[2].allocation_batch_id == rest[0].batch_id
+    assert all(intent.operation_id for intent in (intents[0], intents[2]))
+
+    db_session.refresh(queued_offer)
+    assert queued_offer.invested_amount == queued_offer.committed_amount == Decimal("2500.00")
+    assert db_session.query(WalletLock).filter(WalletLock.reference_id == queued_offer.id).count() == 2
+
+
+def test_invest_endpoint_queues_and_polls(client, db_session: Session, queued_offer: Offer):
+    """Queued offers go through the allocation queue (drained inline in tests); the owner can poll"""
+    user = _funded_user(db_session, "5000.00")
+    other = _funded_user(db_session, "5000.00")
+    db_session.commit()
+
+    app.dependency_overrides[get_current_principal] = lambda: Principal(sub=str(user.id), email=user.email, roles=["USER"])
+    response = client.post(f"/api/v1/offers/{queued_offer.id}/invest", json={"amount": "3000.00", "currency": "AED"})
+    assert response.status_code == 201, response.json()
+    body = response.json()
+    assert body["status"] == "CONFIRMED"
+    assert body["accepted_amount"] == "2500.00000000"
+    assert body["queue_position"] is not None
+
+    polled = client.get(f"/api/v1/offers/{queued_offer.id}/investments/{body['investment_id']}")
+    assert polled.status_code == 200
+    assert polled.json()["status"] == "CONFIRMED"
+    assert Decimal(polled.json()["offer_remaining_amount"]) == 0
+
+    # Only the owner sees the investment
+    app.dependency_overrides[get_current_principal] = lambda: Principal(sub=str(other.id), email=other.email, roles=["USER"])
+    assert client.get(f"/api/v1/offers/{queued_offer.id}/investments/{body['investment_id']}").status_code == 404
+
+    # Offer is full: decided as REJECTED by the allocator
+    response = client.post(f"/api/v1/offers/{queued_offer.id}/invest", json={"amount": "100.00", "currency": "AED"})
+    assert response.status_code == 201
+    assert response.json()["status"] == "REJECTED"
+    assert response.json()["rejection_reason"] == OFFER_FULL
+
+
+def test_callbacks_are_signed_and_refused_without_a_secret(db_session: Session, queued_offer: Offer, monkeypatch):
+    """No INVESTMENT_CALLBACK_SECRET, no callbacks; deliveries carry X-Signature = HMAC-SHA256 of the body"""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "INVESTMENT_CALLBACK_ALLOWED_HOSTS", "hooks.example.com")
+    user = _funded_user(db_session, "5000.00")
+    db_session.commit()
+    invest = lambda: enqueue_investment_intent(
+        db_session, user_id=user.id, offer_id=queued_offer.id, amount=Decimal("100.00"), currency="AED",
+        callback_url="https://hooks.example.com/investments",
+    )
+
+    with pytest.raises(ValidationError):
+        invest()
+
+    monkeypatch.setattr(settings, "INVESTMENT_CALLBACK_SECRET", "callback-test-secret")
+    intent, _ = invest()
+    db_session.commit()
+    drain_offer_allocation_queue(db_session, queued_offer.id)
+
+    sent = []
+
+    class _Response:
+        status = 204
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    class _Opener:
+        def open(self, request, timeout):
+            sent.append(request)
+            return _Response()
+
+    monkeypatch.setattr("urllib.request.build_opener", lambda *handlers: _Opener())
+    assert deliver_intent_callback(db_session, intent.id)
+    expected = hmac.new(b"callback-test-secret", sent[0].data, hashlib.sha256).hexdigest()
+    assert sent[0].get_header("X-signature") == f"sha256={expected}"
@@ -0,0 +1,71 @@
+"""
+Tests for the bulk offer response builder (media/documents loaded per page, not per offer)
+"""
+from decimal import Decimal
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.api.v1.offers import build_offer_response, build_offer_responses
+from app.core.offers.models import (
+    DocumentKind, DocumentVisibility, MediaType, MediaVisibility, Offer, OfferDocument, OfferMedia, OfferStatus,
+)
+
+
+def _offer(db: Session, code: str) -> Offer:
+    offer = Offer(
+        code=code,
+        name=code,
+        currency="AED",
+        max_amount=Decimal("100000.00"),
+        invested_amount=Decimal("0.00"),
+        committed_amount=Decimal("0.00"),
+        status=OfferStatus.LIVE,
+    )
+    db.add(offer)
+    db.flush()
+
+    def media(name: str, sort_order: int, visibility=MediaVisibility.PUBLIC) -> OfferMedia:
+        item = OfferMedia(
+            offer_id=offer.id, type=MediaType.IMAGE, key=f"offers/{code}/{name}",
+            url=f"https://cdn.example.com/{code}/{name}",  # Public URL: no storage needed
+            mime_type="image/jpeg", size_bytes=1024, sort_order=sort_order, visibility=visibility,
+        )
+        db.add(item)
+        return item
+
+    cover = media("cover.jpg", 5)
+    media("b.jpg", 2)
+    media("a.jpg", 1)
+    media("private.jpg", 0, visibility=MediaVisibility.PRIVATE)
+    db.add(OfferDocument(
+        offer_id=offer.id, name="Memo", kind=DocumentKind.MEMO, key=f"offers/{code}/memo.pdf",
+        url=f"https://cdn.example.com/{code}/memo.pdf", mime_type="application/pdf", size_bytes=2048,
+        visibility=DocumentVisibility.PUBLIC,
+    ))
+    db.flush()
+    offer.cover_media_id = cover.id
+    return offer
+
+
+def test_bulk_builder_matches_single_builder_with_two_queries(db_session: Session):
+    """A page of offers costs one media and one document query and yields the same responses"""
+    offers = [_offer(db_session, f"BULK-{i}") for i in range(3)]
+    db_session.commit()
+    expected = [build_offer_response(offer, db_session) for offer in offers]
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        responses = build_offer_responses(offers, db_session)
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+    assert len(statements) == 2
+    assert responses == expected
+    first = responses[0]
+    assert first.cover_url.endswith("BULK-0/cover.jpg")
+    assert [m.url.rsplit("/", 1)[-1] for m in first.media] == ["cover.jpg", "a.jpg", "b.jpg"]
+    assert [d.name for d in first.documents] == ["Memo"]
+    assert build_offer_responses([], db_session) == []
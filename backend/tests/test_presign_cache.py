@@ -0,0 +1,127 @@
+"""
+Tests for the presigned GET URL cache (per object key and expiry bucket)
+"""
+import asyncio
+from itertools import count
+
+import pytest
+from sqlalchemy.util.concurrency import greenlet_spawn
+
+from app.services.storage import presign_cache as presign_cache_module
+from app.services.storage.presign_cache import clear_presigned_url_cache, presigned_url_cache
+from app.services.storage.s3_service import S3Service
+
+
+class _FakeClient:
+    """Signs URLs with a counter so each signature is distinguishable"""
+
+    def __init__(self):
+        self.calls = count(1)
+        self.signed = 0
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        self.signed += 1
+        return f"https://bucket/{Params['Key']}?expires={ExpiresIn}&sig={next(self.calls)}"
+
+
+class _FailingRedis:
+    def mget(self, keys):
+        raise ConnectionError("redis down")
+
+    def pipeline(self, transaction=False):
+        raise ConnectionError("redis down")
+
+
+class _AsyncRedis:
+    """redis.asyncio stand-in: MGET and pipelined SET NX on a dict"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return _AsyncPipeline(self)
+
+
+class _AsyncPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value, nx=False, px=None):
+        self.commands.append((key, value, nx))
+        return self
+
+    async def execute(self):
+        for key, value, nx in self.commands:
+            if not (nx and key in self.redis.data):
+                self.redis.data[key] = value
+        return [True] * len(self.commands)
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    service = S3Service()
+    service._client = _FakeClient()
+    monkeypatch.setattr("app.services.storage.s3_service.assert_configured", lambda settings: None)
+    clear_presigned_url_cache()
+    yield service
+    clear_presigned_url_cache()
+
+
+def _at(monkeypatch, seconds: float) -> None:
+    monkeypatch.setattr(presign_cache_module.time, "time", lambda: seconds)
+
+
+def test_url_reused_within_bucket_and_resigned_after(s3, monkeypatch):
+    """Same URL for a whole bucket (expires - min remaining), a new one in the next bucket"""
+    # Defaults: 900s URLs, 300s minimum remaining -> 600s buckets
+    _at(monkeypatch, 6000)
+    first = s3.generate_presigned_get_url("offers/a.png")
+    _at(monkeypatch, 6599)
+    assert s3.generate_presigned_get_url("offers/a.png") == first
+    assert s3.client.signed == 1
+
+    _at(monkeypatch, 6600)
+    assert s3.generate_presigned_get_url("offers/a.png") != first
+    # A different expiry is a different URL
+    s3.generate_presigned_get_url("offers/a.png", expires_in=3600)
+    assert s3.client.signed == 3
+
+
+def test_batch_signs_only_missing_keys(s3, monkeypatch):
+    """generate_presigned_get_urls returns every key and signs cache misses only"""
+    _at(monkeypatch, 1000)
+    cached = s3.generate_presigned_get_url("offers/a.png")
+    urls = s3.generate_presigned_get_urls(["offers/a.png", "offers/b.png", "offers/b.png"])
+    assert set(urls) == {"offers/a.png", "offers/b.png"}
+    assert urls["offers/a.png"] == cached
+    assert s3.client.signed == 2
+
+
+def test_redis_errors_are_misses(s3, monkeypatch):
+    """A failing Redis tier falls back to local signing"""
+    monkeypatch.setattr(presign_cache_module.get_settings(), "S3_PRESIGN_CACHE_REDIS_ENABLED", True)
+    monkeypatch.setattr(presigned_url_cache, "_redis", lambda: _FailingRedis())
+    _at(monkeypatch, 1000)
+    url = s3.generate_presigned_get_url("offers/a.png")
+    assert s3.generate_presigned_get_url("offers/a.png") == url
+    assert s3.client.signed == 1
+
+
+def test_redis_tier_awaits_under_run_db(s3, monkeypatch):
+    """Signing inside AsyncSession.run_sync (greenlet) uses redis.asyncio, never the blocking client"""
+    redis = _AsyncRedis()
+    monkeypatch.setattr(presign_cache_module.get_settings(), "S3_PRESIGN_CACHE_REDIS_ENABLED", True)
+    monkeypatch.setattr("app.infrastructure.redis_client.redis_client", _FailingRedis())
+    monkeypatch.setattr("app.infrastructure.redis_client.get_async_redis", lambda: redis)
+    _at(monkeypatch, 6000)
+
+    sign = lambda: asyncio.run(greenlet_spawn(s3.generate_presigned_get_urls, ["offers/a.png", "offers/b.png"]))
+    first = sign()
+    assert len(redis.data) == 2
+    clear_presigned_url_cache()  # Next read from the Redis tier
+    assert sign() == first
+    assert s3.client.signed == 2
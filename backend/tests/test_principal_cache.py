@@ -0,0 +1,78 @@
+"""
+Tests for the authentication caches (verified token claims, user records)
+"""
+import time
+
+import jwt as pyjwt
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import get_current_principal
+from app.auth.principal_cache import cache_claims, get_cached_claims, invalidate_cached_user
+from app.core.users.models import User
+from app.infrastructure.settings import get_settings
+
+
+@pytest.fixture(autouse=True)
+def jwt_secret(monkeypatch):
+    """HS256 tokens need a non-empty key (PyJWT >= 2.10 rejects empty ones)"""
+    monkeypatch.setattr(get_settings(), "JWT_SECRET", "test-jwt-secret-for-principal-cache")
+
+
+def _token(user: User, **claims) -> str:
+    settings = get_settings()
+    payload = {"sub": str(user.id), "roles": ["USER"], "exp": int(time.time()) + 600, **claims}
+    return pyjwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+
+async def test_repeated_token_uses_cached_claims_and_user(db_session: Session, test_user: User):
+    """Second request: no decode, no user query; ORM changes invalidate after commit"""
+    authorization = f"Bearer {_token(test_user)}"
+
+    principal = await get_current_principal(authorization=authorization, db=db_session)
+    assert principal.email == "test@example.com"
+
+    # Out-of-band change (no ORM event): the cached record is still served
+    db_session.execute(text("UPDATE users SET email = 'raw@example.com' WHERE id = :id"), {"id": test_user.id})
+    db_session.commit()
+    assert (await get_current_principal(authorization=authorization, db=db_session)).email == "test@example.com"
+
+    # Explicit invalidation (DELETE /admin/v1/users/{user_id}/auth-cache)
+    invalidate_cached_user(test_user.id)
+    assert (await get_current_principal(authorization=authorization, db=db_session)).email == "raw@example.com"
+
+    # ORM update: invalidated once committed
+    db_session.expire_all()
+    test_user.email = "orm@example.com"
+    db_session.commit()
+    assert (await get_current_principal(authorization=authorization, db=db_session)).email == "orm@example.com"
+
+
+async def test_email_claim_skips_user_lookup(db_session: Session, test_user: User):
+    """An email in the token is used as is"""
+    user_id = test_user.id
+    authorization = f"Bearer {_token(test_user, email='claim@example.com')}"
+    db_session.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+    db_session.commit()
+
+    principal = await get_current_principal(authorization=authorization, db=db_session)
+    assert (principal.sub, principal.email) == (str(user_id), "claim@example.com")
+
+
+def test_claims_never_outlive_token_expiry():
+    """Expired tokens are not cached; entries are bounded by exp"""
+    cache_claims("expired-token", {"sub": "x", "exp": int(time.time()) - 1})
+    assert get_cached_claims("expired-token") is None
+
+    cache_claims("valid-token", {"sub": "x", "exp": int(time.time()) + 60})
+    assert get_cached_claims("valid-token") == {"sub": "x", "exp": pytest.approx(time.time() + 60, abs=5)}
+
+
+async def test_invalid_token_is_rejected_and_not_cached(db_session: Session):
+    """Decoding errors still return 401"""
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_principal(authorization="Bearer not-a-jwt", db=db_session)
+    assert exc_info.value.status_code == 401
+    assert get_cached_claims("not-a-jwt") is None
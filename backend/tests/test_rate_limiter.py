@@ -0,0 +1,80 @@
+"""
+Tests for the Redis sliding window rate limiter and abuse tracking (atomic scripts)
+"""
+import time
+
+import redis.asyncio as aioredis
+from redis import Redis
+
+from app.infrastructure.redis_client import get_async_redis
+from app.utils.rate_limiter import AsyncRateLimiter, LocalTokenBucket, RateLimiter
+from app.utils.security_logging import track_abuse_pattern
+
+
+def test_requests_within_the_same_second_are_all_counted(redis_client: Redis):
+    """Unique members: a burst in one second is not collapsed into one entry"""
+    limiter = RateLimiter(redis_client, limit=3, window_seconds=60)
+
+    results = [limiter.check_rate_limit("api", "10.0.0.1") for _ in range(4)]
+
+    assert [allowed for allowed, _, _, _ in results] == [True, True, True, False]
+    assert [remaining for _, remaining, _, _ in results] == [2, 1, 0, 0]
+    assert redis_client.zcard(limiter.get_key("api", "10.0.0.1")) == 3
+    # Blocked: resets when the oldest request leaves the window
+    assert results[3][3] >= int(time.time()) + 59
+    # Other identifiers have their own window
+    assert limiter.check_rate_limit("api", "10.0.0.2")[0] is True
+
+
+def test_script_is_reloaded_after_script_flush(redis_client: Redis):
+    """EVALSHA falls back to loading the script when Redis lost it"""
+    limiter = RateLimiter(redis_client, limit=2, window_seconds=60)
+    assert limiter.check_rate_limit("admin", "10.0.0.3")[0] is True
+
+    redis_client.script_flush()
+    assert limiter.check_rate_limit("admin", "10.0.0.3")[:2] == (True, 0)
+
+
+def test_track_abuse_pattern_counts_each_violation(redis_client: Redis):
+    """Violations in the same second count separately towards the threshold"""
+    detected = [
+        track_abuse_pattern(redis_client, "admin", "10.0.0.4", threshold=3, window_seconds=600)
+        for _ in range(3)
+    ]
+    assert detected == [False, False, True]
+    assert redis_client.ttl("abuse:admin:10.0.0.4") > 600
+
+
+def test_local_token_bucket_limits_and_refills(monkeypatch):
+    """Fallback bucket: `limit` requests per window, refilled continuously"""
+    clock = [1_000.0]
+    monkeypatch.setattr("app.utils.rate_limiter.time.time", lambda: clock[0])
+    bucket = LocalTokenBucket(limit=2, window_seconds=60)
+
+    assert [bucket.check_rate_limit("api", "10.0.0.5")[0] for _ in range(3)] == [True, True, False]
+    assert bucket.check_rate_limit("api", "10.0.0.5")[3] == 1_030  # One token back in 30s
+    clock[0] += 30
+    assert bucket.check_rate_limit("api", "10.0.0.5")[:2] == (True, 0)
+
+
+async def test_async_limiter_falls_back_when_redis_is_unreachable():
+    """An unreachable Redis degrades to local limiting instead of failing or waiting"""
+    unreachable = aioredis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.05)
+    limiter = AsyncRateLimiter(lambda: unreachable, limit=2, timeout_ms=50, retry_seconds=60)
+
+    results = [await limiter.check_rate_limit("api", "10.0.0.6") for _ in range(3)]
+
+    assert limiter.degraded
+    assert [allowed for allowed, _, _, _ in results] == [True, True, False]
+    await unreachable.aclose()
+
+
+async def test_async_limiter_uses_redis_window(redis_client: Redis):
+    """With Redis up, the async limiter shares the sliding window of the sync one"""
+    limiter = AsyncRateLimiter(get_async_redis, limit=2)
+
+    results = [await limiter.check_rate_limit("webhook", "10.0.0.7") for _ in range(3)]
+
+    assert [allowed for allowed, _, _, _ in results] == [True, True, False]
+    assert not limiter.degraded
+    assert redis_client.zcard(limiter.get_key("webhook", "10.0.0.7")) == 2
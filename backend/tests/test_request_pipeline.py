@@ -0,0 +1,73 @@
+"""
+Tests for the pure ASGI request pipeline (trace id, security headers, rate limits)
+"""
+import redis.asyncio as aioredis
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.utils.rate_limiter import AsyncRateLimiter, EndpointRateLimits
+from app.utils.request_pipeline import RequestPipelineMiddleware
+from app.utils.trace_id import get_trace_id
+
+
+def _app(rate_limits=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/api/v1/echo-trace")
+    async def echo_trace(request: Request):
+        return {"trace_id": get_trace_id(request)}
+
+    @app.get("/api/v1/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i};"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.add_middleware(RequestPipelineMiddleware, rate_limits=rate_limits)
+    return app
+
+
+def test_trace_id_and_security_headers():
+    """Incoming trace id is reused and exposed; security headers on every response"""
+    client = TestClient(_app())
+
+    response = client.get("/api/v1/echo-trace", headers={"X-Request-Id": "req-123"})
+    assert response.json() == {"trace_id": "req-123"}
+    assert response.headers["X-Trace-ID"] == "req-123"
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert response.headers["X-Frame-Options"] == "DENY"
+
+    generated = client.get("/health").headers["X-Trace-ID"]
+    assert generated and generated != "req-123"
+
+
+def test_streaming_response_passes_through():
+    """The body stream is not buffered or re-wrapped"""
+    response = TestClient(_app()).get("/api/v1/stream")
+    assert response.text == "chunk0;chunk1;chunk2;"
+    assert "X-Trace-ID" in response.headers
+
+
+def test_rate_limited_request_gets_429_without_reaching_the_app():
+    """Blocked requests: standard error body, rate limit and trace headers"""
+    unreachable = aioredis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.05)
+    rate_limits = EndpointRateLimits(redis_provider=lambda: unreachable)
+    rate_limits.limiters["api"] = AsyncRateLimiter(lambda: unreachable, limit=1, retry_seconds=60)
+    client = TestClient(_app(rate_limits))
+
+    assert client.get("/api/v1/echo-trace").headers["X-RateLimit-Remaining"] == "0"
+    response = client.get("/api/v1/echo-trace", headers={"X-Trace-ID": "blocked-1"})
+
+    assert response.status_code == 429
+    assert response.json()["error"]["code"] == "RATE_LIMITED"
+    assert response.json()["error"]["trace_id"] == "blocked-1"
+    assert response.headers["X-RateLimit-Limit"] == "1"
+    assert response.headers["X-Trace-ID"] == "blocked-1"
+    # Exempt paths carry no rate limit headers
+    assert "X-RateLimit-Limit" not in client.get("/health").headers
@@ -0,0 +1,56 @@
+"""
+Tests for the system account registry (cached INTERNAL_OMNIBUS / pool account ids)
+"""
+from sqlalchemy.orm import Session
+
+from app.core.accounts.models import Account, AccountType
+from app.services.system_accounts import (
+    clear_system_account_registry,
+    get_or_create_system_account_id,
+    system_account_key,
+    system_account_registry,
+    warm_system_account_registry,
+)
+
+
+def test_created_account_cached_only_after_commit(db_session: Session):
+    """A new system account is served from the registry once its row is committed"""
+    key = system_account_key(AccountType.INTERNAL_OMNIBUS, "AED")
+
+    account_id = get_or_create_system_account_id(db_session, AccountType.INTERNAL_OMNIBUS, "AED")
+    assert system_account_registry.get(key) is None
+    # Same transaction: pending id reused, no duplicate row
+    assert get_or_create_system_account_id(db_session, AccountType.INTERNAL_OMNIBUS, "AED") == account_id
+
+    db_session.commit()
+    assert system_account_registry.get(key) == account_id
+    assert db_session.query(Account).filter(Account.account_type == AccountType.INTERNAL_OMNIBUS).count() == 1
+
+
+def test_rolled_back_account_not_cached(db_session: Session):
+    """A rollback discards ids of accounts created in the rolled-back transaction"""
+    get_or_create_system_account_id(db_session, AccountType.INTERNAL_OMNIBUS, "AED")
+    db_session.rollback()
+
+    assert system_account_registry.get(system_account_key(AccountType.INTERNAL_OMNIBUS, "AED")) is None
+
+    account_id = get_or_create_system_account_id(db_session, AccountType.INTERNAL_OMNIBUS, "AED")
+    db_session.commit()
+    assert db_session.query(Account).filter(Account.id == account_id).one()
+
+
+def test_warm_loads_existing_system_accounts(db_session: Session, test_internal_account: Account, avenir_vault):
+    """Warm-up loads every system account in one pass; user accounts are ignored"""
+    pool_id = get_or_create_system_account_id(
+        db_session, AccountType.VAULT_POOL_CASH, "AED", vault_id=avenir_vault.id,
+    )
+    db_session.commit()
+    clear_system_account_registry()
+
+    assert warm_system_account_registry(db_session) == 2
+    assert system_account_registry.get(
+        system_account_key(AccountType.INTERNAL_OMNIBUS, test_internal_account.currency)
+    ) == test_internal_account.id
+    assert system_account_registry.get(
+        system_account_key(AccountType.VAULT_POOL_CASH, "AED", vault_id=avenir_vault.id)
+    ) == pool_id
@@ -0,0 +1,103 @@
+"""
+Tests for GET /api/v1/transactions (set-based timeline, keyset pagination)
+"""
+
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import get_current_principal
+from app.auth.oidc import Principal
+from app.core.accounts.models import AccountType
+from app.core.ledger.models import OperationType
+from app.core.transactions.models import Transaction, TransactionStatus, TransactionType
+from app.core.users.models import User
+from app.main import app
+from app.services.fund_services import record_deposit_blocked
+from app.services.ledger_posting import LedgerLeg, LedgerPosting, post_ledger_operation
+from app.services.system_accounts import get_or_create_system_account_id
+from app.services.wallet_helpers import ensure_wallet_accounts
+
+
+def _login(user: User) -> None:
+    app.dependency_overrides[get_current_principal] = lambda: Principal(
+        sub=str(user.id), email=user.email, roles=["USER"],
+    )
+
+
+def _deposit(db: Session, user: User, amount: str) -> Transaction:
+    transaction = Transaction(
+        user_id=user.id,
+        type=TransactionType.DEPOSIT,
+        status=TransactionStatus.INITIATED,
+        transaction_metadata={"currency": "AED"},
+    )
+    db.add(transaction)
+    db.flush()
+    record_deposit_blocked(
+        db=db, user_id=user.id, currency="AED", amount=Decimal(amount),
+        transaction_id=transaction.id, commit=False,
+    )
+    return transaction
+
+
+def test_timeline_pages_with_cursor(client, db_session: Session, test_user: User):
+    """Transactions and standalone operations are paged without gaps or duplicates"""
+    # Same DB transaction: every row shares created_at, so ordering relies on the id tie-breaker
+    deposits = [_deposit(db_session, test_user, f"{100 + i}.00") for i in range(4)]
+
+    wallet_accounts = ensure_wallet_accounts(db_session, test_user.id, "AED")
+    omnibus_id = get_or_create_system_account_id(db_session, AccountType.INTERNAL_OMNIBUS, "AED")
+    vault_op = post_ledger_operation(db_session, LedgerPosting(
+        operation_type=OperationType.VAULT_DEPOSIT,
+        currency="AED",
+        legs=[
+            LedgerLeg(omnibus_id, Decimal("-50.00")),
+            LedgerLeg(wallet_accounts[AccountType.WALLET_AVAILABLE.value], Decimal("50.00")),
+        ],
+        metadata={"vault_code": "FLEX"},
+    ))
+    # No wallet impact: not listed
+    db_session.add(Transaction(user_id=test_user.id, type=TransactionType.WITHDRAWAL, status=TransactionStatus.INITIATED))
+    db_session.commit()
+
+    _login(test_user)
+    seen = []
+    cursor = None
+    for _ in range(5):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/transactions", params=params)
+        assert response.status_code == 200, response.json()
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert cursor is None
+    assert sorted(item["transaction_id"] for item in seen if item["transaction_id"]) == sorted(str(d.id) for d in deposits)
+    vault_items = [item for item in seen if item["operation_id"] == str(vault_op.id)]
+    assert len(seen) == 5 and len(vault_items) == 1
+    assert vault_items[0]["transaction_id"] is None
+    assert vault_items[0]["amount"] == "50.00000000"
+
+    deposit_amounts = {item["transaction_id"]: Decimal(item["amount"]) for item in seen if item["transaction_id"]}
+    assert deposit_amounts[str(deposits[0].id)] == Decimal("100.00")
+
+
+def test_timeline_filters_and_invalid_cursor(client, db_session: Session, test_user: User):
+    """Type filter applies to transactions; malformed cursors are rejected"""
+    _deposit(db_session, test_user, "75.00")
+    db_session.commit()
+
+    _login(test_user)
+    response = client.get("/api/v1/transactions", params={"type": "INVESTMENT"})
+    assert response.status_code == 200
+    assert response.json() == []
+
+    response = client.get("/api/v1/transactions", params={"currency": "AED"})
+    assert [item["type"] for item in response.json()] == ["DEPOSIT"]
+    assert "X-Next-Cursor" not in response.headers
+
+    assert client.get("/api/v1/transactions", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/v1/transactions", params={"type": "BOGUS"}).status_code == 400
@@ -0,0 +1,156 @@
+"""
+Tests for batched FIFO processing of pending vault withdrawals (and its dry run)
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import get_current_principal
+from app.auth.oidc import Principal
+from app.core.accounts.models import AccountType
+from app.core.accounts.wallet_locks import LockReason, LockStatus, WalletLock
+from app.core.ledger.models import Operation, OperationType
+from app.core.users.models import User
+from app.core.vaults.models import Vault, VaultAccount, WithdrawalRequest, WithdrawalRequestStatus
+from app.main import app
+from app.services.ledger_posting import LedgerLeg, LedgerPosting, post_ledger_operation
+from app.services.system_accounts import get_or_create_system_account_id
+from app.services.vault_helpers import get_or_create_vault_pool_cash_account, get_vault_cash_balance
+from app.services.vault_service import process_pending_withdrawals
+from app.services.wallet_helpers import get_wallet_balances
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _user(db: Session, vault: Vault, principal: str = None, locks=()) -> User:
+    """User with a VaultAccount (unless principal is None) and ACTIVE vesting locks, oldest first"""
+    user = User(email=f"withdraw_{uuid4()}@example.com", password_hash="hashed_password")
+    db.add(user)
+    db.flush()
+    if principal is not None:
+        db.add(VaultAccount(
+            vault_id=vault.id, user_id=user.id,
+            principal=Decimal(principal), available_balance=Decimal(principal),
+        ))
+    for n, amount in enumerate(locks):
+        db.add(WalletLock(
+            user_id=user.id, currency="AED", amount=Decimal(amount),
+            reason=LockReason.VAULT_AVENIR_VESTING.value, reference_type="VAULT", reference_id=vault.id,
+            status=LockStatus.ACTIVE.value, created_at=START + timedelta(days=n),
+        ))
+    db.flush()
+    return user
+
+
+@pytest.fixture
+def withdrawal_queue(db_session: Session, avenir_vault: Vault):
+    """1000.00 vault cash and six PENDING requests: execute, cancel, cancel, execute, wait, wait"""
+    omnibus_id = get_or_create_system_account_id(db_session, AccountType.INTERNAL_OMNIBUS, "AED")
+    post_ledger_operation(db_session, LedgerPosting(
+        operation_type=OperationType.VAULT_DEPOSIT,
+        currency="AED",
+        legs=[
+            LedgerLeg(omnibus_id, Decimal("-1000.00")),
+            LedgerLeg(get_or_create_vault_pool_cash_account(db_session, avenir_vault.id, "AED"), Decimal("1000.00")),
+        ],
+    ))
+    alice = _user(db_session, avenir_vault, "600.00", locks=("100.00", "300.00", "400.00"))
+    no_account = _user(db_session, avenir_vault)
+    poor = _user(db_session, avenir_vault, "100.00")
+    large = _user(db_session, avenir_vault, "1000.00")
+
+    queue = [(alice, "200.00"), (no_account, "50.00"), (poor, "150.00"), (alice, "300.00"), (large, "600.00"), (large, "100.00")]
+    requests = []
+    for n, (user, amount) in enumerate(queue):
+        request = WithdrawalRequest(
+            vault_id=avenir_vault.id, user_id=user.id, amount=Decimal(amount),
+            status=WithdrawalRequestStatus.PENDING, created_at=START + timedelta(minutes=n),
+        )
+        db_session.add(request)
+        requests.append(request)
+    db_session.commit()
+    return {"vault": avenir_vault, "alice": alice, "requests": requests}
+
+
+def test_batches_process_fifo_until_cash_runs_out(db_session: Session, withdrawal_queue):
+    """Batches of 2: cancellations and executions in queue order, stops at the first request cash cannot cover"""
+    vault = withdrawal_queue["vault"]
+    alice = withdrawal_queue["alice"]
+    requests = withdrawal_queue["requests"]
+
+    result = process_pending_withdrawals(db_session, "AVENIR", batch_size=2)
+    db_session.commit()
+
+    assert result["processed_count"] == 2
+    assert result["cancelled_count"] == 2
+    assert result["executed_amount"] == Decimal("500.00")
+    assert result["waiting_request_id"] == requests[4].id
+    assert result["remaining_count"] == 2
+
+    for request in requests:
+        db_session.refresh(request)
+    assert [request.status for request in requests] == [
+        WithdrawalRequestStatus.EXECUTED,
+        WithdrawalRequestStatus.CANCELLED,
+        WithdrawalRequestStatus.CANCELLED,
+        WithdrawalRequestStatus.EXECUTED,
+        WithdrawalRequestStatus.PENDING,
+        WithdrawalRequestStatus.PENDING,  # Smaller, but does not overtake the waiting request
+    ]
+    assert requests[1].reason == "Vault account not found"
+    assert requests[2].reason == "Insufficient principal: 100.00 < 150.00"
+    assert requests[0].executed_at is not None
+
+    assert get_vault_cash_balance(db_session, vault.id, "AED") == Decimal("500.00")
+    assert get_wallet_balances(db_session, alice.id, "AED")["available_balance"] == Decimal("500.00")
+    vault_account = db_session.query(VaultAccount).filter(VaultAccount.user_id == alice.id).one()
+    assert vault_account.principal == vault_account.available_balance == Decimal("100.00")
+    assert db_session.query(Operation).filter(Operation.type == OperationType.VAULT_WITHDRAW_EXECUTED).count() == 2
+
+    # Oldest locks first: 100 + 100 of 300 for the first batch, then the other 200 + 100 of 400
+    locks = db_session.query(WalletLock).filter(WalletLock.user_id == alice.id).order_by(WalletLock.created_at).all()
+    assert [(lock.consumed_amount, lock.status) for lock in locks] == [
+        (Decimal("100.00"), LockStatus.RELEASED.value),
+        (Decimal("300.00"), LockStatus.RELEASED.value),
+        (Decimal("100.00"), LockStatus.ACTIVE.value),
+    ]
+
+
+def test_dry_run_projects_what_executes(client, db_session: Session, withdrawal_queue):
+    """dry_run=true writes nothing and predicts the decisions of the real run"""
+    requests = withdrawal_queue["requests"]
+    app.dependency_overrides[get_current_principal] = lambda: Principal(sub=str(uuid4()), email="admin@example.com", roles=["ADMIN"])
+
+    response = client.post("/admin/v1/vaults/AVENIR/withdrawals/process", params={"dry_run": "true"})
+    assert response.status_code == 200, response.json()
+    projection = response.json()
+    assert projection["dry_run"] is True
+    assert [decision["decision"] for decision in projection["decisions"]] == ["EXECUTE", "CANCEL", "CANCEL", "EXECUTE", "WAIT"]
+    assert projection["processed_count"] == 2
+    assert projection["remaining_count"] == 2
+    assert Decimal(projection["vault_cash_balance"]) == Decimal("1000.00")
+    assert Decimal(projection["projected_cash_balance"]) == Decimal("500.00")
+    assert projection["waiting_request_id"] == str(requests[4].id)
+
+    assert db_session.query(WithdrawalRequest).filter(
+        WithdrawalRequest.status == WithdrawalRequestStatus.PENDING,
+    ).count() == len(requests)
+    assert db_session.query(Operation).filter(Operation.type == OperationType.VAULT_WITHDRAW_EXECUTED).count() == 0
+
+    response = client.post("/admin/v1/vaults/AVENIR/withdrawals/process")
+    assert response.status_code == 200, response.json()
+    body = response.json()
+    assert body["dry_run"] is False
+    assert (body["processed_count"], body["cancelled_count"], body["remaining_count"]) == (2, 2, 2)
+    assert Decimal(body["executed_amount"]) == Decimal(projection["executed_amount"])
+
+    executed = {
+        str(request.id) for request in db_session.query(WithdrawalRequest).filter(
+            WithdrawalRequest.status == WithdrawalRequestStatus.EXECUTED,
+        )
+    }
+    assert executed == {decision["request_id"] for decision in projection["decisions"] if decision["decision"] == "EXECUTE"}
@@ -0,0 +1,80 @@
+"""
+Tests for wallet account provisioning (single upsert) and the wallet account id cache
+"""
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app.core.accounts.models import Account, AccountType
+from app.core.users.models import User
+from app.services.wallet_account_cache import clear_wallet_account_cache, wallet_account_cache
+from app.services.wallet_helpers import ensure_wallet_accounts, ensure_wallet_accounts_bulk
+from app.utils.local_cache import TTLLRUCache
+
+
+def _user(db: Session) -> User:
+    user = User(email=f"wallet_{uuid4()}@example.com", password_hash="hashed_password")
+    db.add(user)
+    db.flush()
+    return user
+
+
+def test_ensure_wallet_accounts_creates_missing_and_caches_after_commit(db_session: Session):
+    """Missing accounts are inserted once; ids are cached only after commit"""
+    user = _user(db_session)
+    db_session.add(Account(user_id=user.id, currency="AED", account_type=AccountType.WALLET_AVAILABLE))
+    db_session.commit()
+
+    accounts = ensure_wallet_accounts(db_session, user.id, "AED")
+    assert set(accounts) == {t.value for t in (
+        AccountType.WALLET_AVAILABLE, AccountType.WALLET_BLOCKED, AccountType.WALLET_LOCKED,
+    )}
+    assert wallet_account_cache.get((user.id, "AED")) is None
+    # Same transaction: pending ids reused, no duplicate rows
+    assert ensure_wallet_accounts(db_session, user.id, "AED") == accounts
+
+    db_session.commit()
+    assert wallet_account_cache.get((user.id, "AED")) == accounts
+    assert db_session.query(Account).filter(Account.user_id == user.id).count() == 3
+
+
+def test_rolled_back_wallet_accounts_not_cached(db_session: Session):
+    """A rollback discards ids of accounts created in the rolled-back transaction"""
+    user = _user(db_session)
+    db_session.commit()
+
+    ensure_wallet_accounts(db_session, user.id, "AED")
+    db_session.rollback()
+    assert wallet_account_cache.get((user.id, "AED")) is None
+
+    accounts = ensure_wallet_accounts(db_session, user.id, "AED")
+    db_session.commit()
+    assert db_session.query(Account).filter(Account.id.in_(accounts.values())).count() == 3
+
+
+def test_bulk_upsert_is_idempotent(db_session: Session):
+    """Bulk provisioning after a cache reset reads back the same rows instead of inserting"""
+    users = [_user(db_session) for _ in range(3)]
+    db_session.commit()
+    pairs = [(user.id, "AED") for user in users]
+
+    first = ensure_wallet_accounts_bulk(db_session, pairs)
+    db_session.commit()
+    clear_wallet_account_cache()
+
+    assert ensure_wallet_accounts_bulk(db_session, pairs) == first
+    assert db_session.query(Account).count() == 9
+
+
+def test_ttl_lru_cache_evicts_and_expires():
+    """Least recently used entries are evicted; expired entries are misses"""
+    cache = TTLLRUCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+    cache.set("d", 4, ttl_seconds=0)
+    assert cache.get("d") is None
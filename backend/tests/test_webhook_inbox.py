@@ -0,0 +1,156 @@
+"""
+Tests for async webhook intake (webhook_inbox_events + inbox processing)
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from decimal import Decimal
+from sqlalchemy.orm import Session
+
+from app.core.transactions.models import Transaction, TransactionStatus
+from app.core.webhooks.models import WebhookInboxEvent, WebhookInboxStatus
+from app.infrastructure.settings import get_settings
+from app.services.webhook_inbox import (
+    list_due_inbox_events,
+    process_inbox_event,
+    reset_dead_letter_events,
+    store_zand_deposit_event,
+)
+from app.services.wallet_helpers import get_wallet_balances
+from app.utils.webhook_security import verify_zand_webhook_security, zand_signature
+
+
+def _payload(user_id, amount="100.00"):
+    return {
+        "provider_event_id": f"ZAND-EVT-{uuid4()}",
+        "iban": "AE123456789012345678901",
+        "user_id": str(user_id),
+        "amount": amount,
+        "currency": "AED",
+        "occurred_at": "2025-12-18T10:00:00Z",
+    }
+
+
+def test_webhook_persists_to_inbox_and_dedupes_deliveries(zand_post, db_session: Session, test_user):
+    """Webhook answers 202 from the inbox; a redelivery maps to the same transaction"""
+    payload = _payload(test_user.id, "250.00")
+
+    first = zand_post("/zand/deposit", payload)
+    second = zand_post("/zand/deposit", payload)
+
+    assert first.status_code == 202
+    assert second.status_code == 202
+    assert first.json()["status"] == "accepted"
+    assert second.json()["status"] == "duplicate"
+    assert second.json()["transaction_id"] == first.json()["transaction_id"]
+
+    event = db_session.query(WebhookInboxEvent).one()
+    assert event.status == WebhookInboxStatus.PROCESSED.value
+    assert event.attempts == 1
+
+    # WEBHOOK_INBOX_ASYNC=false in tests: processed inline with the intake-assigned transaction id
+    transaction = db_session.query(Transaction).filter(
+        Transaction.id == first.json()["transaction_id"]
+    ).one()
+    assert transaction.status == TransactionStatus.COMPLIANCE_REVIEW
+    assert get_wallet_balances(db_session, test_user.id, "AED")["blocked_balance"] == Decimal("250.00")
+
+
+def test_webhook_requires_valid_signature(client, zand_post, db_session: Session, test_user):
+    """Unsigned, wrongly signed or replayed (stale timestamp) deposits are rejected before reaching the inbox"""
+    payload = _payload(test_user.id)
+    stale = int(time.time()) - get_settings().ZAND_WEBHOOK_TOLERANCE_SECONDS - 60
+
+    assert client.post("/webhooks/v1/zand/deposit", json=payload).status_code == 401
+    assert zand_post("/zand/deposit", payload, secret="not-the-secret").status_code == 401
+    assert zand_post("/zand/deposit", payload, timestamp=stale).status_code == 401
+
+    # The timestamp is signed: moving it forward invalidates the signature
+    sent_at = int(time.time())
+    signature = zand_signature(get_settings().ZAND_WEBHOOK_SECRET, str(sent_at), b"{}")
+    assert verify_zand_webhook_security(b"{}", signature, str(sent_at)) == (True, None)
+    assert verify_zand_webhook_security(b"{}", signature, str(sent_at + 1)) == (False, "Invalid signature")
+    assert db_session.query(WebhookInboxEvent).count() == 0
+
+
+def test_deposit_recorded_in_bulk_answers_with_its_transaction(zand_post, db_session: Session, test_user):
+    """The webhook never hands out a transaction id the deposit is not recorded under"""
+    payload = _payload(test_user.id, "75.00")
+    bulk = zand_post("/zand/deposits/bulk", {"events": [payload]}).json()
+    bulk_transaction_id = bulk["results"][0]["transaction_id"]
+
+    # Recorded before intake: duplicate, nothing stored in the inbox
+    response = zand_post("/zand/deposit", payload)
+    assert response.status_code == 202
+    assert response.json() == {"status": "duplicate", "transaction_id": bulk_transaction_id}
+    assert db_session.query(WebhookInboxEvent).count() == 0
+
+    # Recorded between intake and processing: processing returns the existing Transaction
+    late = _payload(test_user.id, "25.00")
+    event_id, intake_transaction_id, _ = store_zand_deposit_event(
+        db_session, provider_event_id=late["provider_event_id"], payload=late,
+    )
+    db_session.commit()
+    late_transaction_id = zand_post("/zand/deposits/bulk", {"events": [late]}).json()["results"][0]["transaction_id"]
+    status, _, transaction_id = process_inbox_event(db_session, event_id)
+    assert status == WebhookInboxStatus.PROCESSED.value
+    assert str(transaction_id) == late_transaction_id != str(intake_transaction_id)
+    assert get_wallet_balances(db_session, test_user.id, "AED")["blocked_balance"] == Decimal("100.00")
+
+
+def test_inbox_retries_then_dead_letters(db_session: Session, monkeypatch):
+    """Retriable failures back off; exhausted events are dead-lettered and can be reset"""
+    monkeypatch.setattr(get_settings(), "WEBHOOK_INBOX_MAX_ATTEMPTS", 2)
+
+    payload = _payload(uuid4())  # Unknown user: Transaction insert fails (FK)
+    event_id, transaction_id, created = store_zand_deposit_event(
+        db_session, provider_event_id=payload["provider_event_id"], payload=payload,
+    )
+    db_session.commit()
+    assert created
+
+    status, retry_in, _ = process_inbox_event(db_session, event_id)
+    assert status == WebhookInboxStatus.FAILED.value
+    assert retry_in == get_settings().WEBHOOK_INBOX_BACKOFF_SECONDS
+
+    event = db_session.query(WebhookInboxEvent).filter(WebhookInboxEvent.id == event_id).one()
+    assert event.attempts == 1
+    assert event.next_attempt_at is not None
+    assert event.last_error.startswith("IntegrityError")
+    assert list_due_inbox_events(db_session) == []  # Retry not due yet
+
+    # A duplicate job running before the backoff has passed does not spend an attempt
+    assert process_inbox_event(db_session, event_id) == (None, None, None)
+    db_session.expire_all()
+    event = db_session.query(WebhookInboxEvent).filter(WebhookInboxEvent.id == event_id).one()
+    assert (event.status, event.attempts) == (WebhookInboxStatus.FAILED.value, 1)
+
+    event.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+    assert list_due_inbox_events(db_session) == [(event_id, 1)]
+
+    status, retry_in, _ = process_inbox_event(db_session, event_id)
+    assert status == WebhookInboxStatus.DEAD_LETTER.value
+    assert retry_in is None
+
+    # Dead-lettered events are not processed again until reset
+    assert process_inbox_event(db_session, event_id) == (WebhookInboxStatus.DEAD_LETTER.value, None, transaction_id)
+    assert reset_dead_letter_events(db_session, [event_id]) == 1
+    db_session.commit()
+    db_session.expire_all()
+    event = db_session.query(WebhookInboxEvent).filter(WebhookInboxEvent.id == event_id).one()
+    assert (event.status, event.attempts) == (WebhookInboxStatus.RECEIVED.value, 0)
+
+
+def test_inbox_non_retriable_error_dead_letters_immediately(db_session: Session, test_user):
+    """Validation errors fail the same way every time: no retry"""
+    payload = _payload(test_user.id, "0")
+    event_id, _, _ = store_zand_deposit_event(
+        db_session, provider_event_id=payload["provider_event_id"], payload=payload,
+    )
+    db_session.commit()
+
+    status, _, _ = process_inbox_event(db_session, event_id)
+    assert status == WebhookInboxStatus.DEAD_LETTER.value
+    assert db_session.query(Transaction).count() == 0
@@ -0,0 +1,93 @@
+"""
+Tests for bulk ZAND deposit ingestion (backlog replay)
+"""
+
+from uuid import uuid4
+from decimal import Decimal
+from sqlalchemy.orm import Session
+
+from app.core.transactions.models import Transaction, TransactionStatus
+from app.core.ledger.models import Operation
+from app.infrastructure.settings import get_settings
+from app.services.fund_services import DepositEvent, record_deposits_blocked_bulk
+from app.services.wallet_helpers import get_wallet_balances
+
+
+def _event(user_id, amount="100.00", provider_event_id=None):
+    return {
+        "provider_event_id": provider_event_id or f"ZAND-EVT-{uuid4()}",
+        "iban": "AE123456789012345678901",
+        "user_id": str(user_id),
+        "amount": amount,
+        "currency": "AED",
+        "occurred_at": "2025-12-18T10:00:00Z",
+    }
+
+
+def test_bulk_deposit_endpoint_results_per_event(zand_post, db_session: Session, test_user):
+    """Bulk webhook records every event and reports accepted / duplicate / failed per event"""
+    replayed = _event(test_user.id, "50.00")
+    response = zand_post("/zand/deposit", replayed)
+    assert response.status_code in (200, 202)
+
+    fresh = _event(test_user.id, "200.00")
+    events = [
+        replayed,                      # already recorded by the single-event webhook
+        fresh,
+        dict(fresh),                   # duplicate inside the batch
+        _event(uuid4(), "10.00"),      # unknown user
+        _event(test_user.id, "300.00"),
+    ]
+
+    response = zand_post("/zand/deposits/bulk", {"events": events})
+    assert response.status_code == 200, response.json()
+    body = response.json()
+
+    assert [r["status"] for r in body["results"]] == ["duplicate", "accepted", "duplicate", "failed", "accepted"]
+    assert (body["accepted_count"], body["duplicate_count"], body["failed_count"]) == (2, 2, 1)
+    assert body["results"][2]["transaction_id"] == body["results"][1]["transaction_id"]
+
+    balances = get_wallet_balances(db_session, test_user.id, "AED")
+    assert balances["blocked_balance"] == Decimal("550.00")
+
+    transaction = db_session.query(Transaction).filter(
+        Transaction.id == body["results"][1]["transaction_id"]
+    ).one()
+    assert transaction.status == TransactionStatus.COMPLIANCE_REVIEW
+
+
+def test_bulk_deposit_requires_valid_signature(client, zand_post, db_session: Session, test_user, monkeypatch):
+    """Unsigned, wrongly signed and secret-less (outside DEV_MODE) requests credit nothing"""
+    body = {"events": [_event(test_user.id, "100.00")]}
+
+    assert client.post("/webhooks/v1/zand/deposits/bulk", json=body).status_code == 401
+    assert zand_post("/zand/deposits/bulk", body, secret="not-the-secret").status_code == 401
+
+    monkeypatch.setattr(get_settings(), "ZAND_WEBHOOK_SECRET", "")
+    monkeypatch.setattr(get_settings(), "DEV_MODE", False)
+    assert zand_post("/zand/deposits/bulk", body).status_code == 401
+
+    assert db_session.query(Operation).count() == 0
+
+
+def test_bulk_deposit_chunks_and_replay_is_idempotent(db_session: Session, test_user):
+    """Events are posted across several chunks; replaying the batch records nothing new"""
+    events = [
+        DepositEvent(
+            provider_event_id=f"ZAND-EVT-{i}",
+            user_id=test_user.id,
+            amount=Decimal("10.00"),
+            currency="AED",
+        )
+        for i in range(7)
+    ]
+
+    results = record_deposits_blocked_bulk(db=db_session, events=events, chunk_size=3)
+    assert [r.status for r in results] == ["accepted"] * 7
+    assert db_session.query(Operation).count() == 7
+
+    replay = record_deposits_blocked_bulk(db=db_session, events=events, chunk_size=3)
+    assert [r.status for r in replay] == ["duplicate"] * 7
+    assert [r.operation_id for r in replay] == [r.operation_id for r in results]
+    assert db_session.query(Operation).count() == 7
+    assert get_wallet_balances(db_session, test_user.id, "AED")["blocked_balance"] == Decimal("70.00")